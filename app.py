@@ -6,7 +6,7 @@ A comprehensive web interface for managing healthcare provider data
 
 import os
 import logging
-from flask import Flask, jsonify
+from flask import Flask, Response, jsonify
 from flask_cors import CORS
 from flask_sqlalchemy import SQLAlchemy
 from dotenv import load_dotenv
@@ -91,6 +91,11 @@ def api_root():
         }
     })
 
+@app.route('/metrics')
+def metrics():
+    from src.monitoring.metrics import CONTENT_TYPE, render
+    return Response(render(), content_type=CONTENT_TYPE)
+
 @app.errorhandler(404)
 def not_found(error):
     return jsonify({'error': 'Endpoint not found'}), 404
@@ -0,0 +1,256 @@
+<?php
+/**
+ * Plugin Name: Healthcare Provider Bulk Upsert
+ * Plugin URI: https://care-compass.jp
+ * Description: REST endpoint that creates or updates many healthcare_provider posts (with ACF fields and taxonomies) in a single request for the Care Compass Japan sync pipeline.
+ * Version: 1.0.0
+ * Author: Care Compass Japan
+ * License: GPL v2 or later
+ *
+ * POST /wp-json/healthcare/v1/providers/bulk
+ * {
+ *   "items": [
+ *     {
+ *       "ref": "123",                      // Client reference, echoed back
+ *       "google_place_id": "ChIJ...",      // Used to find existing posts
+ *       "post_id": 456,                    // Optional known post ID
+ *       "post": {"title": "...", "content": "...", "status": "publish",
+ *                "categories": [1], "location": [10], "specialties": [20]},
+ *       "acf": {"field_669d64327e1be": "...", "provider_rating": "4.5"}
+ *     }
+ *   ]
+ * }
+ *
+ * Response: {"results": [{"ref", "google_place_id", "post_id", "status", "error",
+ *                         "invalid_featured_media" (only when the media ID no longer exists)}],
+ *            "post_ids": {"<google_place_id>": <post_id>}}
+ */
+
+// Prevent direct access
+if (!defined('ABSPATH')) {
+    exit;
+}
+
+class HealthcareBulkUpsert {
+
+    const POST_TYPE = 'healthcare_provider';
+    const PLACE_ID_META = '_healthcare_google_place_id';
+    const MAX_ITEMS = 100;
+
+    public function __init() {
+        add_action('rest_api_init', array($this, 'register_routes'));
+    }
+
+    /**
+     * Register the bulk upsert route
+     */
+    public function register_routes() {
+        register_rest_route('healthcare/v1', '/providers/bulk', array(
+            'methods' => 'POST',
+            'callback' => array($this, 'bulk_upsert'),
+            'permission_callback' => function() {
+                return current_user_can('publish_posts') && current_user_can('edit_others_posts');
+            },
+        ));
+    }
+
+    /**
+     * Upsert every item in the request, reporting results per item
+     */
+    public function bulk_upsert(WP_REST_Request $request) {
+        $items = $request->get_param('items');
+
+        if (!is_array($items)) {
+            return new WP_Error('invalid_items', 'Request body must contain an "items" array', array('status' => 400));
+        }
+
+        if (count($items) > self::MAX_ITEMS) {
+            return new WP_Error('too_many_items', sprintf('At most %d items per request', self::MAX_ITEMS), array('status' => 400));
+        }
+
+        // Term counts are recalculated once at the end instead of per post
+        wp_defer_term_counting(true);
+
+        $results = array();
+        $post_ids = array();
+
+        try {
+            $existing = $this->find_posts_by_place_id($items);
+            $taxonomies = $this->taxonomy_rest_bases();
+
+            foreach ($items as $item) {
+                $result = $this->upsert_item($item, $existing, $taxonomies);
+                $results[] = $result;
+
+                if ($result['post_id'] && !empty($item['google_place_id'])) {
+                    $post_ids[$item['google_place_id']] = $result['post_id'];
+                }
+            }
+        } finally {
+            // Always restore counting, even if a fatal error escapes the loop
+            wp_defer_term_counting(false);
+        }
+
+        return rest_ensure_response(array(
+            'results' => $results,
+            'post_ids' => $post_ids,
+        ));
+    }
+
+    /**
+     * Look up existing posts for all items' place IDs in one query
+     */
+    private function find_posts_by_place_id($items) {
+        global $wpdb;
+
+        $place_ids = array();
+        foreach ($items as $item) {
+            if (!empty($item['google_place_id'])) {
+                $place_ids[] = (string) $item['google_place_id'];
+            }
+        }
+
+        if (empty($place_ids)) {
+            return array();
+        }
+
+        $placeholders = implode(',', array_fill(0, count($place_ids), '%s'));
+        $rows = $wpdb->get_results($wpdb->prepare(
+            "SELECT pm.meta_value AS place_id, pm.post_id
+             FROM {$wpdb->postmeta} pm
+             INNER JOIN {$wpdb->posts} p ON p.ID = pm.post_id
+             WHERE pm.meta_key = %s
+               AND p.post_type = %s
+               AND p.post_status <> 'trash'
+               AND pm.meta_value IN ($placeholders)",
+            array_merge(array(self::PLACE_ID_META, self::POST_TYPE), $place_ids)
+        ));
+
+        $existing = array();
+        foreach ($rows as $row) {
+            $existing[$row->place_id] = (int) $row->post_id;
+        }
+
+        return $existing;
+    }
+
+    /**
+     * Map REST field names (e.g. "location", "specialties") to taxonomy names
+     */
+    private function taxonomy_rest_bases() {
+        $map = array();
+        foreach (get_object_taxonomies(self::POST_TYPE, 'objects') as $taxonomy) {
+            $rest_base = !empty($taxonomy->rest_base) ? $taxonomy->rest_base : $taxonomy->name;
+            $map[$rest_base] = $taxonomy->name;
+        }
+        return $map;
+    }
+
+    /**
+     * Create or update a single provider post
+     */
+    private function upsert_item($item, $existing, $taxonomies) {
+        $ref = isset($item['ref']) ? (string) $item['ref'] : null;
+        $place_id = isset($item['google_place_id']) ? (string) $item['google_place_id'] : '';
+        $result = array(
+            'ref' => $ref,
+            'google_place_id' => $place_id,
+            'post_id' => null,
+            'status' => 'error',
+            'error' => null,
+        );
+
+        try {
+            $post = isset($item['post']) && is_array($item['post']) ? $item['post'] : array();
+            $acf = isset($item['acf']) && is_array($item['acf']) ? $item['acf'] : array();
+
+            // Resolve the target post: known ID first, then place ID
+            $post_id = 0;
+            if (!empty($item['post_id']) && get_post_type((int) $item['post_id']) === self::POST_TYPE) {
+                $post_id = (int) $item['post_id'];
+            } elseif ($place_id && isset($existing[$place_id])) {
+                $post_id = $existing[$place_id];
+            }
+
+            $postarr = array();
+            foreach (array('title' => 'post_title', 'content' => 'post_content', 'status' => 'post_status', 'excerpt' => 'post_excerpt') as $key => $field) {
+                if (array_key_exists($key, $post)) {
+                    $postarr[$field] = $post[$key];
+                }
+            }
+            if (isset($post['categories'])) {
+                $postarr['post_category'] = array_map('intval', (array) $post['categories']);
+            }
+
+            if ($post_id) {
+                // Skip the post save (and its hooks) for ACF-only deltas
+                if (!empty($postarr)) {
+                    $postarr['ID'] = $post_id;
+                    $saved = wp_update_post(wp_slash($postarr), true);
+                    if (is_wp_error($saved)) {
+                        throw new Exception($saved->get_error_message());
+                    }
+                }
+                $result['status'] = 'updated';
+            } else {
+                $postarr['post_type'] = self::POST_TYPE;
+                if (!isset($postarr['post_status'])) {
+                    $postarr['post_status'] = 'publish';
+                }
+                $post_id = wp_insert_post(wp_slash($postarr), true);
+                if (is_wp_error($post_id)) {
+                    throw new Exception($post_id->get_error_message());
+                }
+                $result['status'] = 'created';
+            }
+
+            if ($place_id) {
+                update_post_meta($post_id, self::PLACE_ID_META, $place_id);
+            }
+
+            // Custom taxonomies by REST field name
+            foreach ($taxonomies as $rest_base => $taxonomy) {
+                if (isset($post[$rest_base])) {
+                    $terms = wp_set_object_terms($post_id, array_map('intval', (array) $post[$rest_base]), $taxonomy);
+                    if (is_wp_error($terms)) {
+                        throw new Exception($terms->get_error_message());
+                    }
+                }
+            }
+
+            if (isset($post['featured_media'])) {
+                $media_id = (int) $post['featured_media'];
+                if (get_post_type($media_id) === 'attachment') {
+                    set_post_thumbnail($post_id, $media_id);
+                } else {
+                    // Deleted from the media library; the client uploads the image again
+                    $result['invalid_featured_media'] = true;
+                }
+            }
+
+            // ACF values by field key or field name, as the REST API accepts them
+            if (!empty($acf) && function_exists('update_field')) {
+                foreach ($acf as $selector => $value) {
+                    update_field($selector, $value, $post_id);
+                }
+            }
+
+            $result['post_id'] = (int) $post_id;
+
+        } catch (Exception $e) {
+            $result['status'] = 'error';
+            $result['error'] = $e->getMessage();
+        }
+
+        return $result;
+    }
+}
+
+// Initialize the plugin
+function init_healthcare_bulk_upsert() {
+    $healthcare_bulk_upsert = new HealthcareBulkUpsert();
+    $healthcare_bulk_upsert->__init();
+}
+add_action('init', 'init_healthcare_bulk_upsert', 5);
+
+?>
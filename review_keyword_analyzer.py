@@ -15,6 +15,8 @@ from nltk.corpus import stopwords
 from nltk.tokenize import word_tokenize
 from nltk.stem import WordNetLemmatizer
 
+from src.utils.review_features import AhoCorasickMatcher
+
 # Download required NLTK data
 try:
     nltk.data.find('tokenizers/punkt')
@@ -195,16 +197,13 @@ class ReviewKeywordAnalyzer:
             ]
         }
         
+        # One whole-word pass per review covers every category
+        matcher = AhoCorasickMatcher(service_patterns, whole_words=True)
         service_keywords = {category: Counter() for category in service_patterns}
         
         for review in reviews:
-            text = review.get('text', '').lower()
-            tokens = self.clean_and_tokenize(text)
-            
-            for category, keywords in service_patterns.items():
-                for keyword in keywords:
-                    if keyword in tokens:
-                        service_keywords[category][keyword] += 1
+            for category, keywords in matcher.find(review.get('text', '')).items():
+                service_keywords[category].update(keywords)
         
         return service_keywords
     
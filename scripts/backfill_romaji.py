@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Backfill romaji names in parallel
+Romanizes Japanese provider names across all CPU cores. Use --all after
+changing converter rules to re-romanize the whole directory.
+"""
+
+import sys
+import os
+import logging
+import argparse
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.utils.romaji_backfill import RomajiBackfill
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+
+def main():
+    """Main execution"""
+    parser = argparse.ArgumentParser(description='Backfill romaji provider names in parallel')
+    parser.add_argument('--all', action='store_true', help='Re-romanize providers that already have romaji')
+    parser.add_argument('--workers', type=int, default=None, help='Worker processes (default: CPU count)')
+    parser.add_argument('--page-size', type=int, default=2000, help='Rows fetched per page')
+    parser.add_argument('--chunk-size', type=int, default=200, help='Rows per worker task')
+    parser.add_argument('--dry-run', action='store_true', help='Convert without writing')
+    args = parser.parse_args()
+    
+    logger.info("="*60)
+    logger.info("🔤 PARALLEL ROMAJI BACKFILL")
+    logger.info("="*60)
+    
+    backfill = RomajiBackfill(
+        workers=args.workers,
+        page_size=args.page_size,
+        chunk_size=args.chunk_size,
+        only_missing=not args.all,
+        dry_run=args.dry_run
+    )
+    
+    try:
+        stats = backfill.run()
+    except Exception as e:
+        logger.error(f"❌ Romaji backfill failed: {e}")
+        return 1
+    
+    logger.info(f"   Scanned: {stats['scanned']}")
+    logger.info(f"   Converted: {stats['converted']}")
+    logger.info(f"   Written: {stats['written']}")
+    logger.info(f"   Time: {stats['elapsed_seconds']}s")
+    
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
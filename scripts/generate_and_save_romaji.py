@@ -14,7 +14,7 @@ import requests
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from src.core.database import DatabaseManager
-from src.utils.romaji_converter import contains_japanese, convert_to_romaji
+from src.utils.romaji_backfill import JAPANESE_NAME_REGEX, RomajiBackfill
 from sqlalchemy import text
 from dotenv import load_dotenv
 
@@ -29,49 +29,21 @@ def generate_and_save_romaji():
     session = db.get_session()
     
     try:
-        # Get all providers with Japanese names
+        # Romanize across all cores with batched writes
+        stats = RomajiBackfill(db=db, only_missing=False).run()
+        logger.info(f"\n✅ Saved romaji for {stats['written']} providers")
+        
+        # Return the Japanese-named providers for the WordPress title cleanup
         query = """
             SELECT id, provider_name, wordpress_post_id
             FROM providers
-            WHERE provider_name ~ '[\u3040-\u309f\u30a0-\u30ff\u4e00-\u9faf]'
+            WHERE provider_name ~ :pattern
             ORDER BY id
         """
         
-        result = session.execute(text(query))
-        providers = list(result)
-        
-        logger.info(f"Found {len(providers)} providers with Japanese names")
-        
-        # Generate and save romaji for each
-        for provider in providers:
-            provider_id = provider[0]
-            provider_name = provider[1]
-            wordpress_post_id = provider[2]
-            
-            # Generate romaji
-            romaji = convert_to_romaji(provider_name)
-            
-            if romaji and romaji != provider_name:
-                # Update database directly
-                update_query = """
-                    UPDATE providers 
-                    SET provider_name_romaji = :romaji
-                    WHERE id = :id
-                """
-                
-                session.execute(text(update_query), {'romaji': romaji, 'id': provider_id})
-                
-                logger.info(f"✅ {provider_name}")
-                logger.info(f"   Romaji: {romaji}")
-        
-        # Commit all changes
-        session.commit()
-        logger.info(f"\n✅ Saved romaji for {len(providers)} providers")
-        
-        return providers
+        return list(session.execute(text(query), {'pattern': JAPANESE_NAME_REGEX}))
         
     except Exception as e:
-        session.rollback()
         logger.error(f"❌ Error: {e}")
         return []
         
@@ -21,8 +21,8 @@ from typing import Dict, Any
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from src.core.pipeline import UnifiedPipeline, PipelineMode
-from src.core.database import DatabaseManager
-from src.core.cost_tracker import CostTracker
+from src.core.container import components
+from src.monitoring.metrics import start_metrics_server
 
 
 def setup_logging(verbose: bool = False):
@@ -112,7 +112,7 @@ def check_system_status():
     
     # Check database connection
     try:
-        db = DatabaseManager()
+        db = components.get('db')
         session = db.get_session()
         
         # Get provider stats
@@ -140,7 +140,7 @@ def check_system_status():
     
     # Check API costs
     try:
-        tracker = CostTracker()
+        tracker = components.get('cost_tracker')
         daily_usage = tracker.get_daily_usage()
         monthly_usage = tracker.get_monthly_usage()
         
@@ -227,6 +227,9 @@ Examples:
     parser.add_argument('--create-only', action='store_true', help='Only create new posts, skip updates')
     parser.add_argument('--update-only', action='store_true', help='Only update existing posts, skip creates')
     
+    # Observability
+    parser.add_argument('--metrics-port', type=int, help='Serve Prometheus metrics on this port (default: METRICS_PORT)')
+    
     args = parser.parse_args()
     
     # Setup logging
@@ -236,6 +239,8 @@ Examples:
     logger.info(f"🚀 Starting Unified Pipeline Runner")
     logger.info(f"📝 Log file: {log_file}")
     
+    start_metrics_server(args.metrics_port)
+    
     # Check status only
     if args.status_only:
         check_system_status()
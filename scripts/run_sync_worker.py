@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+WordPress Sync Worker
+Publishes operations from the WordPress sync outbox. Run as many copies as
+the site can take; workers skip each other's claimed operations.
+
+Usage:
+    python scripts/run_sync_worker.py                 # poll forever
+    python scripts/run_sync_worker.py --drain         # exit once the queue is empty
+    python scripts/run_sync_worker.py --enqueue-pending --drain
+"""
+
+import sys
+import os
+import argparse
+import logging
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.publishers.sync_worker import SyncWorker
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Drain the WordPress sync outbox')
+    parser.add_argument('--batch-size', type=int, default=20, help='Operations claimed at a time')
+    parser.add_argument('--max-batches', type=int, help='Stop after this many batches')
+    parser.add_argument('--drain', action='store_true', help='Exit when no operation is due')
+    parser.add_argument('--idle-seconds', type=float, default=5.0, help='Poll interval when idle')
+    parser.add_argument('--max-attempts', type=int, default=5, help='Attempts before an operation fails')
+    parser.add_argument('--enqueue-pending', action='store_true',
+                        help='First queue every provider the database says needs sync')
+    parser.add_argument('--stats', action='store_true', help='Show queue statistics and exit')
+    args = parser.parse_args()
+    
+    worker = SyncWorker(batch_size=args.batch_size)
+    worker.outbox.max_attempts = args.max_attempts
+    
+    if args.stats:
+        stats = worker.outbox.stats()
+        for status, count in sorted(stats['counts'].items()):
+            logger.info(f"   {status}: {count}")
+        logger.info(f"   Oldest pending: {stats['oldest_pending_seconds']:.0f}s")
+        return 0
+    
+    if args.enqueue_pending:
+        db = worker.publisher.db
+        providers = db.get_providers_needing_wordpress() + db.get_providers_needing_update()
+        queued = worker.outbox.enqueue([p.id for p in providers])
+        logger.info(f"📥 Queued {queued} providers")
+    
+    logger.info(f"🚀 Sync worker {worker.worker_id} started")
+    try:
+        totals = worker.run(max_batches=args.max_batches, idle_seconds=args.idle_seconds,
+                            drain=args.drain)
+    except KeyboardInterrupt:
+        logger.info("Stopped")
+        return 0
+    
+    logger.info(f"✅ {totals['completed']} completed, {totals['failed']} failed "
+                f"in {totals['batches']} batches")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
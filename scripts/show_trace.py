@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Show Pipeline Trace
+Print a flame-style time breakdown for one pipeline run, or list recent runs
+"""
+
+import sys
+import os
+import argparse
+from datetime import datetime
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.monitoring.tracing import SpanSink, flame_breakdown
+
+
+def main():
+    """Main execution"""
+    parser = argparse.ArgumentParser(description='Show where a pipeline run spent its time')
+    parser.add_argument('run_id', nargs='?', help='Run ID printed by run_pipeline.py (omit to list recent runs)')
+    parser.add_argument('--db', type=str, help='Trace database (default: TRACE_DB or logs/traces.db)')
+    parser.add_argument('--depth', type=int, default=6, help='Maximum tree depth (default: 6)')
+    parser.add_argument('--min-share', type=float, default=0.1,
+                        help='Hide spans below this percent of the run (default: 0.1)')
+    
+    args = parser.parse_args()
+    sink = SpanSink(args.db)
+    
+    if not args.run_id:
+        traces = sink.recent_traces()
+        if not traces:
+            print("No traced runs yet")
+            return 0
+        
+        print(f"{'RUN ID':<38} {'STARTED':<20} {'DURATION':>10}  STATUS")
+        for trace in traces:
+            started = datetime.fromtimestamp(trace['started_at']).strftime('%Y-%m-%d %H:%M:%S')
+            print(f"{trace['trace_id']:<38} {started:<20} {trace['duration']:>9.1f}s  {trace['status']}")
+        return 0
+    
+    spans = sink.spans(args.run_id)
+    if not spans:
+        print(f"❌ No spans recorded for run {args.run_id}")
+        return 1
+    
+    print(f"🔥 Run {args.run_id}: {len(spans)} spans\n")
+    print(flame_breakdown(spans, max_depth=args.depth, min_share=args.min_share / 100))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -18,6 +18,12 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')
 
 from scripts.generate_taxonomy_content_updated import TaxonomyContentGenerator
 from src.core.database import DatabaseManager
+from src.processors.anthropic_usage import (
+    AnthropicUsageTracker,
+    cached_system_prompt,
+    has_cache_breakpoint,
+    PROMPT_CACHING_BETA
+)
 from sqlalchemy import text
 from dotenv import load_dotenv
 
@@ -30,9 +36,44 @@ load_dotenv('config/.env')
 class TaxonomyTermSyncer:
     """Syncs WordPress taxonomy terms with SEO content"""
     
+    # Static instructions for every term prompt (served from the prompt cache)
+    TERM_SYSTEM_PROMPT = """You write short SEO content for taxonomy archive pages of an English-language healthcare directory for expats in Japan.
+
+LOCATION TERMS - GUIDELINES:
+- Write in a natural, informative tone for expats in Japan
+- Keep it to ONE paragraph (60-80 words)
+- Focus on practical information about healthcare in this location
+- Don't mention specific provider counts
+- No promotional language or calls-to-action
+- Mention areas, access, and general availability of English support
+
+LOCATION TERMS - CREATE:
+1. SEO TITLE: (60 chars max, format: "English Healthcare in [Location]")
+2. META DESCRIPTION: (155 chars max)
+3. DESCRIPTION: (ONE paragraph, 60-80 words for WordPress taxonomy description)
+
+SPECIALTY TERMS - GUIDELINES:
+- Keep it to ONE paragraph (40-50 words)
+- Explain what's unique about this specialty in Japan (different approaches, what to expect)
+- State that listed providers have verified English support
+- Don't mention specific provider counts
+- No promotional language or sales speak
+- Factual and informative
+
+SPECIALTY TERMS - CREATE:
+1. SEO TITLE: (Simple, like "English-Speaking [Specialty] in Japan")
+2. META DESCRIPTION: (Simple, 100-120 chars max)
+3. DESCRIPTION: (ONE paragraph, 40-50 words)
+
+Return in this format:
+TITLE: [title]
+META: [meta description]
+DESCRIPTION: [single paragraph]"""
+    
     def __init__(self):
         self.db = DatabaseManager()
         self.generator = TaxonomyContentGenerator()
+        self.usage_tracker = AnthropicUsageTracker()
         
         # WordPress credentials
         self.wp_url = os.getenv('WORDPRESS_URL')
@@ -125,60 +166,25 @@ class TaxonomyTermSyncer:
         """Generate SEO content for taxonomy terms"""
         
         content_list = []
+        system = cached_system_prompt(self.TERM_SYSTEM_PROMPT, model="claude-3-7-sonnet-20250219")
         
         for term in terms:
-            if taxonomy_type == 'location':
-                prompt = f"""Generate content for a location taxonomy archive page.
+            label = 'Location' if taxonomy_type == 'location' else 'Specialty'
+            prompt = f"""Generate content for a {taxonomy_type} taxonomy archive page.
 
-Location: {term['name']}
-
-GUIDELINES:
-- Write in a natural, informative tone for expats in Japan
-- Keep it to ONE paragraph (60-80 words)
-- Focus on practical information about healthcare in this location
-- Don't mention specific provider counts
-- No promotional language or calls-to-action
-- Mention areas, access, and general availability of English support
-
-Create:
-1. SEO TITLE: (60 chars max, format: "English Healthcare in [Location]")
-2. META DESCRIPTION: (155 chars max)
-3. DESCRIPTION: (ONE paragraph, 60-80 words for WordPress taxonomy description)
-
-Return in this format:
-TITLE: [title]
-META: [meta description]
-DESCRIPTION: [single paragraph]"""
-            else:  # specialty
-                prompt = f"""Generate content for a specialty taxonomy archive page.
-
-Specialty: {term['name']}
-
-GUIDELINES:
-- Keep it to ONE paragraph (40-50 words)
-- Explain what's unique about this specialty in Japan (different approaches, what to expect)
-- State that listed providers have verified English support
-- Don't mention specific provider counts
-- No promotional language or sales speak
-- Factual and informative
-
-Create:
-1. SEO TITLE: (Simple, like "English-Speaking {term['name']} in Japan")
-2. META DESCRIPTION: (Simple, 100-120 chars max)
-3. DESCRIPTION: (ONE paragraph, 40-50 words)
-
-Return in this format:
-TITLE: [title]
-META: [meta description]
-DESCRIPTION: [single paragraph]"""
+{label}: {term['name']}"""
 
             try:
                 response = self.generator.client.messages.create(
                     model="claude-3-7-sonnet-20250219",
                     max_tokens=2000,
                     temperature=0.7,
-                    messages=[{"role": "user", "content": prompt}]
+                    system=system,
+                    messages=[{"role": "user", "content": prompt}],
+                    extra_headers={"anthropic-beta": PROMPT_CACHING_BETA}
                 )
+                self.usage_tracker.track_response(response, model="claude-3-7-sonnet-20250219",
+                                                 cached=has_cache_breakpoint(system))
                 
                 content_text = response.content[0].text
                 
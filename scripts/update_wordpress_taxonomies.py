@@ -15,7 +15,6 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')
 
 from src.core.database import DatabaseManager
 from src.publishers.wordpress import WordPressPublisher
-import requests
 
 logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -70,11 +69,12 @@ def update_taxonomies_only(publisher: WordPressPublisher, provider, dry_run: boo
         update_data = taxonomies
         
         # Make API request to update only taxonomies
-        response = requests.post(
+        response = publisher.http.post(
             f"{publisher.wp_url}/wp-json/wp/v2/healthcare_provider/{provider.wordpress_post_id}",
             auth=(publisher.wp_username, publisher.wp_password),
             json=update_data,
-            headers={'Content-Type': 'application/json'}
+            headers={'Content-Type': 'application/json'},
+            timeout=publisher.timeout
         )
         
         if response.status_code == 200:
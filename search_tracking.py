@@ -31,8 +31,10 @@ from typing import Dict, List, Set, Optional, Tuple
 from dataclasses import dataclass, asdict
 from pathlib import Path
 from dotenv import load_dotenv
-from sqlalchemy import create_engine, Column, Integer, String, Text, DateTime, JSON, text
-from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy import Column, Integer, String, Text, DateTime, JSON, text
+from sqlalchemy.orm import declarative_base
+
+from src.core.database import get_database_url, get_engine, get_session_factory, ensure_tables
 
 Base = declarative_base()
 
@@ -116,12 +118,15 @@ class SearchTracker:
         db_password = os.getenv("POSTGRES_PASSWORD", "password")
         db_host = os.getenv("POSTGRES_HOST", "localhost")
         
-        self.engine = create_engine(f"postgresql://{db_user}:{db_password}@{db_host}:5432/directory")
-        self.Session = sessionmaker(bind=self.engine)
+        # Shared process-wide engine instead of a private pool
+        db_url = get_database_url({'user': db_user, 'password': db_password,
+                                   'host': db_host, 'database': 'directory'})
+        self.engine = get_engine(db_url)
+        self.Session = get_session_factory(db_url)
         
         # Create table if it doesn't exist
         try:
-            Base.metadata.create_all(self.engine)
+            ensure_tables(self.engine, Base.metadata)
         except Exception as e:
             print(f"⚠️ Warning: Could not create search_history table: {e}")
     
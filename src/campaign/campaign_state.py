@@ -1,12 +1,16 @@
 #!/usr/bin/env python3
 """
 Campaign State Management for Healthcare Provider Collection
-Tracks progress, costs, and enables pause/resume for 25-day campaign
+Tracks progress, costs, and enables pause/resume for 25-day campaign.
+State is kept in an embedded SQLite database with one row per query.
 """
 
 import json
 import os
+import sqlite3
 import logging
+import threading
+import time
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any
 from dataclasses import dataclass, asdict, field
@@ -90,7 +94,7 @@ class QueryPerformance:
 
 @dataclass 
 class CampaignState:
-    """Complete campaign state for persistence"""
+    """Campaign-level state; per-query rows live in the store's queries table"""
     # Campaign configuration
     campaign_id: str = ""
     target_providers: int = 5000
@@ -105,8 +109,6 @@ class CampaignState:
     total_queries: int = 0
     completed_queries: int = 0
     current_query_index: int = 0
-    query_queue: List[Dict] = field(default_factory=list)
-    query_performance: List[QueryPerformance] = field(default_factory=list)
     
     # Progress tracking
     metrics: CampaignMetrics = field(default_factory=CampaignMetrics)
@@ -132,8 +134,6 @@ class CampaignState:
             'total_queries': self.total_queries,
             'completed_queries': self.completed_queries,
             'current_query_index': self.current_query_index,
-            'query_queue': self.query_queue,
-            'query_performance': [asdict(q) for q in self.query_performance],
             'metrics': asdict(self.metrics),
             'last_checkpoint': self.last_checkpoint,
             'checkpoint_interval': self.checkpoint_interval,
@@ -144,7 +144,11 @@ class CampaignState:
     
     @classmethod
     def from_dict(cls, data: Dict) -> 'CampaignState':
-        """Create from dictionary (JSON deserialization)"""
+        """Create from dictionary (JSON deserialization)
+        
+        Legacy whole-file JSON states also carry query_queue and
+        query_performance; those are imported by CampaignStateManager.
+        """
         state = cls()
         
         # Simple fields
@@ -157,54 +161,119 @@ class CampaignState:
                 setattr(state, field, data[field])
         
         # Lists
-        state.query_queue = data.get('query_queue', [])
         state.protected_provider_ids = data.get('protected_provider_ids', [])
         
         # Complex objects
         if 'metrics' in data:
             state.metrics = CampaignMetrics(**data['metrics'])
         
-        if 'query_performance' in data:
-            state.query_performance = [
-                QueryPerformance(**perf) for perf in data['query_performance']
-            ]
-        
         return state
 
 
 class CampaignStateManager:
-    """Manages campaign state persistence and recovery"""
+    """Manages campaign state persistence and recovery
+    
+    State lives in an embedded SQLite database: one small row for the
+    campaign-level state, one row per query, and checkpoints that snapshot
+    only the campaign row plus a completion sequence watermark. Marking a
+    query done updates its row and the campaign row in one transaction, so
+    the cost of a save does not grow with the campaign.
+    """
     
-    def __init__(self, state_file: str = 'campaign_state.json'):
+    def __init__(self, state_file: str = 'campaign_state.db'):
         """Initialize state manager
         
         Args:
-            state_file: Path to state persistence file
+            state_file: Path to the state database. A legacy JSON state with the
+                same base name (e.g. campaign_state.json) is imported on first use.
         """
-        self.state_file = state_file
+        root, _ = os.path.splitext(state_file)
+        self.state_file = root + '.db'
+        self.legacy_file = root + '.json'
         self.state: Optional[CampaignState] = None
-        self.backup_dir = 'campaign_checkpoints'
+        self.keep_checkpoints = 10
         
-        # Create backup directory
-        os.makedirs(self.backup_dir, exist_ok=True)
+        directory = os.path.dirname(self.state_file)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(self.state_file, timeout=30, check_same_thread=False)
+        self._init_db()
         
         # Load existing state or create new
         self.load_or_create_state()
     
+    def close(self):
+        """Close the state database"""
+        with self._lock:
+            self._conn.close()
+    
+    def _init_db(self):
+        with self._lock, self._conn:
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute('''
+                CREATE TABLE IF NOT EXISTS campaign (
+                    id INTEGER PRIMARY KEY CHECK (id = 1),
+                    state TEXT NOT NULL,
+                    updated_at TEXT NOT NULL
+                )
+            ''')
+            self._conn.execute('''
+                CREATE TABLE IF NOT EXISTS queries (
+                    idx INTEGER PRIMARY KEY,
+                    query TEXT NOT NULL,
+                    status TEXT NOT NULL DEFAULT 'pending',
+                    completed_seq INTEGER,
+                    providers_found INTEGER DEFAULT 0,
+                    providers_qualified INTEGER DEFAULT 0,
+                    avg_english_score REAL DEFAULT 0,
+                    execution_time TEXT,
+                    error TEXT,
+                    lease_owner TEXT,
+                    lease_expires REAL
+                )
+            ''')
+            columns = {row[1] for row in self._conn.execute('PRAGMA table_info(queries)')}
+            for column, ddl in (('lease_owner', 'TEXT'), ('lease_expires', 'REAL')):
+                if column not in columns:
+                    self._conn.execute(f'ALTER TABLE queries ADD COLUMN {column} {ddl}')
+            self._conn.execute('CREATE INDEX IF NOT EXISTS idx_queries_status ON queries(status, idx)')
+            self._conn.execute('CREATE INDEX IF NOT EXISTS idx_queries_seq ON queries(completed_seq)')
+            self._conn.execute('''
+                CREATE TABLE IF NOT EXISTS checkpoints (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    created_at TEXT NOT NULL,
+                    completed_seq INTEGER NOT NULL,
+                    state TEXT NOT NULL
+                )
+            ''')
+    
+    def _write_state(self):
+        """Upsert the campaign row (caller holds the lock and transaction)"""
+        self._conn.execute(
+            'INSERT OR REPLACE INTO campaign (id, state, updated_at) VALUES (1, ?, ?)',
+            (json.dumps(self.state.to_dict()), self.state.metrics.last_update)
+        )
+    
     def load_or_create_state(self) -> CampaignState:
         """Load existing state or create new campaign"""
-        if os.path.exists(self.state_file):
-            try:
-                self.state = self.load_state()
-                logger.info(f"✅ Loaded existing campaign state")
-                logger.info(f"   Progress: {self.state.metrics.total_providers_found}/{self.state.target_providers} providers")
-                logger.info(f"   Queries: {self.state.completed_queries}/{self.state.total_queries} completed")
-                logger.info(f"   Cost: ${self.state.metrics.total_cost:.2f}/${self.state.budget_limit:.2f}")
-            except Exception as e:
-                logger.error(f"Failed to load state: {e}")
-                self.state = self.create_new_campaign()
-        else:
+        try:
+            self.state = self.load_state()
+            if self.state is None and os.path.exists(self.legacy_file):
+                self.state = self.import_json(self.legacy_file)
+                logger.info(f"📥 Imported legacy campaign state from {self.legacy_file}")
+        except Exception as e:
+            logger.error(f"Failed to load state: {e}")
+            self.state = None
+        
+        if self.state is None:
             self.state = self.create_new_campaign()
+        else:
+            logger.info(f"✅ Loaded existing campaign state")
+            logger.info(f"   Progress: {self.state.metrics.total_providers_found}/{self.state.target_providers} providers")
+            logger.info(f"   Queries: {self.state.completed_queries}/{self.state.total_queries} completed")
+            logger.info(f"   Cost: ${self.state.metrics.total_cost:.2f}/${self.state.budget_limit:.2f}")
         
         return self.state
     
@@ -235,57 +304,131 @@ class CampaignStateManager:
         
         return state
     
-    def load_state(self) -> CampaignState:
-        """Load state from file"""
-        with open(self.state_file, 'r') as f:
+    def load_state(self) -> Optional[CampaignState]:
+        """Load state from the database (None if no campaign is stored)"""
+        with self._lock:
+            row = self._conn.execute('SELECT state FROM campaign WHERE id = 1').fetchone()
+        return CampaignState.from_dict(json.loads(row[0])) if row else None
+    
+    def import_json(self, path: str) -> CampaignState:
+        """Replace the stored campaign with a whole-file JSON state
+        
+        Queries before current_query_index are imported as completed, with
+        their query_performance entries.
+        """
+        with open(path, 'r') as f:
             data = json.load(f)
         
-        return CampaignState.from_dict(data)
+        state = CampaignState.from_dict(data)
+        queue = data.get('query_queue', [])
+        performance = data.get('query_performance', [])
+        
+        rows = []
+        for idx, query in enumerate(queue):
+            if idx < state.current_query_index:
+                perf = performance[idx] if idx < len(performance) else {}
+                rows.append((idx, json.dumps(query), 'completed', idx + 1,
+                             perf.get('providers_found', 0), perf.get('providers_qualified', 0),
+                             perf.get('avg_english_score', 0.0), perf.get('execution_time'),
+                             perf.get('error')))
+            else:
+                rows.append((idx, json.dumps(query), 'pending', None, 0, 0, 0.0, None, None))
+        
+        with self._lock, self._conn:
+            self._conn.execute('DELETE FROM queries')
+            self._conn.execute('DELETE FROM checkpoints')
+            self._conn.executemany('''
+                INSERT INTO queries (idx, query, status, completed_seq, providers_found, providers_qualified,
+                                     avg_english_score, execution_time, error)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', rows)
+            self.state = state
+            self._write_state()
+        
+        return state
     
     def save_state(self):
-        """Save current state to file"""
+        """Save the campaign-level state"""
         if not self.state:
             return
         
-        # Update last update time
-        self.state.metrics.last_update = datetime.now().isoformat()
-        
-        # Save main state file
-        with open(self.state_file, 'w') as f:
-            json.dump(self.state.to_dict(), f, indent=2)
-        
-        # Check if checkpoint needed
-        if self.state.providers_since_checkpoint >= self.state.checkpoint_interval:
-            self.create_checkpoint()
-            self.state.providers_since_checkpoint = 0
+        with self._lock:
+            # Update last update time
+            self.state.metrics.last_update = datetime.now().isoformat()
+            
+            with self._conn:
+                self._write_state()
+            
+            # Check if checkpoint needed
+            if self.state.providers_since_checkpoint >= self.state.checkpoint_interval:
+                self.state.providers_since_checkpoint = 0
+                self.create_checkpoint()
     
-    def create_checkpoint(self):
-        """Create a backup checkpoint"""
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        checkpoint_file = os.path.join(
-            self.backup_dir, 
-            f'checkpoint_{timestamp}.json'
-        )
+    def create_checkpoint(self) -> int:
+        """Snapshot the campaign row and the query completion watermark
         
-        with open(checkpoint_file, 'w') as f:
-            json.dump(self.state.to_dict(), f, indent=2)
-        
-        self.state.last_checkpoint = checkpoint_file
-        logger.info(f"💾 Checkpoint saved: {checkpoint_file}")
-        
-        # Keep only last 10 checkpoints
-        self._cleanup_old_checkpoints()
+        Returns:
+            Checkpoint id
+        """
+        with self._lock, self._conn:
+            seq = self._conn.execute('SELECT COALESCE(MAX(completed_seq), 0) FROM queries').fetchone()[0]
+            created_at = datetime.now().isoformat()
+            cursor = self._conn.execute(
+                'INSERT INTO checkpoints (created_at, completed_seq, state) VALUES (?, ?, ?)',
+                (created_at, seq, json.dumps(self.state.to_dict()))
+            )
+            checkpoint_id = cursor.lastrowid
+            
+            self.state.last_checkpoint = f"checkpoint {checkpoint_id} ({created_at})"
+            self._write_state()
+            
+            # Keep only the latest checkpoints
+            self._conn.execute(
+                'DELETE FROM checkpoints WHERE id NOT IN (SELECT id FROM checkpoints ORDER BY id DESC LIMIT ?)',
+                (self.keep_checkpoints,)
+            )
+        
+        logger.info(f"💾 Checkpoint saved: {self.state.last_checkpoint}")
+        return checkpoint_id
+    
+    def list_checkpoints(self) -> List[Dict]:
+        """Stored checkpoints, newest first"""
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT id, created_at, completed_seq FROM checkpoints ORDER BY id DESC'
+            ).fetchall()
+        return [{'id': r[0], 'created_at': r[1], 'completed_seq': r[2]} for r in rows]
     
-    def _cleanup_old_checkpoints(self, keep_count: int = 10):
-        """Remove old checkpoint files"""
-        checkpoints = sorted([
-            f for f in os.listdir(self.backup_dir)
-            if f.startswith('checkpoint_')
-        ])
+    def restore_checkpoint(self, checkpoint_id: int = None) -> bool:
+        """Roll the campaign back to a checkpoint (latest if none given)
         
-        if len(checkpoints) > keep_count:
-            for old_checkpoint in checkpoints[:-keep_count]:
-                os.remove(os.path.join(self.backup_dir, old_checkpoint))
+        Queries completed after the checkpoint, and any leased ones, go back
+        to pending.
+        """
+        with self._lock, self._conn:
+            if checkpoint_id is None:
+                row = self._conn.execute(
+                    'SELECT completed_seq, state FROM checkpoints ORDER BY id DESC LIMIT 1'
+                ).fetchone()
+            else:
+                row = self._conn.execute(
+                    'SELECT completed_seq, state FROM checkpoints WHERE id = ?', (checkpoint_id,)
+                ).fetchone()
+            
+            if not row:
+                return False
+            
+            self._conn.execute('''
+                UPDATE queries
+                SET status = 'pending', completed_seq = NULL, providers_found = 0,
+                    providers_qualified = 0, avg_english_score = 0, execution_time = NULL, error = NULL,
+                    lease_owner = NULL, lease_expires = NULL
+                WHERE completed_seq > ? OR status = 'leased'
+            ''', (row[0],))
+            self.state = CampaignState.from_dict(json.loads(row[1]))
+            self._write_state()
+        
+        return True
     
     def initialize_query_queue(self, queries: List[Dict]):
         """Initialize the query queue from enhanced search
@@ -293,50 +436,168 @@ class CampaignStateManager:
         Args:
             queries: List of query dictionaries from generate_english_focused_queries()
         """
-        self.state.query_queue = queries
-        self.state.total_queries = len(queries)
-        self.state.current_query_index = 0
-        self.state.completed_queries = 0
-        
-        # Initialize performance tracking
-        self.state.query_performance = []
+        with self._lock, self._conn:
+            self._conn.execute('DELETE FROM queries')
+            self._conn.execute('DELETE FROM checkpoints')
+            self._conn.executemany(
+                'INSERT INTO queries (idx, query) VALUES (?, ?)',
+                [(idx, json.dumps(query)) for idx, query in enumerate(queries)]
+            )
+            
+            self.state.total_queries = len(queries)
+            self.state.current_query_index = 0
+            self.state.completed_queries = 0
         
         logger.info(f"📋 Initialized {len(queries)} queries in campaign queue")
         self.save_state()
     
     def get_next_query(self) -> Optional[Dict]:
-        """Get the next query to execute"""
-        if self.state.current_query_index < len(self.state.query_queue):
-            return self.state.query_queue[self.state.current_query_index]
-        return None
+        """Get the next query to execute
+        
+        The returned dict carries its position in the queue as queue_index.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT idx, query FROM queries WHERE status = 'pending' ORDER BY idx LIMIT 1"
+            ).fetchone()
+        if not row:
+            return None
+        return {**json.loads(row[1]), 'queue_index': row[0]}
     
-    def mark_query_completed(self, query: Dict, providers_found: int, 
-                            providers_qualified: int, avg_english_score: float):
-        """Mark a query as completed and track performance"""
-        # Track performance
-        perf = QueryPerformance(
-            query=query['query'],
-            location=query['location'],
-            specialty=query['specialty'],
-            pattern_type=query['pattern_type'],
-            providers_found=providers_found,
-            providers_qualified=providers_qualified,
-            avg_english_score=avg_english_score,
-            executed=True,
-            execution_time=datetime.now().isoformat()
-        )
+    def lease_queries(self, owner: str, count: int, lease_seconds: float = 600) -> List[Dict]:
+        """Lease up to count pending queries for parallel execution
         
-        self.state.query_performance.append(perf)
+        Other owners' leases that expired (their worker died) are returned to
+        pending first; the caller's own leases are renewed instead, since its
+        queries are still running. A leased query is not handed out again
+        until it is completed, released or its lease expires.
         
-        # Update counters
-        self.state.current_query_index += 1
-        self.state.completed_queries += 1
-        self.state.metrics.queries_today += 1
+        Args:
+            owner: Lease holder (one per executor run)
+            count: Maximum queries to lease
+            lease_seconds: Time before an unfinished lease can be taken over
         
-        # Update cost
-        self.state.metrics.update_costs(google_searches=1)
+        Returns:
+            Query dicts in queue order, each with its queue_index
+        """
+        if count <= 0:
+            return []
+        
+        now = time.time()
+        with self._lock, self._conn:
+            self._renew(owner, now + lease_seconds)
+            self._conn.execute('''
+                UPDATE queries SET status = 'pending', lease_owner = NULL, lease_expires = NULL
+                WHERE status = 'leased' AND lease_expires < ? AND lease_owner != ?
+            ''', (now, owner))
+            rows = self._conn.execute(
+                "SELECT idx, query FROM queries WHERE status = 'pending' ORDER BY idx LIMIT ?", (count,)
+            ).fetchall()
+            self._conn.executemany(
+                "UPDATE queries SET status = 'leased', lease_owner = ?, lease_expires = ? WHERE idx = ?",
+                [(owner, now + lease_seconds, row[0]) for row in rows]
+            )
+        
+        return [{**json.loads(row[1]), 'queue_index': row[0]} for row in rows]
+    
+    def renew_leases(self, owner: str, lease_seconds: float = 600) -> int:
+        """Extend an owner's unfinished leases while its queries keep running
         
-        self.save_state()
+        Returns:
+            Queries renewed
+        """
+        with self._lock, self._conn:
+            return self._renew(owner, time.time() + lease_seconds)
+    
+    def _renew(self, owner: str, expires: float) -> int:
+        cursor = self._conn.execute(
+            "UPDATE queries SET lease_expires = ? WHERE status = 'leased' AND lease_owner = ?",
+            (expires, owner)
+        )
+        return cursor.rowcount
+    
+    def release_leases(self, owner: str) -> int:
+        """Return an owner's unfinished leases to pending
+        
+        Returns:
+            Queries released
+        """
+        with self._lock, self._conn:
+            cursor = self._conn.execute('''
+                UPDATE queries SET status = 'pending', lease_owner = NULL, lease_expires = NULL
+                WHERE status = 'leased' AND lease_owner = ?
+            ''', (owner,))
+        return cursor.rowcount
+    
+    def mark_query_completed(self, query: Dict, providers_found: int, 
+                            providers_qualified: int, avg_english_score: float,
+                            error: str = None) -> bool:
+        """Mark a query as completed and track performance
+        
+        The query row and the campaign counters are committed together. A
+        query that is already completed is not counted again.
+        
+        Returns:
+            True if the query was newly completed
+        """
+        with self._lock:
+            idx = query.get('queue_index')
+            if idx is None:
+                next_query = self.get_next_query()
+                idx = next_query['queue_index'] if next_query else None
+            
+            # Query row and campaign row commit together
+            with self._conn:
+                if idx is not None:
+                    cursor = self._conn.execute('''
+                        UPDATE queries
+                        SET status = 'completed',
+                            completed_seq = (SELECT COALESCE(MAX(completed_seq), 0) + 1 FROM queries),
+                            providers_found = ?, providers_qualified = ?, avg_english_score = ?,
+                            execution_time = ?, error = ?, lease_owner = NULL, lease_expires = NULL
+                        WHERE idx = ? AND status != 'completed'
+                    ''', (providers_found, providers_qualified, avg_english_score,
+                          datetime.now().isoformat(), error, idx))
+                    if not cursor.rowcount:
+                        return False
+                
+                # Update counters
+                self.state.current_query_index += 1
+                self.state.completed_queries += 1
+                self.state.metrics.queries_today += 1
+                
+                # Update cost
+                self.state.metrics.update_costs(google_searches=1)
+                self.state.metrics.last_update = datetime.now().isoformat()
+                
+                self._write_state()
+        
+        return True
+    
+    def get_query_performance(self) -> List[QueryPerformance]:
+        """Performance of executed queries, in queue order"""
+        with self._lock:
+            rows = self._conn.execute('''
+                SELECT query, providers_found, providers_qualified, avg_english_score, execution_time, error
+                FROM queries WHERE status = 'completed' ORDER BY idx
+            ''').fetchall()
+        
+        performance = []
+        for row in rows:
+            query = json.loads(row[0])
+            performance.append(QueryPerformance(
+                query=query.get('query', ''),
+                location=query.get('location', ''),
+                specialty=query.get('specialty', ''),
+                pattern_type=query.get('pattern_type', ''),
+                providers_found=row[1],
+                providers_qualified=row[2],
+                avg_english_score=row[3],
+                executed=True,
+                execution_time=row[4] or '',
+                error=row[5]
+            ))
+        return performance
     
     def update_provider_metrics(self, providers_found: int = 0, 
                                providers_processed: int = 0,
@@ -6,11 +6,16 @@ Wraps existing UnifiedPipeline with state tracking and recovery
 
 import os
 import sys
+import uuid
 import logging
+import threading
 import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from typing import List, Dict, Optional
 from datetime import datetime
 
+from sqlalchemy.exc import IntegrityError
+
 # Add parent directory to path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
 
@@ -19,6 +24,7 @@ from src.collectors.google_places import GooglePlacesCollector
 from src.processors.ai_content import AIContentProcessor
 from src.publishers.wordpress import WordPressPublisher
 from src.campaign.campaign_state import CampaignStateManager
+from src.monitoring.tracing import propagate
 from src.data import get_english_priority_locations
 
 logger = logging.getLogger(__name__)
@@ -27,11 +33,14 @@ logger = logging.getLogger(__name__)
 class EnhancedCampaignPipeline:
     """Enhanced pipeline with state management for campaign execution"""
     
-    def __init__(self, state_file: str = 'campaign_state.json'):
+    # Leases are renewed every third of this while their queries run
+    LEASE_SECONDS = 600
+    
+    def __init__(self, state_file: str = 'campaign_state.db'):
         """Initialize enhanced pipeline with state management
         
         Args:
-            state_file: Path to campaign state file
+            state_file: Path to campaign state database
         """
         # Initialize state manager
         self.state_manager = CampaignStateManager(state_file)
@@ -42,6 +51,7 @@ class EnhancedCampaignPipeline:
         self.collector = GooglePlacesCollector()
         self.ai_processor = AIContentProcessor()
         self.publisher = WordPressPublisher()
+        self.results_per_query = 10  # Get up to 10 results per query
         
         logger.info("✅ Enhanced Campaign Pipeline initialized")
         
@@ -96,13 +106,20 @@ class EnhancedCampaignPipeline:
     def run_with_state_management(self, 
                                  daily_limit: int = 200,
                                  test_mode: bool = False,
-                                 test_limit: int = 20):
+                                 test_limit: int = 20,
+                                 workers: Optional[int] = None):
         """Run pipeline with state management and checkpointing
         
+        Pending queries are leased from the state store and run concurrently.
+        Results are recorded on this thread as each query finishes, so a crash
+        never loses or double-counts a completed query; unfinished leases are
+        released at the end of the run or expire after a crash.
+        
         Args:
             daily_limit: Maximum providers to process per day
             test_mode: If True, only process test_limit providers
             test_limit: Number of providers for test mode
+            workers: Concurrent queries (default CAMPAIGN_QUERY_WORKERS or 4)
         """
         if self.state.status != 'running':
             logger.info(f"Campaign status: {self.state.status}")
@@ -112,142 +129,59 @@ class EnhancedCampaignPipeline:
         
         # Set limits
         max_providers = test_limit if test_mode else daily_limit
+        workers = max(workers or int(os.getenv('CAMPAIGN_QUERY_WORKERS', '4')), 1)
         providers_collected = 0
+        owner = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        in_flight = {}
+        # Places already taken by a query this run; overlapping queries skip them
+        self._claimed_places = set()
+        self._claim_lock = threading.Lock()
         
         logger.info("=" * 80)
-        logger.info(f"STARTING CAMPAIGN BATCH (Limit: {max_providers})")
+        logger.info(f"STARTING CAMPAIGN BATCH (Limit: {max_providers}, Workers: {workers})")
         logger.info("=" * 80)
         
-        # Process queries from queue
-        while providers_collected < max_providers:
-            # Get next query
-            query_data = self.state_manager.get_next_query()
-            
-            if not query_data:
-                logger.info("✅ All queries completed!")
-                self.state.status = 'completed'
-                self.state_manager.save_state()
-                break
-            
-            logger.info(f"\n📍 Query {self.state.current_query_index + 1}/{self.state.total_queries}")
-            logger.info(f"   Search: {query_data['query']}")
-            logger.info(f"   Location: {query_data['location']} ({query_data['location_type']})")
-            logger.info(f"   Specialty: {query_data['specialty']}")
-            
-            try:
-                # Execute search with existing collector - get basic results first
-                results = self.collector.search_providers(
-                    query_data['query'],
-                    limit=10  # Get up to 10 results per query
-                )
-                
-                if not results:
-                    logger.info("   No results found")
-                    self.state_manager.mark_query_completed(
-                        query_data, 0, 0, 0.0
-                    )
-                    continue
-                
-                logger.info(f"   Found {len(results)} potential providers")
-                
-                # Process results through pipeline phases
-                qualified_count = 0
-                english_scores = []
+        try:
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='campaign-query') as executor:
+                run_query = propagate(self._run_query)
                 
-                for result in results:
-                    # Get place_id for detailed fetch
-                    place_id = result.get('place_id')
-                    if not place_id:
-                        continue
-                    
-                    # Fetch full details including reviews (needed for English proficiency scoring)
-                    details = self.collector.get_place_details(place_id)
-                    if not details:
-                        logger.debug(f"   Could not fetch details for {result.get('name', 'Unknown')}")
-                        continue
+                while True:
+                    # Lease more queries while under the provider and cost limits
+                    if self.state.status == 'running' and providers_collected < max_providers:
+                        slots = self._affordable_slots(workers - len(in_flight), len(in_flight))
+                        for query_data in self.state_manager.lease_queries(owner, slots, self.LEASE_SECONDS):
+                            logger.info(f"📍 Query {query_data['queue_index'] + 1}/{self.state.total_queries}: "
+                                        f"{query_data['query']}")
+                            in_flight[executor.submit(run_query, query_data)] = query_data
                     
-                    # Create provider record from detailed data (includes validation & deduplication)
-                    provider_record = self.collector.create_provider_record(details)
+                    if not in_flight:
+                        break
                     
-                    if not provider_record:
-                        continue
-                    
-                    # Check English proficiency (now should have actual scores from reviews)
-                    proficiency = provider_record.get('proficiency_score', 0)
-                    if proficiency >= 3:  # Minimum English score
-                        qualified_count += 1
-                        english_scores.append(proficiency)
-                        
-                        # Track validation metrics
-                        if provider_record.get('location_needs_review'):
-                            self.state_manager.state.metrics.locations_needing_review += 1
-                            logger.info(f"   ⚠️  Location needs review: {provider_record.get('city', 'Unknown')}")
-                        else:
-                            self.state_manager.state.metrics.locations_validated += 1
-                        
-                        if provider_record.get('specialties_need_review'):
-                            self.state_manager.state.metrics.specialties_needing_review += 1
-                            logger.info(f"   ⚠️  Specialties need review: {provider_record.get('specialties', [])}")
-                        else:
-                            self.state_manager.state.metrics.specialties_normalized += len(provider_record.get('specialties', []))
-                        
-                        # Set primary specialty (first normalized specialty)
-                        specialties = provider_record.get('specialties', [])
-                        if specialties:
-                            provider_record['primary_specialty'] = specialties[0]
+                    done, _ = wait(in_flight, timeout=self.LEASE_SECONDS / 3, return_when=FIRST_COMPLETED)
+                    # Slow queries must not expire and be leased a second time
+                    self.state_manager.renew_leases(owner, self.LEASE_SECONDS)
+                    for future in done:
+                        query_data = in_flight.pop(future)
+                        try:
+                            outcome = future.result()
+                        except Exception as e:
+                            logger.error(f"   ❌ Query failed: {str(e)}")
+                            # Still mark as completed to move forward
+                            self.state_manager.mark_query_completed(query_data, 0, 0, 0.0, error=str(e))
+                            continue
                         
-                        # Flag provider for review if needed
-                        needs_review = (provider_record.get('location_needs_review') or 
-                                      provider_record.get('specialties_need_review'))
-                        if needs_review:
-                            self.state_manager.state.metrics.providers_needing_review += 1
-                            provider_record['needs_manual_review'] = True
-                            
-                            # Add validation notes
-                            notes = []
-                            if provider_record.get('location_needs_review'):
-                                notes.append(f"Location needs review: {provider_record.get('city', 'Unknown')}")
-                            if provider_record.get('specialties_need_review'):
-                                notes.append(f"Specialties need review: {', '.join(specialties)}")
-                            provider_record['validation_notes'] = '; '.join(notes)
-                        
-                        # Save to database
-                        saved_provider = self.pipeline.db.create_or_update_provider(provider_record)
-                        
-                        if saved_provider:
-                            providers_collected += 1
-                            logger.info(f"   ✅ Added: {provider_record.get('provider_name', 'Unknown')}")
-                            logger.info(f"      English Score: {proficiency}/5")
-                            logger.info(f"      Location: {provider_record.get('city', 'Unknown')} {'[REVIEW]' if provider_record.get('location_needs_review') else '[VALID]'}")
-                            logger.info(f"      Specialties: {', '.join(provider_record.get('specialties', ['None']))} {'[REVIEW]' if provider_record.get('specialties_need_review') else '[VALID]'}")
-                            
-                            # Update metrics
-                            self.state_manager.update_provider_metrics(
-                                providers_found=1,
-                                english_scores=[proficiency]
-                            )
-                
-                # Mark query completed with performance metrics
-                avg_score = sum(english_scores) / len(english_scores) if english_scores else 0
-                self.state_manager.mark_query_completed(
-                    query_data,
-                    providers_found=len(results),
-                    providers_qualified=qualified_count,
-                    avg_english_score=avg_score
-                )
-                
-                logger.info(f"   Query complete: {qualified_count}/{len(results)} qualified")
+                        providers_collected += self._record_query(query_data, outcome)
                 
-                # Check if we've hit the limit
                 if providers_collected >= max_providers:
                     logger.info(f"\n✅ Daily limit reached: {providers_collected} providers")
-                    break
-                
-            except Exception as e:
-                logger.error(f"   ❌ Query failed: {str(e)}")
-                # Still mark as completed to move forward
-                self.state_manager.mark_query_completed(query_data, 0, 0, 0.0)
-                continue
+                elif self.state.status == 'running' and self.state_manager.get_next_query() is None:
+                    logger.info("✅ All queries completed!")
+                    self.state.status = 'completed'
+                    self.state_manager.save_state()
+        finally:
+            released = self.state_manager.release_leases(owner)
+            if released:
+                logger.info(f"   Released {released} unfinished queries back to the queue")
         
         # Run AI content generation for collected providers
         if providers_collected > 0:
@@ -258,6 +192,167 @@ class EnhancedCampaignPipeline:
         
         return providers_collected
     
+    def _affordable_slots(self, free_slots: int, running: int) -> int:
+        """Queries that can start now without the in-flight ones exceeding the budget"""
+        if free_slots <= 0:
+            return 0
+        
+        cost_tracker = self.collector.cost_tracker
+        # Worst case: every search page is fetched before details are
+        query_cost = (GooglePlacesCollector.MAX_SEARCH_PAGES * cost_tracker.COSTS['place_search'] +
+                      self.results_per_query * (cost_tracker.COSTS['place_details'] +
+                                                cost_tracker.COSTS['contact_data']))
+        affordable = int(cost_tracker.get_remaining_budget() // query_cost) - running
+        if affordable <= 0 and not running:
+            logger.warning("⚠️ API budget reached; remaining queries stay queued")
+        return max(0, min(free_slots, affordable))
+    
+    def _run_query(self, query_data: Dict) -> Dict:
+        """Search, fetch details and save qualified providers for one query
+        
+        Runs on a worker thread; campaign state is only touched by the caller.
+        """
+        outcome = {
+            'results': 0,
+            'qualified': 0,
+            'english_scores': [],
+            'saved_scores': [],
+            'locations_needing_review': 0,
+            'locations_validated': 0,
+            'specialties_needing_review': 0,
+            'specialties_normalized': 0,
+            'providers_needing_review': 0
+        }
+        
+        # Execute search with existing collector - get basic results first
+        results = self.collector.search_providers(
+            query_data['query'],
+            limit=self.results_per_query
+        )
+        
+        if not results:
+            logger.info(f"   No results found for: {query_data['query']}")
+            return outcome
+        
+        outcome['results'] = len(results)
+        
+        for result in results:
+            # Get place_id for detailed fetch
+            place_id = result.get('place_id')
+            if not place_id or not self._claim_place(place_id):
+                continue
+            
+            # Fetch full details including reviews (needed for English proficiency scoring)
+            details = self.collector.get_place_details(place_id)
+            if not details:
+                logger.debug(f"   Could not fetch details for {result.get('name', 'Unknown')}")
+                continue
+            
+            # Create provider record from detailed data (includes validation & deduplication)
+            provider_record = self.collector.create_provider_record(details)
+            
+            if not provider_record:
+                continue
+            
+            # Check English proficiency (now should have actual scores from reviews)
+            proficiency = provider_record.get('proficiency_score', 0)
+            if proficiency < 3:  # Minimum English score
+                continue
+            
+            outcome['qualified'] += 1
+            outcome['english_scores'].append(proficiency)
+            
+            # Track validation metrics
+            if provider_record.get('location_needs_review'):
+                outcome['locations_needing_review'] += 1
+                logger.info(f"   ⚠️  Location needs review: {provider_record.get('city', 'Unknown')}")
+            else:
+                outcome['locations_validated'] += 1
+            
+            specialties = provider_record.get('specialties', [])
+            if provider_record.get('specialties_need_review'):
+                outcome['specialties_needing_review'] += 1
+                logger.info(f"   ⚠️  Specialties need review: {specialties}")
+            else:
+                outcome['specialties_normalized'] += len(specialties)
+            
+            # Set primary specialty (first normalized specialty)
+            if specialties:
+                provider_record['primary_specialty'] = specialties[0]
+            
+            # Flag provider for review if needed
+            needs_review = (provider_record.get('location_needs_review') or 
+                          provider_record.get('specialties_need_review'))
+            if needs_review:
+                outcome['providers_needing_review'] += 1
+                provider_record['needs_manual_review'] = True
+                
+                # Add validation notes
+                notes = []
+                if provider_record.get('location_needs_review'):
+                    notes.append(f"Location needs review: {provider_record.get('city', 'Unknown')}")
+                if provider_record.get('specialties_need_review'):
+                    notes.append(f"Specialties need review: {', '.join(specialties)}")
+                provider_record['validation_notes'] = '; '.join(notes)
+            
+            # Save to database
+            try:
+                saved_provider = self.pipeline.db.create_or_update_provider(provider_record)
+            except IntegrityError as e:
+                # Inserted concurrently by another process; keep this query's other results
+                logger.warning(f"   ⚠️  Skipped {provider_record.get('provider_name', place_id)}: {e.orig}")
+                continue
+            
+            if saved_provider:
+                outcome['saved_scores'].append(proficiency)
+                logger.info(f"   ✅ Added: {provider_record.get('provider_name', 'Unknown')}")
+                logger.info(f"      English Score: {proficiency}/5")
+                logger.info(f"      Location: {provider_record.get('city', 'Unknown')} {'[REVIEW]' if provider_record.get('location_needs_review') else '[VALID]'}")
+                logger.info(f"      Specialties: {', '.join(specialties or ['None'])} {'[REVIEW]' if provider_record.get('specialties_need_review') else '[VALID]'}")
+        
+        return outcome
+    
+    def _claim_place(self, place_id: str) -> bool:
+        """Take a place for the calling query; False if another query of this run has it"""
+        with self._claim_lock:
+            if place_id in self._claimed_places:
+                return False
+            self._claimed_places.add(place_id)
+            return True
+    
+    def _record_query(self, query_data: Dict, outcome: Dict) -> int:
+        """Apply one finished query to the campaign state
+        
+        Returns:
+            Providers saved by the query (0 if it was already recorded)
+        """
+        metrics = self.state_manager.state.metrics
+        english_scores = outcome['english_scores']
+        avg_score = sum(english_scores) / len(english_scores) if english_scores else 0
+        
+        # Mark query completed with performance metrics
+        if not self.state_manager.mark_query_completed(
+            query_data,
+            providers_found=outcome['results'],
+            providers_qualified=outcome['qualified'],
+            avg_english_score=avg_score
+        ):
+            return 0
+        
+        for name in ('locations_needing_review', 'locations_validated', 'specialties_needing_review',
+                     'specialties_normalized', 'providers_needing_review'):
+            setattr(metrics, name, getattr(metrics, name) + outcome[name])
+        
+        saved = len(outcome['saved_scores'])
+        if saved:
+            self.state_manager.update_provider_metrics(
+                providers_found=saved,
+                english_scores=outcome['saved_scores']
+            )
+        
+        logger.info(f"   Query complete: {query_data['query']} - {outcome['qualified']}/{outcome['results']} qualified")
+        return saved
+    
     def _process_content_generation(self):
         """Process AI content generation for providers needing content"""
         logger.info("\n📝 Processing AI content generation...")
@@ -356,40 +451,23 @@ class EnhancedCampaignPipeline:
         print("=" * 80)
     
     def recover_from_checkpoint(self, checkpoint_file: str = None):
-        """Recover campaign from checkpoint file
+        """Recover campaign from a checkpoint
         
         Args:
-            checkpoint_file: Path to checkpoint file, or None for latest
+            checkpoint_file: Path to a legacy JSON checkpoint file, or None for
+                the latest checkpoint in the state database
         """
-        if not checkpoint_file:
-            # Find latest checkpoint
-            checkpoint_dir = self.state_manager.backup_dir
-            checkpoints = sorted([
-                f for f in os.listdir(checkpoint_dir)
-                if f.startswith('checkpoint_')
-            ])
-            
-            if not checkpoints:
-                logger.error("No checkpoint files found")
-                return False
-            
-            checkpoint_file = os.path.join(checkpoint_dir, checkpoints[-1])
-        
-        logger.info(f"🔄 Recovering from checkpoint: {checkpoint_file}")
+        logger.info(f"🔄 Recovering from checkpoint: {checkpoint_file or 'latest'}")
         
         try:
-            import json
-            with open(checkpoint_file, 'r') as f:
-                data = json.load(f)
+            if checkpoint_file:
+                self.state_manager.import_json(checkpoint_file)
+            elif not self.state_manager.restore_checkpoint():
+                logger.error("No checkpoints found")
+                return False
             
-            # Restore state
-            from src.campaign.campaign_state import CampaignState
-            self.state_manager.state = CampaignState.from_dict(data)
             self.state = self.state_manager.state
             
-            # Save as current state
-            self.state_manager.save_state()
-            
             logger.info(f"✅ Recovered campaign state:")
             logger.info(f"   Providers found: {self.state.metrics.total_providers_found}")
             logger.info(f"   Queries completed: {self.state.completed_queries}/{self.state.total_queries}")
@@ -411,6 +489,7 @@ def main():
     parser.add_argument('--pause', action='store_true', help='Pause campaign')
     parser.add_argument('--status', action='store_true', help='Show campaign status')
     parser.add_argument('--recover', action='store_true', help='Recover from checkpoint')
+    parser.add_argument('--workers', type=int, help='Concurrent queries (default: CAMPAIGN_QUERY_WORKERS or 4)')
     
     args = parser.parse_args()
     
@@ -429,7 +508,7 @@ def main():
         pipeline.pause_campaign()
     elif args.resume:
         pipeline.resume_campaign()
-        pipeline.run_with_state_management(test_mode=args.test)
+        pipeline.run_with_state_management(test_mode=args.test, workers=args.workers)
     elif args.recover:
         pipeline.recover_from_checkpoint()
     else:
@@ -445,7 +524,8 @@ def main():
         # Run campaign
         pipeline.run_with_state_management(
             test_mode=args.test,
-            test_limit=20
+            test_limit=20,
+            workers=args.workers
         )
 
 
@@ -9,6 +9,7 @@ import time
 import json
 import logging
 import requests
+import threading
 from typing import List, Dict, Optional, Any, Set
 from datetime import datetime
 
@@ -16,6 +17,9 @@ from ..core.cache import PersistentCache
 from ..core.cost_tracker import CostTracker
 from ..core.database import DatabaseManager, Provider
 from .deduplication import ProviderDeduplicator
+from ..utils.review_features import extract_review_features
+from ..monitoring.metrics import PLACES_REQUEST_SECONDS, PLACES_REQUESTS, SEARCH_PAGES
+from ..monitoring.tracing import span
 from sqlalchemy import text
 
 logger = logging.getLogger(__name__)
@@ -24,6 +28,9 @@ logger = logging.getLogger(__name__)
 class GooglePlacesCollector:
     """Enhanced Google Places collector with cost optimization"""
     
+    # Google allows max 3 search pages (60 results total)
+    MAX_SEARCH_PAGES = 3
+    
     # Optimized field selection (only what we need)
     REQUIRED_FIELDS = [
         'place_id', 'name', 'formatted_address', 'rating', 
@@ -104,6 +111,7 @@ class GooglePlacesCollector:
         # FIXED: Add rate limiting (2 seconds between API calls)
         self.rate_limit_delay = 2.0  # seconds between API calls
         self.last_api_call = 0
+        self._rate_limit_lock = threading.Lock()  # Campaign queries share one collector
         
         # Configuration
         self.daily_limit = daily_limit
@@ -131,16 +139,21 @@ class GooglePlacesCollector:
         logger.info(f"✅ Google Places Collector initialized (daily limit: {daily_limit or 'None'})")
     
     def _apply_rate_limit(self):
-        """Apply rate limiting between API calls"""
-        current_time = time.time()
-        time_since_last = current_time - self.last_api_call
+        """Apply rate limiting between API calls
+        
+        Each caller reserves the next free slot under the lock and sleeps
+        until that slot without holding it, so concurrent callers stay spaced
+        apart.
+        """
+        with self._rate_limit_lock:
+            current_time = time.time()
+            slot = max(current_time, self.last_api_call + self.rate_limit_delay)
+            self.last_api_call = slot
         
-        if time_since_last < self.rate_limit_delay:
-            sleep_time = self.rate_limit_delay - time_since_last
+        sleep_time = slot - current_time
+        if sleep_time > 0:
             logger.debug(f"Rate limiting: sleeping for {sleep_time:.2f} seconds")
             time.sleep(sleep_time)
-        
-        self.last_api_call = time.time()
     
     def _load_exclusion_list(self):
         """Load place IDs to exclude from searches (existing providers and rejected)"""
@@ -509,7 +522,8 @@ class GooglePlacesCollector:
         all_results = []
         next_page_token = None
         page_count = 0
-        max_pages = 3  # Google allows max 3 pages (60 results total)
+        pages_fetched = 0
+        max_pages = self.MAX_SEARCH_PAGES
         
         while page_count < max_pages:
             # Check budget for each page request
@@ -538,11 +552,19 @@ class GooglePlacesCollector:
                 # FIXED: Apply rate limiting
                 self._apply_rate_limit()
                 
-                response = requests.get(self.search_url, params=params, timeout=10)
-                response.raise_for_status()
+                try:
+                    with PLACES_REQUEST_SECONDS.time(endpoint='search'), \
+                            span('google.search_page', page=page_count + 1):
+                        response = requests.get(self.search_url, params=params, timeout=10)
+                    response.raise_for_status()
+                    data = response.json()
+                except Exception:
+                    PLACES_REQUESTS.inc(endpoint='search', status='error')
+                    raise
                 
-                data = response.json()
                 status = data.get('status')
+                PLACES_REQUESTS.inc(endpoint='search', status=status or 'unknown')
+                pages_fetched += 1
                 
                 if status not in ['OK', 'ZERO_RESULTS']:
                     logger.error(f"API error on page {page_count + 1}: {status}")
@@ -572,7 +594,8 @@ class GooglePlacesCollector:
                 # This is MANDATORY - requests without delay will fail
                 if page_count < max_pages - 1 and next_page_token:
                     logger.info("⏳ Waiting 2 seconds before next page (Google requirement)...")
-                    time.sleep(2)
+                    with span('google.pagination_wait'):
+                        time.sleep(2)
                 
                 page_count += 1
                 
@@ -582,6 +605,9 @@ class GooglePlacesCollector:
                     return []  # First page failed
                 break  # Return what we have from previous pages
         
+        if pages_fetched:
+            SEARCH_PAGES.observe(pages_fetched)
+        
         # Filter out excluded place IDs BEFORE caching
         filtered_results = []
         excluded_count = 0
@@ -684,10 +710,17 @@ class GooglePlacesCollector:
             # FIXED: Apply rate limiting
             self._apply_rate_limit()
             
-            response = requests.get(self.details_url, params=params, timeout=10)
-            response.raise_for_status()
+            try:
+                with PLACES_REQUEST_SECONDS.time(endpoint='details'), \
+                        span('google.details', place_id=place_id):
+                    response = requests.get(self.details_url, params=params, timeout=10)
+                response.raise_for_status()
+                data = response.json()
+            except Exception:
+                PLACES_REQUESTS.inc(endpoint='details', status='error')
+                raise
             
-            data = response.json()
+            PLACES_REQUESTS.inc(endpoint='details', status=data.get('status') or 'unknown')
             if data.get('status') != 'OK':
                 logger.error(f"API error for {place_id}: {data.get('status')}")
                 return None
@@ -881,31 +914,22 @@ class GooglePlacesCollector:
         return specialties or ['Healthcare']
     
     def _analyze_english_proficiency(self, reviews: List[Dict]) -> Dict:
-        """Analyze reviews for English language proficiency indicators"""
-        english_keywords = [
-            'english', 'English', 'ENGLISH', '英語', 'えいご',
-            'foreign', 'Foreign', 'international', 'International',
-            'interpreter', 'translation', 'bilingual'
-        ]
+        """Analyze reviews for English language proficiency indicators
         
-        proficiency_score = 0
-        review_content = []
-        english_mentions = []
-        
-        for review in reviews:
-            text = review.get('text', '')
-            review_content.append({
-                'text': text,
-                'rating': review.get('rating', 0),
-                'time': review.get('time', 0)
-            })
-            
-            # Check for English keywords
-            for keyword in english_keywords:
-                if keyword in text:
-                    proficiency_score += 10
-                    english_mentions.append(text[:200])
-                    break
+        Review features are extracted once here and stored on the provider so
+        content, specialty and publishing stages don't rescan the text.
+        """
+        review_content = [{
+            'text': review.get('text', ''),
+            'rating': review.get('rating', 0),
+            'time': review.get('time', 0)
+        } for review in reviews]
+        
+        features = extract_review_features(review_content)
+        english_mentions = features['english_mentions']
+        
+        # 10 points per review mentioning English support
+        proficiency_score = 10 * len(english_mentions)
         
         # Additional scoring based on review patterns
         if len(english_mentions) >= 3:
@@ -918,6 +942,8 @@ class GooglePlacesCollector:
         
         return {
             'review_content': review_content,
+            'review_keywords': features,
+            'review_highlights': features['highlights'],
             'proficiency_score': proficiency_level,
             'english_proficiency': self._get_proficiency_label(proficiency_level)
         }
@@ -964,37 +990,40 @@ class GooglePlacesCollector:
                 logger.info(f"📊 Daily limit reached: {self.daily_limit}")
                 break
             
-            # Search providers
-            results = self.search_providers(query, max_results=max_per_query)
-            summary['queries_executed'] += 1
-            summary['providers_found'] += len(results)
-            
-            for result in results:
-                place_id = result.get('place_id')
-                if not place_id:
-                    continue
-                
-                # Get details with city-aware deduplication
-                details = self.get_place_details(place_id, city=city)
-                if not details:
-                    summary['duplicates_skipped'] += 1
-                    continue
-                
-                # Create provider record
-                record = self.create_provider_record(details, city=city)
-                if not record:
-                    if details.get('proficiency_score', 0) < 3:
-                        summary['rejected_proficiency'] += 1
-                    continue
+            with span('query', query=query) as query_span:
+                # Search providers
+                results = self.search_providers(query, max_results=max_per_query)
+                summary['queries_executed'] += 1
+                summary['providers_found'] += len(results)
+                query_span.set(results=len(results))
                 
-                # Save to database
-                provider = self.db.create_or_update_provider(record)
-                collected_providers.append(provider)
-                summary['providers_collected'] += 1
-                
-                # Check limit
-                if self.daily_limit and summary['providers_collected'] >= self.daily_limit:
-                    break
+                for result in results:
+                    place_id = result.get('place_id')
+                    if not place_id:
+                        continue
+                    
+                    # Get details with city-aware deduplication
+                    details = self.get_place_details(place_id, city=city)
+                    if not details:
+                        summary['duplicates_skipped'] += 1
+                        continue
+                    
+                    # Create provider record
+                    record = self.create_provider_record(details, city=city)
+                    if not record:
+                        if details.get('proficiency_score', 0) < 3:
+                            summary['rejected_proficiency'] += 1
+                        continue
+                    
+                    # Save to database
+                    with span('db.save_provider'):
+                        provider = self.db.create_or_update_provider(record)
+                    collected_providers.append(provider)
+                    summary['providers_collected'] += 1
+                    
+                    # Check limit
+                    if self.daily_limit and summary['providers_collected'] >= self.daily_limit:
+                        break
         
         # Get final stats
         stats = self.cost_tracker.get_usage_stats(days=1)
@@ -12,6 +12,8 @@ import logging
 from datetime import datetime, timedelta
 from typing import Any, Optional, Dict
 
+from ..monitoring.metrics import CACHE_LOOKUPS, CACHE_SECONDS
+
 logger = logging.getLogger(__name__)
 
 
@@ -78,7 +80,9 @@ class PersistentCache:
         Returns:
             Cached data or None if not found/expired
         """
-        with sqlite3.connect(self.db_path) as conn:
+        result = 'miss'
+        with CACHE_SECONDS.time(operation='get', cache_type=cache_type), \
+                sqlite3.connect(self.db_path) as conn:
             cursor = conn.execute('''
                 SELECT data, expires_at FROM place_cache 
                 WHERE place_id = ? AND cache_type = ?
@@ -100,6 +104,7 @@ class PersistentCache:
                     conn.commit()
                     
                     logger.debug(f"✅ Cache hit for {key} ({cache_type})")
+                    CACHE_LOOKUPS.inc(cache_type=cache_type, result='hit')
                     return pickle.loads(data)
                 else:
                     # Remove expired entry
@@ -108,8 +113,10 @@ class PersistentCache:
                         WHERE place_id = ? AND cache_type = ?
                     ''', (key, cache_type))
                     conn.commit()
+                    result = 'expired'
                     logger.debug(f"🗑️ Removed expired cache for {key} ({cache_type})")
         
+        CACHE_LOOKUPS.inc(cache_type=cache_type, result=result)
         logger.debug(f"❌ Cache miss for {key} ({cache_type})")
         return None
     
@@ -126,7 +133,8 @@ class PersistentCache:
         created_at = datetime.now()
         expires_at = created_at + timedelta(days=ttl_days)
         
-        with sqlite3.connect(self.db_path) as conn:
+        with CACHE_SECONDS.time(operation='set', cache_type=cache_type), \
+                sqlite3.connect(self.db_path) as conn:
             conn.execute('''
                 INSERT OR REPLACE INTO place_cache 
                 (place_id, cache_type, data, created_at, expires_at, hit_count)
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Lazy Component Container
+Builds each subsystem (database, collectors, publishers, dashboards) on first
+use and shares it across the process, so CLI commands only pay for what they touch
+"""
+
+import logging
+import threading
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class Container:
+    """Registry of named component factories, each built at most once"""
+    
+    def __init__(self):
+        self._factories: Dict[str, Callable[['Container'], Any]] = {}
+        self._instances: Dict[str, Any] = {}
+        self._lock = threading.RLock()
+    
+    def register(self, name: str, factory: Callable[['Container'], Any]) -> None:
+        """Register a factory; it receives the container to resolve its own dependencies"""
+        with self._lock:
+            self._factories[name] = factory
+            self._instances.pop(name, None)
+    
+    def provide(self, name: str, instance: Any) -> None:
+        """Use an existing instance for a component (e.g. a test double)"""
+        with self._lock:
+            self._instances[name] = instance
+    
+    def get(self, name: str) -> Any:
+        """Get a component, building it on first use"""
+        instance = self._instances.get(name)
+        if instance is not None:
+            return instance
+        
+        with self._lock:
+            if name in self._instances:
+                return self._instances[name]
+            if name not in self._factories:
+                raise KeyError(f"No component registered as '{name}'")
+            
+            instance = self._factories[name](self)
+            self._instances[name] = instance
+            logger.debug(f"Built component '{name}'")
+            return instance
+    
+    def is_built(self, name: str) -> bool:
+        """Whether a component has been built yet"""
+        return name in self._instances
+    
+    def reset(self, name: Optional[str] = None) -> None:
+        """Drop one (or every) built component so it is rebuilt on next use"""
+        with self._lock:
+            if name is None:
+                self._instances.clear()
+            else:
+                self._instances.pop(name, None)
+
+
+class component:
+    """Class attribute that resolves a container component on first access
+    
+    Assigning the attribute on an instance overrides it, so tests and callers
+    can still inject their own objects:
+        
+        class HealthMonitor:
+            db = component('db')
+    """
+    
+    def __init__(self, name: str):
+        self.name = name
+        self.attr = name
+    
+    def __set_name__(self, owner, attr):
+        self.attr = attr
+    
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        container = instance.__dict__.get('container') or components
+        value = container.get(self.name)
+        instance.__dict__[self.attr] = value
+        return value
+
+
+def _db(c):
+    from .database import DatabaseManager
+    return DatabaseManager()
+
+
+def _cache(c):
+    from .cache import PersistentCache
+    return PersistentCache()
+
+
+def _cost_tracker(c):
+    from .cost_tracker import CostTracker
+    return CostTracker()
+
+
+def _collector(c):
+    from ..collectors.google_places import GooglePlacesCollector
+    return GooglePlacesCollector()
+
+
+def _processor(c):
+    from ..processors.ai_content import AIContentProcessor
+    return AIContentProcessor()
+
+
+def _publisher(c):
+    from ..publishers.wordpress import WordPressPublisher
+    return WordPressPublisher()
+
+
+def _tracker(c):
+    from ..utils.pipeline_tracker import PipelineTracker
+    return PipelineTracker()
+
+
+def _state_manager(c):
+    from ..campaign.campaign_state import CampaignStateManager
+    return CampaignStateManager()
+
+
+def _dashboard(c):
+    from ..monitoring.campaign_dashboard import CampaignDashboard
+    return CampaignDashboard()
+
+
+def default_container() -> Container:
+    """Container with the standard components registered"""
+    container = Container()
+    container.register('db', _db)
+    container.register('cache', _cache)
+    container.register('cost_tracker', _cost_tracker)
+    container.register('collector', _collector)
+    container.register('processor', _processor)
+    container.register('publisher', _publisher)
+    container.register('tracker', _tracker)
+    container.register('state_manager', _state_manager)
+    container.register('dashboard', _dashboard)
+    return container
+
+
+# Process-wide container
+components = default_container()
@@ -554,6 +554,16 @@ class CostTracker:
         """
         return self._get_monthly_cost()
     
+    def get_remaining_budget(self) -> float:
+        """Get spend left before the daily or monthly limit, whichever is lower
+        
+        Returns:
+            Remaining budget in USD (never negative)
+        """
+        remaining = min(self.daily_limit - self._get_daily_cost(),
+                        self.monthly_limit - self._get_monthly_cost())
+        return max(0.0, remaining)
+    
     def get_actual_vs_estimated(self) -> Dict[str, any]:
         """Get comparison of actual vs estimated costs
         
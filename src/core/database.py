@@ -6,11 +6,16 @@ Consolidates all database interactions with proper column naming
 
 import os
 import logging
+import threading
 from typing import List, Dict, Optional, Any
 from datetime import datetime
 from dotenv import load_dotenv
-from sqlalchemy import create_engine, Column, Integer, String, Text, Float, JSON, TIMESTAMP, or_, and_, ARRAY
+from sqlalchemy import create_engine, text, Column, Integer, String, Text, Float, JSON, TIMESTAMP, Boolean, ForeignKey, FetchedValue, or_, and_, ARRAY
 from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.orm.attributes import set_committed_value
+
+from ..utils.review_features import review_feature_columns
+from ..monitoring.metrics import DB_OPERATION_SECONDS, DB_OPERATIONS, timed
 
 logger = logging.getLogger(__name__)
 
@@ -27,6 +32,74 @@ def get_postgres_config():
         'database': os.getenv("POSTGRES_DB", "directory")
     }
 
+
+def get_database_url(config: Optional[Dict[str, str]] = None) -> str:
+    """Build the PostgreSQL URL from a config dict (defaults to the environment)"""
+    config = config or get_postgres_config()
+    return f"postgresql://{config['user']}:{config['password']}@{config['host']}:5432/{config['database']}"
+
+
+# Process-wide engine registry: one connection pool per database URL, shared
+# by every DatabaseManager, ActivityLogger and tracker in the process
+_engines: Dict[str, Any] = {}
+_session_factories: Dict[str, sessionmaker] = {}
+_created_metadata: set = set()
+_registry_lock = threading.Lock()
+
+
+def get_engine(url: Optional[str] = None):
+    """Get the shared engine for a database URL, creating it on first use"""
+    url = url or get_database_url()
+    with _registry_lock:
+        engine = _engines.get(url)
+        if engine is None:
+            # Pooled rather than NullPool - creating a connection per request is too slow
+            engine = create_engine(
+                url,
+                pool_size=int(os.getenv('DB_POOL_SIZE', 10)),
+                max_overflow=int(os.getenv('DB_MAX_OVERFLOW', 20)),
+                pool_recycle=3600,     # Recycle connections after 1 hour
+                pool_pre_ping=True,    # Verify connections before use
+                echo=False
+            )
+            _engines[url] = engine
+        return engine
+
+
+def get_session_factory(url: Optional[str] = None) -> sessionmaker:
+    """Get the shared session factory bound to the engine for a URL"""
+    url = url or get_database_url()
+    engine = get_engine(url)
+    with _registry_lock:
+        factory = _session_factories.get(url)
+        if factory is None:
+            factory = sessionmaker(bind=engine)
+            _session_factories[url] = factory
+        return factory
+
+
+def ensure_tables(engine, metadata) -> None:
+    """Run create_all for a metadata once per engine per process"""
+    key = (id(engine), id(metadata))
+    if key in _created_metadata:
+        return
+    with _registry_lock:
+        if key in _created_metadata:
+            return
+        metadata.create_all(engine)
+        _created_metadata.add(key)
+
+
+def dispose_engines() -> None:
+    """Close every pooled connection (call after fork or at shutdown)"""
+    with _registry_lock:
+        for engine in _engines.values():
+            engine.dispose()
+        _engines.clear()
+        _session_factories.clear()
+        _created_metadata.clear()
+
+
 Base = declarative_base()
 
 
@@ -39,6 +112,7 @@ class Provider(Base):
     
     # Basic information
     provider_name = Column(String(255), nullable=False)
+    provider_name_romaji = Column(String(500))  # Added by utility/migrate/add_romaji_column.py
     address = Column(Text)
     city = Column(String(100))
     prefecture = Column(String(100))
@@ -87,6 +161,9 @@ class Provider(Base):
     wordpress_post_id = Column(Integer)
     last_wordpress_sync = Column(TIMESTAMP)
     content_hash = Column(String(64))
+    # Maintained by the providers_content_hash trigger; reloaded after every insert/update
+    current_content_hash = Column(String(64), server_default=FetchedValue(), server_onupdate=FetchedValue())
+    content_field_hashes = Column(JSON)  # Per-field hashes for delta updates
     wordpress_status = Column(String(20), default="pending")
     
     # Deduplication fingerprints
@@ -106,6 +183,63 @@ class Metric(Base):
     details = Column(JSON)
 
 
+class ProviderQuality(Base):
+    """Persisted QA score per provider (see src/monitoring/provider_quality.py)"""
+    __tablename__ = "provider_quality"
+    
+    provider_id = Column(Integer, ForeignKey('providers.id', ondelete='CASCADE'), primary_key=True)
+    input_hash = Column(String(32), nullable=False)  # md5 of the scored columns
+    scorer_version = Column(Integer, nullable=False)
+    scored_at = Column(TIMESTAMP)
+    provider_name = Column(String(255))
+    
+    description_completeness = Column(Float)
+    excerpt_completeness = Column(Float)
+    review_summary_completeness = Column(Float)
+    seo_completeness = Column(Float)
+    overall_completeness = Column(Float)
+    romaji_consistency = Column(Float)
+    english_proficiency_alignment = Column(Float)
+    seo_optimization = Column(Float)
+    content_uniqueness = Column(Float)
+    overall_quality = Column(Float)
+    master_data_compliance = Column(Float)
+    field_validation = Column(Float)
+    wordpress_consistency = Column(Float)
+    overall_integrity = Column(Float)
+    final_quality_score = Column(Float, index=True)
+    
+    issues = Column(JSON)
+    recommendations = Column(JSON)
+    issue_count = Column(Integer, default=0)
+    needs_manual_review = Column(Boolean, default=False)
+    priority_level = Column(String(10))
+
+
+def wordpress_info_mappings(updates: List[Dict[str, Any]], synced_at: datetime) -> List[Dict[str, Any]]:
+    """Provider bulk update mappings for WordPress sync info
+    
+    Args:
+        updates: Dicts with provider_id, wordpress_post_id and optional
+            content_hash / content_field_hashes
+        synced_at: Value for last_wordpress_sync
+    """
+    mappings = []
+    for update in updates:
+        mapping = {
+            'id': update['provider_id'],
+            'wordpress_post_id': update['wordpress_post_id'],
+            'last_wordpress_sync': synced_at,
+            'wordpress_status': 'synced'
+        }
+        if update.get('content_hash'):
+            mapping['content_hash'] = update['content_hash']
+        if update.get('content_field_hashes'):
+            mapping['content_field_hashes'] = update['content_field_hashes']
+        mappings.append(mapping)
+    return mappings
+
+
 class DatabaseManager:
     """Unified database manager with all operations"""
     
@@ -113,11 +247,15 @@ class DatabaseManager:
         """Initialize database connection"""
         self.config = self._get_config()
         self.engine = self._create_engine()
-        self.Session = sessionmaker(bind=self.engine)
+        self.Session = get_session_factory(get_database_url(self.config))
         
-        # Create tables if they don't exist
-        Base.metadata.create_all(self.engine)
-        logger.info("✅ Database manager initialized")
+        # Content writes queue WordPress syncs in their own transaction
+        # (wordpress_sync_operations, see utility/migrate/add_wordpress_sync_outbox.py)
+        self.sync_outbox = os.getenv('WORDPRESS_SYNC_OUTBOX', 'false').lower() == 'true'
+        
+        # Create tables if they don't exist (once per process)
+        ensure_tables(self.engine, Base.metadata)
+        logger.debug("Database manager initialized")
     
     def _get_config(self) -> Dict[str, str]:
         """Get database configuration from environment"""
@@ -129,19 +267,8 @@ class DatabaseManager:
         }
     
     def _create_engine(self):
-        """Create SQLAlchemy engine with proper connection pooling"""
-        db_url = f"postgresql://{self.config['user']}:{self.config['password']}@{self.config['host']}:5432/{self.config['database']}"
-        
-        # FIXED: Using proper connection pooling instead of NullPool
-        # NullPool creates/destroys connections on every request - terrible for production
-        return create_engine(
-            db_url,
-            pool_size=10,           # Maintain 10 persistent connections
-            max_overflow=20,        # Allow 20 additional connections when needed
-            pool_recycle=3600,     # Recycle connections after 1 hour
-            pool_pre_ping=True,    # Verify connections before use
-            echo=False
-        )
+        """Get the process-wide pooled engine for this configuration"""
+        return get_engine(get_database_url(self.config))
     
     def get_session(self):
         """Get a new database session"""
@@ -209,16 +336,19 @@ class DatabaseManager:
             session.close()
     
     def get_providers_needing_update(self, limit: int = None) -> List[Provider]:
-        """Get providers with content changes needing WordPress update"""
+        """Get providers with content changes needing WordPress update
+        
+        current_content_hash is kept up to date by a database trigger, so this
+        is one comparison served by the idx_providers_needs_sync partial index.
+        """
         session = self.Session()
         try:
-            # This would work with content hash comparison
             query = session.query(Provider).filter(
                 and_(
                     Provider.wordpress_post_id.isnot(None),
-                    Provider.wordpress_status != 'synced'
+                    Provider.current_content_hash.is_distinct_from(Provider.content_hash)
                 )
-            )
+            ).order_by(Provider.id)
             
             if limit:
                 query = query.limit(limit)
@@ -227,6 +357,32 @@ class DatabaseManager:
         finally:
             session.close()
     
+    def refresh_content_hashes(self, providers: List[Provider]) -> None:
+        """Reload the trigger-maintained current_content_hash onto loaded providers
+        
+        Detached instances keep the value they were loaded with, so rows
+        changed since then (e.g. by update_provider_field) would record a
+        stale hash at sync time and be selected for update again.
+        """
+        ids = [provider.id for provider in providers if provider.id is not None]
+        if not ids:
+            return
+        
+        session = self.Session()
+        try:
+            hashes = dict(
+                session.query(Provider.id, Provider.current_content_hash)
+                .filter(Provider.id.in_(ids))
+                .all()
+            )
+        finally:
+            session.close()
+        
+        for provider in providers:
+            if provider.id in hashes:
+                set_committed_value(provider, 'current_content_hash', hashes[provider.id])
+    
+    @timed(DB_OPERATION_SECONDS, DB_OPERATIONS, operation='create_or_update_provider')
     def create_or_update_provider(self, provider_data: Dict[str, Any]) -> Provider:
         """Create or update a provider"""
         session = self.Session()
@@ -242,6 +398,10 @@ class DatabaseManager:
                 provider = Provider()
                 session.add(provider)
             
+            # Keep precomputed review features in step with the reviews
+            if provider_data.get('review_content') and 'review_keywords' not in provider_data:
+                provider_data = {**provider_data, **review_feature_columns(provider_data['review_content'])}
+            
             # Update fields
             for key, value in provider_data.items():
                 if hasattr(provider, key):
@@ -251,6 +411,11 @@ class DatabaseManager:
             if not provider.created_at:
                 provider.created_at = datetime.now().isoformat()
             
+            # Refreshed data for a published provider goes out with the commit
+            if self.sync_outbox and provider.wordpress_post_id:
+                session.flush()
+                self.enqueue_wordpress_sync(session, provider)
+            
             session.commit()
             session.refresh(provider)
             
@@ -323,6 +488,9 @@ class DatabaseManager:
             if provider.status == 'pending' and content_data.get('description'):
                 provider.status = 'approved'
             
+            if self.sync_outbox and provider.ai_description:
+                self.enqueue_wordpress_sync(session, provider)
+            
             session.commit()
             return True
             
@@ -334,7 +502,8 @@ class DatabaseManager:
             session.close()
     
     def update_wordpress_info(self, provider_id: int, wordpress_post_id: int, 
-                            content_hash: str = None) -> bool:
+                            content_hash: str = None,
+                            content_field_hashes: Dict = None) -> bool:
         """Update WordPress sync information"""
         session = self.Session()
         try:
@@ -349,6 +518,8 @@ class DatabaseManager:
             
             if content_hash:
                 provider.content_hash = content_hash
+            if content_field_hashes:
+                provider.content_field_hashes = content_field_hashes
             
             session.commit()
             return True
@@ -360,6 +531,52 @@ class DatabaseManager:
         finally:
             session.close()
     
+    def bulk_update_wordpress_info(self, updates: List[Dict[str, Any]]) -> bool:
+        """Update WordPress sync information for many providers in one transaction
+        
+        Args:
+            updates: Dicts with provider_id, wordpress_post_id and optional
+                content_hash / content_field_hashes
+        """
+        if not updates:
+            return True
+        
+        session = self.Session()
+        try:
+            session.bulk_update_mappings(Provider, wordpress_info_mappings(updates, datetime.now()))
+            session.commit()
+            return True
+            
+        except Exception as e:
+            session.rollback()
+            logger.error(f"Error bulk updating WordPress info: {str(e)}")
+            return False
+        finally:
+            session.close()
+    
+    def enqueue_wordpress_sync(self, session, provider: Provider) -> None:
+        """Queue a WordPress sync for a provider in the caller's transaction
+        
+        A provider has at most one pending operation (uq_wordpress_sync_pending);
+        changes made before a sync worker claims it are coalesced into it.
+        """
+        session.execute(text("""
+            INSERT INTO wordpress_sync_operations
+                (timestamp, operation_type, provider_id, wordpress_post_id, status,
+                 content_hash_before, attempts, coalesced, next_attempt_at)
+            VALUES
+                (:now, :operation_type, :provider_id, :wordpress_post_id, 'pending',
+                 :content_hash_before, 0, 0, :now)
+            ON CONFLICT (provider_id) WHERE status = 'pending'
+            DO UPDATE SET coalesced = wordpress_sync_operations.coalesced + 1
+        """), {
+            'now': datetime.utcnow(),
+            'operation_type': 'update' if provider.wordpress_post_id else 'create',
+            'provider_id': provider.id,
+            'wordpress_post_id': provider.wordpress_post_id,
+            'content_hash_before': provider.content_hash
+        })
+    
     # Metric operations
     
     def log_metric(self, metric_type: str, value: float, details: Dict = None) -> None:
@@ -407,6 +624,7 @@ class DatabaseManager:
         finally:
             session.close()
     
+    @timed(DB_OPERATION_SECONDS, DB_OPERATIONS, operation='check_fingerprints')
     def check_fingerprints(self, primary: str, secondary: str, fuzzy: str) -> Optional[Provider]:
         """Check for duplicate providers using fingerprints"""
         session = self.Session()
@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+Buffered Event Sink
+Collects telemetry rows (pipeline steps, activity log) in memory and writes
+them off the critical path: a background thread flushes every few seconds or
+once a batch fills, and each statement's rows go out as one multi-row INSERT.
+Callers flush explicitly at run end; pending rows are also flushed at exit.
+"""
+
+import os
+import atexit
+import logging
+import threading
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+from sqlalchemy.exc import DBAPIError, OperationalError
+
+from .database import get_database_url, get_session_factory
+
+logger = logging.getLogger(__name__)
+
+
+class BufferedEventSink:
+    """Buffers rows per Core statement and executes them in batches"""
+    
+    def __init__(self, session_factory, flush_interval: float = 2.0,
+                 batch_size: int = 500, max_pending: int = 20000):
+        """Initialize the sink
+        
+        Args:
+            session_factory: Session factory to write through
+            flush_interval: Seconds between background flushes
+            batch_size: Pending rows that trigger an early flush
+            max_pending: Rows kept while the database is unreachable; oldest are dropped beyond this
+        """
+        self.Session = session_factory
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.max_pending = max_pending
+        
+        # statement -> rows, in the order statements were first used
+        self._pending: Dict[Any, List[Dict[str, Any]]] = {}
+        # (statement, key) -> pending row, for merging later changes into it
+        self._keyed: Dict[Tuple[Any, Hashable], Dict[str, Any]] = {}
+        self._count = 0
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closed = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        atexit.register(self.close)
+    
+    def add(self, statement, row: Dict[str, Any], key: Optional[Hashable] = None) -> None:
+        """Queue one row for statement
+        
+        Args:
+            statement: Core insert/update executed with the batched rows
+            row: Parameters for one row
+            key: Identity for merge() while the row is still pending
+        """
+        with self._lock:
+            self._pending.setdefault(statement, []).append(row)
+            if key is not None:
+                self._keyed[(statement, key)] = row
+            self._count += 1
+            full = self._count >= self.batch_size
+        
+        self._ensure_thread()
+        if full:
+            self._wake.set()
+    
+    def merge(self, statement, key: Hashable, changes: Dict[str, Any]) -> bool:
+        """Apply changes to a still-pending keyed row
+        
+        Returns:
+            True if the row was pending and updated in place
+        """
+        with self._lock:
+            row = self._keyed.get((statement, key))
+            if row is None:
+                return False
+            row.update(changes)
+            return True
+    
+    def pending(self) -> int:
+        return self._count
+    
+    def flush(self) -> int:
+        """Write everything queued so far
+        
+        Returns:
+            Rows written
+        """
+        with self._flush_lock:
+            with self._lock:
+                batches, self._pending = self._pending, {}
+                self._keyed = {}
+                self._count = 0
+            
+            if not batches:
+                return 0
+            
+            session = None
+            try:
+                session = self.Session()
+                for statement, rows in batches.items():
+                    session.execute(statement, rows)
+                session.commit()
+                return sum(len(rows) for rows in batches.values())
+            except Exception as e:
+                if session is not None:
+                    session.rollback()
+                if _is_connection_error(e):
+                    logger.error(f"Error flushing telemetry events: {e}")
+                    self._requeue(batches)
+                    return 0
+                logger.warning(f"Batched telemetry write failed, retrying row by row: {e}")
+            finally:
+                if session is not None:
+                    session.close()
+            
+            return self._flush_rows(batches)
+    
+    def _flush_rows(self, batches: Dict[Any, List[Dict[str, Any]]]) -> int:
+        """Write each row on its own after a batch was rejected
+        
+        Rows the database rejects are dropped so one bad row cannot block the
+        queue; if the connection goes away, the unwritten rows are requeued.
+        
+        Returns:
+            Rows written
+        """
+        written = 0
+        dropped = 0
+        remaining = {statement: list(rows) for statement, rows in batches.items()}
+        try:
+            session = self.Session()
+        except Exception as e:
+            logger.error(f"Error flushing telemetry events: {e}")
+            self._requeue(batches)
+            return 0
+        
+        try:
+            for statement, rows in batches.items():
+                for row in rows:
+                    try:
+                        session.execute(statement, row)
+                        session.commit()
+                        written += 1
+                    except Exception as e:
+                        session.rollback()
+                        if _is_connection_error(e):
+                            logger.error(f"Error flushing telemetry events: {e}")
+                            self._requeue({s: r for s, r in remaining.items() if r})
+                            return written
+                        logger.warning(f"Dropped telemetry event rejected by the database: {e}")
+                        dropped += 1
+                    remaining[statement].pop(0)
+        finally:
+            session.close()
+        
+        if dropped:
+            logger.warning(f"Dropped {dropped} telemetry events that could not be written")
+        return written
+    
+    def _requeue(self, batches: Dict[Any, List[Dict[str, Any]]]) -> None:
+        """Put a failed batch back ahead of newer rows, within max_pending"""
+        with self._lock:
+            merged = {statement: list(rows) for statement, rows in batches.items()}
+            for statement, rows in self._pending.items():
+                merged.setdefault(statement, []).extend(rows)
+            
+            total = sum(len(rows) for rows in merged.values())
+            dropped = 0
+            for rows in merged.values():
+                while total > self.max_pending and rows:
+                    rows.pop(0)
+                    total -= 1
+                    dropped += 1
+            if dropped:
+                logger.error(f"Dropped {dropped} telemetry events while the database was unavailable")
+            
+            self._pending = {statement: rows for statement, rows in merged.items() if rows}
+            self._count = total
+    
+    def _ensure_thread(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._closed.clear()
+            self._thread = threading.Thread(target=self._run, name='event-sink', daemon=True)
+            self._thread.start()
+    
+    def _run(self) -> None:
+        while not self._closed.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            if self._count:
+                self.flush()
+    
+    def close(self) -> None:
+        """Stop the background thread and write what is left"""
+        self._closed.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        self.flush()
+
+
+def _is_connection_error(error: Exception) -> bool:
+    """True for failures worth retrying later rather than bad rows"""
+    if isinstance(error, OperationalError):
+        return True
+    return isinstance(error, DBAPIError) and error.connection_invalidated
+
+
+_sinks: Dict[str, BufferedEventSink] = {}
+_sinks_lock = threading.Lock()
+
+
+def get_event_sink(url: Optional[str] = None) -> BufferedEventSink:
+    """Get the process-wide sink for a database URL"""
+    url = url or get_database_url()
+    with _sinks_lock:
+        sink = _sinks.get(url)
+        if sink is None:
+            sink = BufferedEventSink(
+                get_session_factory(url),
+                flush_interval=float(os.getenv('TELEMETRY_FLUSH_SECONDS', 2.0)),
+                batch_size=int(os.getenv('TELEMETRY_BATCH_SIZE', 500))
+            )
+            _sinks[url] = sink
+        return sink
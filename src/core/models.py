@@ -170,4 +170,12 @@ class WordPressSyncOperation(Base):
     content_hash_before = Column(String(64))
     content_hash_after = Column(String(64))
     fields_updated = Column(JSON)
-    duration = Column(Float)
\ No newline at end of file
+    duration = Column(Float)
+    
+    # Outbox queue state (see src/core/sync_outbox.py)
+    attempts = Column(Integer, default=0)
+    coalesced = Column(Integer, default=0)
+    next_attempt_at = Column(DateTime)
+    claimed_by = Column(String(100))
+    claimed_at = Column(DateTime)
+    completed_at = Column(DateTime)
\ No newline at end of file
@@ -11,14 +11,9 @@ from typing import List, Dict, Any  # Optional removed - not used
 from datetime import datetime
 from enum import Enum
 
-from .database import DatabaseManager  # Provider removed - not used
-from .cache import PersistentCache
-from .cost_tracker import CostTracker
-from ..collectors.google_places import GooglePlacesCollector
-from ..collectors.geographic_search import GeographicSearchEngine
-from ..processors.ai_content import AIContentProcessor
-from ..publishers.wordpress import WordPressPublisher
-from ..utils.pipeline_tracker import PipelineTracker
+from .container import component
+from .sync_outbox import SyncOutbox
+from ..monitoring.tracing import span, start_trace
 
 logger = logging.getLogger(__name__)
 
@@ -36,16 +31,24 @@ class PipelineMode(Enum):
 class UnifiedPipeline:
     """Main pipeline orchestrator for healthcare directory"""
     
-    def __init__(self):
-        """Initialize pipeline components"""
-        self.db = DatabaseManager()
-        self.cache = PersistentCache()
-        self.cost_tracker = CostTracker()
-        self.collector = GooglePlacesCollector()
+    # Built on first use and shared through the process-wide container
+    db = component('db')
+    cache = component('cache')
+    cost_tracker = component('cost_tracker')
+    collector = component('collector')
+    processor = component('processor')
+    publisher = component('publisher')
+    tracker = component('tracker')
+    
+    def __init__(self, container=None):
+        """Initialize pipeline components
+        
+        Args:
+            container: Component container (defaults to the process-wide one)
+        """
+        if container is not None:
+            self.container = container
         self.geo_engine = None  # Initialized on demand
-        self.processor = AIContentProcessor()
-        self.publisher = WordPressPublisher()
-        self.tracker = PipelineTracker()
         
         logger.info("✅ Unified Pipeline initialized")
     
@@ -91,53 +94,58 @@ class UnifiedPipeline:
             }
         }
         
-        try:
-            # Execute based on mode
-            if mode in [PipelineMode.COLLECT, PipelineMode.COLLECT_PROCESS, PipelineMode.FULL]:
-                collection_results = self._run_collection_phase(**options)
-                results['phases']['collection'] = collection_results
-                results['totals']['collected'] = collection_results.get('providers_collected', 0)
-            
-            if mode in [PipelineMode.PROCESS, PipelineMode.COLLECT_PROCESS, 
-                       PipelineMode.PROCESS_PUBLISH, PipelineMode.FULL]:
-                process_results = self._run_processing_phase(**options)
-                results['phases']['processing'] = process_results
-                results['totals']['processed'] = process_results.get('successful', 0)
-            
-            if mode in [PipelineMode.PUBLISH, PipelineMode.PROCESS_PUBLISH, PipelineMode.FULL]:
-                publish_results = self._run_publishing_phase(**options)
-                results['phases']['publishing'] = publish_results
-                results['totals']['published'] = publish_results.get('synced', 0)
-            
-            # Calculate final metrics
-            duration = (datetime.now() - start_time).total_seconds()
-            results['completed_at'] = datetime.now().isoformat()
-            results['duration_seconds'] = duration
-            
-            # Get cost summary
-            cost_stats = self.cost_tracker.get_usage_stats(days=1)
-            results['costs']['api_calls'] = cost_stats['total_requests']
-            results['costs']['estimated_cost'] = cost_stats['current_day_cost']
-            results['costs']['cache_hits'] = cost_stats['cache_hits']
-            results['costs']['cache_rate'] = cost_stats['cache_rate']
-            
-            # Complete tracking
-            self.tracker.complete_run(
-                run_id,
-                total_providers=results['totals']['collected'] + results['totals']['processed'],
-                successful=results['totals']['processed'] + results['totals']['published'],
-                failed=results['totals']['failed']
-            )
-            
-            self._print_summary(results)
+        # Spans below this attach to the run (see scripts/show_trace.py)
+        with start_trace(run_id, 'pipeline.run', mode=mode.value):
+            try:
+                # Execute based on mode
+                if mode in [PipelineMode.COLLECT, PipelineMode.COLLECT_PROCESS, PipelineMode.FULL]:
+                    with span('phase.collection'):
+                        collection_results = self._run_collection_phase(**options)
+                    results['phases']['collection'] = collection_results
+                    results['totals']['collected'] = collection_results.get('providers_collected', 0)
+                
+                if mode in [PipelineMode.PROCESS, PipelineMode.COLLECT_PROCESS, 
+                           PipelineMode.PROCESS_PUBLISH, PipelineMode.FULL]:
+                    with span('phase.processing'):
+                        process_results = self._run_processing_phase(**options)
+                    results['phases']['processing'] = process_results
+                    results['totals']['processed'] = process_results.get('successful', 0)
+                
+                if mode in [PipelineMode.PUBLISH, PipelineMode.PROCESS_PUBLISH, PipelineMode.FULL]:
+                    with span('phase.publishing'):
+                        publish_results = self._run_publishing_phase(**options)
+                    results['phases']['publishing'] = publish_results
+                    results['totals']['published'] = publish_results.get('synced', 0)
+                
+                # Calculate final metrics
+                duration = (datetime.now() - start_time).total_seconds()
+                results['completed_at'] = datetime.now().isoformat()
+                results['duration_seconds'] = duration
+                
+                # Get cost summary
+                cost_stats = self.cost_tracker.get_usage_stats(days=1)
+                results['costs']['api_calls'] = cost_stats['total_requests']
+                results['costs']['estimated_cost'] = cost_stats['current_day_cost']
+                results['costs']['cache_hits'] = cost_stats['cache_hits']
+                results['costs']['cache_rate'] = cost_stats['cache_rate']
+                
+                # Complete tracking
+                self.tracker.complete_run(
+                    run_id,
+                    total_providers=results['totals']['collected'] + results['totals']['processed'],
+                    successful=results['totals']['processed'] + results['totals']['published'],
+                    failed=results['totals']['failed']
+                )
+                
+                self._print_summary(results)
+                
+            except Exception as e:
+                logger.error(f"❌ Pipeline error: {str(e)}")
+                results['error'] = str(e)
+                results['status'] = 'failed'
+                self.tracker.fail_run(run_id, str(e))
+                raise
             
-        except Exception as e:
-            logger.error(f"❌ Pipeline error: {str(e)}")
-            results['error'] = str(e)
-            results['status'] = 'failed'
-            self.tracker.fail_run(run_id, str(e))
-            raise
-        
         return results
     
     def _run_collection_phase(self, **options) -> Dict[str, Any]:
@@ -190,6 +198,7 @@ class UnifiedPipeline:
                 
                 # Initialize geographic engine if needed
                 if self.geo_engine is None:
+                    from ..collectors.geographic_search import GeographicSearchEngine
                     self.geo_engine = GeographicSearchEngine(grid_size_meters=grid_size)
                 
                 # Generate grids for each city
@@ -233,11 +242,13 @@ class UnifiedPipeline:
                     grid_has_providers = False
                     if not options.get('dry_run'):
                         # Quick test to see if area has providers
-                        test_summary = self.collector.collect_providers(
-                            queries=test_queries,
-                            max_per_query=1,  # Just test for existence
-                            city=grid.city  # Note: ward is part of grid object but not passed separately
-                        )
+                        with span('grid.probe', grid_id=grid.grid_id, location=location) as probe_span:
+                            test_summary = self.collector.collect_providers(
+                                queries=test_queries,
+                                max_per_query=1,  # Just test for existence
+                                city=grid.city  # Note: ward is part of grid object but not passed separately
+                            )
+                            probe_span.set(collected=test_summary.get('providers_collected', 0))
                         grid_has_providers = test_summary.get('providers_collected', 0) > 0
                         
                         if not grid_has_providers:
@@ -292,11 +303,14 @@ class UnifiedPipeline:
                     else:
                         # Actually collect providers (if grid has any)
                         if grid_queries:  # Only if we have queries to run
-                            grid_summary = self.collector.collect_providers(
-                                queries=grid_queries,
-                                max_per_query=min(10, remaining // len(grid_queries) if grid_queries else 1),
-                                city=grid.city  # Pass city for proper field population
-                            )
+                            with span('grid.collect', grid_id=grid.grid_id, location=location,
+                                      queries=len(grid_queries)) as grid_span:
+                                grid_summary = self.collector.collect_providers(
+                                    queries=grid_queries,
+                                    max_per_query=min(10, remaining // len(grid_queries) if grid_queries else 1),
+                                    city=grid.city  # Pass city for proper field population
+                                )
+                                grid_span.set(collected=grid_summary['providers_collected'])
                             
                             # Track grid in geographic engine
                             self.geo_engine.track_search({"grid_id": grid.grid_id}, grid_summary['providers_collected'])
@@ -510,6 +524,13 @@ class UnifiedPipeline:
                 logger.info("✅ No providers need WordPress sync")
                 return results
             
+            if self.db.sync_outbox and not options.get('dry_run'):
+                # Sync workers (scripts/run_sync_worker.py) publish off this path
+                results['queued'] = SyncOutbox(self.db).enqueue([p.id for p in providers])
+                results['completed_at'] = datetime.now().isoformat()
+                logger.info(f"📥 Queued {results['queued']} providers for the sync workers")
+                return results
+            
             logger.info(f"📤 Syncing {len(providers)} providers to WordPress")
             
             # Sync to WordPress
@@ -581,6 +602,7 @@ class UnifiedPipeline:
         # logger.info(f"💰 API Calls: {results['costs']['api_calls']}")  # Cost logging commented out
         # logger.info(f"💵 Estimated Cost: ${results['costs']['estimated_cost']:.2f}")  # Cost logging commented out
         logger.info(f"✅ Cache Hit Rate: {results['costs']['cache_rate']:.1f}%")
+        logger.info(f"🔥 Time breakdown: python scripts/show_trace.py {results['run_id']}")
         logger.info("=" * 60)
     
     def get_status(self, run_id: str = None) -> Dict[str, Any]:
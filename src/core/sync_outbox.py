@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+"""
+WordPress Sync Outbox
+Transactional outbox over the wordpress_sync_operations table. Content
+changes enqueue a sync operation in the same transaction that writes them
+(DatabaseManager.enqueue_wordpress_sync); sync workers claim operations with
+FOR UPDATE SKIP LOCKED so any number of worker processes can drain the queue
+without publishing a provider twice.
+"""
+
+import json
+import random
+import logging
+from datetime import datetime, timedelta
+from typing import List, Dict, Optional, Any
+
+from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError
+
+from .database import DatabaseManager, Provider, wordpress_info_mappings
+
+logger = logging.getLogger(__name__)
+
+# Operation lifecycle
+PENDING = 'pending'
+PROCESSING = 'processing'
+COMPLETED = 'completed'
+FAILED = 'failed'
+SUPERSEDED = 'superseded'
+
+
+def backoff_delay(attempts: int, base: float = 30.0, cap: float = 3600.0,
+                  jitter: float = 0.1) -> float:
+    """Seconds to wait before retrying an operation that failed attempts times
+    
+    Exponential with a cap; the jitter spreads retries out after a site outage.
+    """
+    delay = min(cap, base * 2 ** max(attempts - 1, 0))
+    return delay * (1 + random.uniform(-jitter, jitter))
+
+
+class SyncOutbox:
+    """Queue operations for the WordPress sync workers"""
+    
+    def __init__(self, db: Optional[DatabaseManager] = None,
+                 max_attempts: int = 5, backoff_base: float = 30.0,
+                 backoff_cap: float = 3600.0):
+        """Initialize the outbox
+        
+        Args:
+            db: Database manager (created if not given)
+            max_attempts: Attempts before an operation is marked failed
+            backoff_base: Seconds before the first retry
+            backoff_cap: Longest wait between retries
+        """
+        self.db = db or DatabaseManager()
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+    
+    def enqueue(self, provider_ids: List[int]) -> int:
+        """Queue syncs for existing providers (backfill, manual re-sync)
+        
+        Returns:
+            Number of providers queued
+        """
+        if not provider_ids:
+            return 0
+        
+        session = self.db.get_session()
+        try:
+            providers = session.query(Provider).filter(Provider.id.in_(provider_ids)).all()
+            for provider in providers:
+                self.db.enqueue_wordpress_sync(session, provider)
+            session.commit()
+            return len(providers)
+        except Exception as e:
+            session.rollback()
+            logger.error(f"Error enqueueing WordPress sync: {str(e)}")
+            raise
+        finally:
+            session.close()
+    
+    def claim(self, worker_id: str, limit: int = 20) -> List[Dict[str, Any]]:
+        """Claim due operations for one worker
+        
+        Rows another worker is claiming are skipped rather than waited on, and
+        providers with an operation already in flight are left for later.
+        """
+        session = self.db.get_session()
+        try:
+            rows = session.execute(text("""
+                UPDATE wordpress_sync_operations AS op
+                SET status = 'processing',
+                    claimed_by = :worker_id,
+                    claimed_at = :now,
+                    attempts = op.attempts + 1
+                WHERE op.id IN (
+                    SELECT candidate.id
+                    FROM wordpress_sync_operations AS candidate
+                    WHERE candidate.status = 'pending'
+                      AND candidate.next_attempt_at <= :now
+                      AND NOT EXISTS (
+                          SELECT 1 FROM wordpress_sync_operations AS running
+                          WHERE running.provider_id = candidate.provider_id
+                            AND running.status = 'processing'
+                      )
+                    ORDER BY candidate.next_attempt_at, candidate.id
+                    LIMIT :limit
+                    FOR UPDATE SKIP LOCKED
+                )
+                RETURNING op.id, op.provider_id, op.operation_type, op.attempts,
+                          op.coalesced, op.content_hash_before
+            """), {'worker_id': worker_id, 'now': datetime.utcnow(), 'limit': limit}).mappings().all()
+            session.commit()
+            return [dict(row) for row in rows]
+        except Exception as e:
+            session.rollback()
+            logger.error(f"Error claiming WordPress sync operations: {str(e)}")
+            raise
+        finally:
+            session.close()
+    
+    def load_providers(self, provider_ids: List[int]) -> Dict[int, Provider]:
+        """Current provider rows for claimed operations"""
+        if not provider_ids:
+            return {}
+        
+        session = self.db.get_session()
+        try:
+            providers = session.query(Provider).filter(Provider.id.in_(provider_ids)).all()
+            return {provider.id: provider for provider in providers}
+        finally:
+            session.close()
+    
+    def finish(self, outcomes: List[Dict[str, Any]], worker_id: str) -> None:
+        """Record the outcome of claimed operations
+        
+        Provider sync info and the operation rows are written in one
+        transaction, so a created post is never recorded without its ID.
+        Outcomes for operations this worker no longer holds are ignored.
+        
+        Args:
+            outcomes: Dicts with op_id, success, attempts, duration and either
+                wordpress_info / fields_updated / operation_type or error
+            worker_id: Worker that claimed the operations
+        """
+        if not outcomes:
+            return
+        
+        session = self.db.get_session()
+        try:
+            now = datetime.utcnow()
+            infos = []
+            for outcome in outcomes:
+                if not outcome['success']:
+                    self._mark_retry(session, outcome, now, worker_id)
+                elif self._mark_completed(session, outcome, worker_id, now) and outcome.get('wordpress_info'):
+                    infos.append(outcome['wordpress_info'])
+            
+            if infos:
+                session.bulk_update_mappings(Provider, wordpress_info_mappings(infos, datetime.now()))
+            
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            logger.error(f"Error recording WordPress sync outcomes: {str(e)}")
+            raise
+        finally:
+            session.close()
+    
+    @staticmethod
+    def _held_by(worker_id: Optional[str]) -> str:
+        """WHERE condition matching an operation still being processed
+        
+        An operation released by release_stale() and claimed again belongs to
+        the new worker, so a late outcome from the old one leaves it alone.
+        """
+        if worker_id is None:
+            return "status = 'processing'"
+        return "status = 'processing' AND claimed_by = :worker"
+    
+    def _mark_completed(self, session, outcome: Dict[str, Any], worker_id: str, now: datetime) -> bool:
+        """Complete an operation this worker still holds
+        
+        Returns:
+            True if the operation was completed
+        """
+        info = outcome.get('wordpress_info') or {}
+        result = session.execute(text("""
+            UPDATE wordpress_sync_operations
+            SET status = 'completed',
+                operation_type = COALESCE(:operation_type, operation_type),
+                wordpress_post_id = COALESCE(:wordpress_post_id, wordpress_post_id),
+                content_hash_after = :content_hash_after,
+                fields_updated = CAST(:fields_updated AS JSON),
+                duration = :duration,
+                error_message = NULL,
+                completed_at = :now
+            WHERE id = :op_id AND status = 'processing' AND claimed_by = :worker
+        """), {
+            'op_id': outcome['op_id'],
+            'worker': worker_id,
+            'operation_type': outcome.get('operation_type'),
+            'wordpress_post_id': info.get('wordpress_post_id'),
+            'content_hash_after': info.get('content_hash') or outcome.get('content_hash_after'),
+            'fields_updated': json.dumps(outcome.get('fields_updated') or []),
+            'duration': outcome.get('duration'),
+            'now': now
+        })
+        if result.rowcount == 0:
+            logger.warning(f"⚠️ WordPress sync operation {outcome['op_id']} is no longer held by {worker_id}")
+            return False
+        return True
+    
+    def _mark_retry(self, session, outcome: Dict[str, Any], now: datetime,
+                    worker_id: Optional[str] = None):
+        """Reschedule a failed operation with backoff, or give up on it
+        
+        Args:
+            worker_id: Worker that must still hold the operation; None when
+                release_stale() reclaims it from a dead worker
+        """
+        held = self._held_by(worker_id)
+        params = {
+            'op_id': outcome['op_id'],
+            'worker': worker_id,
+            'error': (outcome.get('error') or 'Unknown error')[:2000],
+            'duration': outcome.get('duration'),
+            'now': now
+        }
+        
+        if not outcome.get('retry', True) or outcome['attempts'] >= self.max_attempts:
+            session.execute(text(f"""
+                UPDATE wordpress_sync_operations
+                SET status = 'failed', error_message = :error,
+                    duration = :duration, completed_at = :now
+                WHERE id = :op_id AND {held}
+            """), params)
+            return
+        
+        delay = backoff_delay(outcome['attempts'], self.backoff_base, self.backoff_cap)
+        params['next_attempt_at'] = now + timedelta(seconds=delay)
+        
+        # A change queued while this one ran takes over the retry
+        savepoint = session.begin_nested()
+        try:
+            session.execute(text(f"""
+                UPDATE wordpress_sync_operations
+                SET status = 'pending', error_message = :error, duration = :duration,
+                    next_attempt_at = :next_attempt_at,
+                    claimed_by = NULL, claimed_at = NULL
+                WHERE id = :op_id AND {held}
+            """), params)
+            savepoint.commit()
+        except IntegrityError:
+            savepoint.rollback()
+            session.execute(text(f"""
+                UPDATE wordpress_sync_operations
+                SET status = 'superseded', error_message = :error,
+                    duration = :duration, completed_at = :now
+                WHERE id = :op_id AND {held}
+            """), params)
+    
+    def release_stale(self, lease_seconds: int = 900) -> int:
+        """Return operations held by a worker that died back to the queue
+        
+        Returns:
+            Number of operations released
+        """
+        session = self.db.get_session()
+        try:
+            now = datetime.utcnow()
+            stale = session.execute(text("""
+                SELECT id, attempts FROM wordpress_sync_operations
+                WHERE status = 'processing' AND claimed_at < :cutoff
+                FOR UPDATE SKIP LOCKED
+            """), {'cutoff': now - timedelta(seconds=lease_seconds)}).fetchall()
+            
+            for op_id, attempts in stale:
+                self._mark_retry(session, {
+                    'op_id': op_id,
+                    'attempts': attempts,
+                    'error': f'Worker lease expired after {lease_seconds}s'
+                }, now)
+            
+            session.commit()
+            if stale:
+                logger.warning(f"⚠️ Released {len(stale)} stale WordPress sync operations")
+            return len(stale)
+        except Exception as e:
+            session.rollback()
+            logger.error(f"Error releasing stale sync operations: {str(e)}")
+            return 0
+        finally:
+            session.close()
+    
+    def stats(self) -> Dict[str, Any]:
+        """Operation counts by status, plus the age of the oldest pending one"""
+        session = self.db.get_session()
+        try:
+            counts = dict(session.execute(text("""
+                SELECT status, COUNT(*) FROM wordpress_sync_operations GROUP BY status
+            """)).fetchall())
+            oldest = session.execute(text("""
+                SELECT MIN(timestamp) FROM wordpress_sync_operations WHERE status = 'pending'
+            """)).scalar()
+            return {
+                'counts': counts,
+                'oldest_pending_seconds': (datetime.utcnow() - oldest).total_seconds() if oldest else 0
+            }
+        finally:
+            session.close()
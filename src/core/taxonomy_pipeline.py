@@ -0,0 +1,440 @@
+#!/usr/bin/env python3
+"""
+Taxonomy Page Pipeline
+Keeps the tc_combination pages complete and in sync in one pass:
+1. Derive (location, specialty, ward) combinations from provider counts
+2. Diff them, and the pages already on WordPress, against taxonomy_content
+3. Generate the missing pages concurrently under a token budget
+4. Upsert generated pages in bulk
+5. Push changed pages to WordPress over a pooled session
+"""
+
+import os
+import time
+import logging
+import threading
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import text
+
+from .database import DatabaseManager
+from ..processors.taxonomy_content import TaxonomyContentGenerator, upsert_taxonomy_content
+from ..publishers.wp_mirror import WordPressMirror, hash_field
+from ..publishers.wp_session import DEFAULT_TIMEOUT, create_wordpress_session
+
+logger = logging.getLogger(__name__)
+
+SPECIALTY_SLUGS = {
+    'general medicine': 'General Medicine',
+    'internal medicine': 'Internal Medicine',
+    'ent ear nose throat': 'ENT (Ear, Nose & Throat)',
+    'dentist': 'Dentist',
+    'dentistry': 'Dentist',
+    'gynecology': 'Gynecology',
+    'pediatrics': 'Pediatrics',
+    'dermatology': 'Dermatology',
+    'ophthalmology': 'Ophthalmology',
+    'cardiology': 'Cardiology',
+    'orthopedics': 'Orthopedics'
+}
+
+TOKYO_WARDS = {
+    'Shibuya', 'Shinjuku', 'Minato', 'Chiyoda', 'Chuo', 'Meguro', 'Setagaya',
+    'Ota', 'Bunkyo', 'Taito', 'Sumida', 'Koto', 'Shinagawa', 'Nakano',
+    'Suginami', 'Toshima', 'Kita', 'Arakawa', 'Itabashi', 'Nerima', 'Adachi',
+    'Katsushika', 'Edogawa'
+}
+
+
+def page_key(location: Optional[str], specialty: Optional[str], ward: Optional[str]) -> str:
+    """Lookup key for a combination page"""
+    return f"{location}|{specialty}|{ward or ''}"
+
+
+def parse_combination_slug(slug: str) -> Dict[str, Optional[str]]:
+    """Parse a tc_combination slug ("english-<specialty>-in-<location>")"""
+    result = {'location': None, 'specialty': None, 'ward': None}
+    
+    if 'english-' not in slug or '-in-' not in slug:
+        return result
+    
+    parts = slug.replace('english-', '').split('-in-')
+    if len(parts) != 2:
+        return result
+    
+    specialty = parts[0].replace('-', ' ').replace('_', ' ')
+    result['specialty'] = SPECIALTY_SLUGS.get(specialty.lower(), specialty.title())
+    
+    location = parts[1].replace('-', ' ').title()
+    if location in TOKYO_WARDS:
+        result['ward'] = location
+        result['location'] = 'Tokyo'
+    else:
+        result['location'] = location
+    
+    return result
+
+
+class TokenBudget:
+    """Thread-safe token allowance for a generation run"""
+    
+    def __init__(self, max_tokens: Optional[int] = None):
+        """Initialize the budget
+        
+        Args:
+            max_tokens: Tokens the run may spend (None for unlimited)
+        """
+        self.max_tokens = max_tokens
+        self.used = 0
+        self._reserved = 0
+        self._lock = threading.Lock()
+    
+    def reserve(self, tokens: int) -> bool:
+        """Set aside an estimate before a call; False if it would overspend"""
+        with self._lock:
+            if self.max_tokens is not None and self.used + self._reserved + tokens > self.max_tokens:
+                return False
+            self._reserved += tokens
+            return True
+    
+    def settle(self, reserved: int, used: int):
+        """Replace a reservation with what the call actually used"""
+        with self._lock:
+            self._reserved -= reserved
+            self.used += used
+
+
+class TaxonomyPipeline:
+    """Generate and publish combination taxonomy pages"""
+    
+    POST_TYPE = 'tc_combination'
+    
+    # ACF fields hashed into the mirror to detect missing or stale content
+    MIRRORED_FIELDS = ('brief_intro', 'full_description')
+    
+    def __init__(self, db: Optional[DatabaseManager] = None,
+                 generator: Optional[TaxonomyContentGenerator] = None,
+                 mirror: Optional[WordPressMirror] = None,
+                 workers: Optional[int] = None,
+                 push_workers: Optional[int] = None,
+                 batch_size: int = 5,
+                 token_budget: Optional[int] = None,
+                 tokens_per_page: int = 2500):
+        """Initialize the pipeline
+        
+        Args:
+            db: Database manager (created if not given)
+            generator: Content generator (created on first use if not given)
+            mirror: WordPress post mirror (created from the environment if not given)
+            workers: Concurrent generation calls (default TAXONOMY_GENERATION_WORKERS or 4)
+            push_workers: Concurrent WordPress updates (default WORDPRESS_SYNC_WORKERS or 4)
+            batch_size: Pages per generation call
+            token_budget: Tokens the run may spend on generation (None for unlimited)
+            tokens_per_page: Estimate reserved per page before a call
+        """
+        self.db = db or DatabaseManager()
+        self._generator = generator
+        self.workers = workers or int(os.getenv('TAXONOMY_GENERATION_WORKERS', '4'))
+        self.push_workers = push_workers or int(os.getenv('WORDPRESS_SYNC_WORKERS', '4'))
+        self.batch_size = batch_size
+        self.budget = TokenBudget(token_budget)
+        self.tokens_per_page = tokens_per_page
+        
+        self.wp_url = (os.getenv('WORDPRESS_URL') or '').rstrip('/')
+        self.auth = (os.getenv('WORDPRESS_USERNAME'), os.getenv('WORDPRESS_APPLICATION_PASSWORD'))
+        self.mirror = mirror
+        if self.mirror is None and self.wp_url and all(self.auth):
+            self.mirror = WordPressMirror(self.wp_url, self.auth)
+        self.http = create_wordpress_session(self.wp_url, pool_size=max(self.push_workers, 1) * 2)
+    
+    @property
+    def generator(self) -> TaxonomyContentGenerator:
+        if self._generator is None:
+            self._generator = TaxonomyContentGenerator()
+        return self._generator
+    
+    # Inputs
+    
+    def compute_combinations(self, min_providers: int = 1) -> List[Tuple]:
+        """Combinations with their provider counts, from one GROUP BY
+        
+        Returns:
+            Generator items ('combination', location, specialty, ward, count),
+            most providers first
+        """
+        session = self.db.get_session()
+        try:
+            rows = session.execute(text("""
+                SELECT p.city, NULLIF(p.ward, '') AS ward, s.specialty, COUNT(*) AS provider_count
+                FROM providers p
+                CROSS JOIN LATERAL json_array_elements_text(
+                    CASE WHEN json_typeof(p.specialties::json) = 'array'
+                         THEN p.specialties::json ELSE '[]'::json END
+                ) AS s(specialty)
+                WHERE p.city IS NOT NULL AND p.city <> ''
+                GROUP BY p.city, NULLIF(p.ward, ''), s.specialty
+                HAVING COUNT(*) >= :min_providers
+                ORDER BY provider_count DESC, p.city, s.specialty
+            """), {'min_providers': min_providers}).fetchall()
+        finally:
+            session.close()
+        
+        return [('combination', city, specialty, ward, count) for city, ward, specialty, count in rows]
+    
+    def existing_content(self) -> Dict[str, Dict[str, Any]]:
+        """Stored combination pages by page_key"""
+        session = self.db.get_session()
+        try:
+            rows = session.execute(text("""
+                SELECT location, specialty, ward, title, meta_description,
+                       brief_intro, full_description, wordpress_post_id
+                FROM taxonomy_content
+                WHERE taxonomy_type = 'combination'
+            """)).mappings().all()
+        finally:
+            session.close()
+        
+        return {page_key(row['location'], row['specialty'], row['ward']): dict(row) for row in rows}
+    
+    def wordpress_pages(self, full_refresh: bool = False) -> List[Dict[str, Any]]:
+        """Combination posts from the incremental WordPress mirror"""
+        if self.mirror is None:
+            logger.warning("WordPress credentials not configured; skipping WordPress pages")
+            return []
+        
+        try:
+            self.mirror.refresh(self.POST_TYPE, acf_fields=self.MIRRORED_FIELDS, full=full_refresh)
+        except Exception as e:
+            logger.error(f"Error refreshing WordPress mirror: {e}")
+        
+        pages = []
+        for post in self.mirror.posts(self.POST_TYPE):
+            hashes = post['field_hashes']
+            pages.append({
+                'wp_id': post['post_id'],
+                'slug': post['slug'],
+                'title': post['title'],
+                **parse_combination_slug(post['slug']),
+                'has_content': bool(hashes.get('brief_intro')) and bool(hashes.get('full_description')),
+                'current_brief_hash': hashes.get('brief_intro'),
+                'current_full_hash': hashes.get('full_description')
+            })
+        return pages
+    
+    @staticmethod
+    def find_missing(combinations: List[Tuple], wp_pages: List[Dict[str, Any]],
+                     content: Dict[str, Dict[str, Any]]) -> List[Tuple]:
+        """Pages that need generating: provider combinations and WordPress
+        posts without stored content, each once"""
+        missing = {}
+        
+        for item in combinations:
+            key = page_key(item[1], item[2], item[3])
+            if not (content.get(key) or {}).get('brief_intro'):
+                missing.setdefault(key, item)
+        
+        for page in wp_pages:
+            if not page['location'] or not page['specialty']:
+                logger.warning(f"Skipping post {page['wp_id']} - couldn't parse: {page['slug']}")
+                continue
+            key = page_key(page['location'], page['specialty'], page['ward'])
+            if not (content.get(key) or {}).get('brief_intro'):
+                missing.setdefault(key, ('combination', page['location'], page['specialty'], page['ward'], 0))
+        
+        return sorted(missing.values(), key=lambda item: item[4], reverse=True)
+    
+    # Generation
+    
+    def _save(self, pages: List) -> int:
+        session = self.db.get_session()
+        try:
+            saved = upsert_taxonomy_content(session, pages)
+            session.commit()
+            return saved
+        except Exception as e:
+            session.rollback()
+            logger.error(f"Error saving taxonomy content: {e}")
+            return 0
+        finally:
+            session.close()
+    
+    def generate(self, items: List[Tuple]) -> Dict[str, Any]:
+        """Generate pages concurrently, saving each batch as it completes
+        
+        At most `workers` calls are in flight. A call is only started if its
+        estimated tokens fit the remaining budget; pages left over are picked
+        up by the next run.
+        """
+        stats = {'requested': len(items), 'generated': 0, 'failed': 0, 'over_budget': 0, 'tokens': 0}
+        pending = deque(items[i:i + self.batch_size] for i in range(0, len(items), self.batch_size))
+        in_flight = {}
+        started = time.time()
+        
+        with ThreadPoolExecutor(max_workers=max(self.workers, 1)) as executor:
+            while pending or in_flight:
+                while pending and len(in_flight) < self.workers:
+                    estimate = len(pending[0]) * self.tokens_per_page
+                    if not self.budget.reserve(estimate):
+                        break
+                    batch = pending.popleft()
+                    in_flight[executor.submit(self.generator.generate_pages, batch)] = (batch, estimate)
+                
+                if not in_flight:
+                    break
+                
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    batch, estimate = in_flight.pop(future)
+                    try:
+                        contents, tokens = future.result()
+                    except Exception as e:
+                        logger.error(f"❌ Generation failed for {len(batch)} pages: {e}")
+                        self.budget.settle(estimate, 0)
+                        stats['failed'] += len(batch)
+                        continue
+                    
+                    self.budget.settle(estimate, tokens)
+                    pages = [content for content in contents if content]
+                    stats['generated'] += self._save(pages)
+                    stats['failed'] += len(batch) - len(pages)
+                    logger.info(f"   Generated {stats['generated']}/{len(items)} pages "
+                                f"({self.budget.used:,} tokens)")
+        
+        stats['over_budget'] = sum(len(batch) for batch in pending)
+        stats['tokens'] = self.budget.used
+        stats['elapsed_seconds'] = round(time.time() - started, 1)
+        
+        if stats['over_budget']:
+            logger.warning(f"⚠️ Token budget reached; {stats['over_budget']} pages left for the next run")
+        return stats
+    
+    # Publishing
+    
+    def _update_post(self, page: Dict[str, Any], content: Dict[str, Any]) -> bool:
+        update_data = {
+            # DO NOT change the title - it's auto-generated by another plugin
+            'acf': {
+                'brief_intro': content['brief_intro'],
+                'full_description': content['full_description'],
+                'seo_title': content['title'],
+                'seo_meta_description': content['meta_description']
+            },
+            # Yoast fields
+            '_yoast_wpseo_title': content['title'],
+            '_yoast_wpseo_metadesc': content['meta_description']
+        }
+        
+        try:
+            response = self.http.post(
+                f"{self.wp_url}/wp-json/wp/v2/{self.POST_TYPE}/{page['wp_id']}",
+                auth=self.auth,
+                json=update_data,
+                timeout=DEFAULT_TIMEOUT
+            )
+        except Exception as e:
+            logger.error(f"Error updating post {page['wp_id']}: {e}")
+            return False
+        
+        if response.status_code not in (200, 201):
+            logger.error(f"Failed to update post {page['wp_id']}: {response.status_code}")
+            return False
+        return True
+    
+    def push(self, wp_pages: List[Dict[str, Any]], content: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+        """Send stored content to WordPress posts whose fields differ"""
+        updates = []
+        for page in wp_pages:
+            if not page['location'] or not page['specialty']:
+                continue
+            stored = content.get(page_key(page['location'], page['specialty'], page['ward']))
+            if not stored or not stored.get('brief_intro'):
+                continue
+            if (page['current_brief_hash'] == hash_field(stored['brief_intro']) and
+                    page['current_full_hash'] == hash_field(stored['full_description'])):
+                continue  # Already up to date
+            updates.append((page, stored))
+        
+        stats = {'candidates': len(updates), 'updated': 0, 'failed': 0}
+        if not updates:
+            return stats
+        
+        with ThreadPoolExecutor(max_workers=max(self.push_workers, 1)) as executor:
+            results = list(executor.map(lambda update: self._update_post(*update), updates))
+        
+        linked = []
+        for (page, stored), ok in zip(updates, results):
+            if not ok:
+                stats['failed'] += 1
+                continue
+            stats['updated'] += 1
+            if not stored.get('wordpress_post_id'):
+                linked.append({
+                    'wp_id': page['wp_id'],
+                    'location': page['location'],
+                    'specialty': page['specialty'],
+                    'ward': page['ward']
+                })
+        
+        if linked:
+            session = self.db.get_session()
+            try:
+                session.execute(text("""
+                    UPDATE taxonomy_content
+                    SET wordpress_post_id = :wp_id
+                    WHERE taxonomy_type = 'combination'
+                      AND location = :location
+                      AND specialty = :specialty
+                      AND COALESCE(ward, '') = COALESCE(:ward, '')
+                """), linked)
+                session.commit()
+            except Exception as e:
+                session.rollback()
+                logger.error(f"Error recording WordPress post IDs: {e}")
+            finally:
+                session.close()
+        
+        return stats
+    
+    def run(self, generate: bool = True, publish: bool = True,
+            min_providers: int = 1, limit: Optional[int] = None,
+            full_refresh: bool = False) -> Dict[str, Any]:
+        """Run the full pipeline
+        
+        Args:
+            generate: Generate missing pages
+            publish: Push changed pages to WordPress
+            min_providers: Smallest provider count that earns a combination page
+            limit: Generate at most this many pages
+            full_refresh: Re-download every WordPress post into the mirror
+        
+        Returns:
+            Stage statistics
+        """
+        started = time.time()
+        results = {}
+        
+        wp_pages = self.wordpress_pages(full_refresh)
+        combinations = self.compute_combinations(min_providers)
+        content = self.existing_content()
+        
+        missing = self.find_missing(combinations, wp_pages, content)
+        results['inputs'] = {
+            'combinations': len(combinations),
+            'wordpress_pages': len(wp_pages),
+            'stored_pages': len(content),
+            'missing': len(missing)
+        }
+        logger.info(f"📊 {len(combinations)} provider combinations, {len(wp_pages)} WordPress pages, "
+                    f"{len(content)} stored, {len(missing)} to generate")
+        
+        if generate and missing:
+            results['generation'] = self.generate(missing[:limit] if limit else missing)
+            content = self.existing_content()
+        
+        if publish:
+            results['publishing'] = self.push(wp_pages, content)
+        
+        results['elapsed_seconds'] = round(time.time() - started, 1)
+        return results
@@ -18,9 +18,9 @@ from pathlib import Path
 # Add src to path for imports
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from src.core.database import DatabaseManager
+from src.core.container import component
+from src.monitoring.metric_snapshots import MetricSnapshots
 from src.campaign.campaign_state import CampaignStateManager
-from src.publishers.wordpress import WordPressPublisher
 from src.utils.romaji_converter import contains_japanese
 
 logger = logging.getLogger(__name__)
@@ -109,23 +109,66 @@ class DashboardMetrics:
             self.top_specialties = []
 
 
+# Seconds each metric group stays fresh before it is recomputed
+SNAPSHOT_TTLS = {
+    'database': 300,
+    'geographic': 900,
+    'specialty': 900,
+    'validation': 900,
+    'health': 60,
+    'quality': 1800,
+    'search': 3600
+}
+
+# DashboardMetrics fields filled in by each group
+SNAPSHOT_FIELDS = {
+    'database': ['providers_high_english', 'providers_moderate_english', 'providers_low_english',
+                 'romaji_conversion_success', 'database_status'],
+    'geographic': ['cities_covered', 'top_cities', 'locations_needing_review'],
+    'specialty': ['specialties_covered', 'top_specialties', 'specialties_needing_review'],
+    'validation': ['location_validation_success', 'specialty_validation_success',
+                   'providers_needing_manual_review'],
+    'health': ['system_memory_usage', 'wordpress_status', 'google_api_status'],
+    'quality': ['overall_quality_score', 'content_quality_score', 'data_integrity_score',
+                'system_reliability_score', 'providers_needing_qa_review', 'critical_quality_issues'],
+    'search': ['search_effectiveness_score', 'avg_english_success_rate', 'cost_per_english_provider',
+               'recommended_search_strategies', 'high_yield_locations', 'optimization_recommendations']
+}
+
+
 class CampaignDashboard:
     """Real-time campaign monitoring dashboard"""
     
-    def __init__(self, state_file: str = 'campaign_state.json'):
+    # Built on first use and shared through the process-wide container
+    db = component('db')
+    wp_publisher = component('publisher')
+    
+    def __init__(self, state_file: str = 'campaign_state.db'):
         """Initialize dashboard with data sources
         
         Args:
             state_file: Path to campaign state file
         """
         self.state_manager = CampaignStateManager(state_file)
-        self.db = DatabaseManager()
-        self.wp_publisher = WordPressPublisher()
         
         # Initialize QA system (lazy loading to avoid circular imports)
         self._qa_system = None
         self._search_optimizer = None
         
+        # Cached metric groups, refreshed by TTL
+        self.snapshots = MetricSnapshots()
+        updaters = {
+            'database': self._update_database_metrics,
+            'geographic': self._update_geographic_metrics,
+            'specialty': self._update_specialty_metrics,
+            'validation': self._update_validation_metrics,
+            'health': self._update_health_metrics,
+            'quality': self._update_quality_metrics,
+            'search': self._update_search_metrics
+        }
+        for group, updater in updaters.items():
+            self.snapshots.register(group, self._snapshot_refresher(group, updater), SNAPSHOT_TTLS[group])
+        
         # Dashboard configuration
         self.campaign_target = 5000  # Total providers target
         self.daily_target = 200  # Providers per day target
@@ -134,8 +177,31 @@ class CampaignDashboard:
         
         logger.info("✅ Campaign Dashboard initialized")
     
-    def get_real_time_metrics(self) -> DashboardMetrics:
-        """Generate real-time dashboard metrics"""
+    def _snapshot_refresher(self, group: str, updater):
+        """Refresh function for one metric group's snapshot"""
+        def refresh() -> Dict[str, Any]:
+            metrics = DashboardMetrics()
+            updater(metrics)
+            return {field: getattr(metrics, field) for field in SNAPSHOT_FIELDS[group]}
+        return refresh
+    
+    def start_background_refresh(self, interval: float = 30.0):
+        """Keep metric snapshots warm from a background thread"""
+        self.snapshots.start(interval)
+    
+    def stop_background_refresh(self):
+        """Stop refreshing metric snapshots in the background"""
+        self.snapshots.stop()
+    
+    def get_real_time_metrics(self, fresh: bool = False) -> DashboardMetrics:
+        """Generate real-time dashboard metrics
+        
+        Campaign state is read directly; database, health, QA and search
+        metrics come from snapshots (see SNAPSHOT_TTLS).
+        
+        Args:
+            fresh: Recompute every metric group before returning
+        """
         logger.info("📊 Generating real-time dashboard metrics...")
         
         metrics = DashboardMetrics()
@@ -186,56 +252,15 @@ class CampaignDashboard:
                         metrics.estimated_completion_date = completion_date.strftime('%Y-%m-%d')
                         metrics.days_remaining = int(estimated_days)
             
-            # Get detailed database metrics
-            self._update_database_metrics(metrics)
-            
-            # Get geographic and specialty distribution
-            self._update_geographic_metrics(metrics)
-            self._update_specialty_metrics(metrics)
-            
-            # Update system health
-            self._update_health_metrics(metrics)
-            
-            # Master data validation metrics
-            self._update_validation_metrics(metrics)
-            
         except Exception as e:
             logger.error(f"Error generating metrics: {e}")
             import traceback
             traceback.print_exc()
         
-        # Integrate QA metrics
-        try:
-            qa_metrics = self._get_qa_metrics()
-            if qa_metrics:
-                metrics.overall_quality_score = qa_metrics.overall_system_quality
-                metrics.content_quality_score = qa_metrics.avg_content_quality
-                metrics.data_integrity_score = (
-                    qa_metrics.master_data_compliance_rate + 
-                    qa_metrics.database_integrity_score
-                ) / 2
-                metrics.system_reliability_score = (
-                    qa_metrics.api_performance_score + 
-                    qa_metrics.system_uptime_score + 
-                    qa_metrics.error_handling_score
-                ) / 3
-                metrics.providers_needing_qa_review = qa_metrics.providers_needing_review
-                metrics.critical_quality_issues = qa_metrics.critical_issues
-        except Exception as e:
-            logger.warning(f"QA metrics integration failed: {e}")
-        
-        # Integrate Search Optimization metrics
-        try:
-            search_metrics = self._get_search_optimization_metrics()
-            if search_metrics:
-                metrics.search_effectiveness_score = search_metrics.get('overall_effectiveness', 0.0)
-                metrics.avg_english_success_rate = search_metrics.get('english_success_rate', 0.0)
-                metrics.cost_per_english_provider = search_metrics.get('cost_per_english_provider', 0.0)
-                metrics.recommended_search_strategies = search_metrics.get('recommended_strategies', [])
-                metrics.high_yield_locations = search_metrics.get('high_yield_locations', [])
-                metrics.optimization_recommendations = search_metrics.get('recommendations', [])
-        except Exception as e:
-            logger.warning(f"Search optimization metrics integration failed: {e}")
+        # Database, health, QA and search groups from their snapshots
+        for group, values in self.snapshots.get_many(SNAPSHOT_TTLS, fresh=fresh).items():
+            for field, value in (values or {}).items():
+                setattr(metrics, field, value)
         
         logger.info("✅ Dashboard metrics generated")
         return metrics
@@ -287,6 +312,41 @@ class CampaignDashboard:
             logger.error(f"Database metrics error: {e}")
             metrics.database_status = "error"
     
+    def _update_quality_metrics(self, metrics: DashboardMetrics):
+        """Update metrics from the QA system"""
+        try:
+            qa_metrics = self._get_qa_metrics()
+            if qa_metrics:
+                metrics.overall_quality_score = qa_metrics.overall_system_quality
+                metrics.content_quality_score = qa_metrics.avg_content_quality
+                metrics.data_integrity_score = (
+                    qa_metrics.master_data_compliance_rate + 
+                    qa_metrics.database_integrity_score
+                ) / 2
+                metrics.system_reliability_score = (
+                    qa_metrics.api_performance_score + 
+                    qa_metrics.system_uptime_score + 
+                    qa_metrics.error_handling_score
+                ) / 3
+                metrics.providers_needing_qa_review = qa_metrics.providers_needing_review
+                metrics.critical_quality_issues = qa_metrics.critical_issues
+        except Exception as e:
+            logger.warning(f"QA metrics integration failed: {e}")
+    
+    def _update_search_metrics(self, metrics: DashboardMetrics):
+        """Update metrics from the search optimizer"""
+        try:
+            search_metrics = self._get_search_optimization_metrics()
+            if search_metrics:
+                metrics.search_effectiveness_score = search_metrics.get('overall_effectiveness', 0.0)
+                metrics.avg_english_success_rate = search_metrics.get('english_success_rate', 0.0)
+                metrics.cost_per_english_provider = search_metrics.get('cost_per_english_provider', 0.0)
+                metrics.recommended_search_strategies = search_metrics.get('recommended_strategies', [])
+                metrics.high_yield_locations = search_metrics.get('high_yield_locations', [])
+                metrics.optimization_recommendations = search_metrics.get('recommendations', [])
+        except Exception as e:
+            logger.warning(f"Search optimization metrics integration failed: {e}")
+    
     def _update_geographic_metrics(self, metrics: DashboardMetrics):
         """Update geographic distribution metrics"""
         try:
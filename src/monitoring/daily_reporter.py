@@ -22,7 +22,8 @@ from pathlib import Path
 # Add src to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from src.monitoring.campaign_dashboard import CampaignDashboard, DashboardMetrics
+from src.core.container import component
+from src.monitoring.campaign_dashboard import DashboardMetrics
 import logging
 
 logger = logging.getLogger(__name__)
@@ -31,9 +32,11 @@ logger = logging.getLogger(__name__)
 class DailyReporter:
     """Automated daily campaign reporting system"""
     
+    # Shared dashboard, so reports render from its metric snapshots
+    dashboard = component('dashboard')
+    
     def __init__(self):
         """Initialize daily reporter"""
-        self.dashboard = CampaignDashboard()
         
         # Email configuration
         self.smtp_host = os.getenv('SMTP_HOST', 'smtp.gmail.com')
@@ -9,6 +9,8 @@ import sys
 import time
 import psutil
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Dict, List, Any, Optional, Tuple
@@ -17,14 +19,57 @@ from dataclasses import dataclass, asdict
 # Add src to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from src.core.database import DatabaseManager
-from src.publishers.wordpress import WordPressPublisher
-from src.collectors.google_places import GooglePlacesCollector
-from src.processors.ai_content import AIContentProcessor
-from src.campaign.campaign_state import CampaignStateManager
+from src.core.container import component
 
 logger = logging.getLogger(__name__)
 
+# name -> (check method, timeout seconds, cache TTL seconds)
+HEALTH_CHECKS = {
+    'database': ('check_database_health', 10.0, 15.0),
+    'wordpress': ('check_wordpress_health', 10.0, 30.0),
+    'google_api': ('check_google_api_health', 5.0, 60.0),
+    'claude_api': ('check_claude_api_health', 5.0, 300.0),
+    'system_resources': ('check_system_resources', 2.0, 5.0),
+    'campaign': ('check_campaign_health', 5.0, 15.0)
+}
+
+
+class CpuSampler:
+    """Samples CPU usage on a background thread so health checks never block on it"""
+    
+    def __init__(self, interval: float = 5.0):
+        self.interval = interval
+        self.value: Optional[float] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+    
+    def start(self) -> None:
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                return
+            # Sets the baseline the first sample is measured against
+            psutil.cpu_percent(interval=None)
+            self._thread = threading.Thread(target=self._run, name='cpu-sampler', daemon=True)
+            self._thread.start()
+    
+    def _run(self) -> None:
+        while True:
+            try:
+                self.value = psutil.cpu_percent(interval=self.interval)
+            except Exception as e:
+                logger.debug(f"CPU sample failed: {e}")
+                time.sleep(self.interval)
+    
+    def latest(self) -> float:
+        """Most recent CPU percentage (usage since start until the first sample lands)"""
+        self.start()
+        if self.value is None:
+            return psutil.cpu_percent(interval=None)
+        return self.value
+
+
+cpu_sampler = CpuSampler()
+
 
 @dataclass
 class HealthMetrics:
@@ -80,13 +125,15 @@ class HealthMetrics:
 class HealthMonitor:
     """Comprehensive system health monitoring"""
     
+    # Each check builds only the components it probes
+    db = component('db')
+    wp_publisher = component('publisher')
+    cost_tracker = component('cost_tracker')
+    content_processor = component('processor')
+    state_manager = component('state_manager')
+    
     def __init__(self):
         """Initialize health monitor"""
-        self.db = DatabaseManager()
-        self.wp_publisher = WordPressPublisher()
-        self.collector = GooglePlacesCollector()
-        self.content_processor = AIContentProcessor()
-        self.state_manager = CampaignStateManager()
         
         # Health thresholds
         self.response_time_warning = 5.0  # seconds
@@ -96,6 +143,13 @@ class HealthMonitor:
         self.disk_warning = 85.0  # percentage
         self.disk_critical = 95.0  # percentage
         
+        # Last result per check, and probes still running from an earlier poll
+        self._check_results: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+        self._check_futures = {}
+        self._check_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=len(HEALTH_CHECKS),
+                                            thread_name_prefix='health-check')
+        
         logger.info("✅ Health Monitor initialized")
     
     def check_database_health(self) -> Dict[str, Any]:
@@ -191,29 +245,21 @@ class HealthMonitor:
         }
         
         try:
-            # Check collector status
-            if hasattr(self.collector, 'cost_tracker'):
-                cost_tracker = self.collector.cost_tracker
-                
-                # Get daily usage
-                today_cost = cost_tracker.get_daily_costs()
-                health['daily_usage'] = today_cost.get('total', 0.0)
-                
-                # Estimate quota remaining (rough calculation)
-                daily_limit_cost = 25.0  # Daily budget limit
-                if daily_limit_cost > 0:
-                    usage_percent = (health['daily_usage'] / daily_limit_cost) * 100
-                    health['quota_remaining'] = max(0, 100 - usage_percent)
-                
-                health['status'] = 'active'
-                
-                # Check if approaching limits
-                if health['quota_remaining'] < 10:
-                    health['status'] = 'critical'
-                elif health['quota_remaining'] < 25:
-                    health['status'] = 'warning'
-            else:
-                health['status'] = 'inactive'
+            health['daily_usage'] = self.cost_tracker.get_daily_usage()
+            
+            # Share of the daily budget still available
+            daily_limit = self.cost_tracker.DAILY_LIMIT
+            if daily_limit > 0:
+                usage_percent = (health['daily_usage'] / daily_limit) * 100
+                health['quota_remaining'] = max(0, 100 - usage_percent)
+            
+            health['status'] = 'active'
+            
+            # Check if approaching limits
+            if health['quota_remaining'] < 10:
+                health['status'] = 'critical'
+            elif health['quota_remaining'] < 25:
+                health['status'] = 'warning'
                 
         except Exception as e:
             health['status'] = 'error'
@@ -266,8 +312,8 @@ class HealthMonitor:
         }
         
         try:
-            # CPU usage
-            resources['cpu_usage'] = psutil.cpu_percent(interval=1)
+            # CPU usage (sampled in the background)
+            resources['cpu_usage'] = cpu_sampler.latest()
             
             # Memory usage
             memory = psutil.virtual_memory()
@@ -393,19 +439,79 @@ class HealthMonitor:
         
         return max(0.0, score), status
     
-    def generate_health_report(self) -> HealthMetrics:
+    def _failed_result(self, name: str, timeout: float, message: str) -> Dict[str, Any]:
+        """Result reported for a check that did not answer in time or raised"""
+        if name == 'system_resources':
+            return {'cpu_usage': 0.0, 'memory_usage': 0.0, 'memory_total': 0.0,
+                    'disk_usage': 0.0, 'disk_total': 0.0, 'process_count': 0}
+        if name == 'campaign':
+            return {'state_healthy': False, 'last_activity': '', 'error_count': 1}
+        if name == 'google_api':
+            return {'status': 'error', 'quota_remaining': 100.0, 'daily_usage': 0.0, 'error_rate': 0.0}
+        
+        result = {'status': 'error', 'response_time': timeout, 'error_message': message}
+        if name == 'database':
+            result['connection_count'] = 0
+        elif name == 'wordpress':
+            result['last_sync'] = ''
+        else:
+            result['daily_usage'] = 0.0
+        return result
+    
+    def _store_result(self, name: str, future) -> None:
+        """Cache a finished probe, including one that outlived its poll"""
+        with self._check_lock:
+            self._check_futures.pop(name, None)
+            if not future.cancelled() and future.exception() is None:
+                self._check_results[name] = (time.monotonic(), future.result())
+    
+    def run_health_checks(self, fresh: bool = False) -> Dict[str, Dict[str, Any]]:
+        """Run all checks concurrently, each bounded by its own timeout
+        
+        Results younger than their TTL are reused unless fresh=True. A probe
+        still running from an earlier poll is joined rather than started again.
+        
+        Returns:
+            Result per check name (see HEALTH_CHECKS)
+        """
+        started = time.monotonic()
+        results, pending = {}, {}
+        
+        with self._check_lock:
+            for name, (method, timeout, ttl) in HEALTH_CHECKS.items():
+                cached = self._check_results.get(name)
+                if not fresh and cached and started - cached[0] < ttl:
+                    results[name] = cached[1]
+                    continue
+                
+                future = self._check_futures.get(name)
+                if future is None:
+                    future = self._executor.submit(getattr(self, method))
+                    self._check_futures[name] = future
+                    future.add_done_callback(lambda f, name=name: self._store_result(name, f))
+                pending[name] = future
+        
+        # All deadlines run from the same start, so a poll lasts about as long as its slowest probe
+        for name, future in pending.items():
+            timeout = HEALTH_CHECKS[name][1]
+            try:
+                results[name] = future.result(timeout=max(0.0, started + timeout - time.monotonic()))
+            except FutureTimeout:
+                message = f'Health check timed out after {timeout:.0f}s'
+                logger.warning(f"Health check '{name}': {message}")
+                results[name] = self._failed_result(name, timeout, message)
+            except Exception as e:
+                logger.error(f"Health check '{name}' failed: {e}")
+                results[name] = self._failed_result(name, timeout, str(e))
+        
+        return {name: results[name] for name in HEALTH_CHECKS}
+    
+    def generate_health_report(self, fresh: bool = False) -> HealthMetrics:
         """Generate comprehensive health report"""
         logger.info("🏥 Generating system health report...")
         
         # Collect all health metrics
-        health_data = {
-            'database': self.check_database_health(),
-            'wordpress': self.check_wordpress_health(),
-            'google_api': self.check_google_api_health(),
-            'claude_api': self.check_claude_api_health(),
-            'system_resources': self.check_system_resources(),
-            'campaign': self.check_campaign_health()
-        }
+        health_data = self.run_health_checks(fresh=fresh)
         
         # Calculate overall health
         health_score, health_status = self.calculate_health_score(health_data)
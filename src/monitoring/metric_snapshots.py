@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Metric Snapshots
+Caches groups of dashboard metrics with a TTL per group. Stale groups are
+served immediately while one background refresh runs; concurrent callers
+share that refresh (single-flight) instead of re-running the queries.
+"""
+
+import time
+import logging
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class _Snapshot:
+    """One metric group and its cached value"""
+    
+    def __init__(self, name: str, refresh: Callable[[], Any], ttl: float):
+        self.name = name
+        self.refresh = refresh
+        self.ttl = ttl
+        self.value: Any = None
+        self.refreshed_at: Optional[float] = None
+        self.in_flight: Optional[Future] = None
+        self.lock = threading.Lock()
+
+
+class MetricSnapshots:
+    """TTL snapshots of expensive metric groups with single-flight refresh"""
+    
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        self.clock = clock
+        self._snapshots: Dict[str, _Snapshot] = {}
+        self._local = threading.local()
+        self._stop = threading.Event()
+        self._scheduler: Optional[threading.Thread] = None
+    
+    def register(self, name: str, refresh: Callable[[], Any], ttl: float) -> None:
+        """Register a metric group
+        
+        Args:
+            name: Group name
+            refresh: Computes the group's value
+            ttl: Seconds a value stays fresh
+        """
+        self._snapshots[name] = _Snapshot(name, refresh, ttl)
+    
+    def is_stale(self, name: str) -> bool:
+        """Whether a group has no value or has outlived its TTL"""
+        snapshot = self._snapshots[name]
+        return snapshot.refreshed_at is None or self.clock() - snapshot.refreshed_at >= snapshot.ttl
+    
+    def ages(self) -> Dict[str, Optional[float]]:
+        """Seconds since each group was refreshed (None if never)"""
+        now = self.clock()
+        return {
+            name: (now - s.refreshed_at) if s.refreshed_at is not None else None
+            for name, s in self._snapshots.items()
+        }
+    
+    def _refreshing(self) -> set:
+        if not hasattr(self._local, 'names'):
+            self._local.names = set()
+        return self._local.names
+    
+    def _run(self, snapshot: _Snapshot, future: Future) -> None:
+        """Leader side of a refresh"""
+        refreshing = self._refreshing()
+        refreshing.add(snapshot.name)
+        try:
+            value = snapshot.refresh()
+            snapshot.value = value
+            snapshot.refreshed_at = self.clock()
+        except Exception as e:
+            # Keep serving the last good value
+            logger.error(f"Metric snapshot '{snapshot.name}' refresh failed: {e}")
+            value = snapshot.value
+        finally:
+            refreshing.discard(snapshot.name)
+            with snapshot.lock:
+                snapshot.in_flight = None
+        future.set_result(value)
+    
+    def refresh_async(self, name: str) -> Future:
+        """Start a background refresh, or join the one already running"""
+        snapshot = self._snapshots[name]
+        with snapshot.lock:
+            if snapshot.in_flight is not None:
+                return snapshot.in_flight
+            future = snapshot.in_flight = Future()
+        
+        threading.Thread(target=self._run, args=(snapshot, future),
+                         name=f"snapshot-{name}", daemon=True).start()
+        return future
+    
+    def get_many(self, names: Iterable[str], fresh: bool = False) -> Dict[str, Any]:
+        """Current values for several groups
+        
+        Fresh values are returned as-is. Stale values are returned too, with a
+        refresh started behind them. Groups with no value yet (or all groups when
+        fresh=True) are refreshed concurrently and waited for.
+        """
+        names = list(names)
+        values, waiting = {}, {}
+        # Inside a refresh (e.g. an analyzer reading the dashboard) never wait:
+        # two refreshes waiting on each other would deadlock
+        nested = bool(self._refreshing())
+        
+        for name in names:
+            snapshot = self._snapshots[name]
+            if nested:
+                values[name] = snapshot.value
+            elif not fresh and not self.is_stale(name):
+                values[name] = snapshot.value
+            elif not fresh and snapshot.refreshed_at is not None:
+                values[name] = snapshot.value
+                self.refresh_async(name)
+            else:
+                waiting[name] = self.refresh_async(name)
+        
+        for name, future in waiting.items():
+            values[name] = future.result()
+        
+        return {name: values[name] for name in names}
+    
+    def get(self, name: str, fresh: bool = False) -> Any:
+        """Current value for one group (see get_many)"""
+        return self.get_many([name], fresh)[name]
+    
+    def start(self, interval: float = 30.0) -> None:
+        """Refresh stale groups on a background schedule"""
+        if self._scheduler and self._scheduler.is_alive():
+            return
+        
+        self._stop.clear()
+        
+        def loop():
+            while not self._stop.is_set():
+                for name in list(self._snapshots):
+                    if self.is_stale(name):
+                        self.refresh_async(name)
+                self._stop.wait(interval)
+        
+        self._scheduler = threading.Thread(target=loop, name='metric-snapshots', daemon=True)
+        self._scheduler.start()
+        logger.info(f"✅ Metric snapshot refresh scheduled every {interval:.0f}s")
+    
+    def stop(self) -> None:
+        """Stop the background schedule"""
+        self._stop.set()
+        if self._scheduler:
+            self._scheduler.join(timeout=5)
+            self._scheduler = None
@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+"""
+Process Metrics
+Counters and latency histograms for the pipeline hot paths, rendered in the
+Prometheus text exposition format. Served by start_metrics_server() or by any
+web app that returns render().
+"""
+
+import os
+import re
+import time
+import logging
+import threading
+from bisect import bisect_left
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterable, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Seconds; covers cache lookups through slow Claude batches
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = '') -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    """Shared label handling for counters and histograms"""
+    
+    kind = ''
+    
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+    
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[n]) for n in self.labelnames)
+    
+    def samples(self) -> Iterable[str]:
+        raise NotImplementedError
+    
+    def render(self) -> str:
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.kind}']
+        lines.extend(self.samples())
+        return '\n'.join(lines)
+
+
+class Counter(_Metric):
+    """Monotonic count per label set"""
+    
+    kind = 'counter'
+    
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+    
+    def inc(self, amount: float = 1, **labels) -> None:
+        if amount < 0:
+            raise ValueError('Counters can only increase')
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+    
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+    
+    def samples(self) -> Iterable[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            yield f'{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}'
+
+
+class Histogram(_Metric):
+    """Bucketed observations (cumulative on render) per label set"""
+    
+    kind = 'histogram'
+    
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float('inf'),)
+        # label values -> [per-bucket counts, sum]
+        self._values: Dict[Tuple[str, ...], list] = {}
+    
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * len(self.buckets), 0.0]
+            state[0][index] += 1
+            state[1] += value
+    
+    def count(self, **labels) -> int:
+        state = self._values.get(self._key(labels))
+        return sum(state[0]) if state else 0
+    
+    @contextmanager
+    def time(self, **labels):
+        """Observe the duration of a block, including blocks that raise"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+    
+    def samples(self) -> Iterable[str]:
+        with self._lock:
+            items = sorted((key, (list(state[0]), state[1])) for key, state in self._values.items())
+        for key, (counts, total) in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                le = 'le="%s"' % _format_value(bound)
+                yield f'{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}'
+            yield f'{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(total)}'
+            yield f'{self.name}_count{_format_labels(self.labelnames, key)} {cumulative}'
+
+
+class MetricsRegistry:
+    """Named metrics of one process"""
+    
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+    
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                if type(existing) is not type(metric) or existing.labelnames != metric.labelnames:
+                    raise ValueError(f"Metric {metric.name} already registered differently")
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+    
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+    
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+    
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return '\n'.join(m.render() for m in metrics) + '\n'
+
+
+registry = MetricsRegistry()
+
+
+def render() -> str:
+    """Current metrics in the Prometheus text format"""
+    return registry.render()
+
+
+@contextmanager
+def timed(histogram: Histogram, counter: Optional[Counter] = None, **labels):
+    """Time a block into histogram and count it by outcome (status="ok"/"error")"""
+    status = 'ok'
+    try:
+        with histogram.time(**labels):
+            yield
+    except Exception:
+        status = 'error'
+        raise
+    finally:
+        if counter is not None:
+            counter.inc(status=status, **labels)
+
+
+# Google Places
+PLACES_REQUEST_SECONDS = registry.histogram(
+    'places_request_seconds', 'Google Places API request latency', ['endpoint'])
+PLACES_REQUESTS = registry.counter(
+    'places_requests_total', 'Google Places API requests by API status', ['endpoint', 'status'])
+SEARCH_PAGES = registry.histogram(
+    'places_search_pages', 'Result pages fetched per provider search', buckets=(1, 2, 3))
+
+# Local SQLite response cache
+CACHE_SECONDS = registry.histogram(
+    'cache_operation_seconds', 'Persistent cache operation latency', ['operation', 'cache_type'])
+CACHE_LOOKUPS = registry.counter(
+    'cache_lookups_total', 'Persistent cache lookups by result', ['cache_type', 'result'])
+
+# Provider database
+DB_OPERATION_SECONDS = registry.histogram(
+    'db_operation_seconds', 'Provider database operation latency', ['operation'])
+DB_OPERATIONS = registry.counter(
+    'db_operations_total', 'Provider database operations by outcome', ['operation', 'status'])
+
+# Claude
+CLAUDE_REQUEST_SECONDS = registry.histogram(
+    'claude_request_seconds', 'Claude API request latency', ['caller'])
+CLAUDE_REQUESTS = registry.counter(
+    'claude_requests_total', 'Claude API requests by outcome', ['caller', 'status'])
+CLAUDE_TOKENS = registry.counter(
+    'claude_tokens_total', 'Claude tokens by model and kind', ['model', 'kind'])
+
+# WordPress REST API
+WORDPRESS_REQUEST_SECONDS = registry.histogram(
+    'wordpress_request_seconds', 'WordPress REST request latency', ['method', 'endpoint'])
+WORDPRESS_REQUESTS = registry.counter(
+    'wordpress_requests_total', 'WordPress REST requests by HTTP status', ['method', 'endpoint', 'status'])
+
+_NUMERIC_SEGMENT = re.compile(r'/\d+(?=/|$)')
+
+
+def wordpress_endpoint(url: str) -> str:
+    """Route template of a WordPress REST URL, e.g. /wp/v2/healthcare_provider/{id}"""
+    path = url.split('?', 1)[0]
+    if '/wp-json' in path:
+        path = path.split('/wp-json', 1)[1]
+    return _NUMERIC_SEGMENT.sub('/{id}', path) or '/'
+
+
+def record_wordpress_response(response, *args, **kwargs):
+    """requests response hook: latency and status per WordPress endpoint"""
+    try:
+        method = response.request.method
+        endpoint = wordpress_endpoint(response.request.url)
+        WORDPRESS_REQUEST_SECONDS.observe(response.elapsed.total_seconds(), method=method, endpoint=endpoint)
+        WORDPRESS_REQUESTS.inc(method=method, endpoint=endpoint, status=str(response.status_code))
+    except Exception as e:
+        logger.debug(f"Could not record WordPress metrics: {e}")
+    return response
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+
+    def do_GET(self):
+        if self.path.split('?', 1)[0] != '/metrics':
+            self.send_error(404)
+            return
+        body = render().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', CONTENT_TYPE)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def log_message(self, format, *args):
+        logger.debug(format % args)
+
+
+_server: Optional[ThreadingHTTPServer] = None
+
+
+def start_metrics_server(port: Optional[int] = None, addr: str = '0.0.0.0') -> Optional[ThreadingHTTPServer]:
+    """Serve /metrics from a daemon thread (port defaults to METRICS_PORT; unset disables)"""
+    global _server
+    if _server is not None:
+        return _server
+    
+    if port is None:
+        port = int(os.getenv('METRICS_PORT', '0') or 0)
+        if not port:
+            return None
+    
+    _server = ThreadingHTTPServer((addr, port), _MetricsHandler)
+    _server.daemon_threads = True
+    threading.Thread(target=_server.serve_forever, name='metrics-server', daemon=True).start()
+    logger.info(f"📈 Metrics exporter listening on {addr}:{_server.server_address[1]}/metrics")
+    return _server
+
+
+def stop_metrics_server() -> None:
+    global _server
+    if _server is not None:
+        _server.shutdown()
+        _server.server_close()
+        _server = None
@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+Persisted Provider Quality Scores
+Keeps one QA score per provider in provider_quality, keyed by an md5 of the
+columns the analyzers read. Only providers whose columns changed (or that were
+scored by an older scorer) are rescored, page by page on a process pool, and
+system aggregates are computed in SQL.
+"""
+
+import os
+import json
+import logging
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import text
+
+logger = logging.getLogger(__name__)
+
+# Bump when the analyzers in quality_assurance.py change so every score is redone
+SCORER_VERSION = 1
+
+# Provider columns read by QualityAssuranceSystem.analyze_content_quality
+SCORED_COLUMNS = [
+    'provider_name', 'provider_name_romaji', 'address', 'city', 'prefecture',
+    'google_place_id', 'specialties', 'english_proficiency', 'proficiency_score',
+    'total_reviews', 'review_content', 'ai_description', 'ai_excerpt',
+    'review_summary', 'seo_title', 'seo_meta_description', 'wordpress_status'
+]
+
+SCORE_FIELDS = [
+    'description_completeness', 'excerpt_completeness', 'review_summary_completeness',
+    'seo_completeness', 'overall_completeness', 'romaji_consistency',
+    'english_proficiency_alignment', 'seo_optimization', 'content_uniqueness',
+    'overall_quality', 'master_data_compliance', 'field_validation',
+    'wordpress_consistency', 'overall_integrity', 'final_quality_score'
+]
+
+INPUT_HASH = "md5(ROW({})::text)".format(', '.join(f"p.{c}" for c in SCORED_COLUMNS))
+
+STALE_PAGE_SQL = f"""
+    SELECT p.id, {', '.join(f'p.{c}' for c in SCORED_COLUMNS)}, {INPUT_HASH} AS input_hash
+    FROM providers p
+    LEFT JOIN provider_quality q ON q.provider_id = p.id
+    WHERE p.id > :after_id
+      AND (q.provider_id IS NULL
+           OR q.scorer_version <> :scorer_version
+           OR q.input_hash <> {INPUT_HASH})
+    ORDER BY p.id
+    LIMIT :limit
+"""
+
+UPSERT_SQL = f"""
+    INSERT INTO provider_quality (
+        provider_id, input_hash, scorer_version, scored_at, provider_name,
+        {', '.join(SCORE_FIELDS)},
+        issues, recommendations, issue_count, needs_manual_review, priority_level
+    ) VALUES (
+        :provider_id, :input_hash, :scorer_version, NOW(), :provider_name,
+        {', '.join(f':{f}' for f in SCORE_FIELDS)},
+        CAST(:issues AS JSON), CAST(:recommendations AS JSON), :issue_count,
+        :needs_manual_review, :priority_level
+    )
+    ON CONFLICT (provider_id) DO UPDATE SET
+        input_hash = EXCLUDED.input_hash,
+        scorer_version = EXCLUDED.scorer_version,
+        scored_at = EXCLUDED.scored_at,
+        provider_name = EXCLUDED.provider_name,
+        {', '.join(f'{f} = EXCLUDED.{f}' for f in SCORE_FIELDS)},
+        issues = EXCLUDED.issues,
+        recommendations = EXCLUDED.recommendations,
+        issue_count = EXCLUDED.issue_count,
+        needs_manual_review = EXCLUDED.needs_manual_review,
+        priority_level = EXCLUDED.priority_level
+"""
+
+AGGREGATES_SQL = """
+    SELECT
+        COUNT(*) AS scored,
+        AVG(overall_quality) AS avg_content_quality,
+        AVG(overall_completeness) AS content_completeness_rate,
+        AVG(romaji_consistency) AS romaji_success_rate,
+        AVG(seo_optimization) AS seo_optimization_score,
+        AVG(master_data_compliance) AS master_data_compliance_rate,
+        AVG(field_validation) AS database_integrity_score,
+        AVG(wordpress_consistency) AS wordpress_sync_accuracy,
+        COUNT(*) FILTER (WHERE final_quality_score >= 75) AS high_quality,
+        COUNT(*) FILTER (WHERE final_quality_score >= 60 AND final_quality_score < 75) AS medium_quality,
+        COUNT(*) FILTER (WHERE final_quality_score < 60) AS low_quality,
+        COUNT(*) FILTER (WHERE needs_manual_review) AS needs_review,
+        COALESCE(SUM(issue_count), 0) AS total_issues,
+        COUNT(*) FILTER (WHERE priority_level = 'critical') AS critical_issues,
+        COUNT(*) FILTER (WHERE priority_level = 'high') AS high_priority_issues,
+        COUNT(*) FILTER (WHERE priority_level = 'medium') AS medium_priority_issues,
+        COUNT(*) FILTER (WHERE romaji_consistency < 90) AS romaji_issues,
+        COUNT(*) FILTER (WHERE seo_optimization < 70) AS seo_issues
+    FROM provider_quality
+"""
+
+AVERAGES = {
+    'avg_content_quality', 'content_completeness_rate', 'romaji_success_rate',
+    'seo_optimization_score', 'master_data_compliance_rate', 'database_integrity_score',
+    'wordpress_sync_accuracy'
+}
+
+_scorer = None
+
+
+def _init_scorer():
+    """Build the QA analyzers once per worker process"""
+    global _scorer
+    from .quality_assurance import QualityAssuranceSystem
+    _scorer = QualityAssuranceSystem()
+
+
+def score_rows(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Score projected provider rows (runs in a worker process)
+    
+    Returns:
+        Upsert parameters for every row that scored; failures are logged and skipped
+    """
+    if _scorer is None:
+        _init_scorer()
+    
+    scored = []
+    for row in rows:
+        provider = SimpleNamespace(id=row['id'], **{c: row.get(c) for c in SCORED_COLUMNS})
+        try:
+            score = asdict(_scorer.analyze_content_quality(provider))
+        except Exception as e:
+            logger.error(f"Quality analysis failed for provider {row['id']}: {e}")
+            continue
+        
+        params = {field: score[field] for field in SCORE_FIELDS}
+        params.update({
+            'provider_id': row['id'],
+            'input_hash': row['input_hash'],
+            'scorer_version': SCORER_VERSION,
+            'provider_name': score['provider_name'],
+            'issues': score['issues'],
+            'recommendations': score['recommendations'],
+            'issue_count': len(score['issues']),
+            'needs_manual_review': score['needs_manual_review'],
+            'priority_level': score['priority_level']
+        })
+        scored.append(params)
+    return scored
+
+
+class ProviderQualityStore:
+    """Incremental QA scoring backed by the provider_quality table"""
+    
+    def __init__(self, db, page_size: int = 500, workers: Optional[int] = None):
+        """Initialize the store
+        
+        Args:
+            db: DatabaseManager
+            page_size: Providers fetched and scored per task
+            workers: Scoring processes (QA_SCORING_WORKERS, default CPU count up to 4);
+                0 scores in this process
+        """
+        self.db = db
+        self.page_size = page_size
+        if workers is None:
+            workers = int(os.getenv('QA_SCORING_WORKERS', min(4, os.cpu_count() or 1)))
+        self.workers = workers
+    
+    def stale_page(self, after_id: int = 0, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Next page of providers without a current score, in id order"""
+        session = self.db.get_session()
+        try:
+            result = session.execute(text(STALE_PAGE_SQL), {
+                'after_id': after_id,
+                'scorer_version': SCORER_VERSION,
+                'limit': limit or self.page_size
+            })
+            return [dict(row) for row in result.mappings()]
+        finally:
+            session.close()
+    
+    def save(self, scored: List[Dict[str, Any]]) -> int:
+        """Upsert scores in one statement"""
+        if not scored:
+            return 0
+        
+        params = [
+            {**s, 'issues': json.dumps(s['issues']), 'recommendations': json.dumps(s['recommendations'])}
+            for s in scored
+        ]
+        
+        session = self.db.get_session()
+        try:
+            session.execute(text(UPSERT_SQL), params)
+            session.commit()
+            return len(params)
+        except Exception as e:
+            session.rollback()
+            logger.error(f"Error saving quality scores: {e}")
+            return 0
+        finally:
+            session.close()
+    
+    def pages(self):
+        """Yield stale pages by keyset (id) until none are left"""
+        after_id = 0
+        while True:
+            page = self.stale_page(after_id)
+            if not page:
+                return
+            yield page
+            if len(page) < self.page_size:
+                return
+            after_id = page[-1]['id']
+    
+    def refresh(self) -> Dict[str, int]:
+        """Rescore every stale or changed provider
+        
+        Returns:
+            Counts of pages, rows fetched and scores saved
+        """
+        stats = {'pages': 0, 'fetched': 0, 'scored': 0}
+        pages = self.pages()
+        first = next(pages, None)
+        if first is None:
+            return stats
+        
+        def record(page, scored):
+            stats['pages'] += 1
+            stats['fetched'] += len(page)
+            stats['scored'] += self.save(scored)
+        
+        # A single short page is cheaper to score here than to start a pool for
+        if self.workers <= 0 or len(first) < self.page_size:
+            record(first, score_rows(first))
+            for page in pages:
+                record(page, score_rows(page))
+            return stats
+        
+        with ProcessPoolExecutor(max_workers=self.workers, initializer=_init_scorer) as executor:
+            # Pages are fetched while earlier ones score; keep at most two per worker queued
+            in_flight = deque([(first, executor.submit(score_rows, first))])
+            for page in pages:
+                if len(in_flight) >= self.workers * 2:
+                    done_page, future = in_flight.popleft()
+                    record(done_page, future.result())
+                in_flight.append((page, executor.submit(score_rows, page)))
+            while in_flight:
+                done_page, future = in_flight.popleft()
+                record(done_page, future.result())
+        
+        logger.info(f"✅ Rescored {stats['scored']} providers in {stats['pages']} pages")
+        return stats
+    
+    def aggregates(self) -> Dict[str, Any]:
+        """System-wide aggregates over the stored scores"""
+        session = self.db.get_session()
+        try:
+            row = session.execute(text(AGGREGATES_SQL)).mappings().first()
+            return {key: (float(value or 0.0) if key in AVERAGES else int(value or 0))
+                    for key, value in row.items()}
+        finally:
+            session.close()
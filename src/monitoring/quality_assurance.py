@@ -17,15 +17,15 @@ from pathlib import Path
 # Add src to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from src.core.database import DatabaseManager, Provider
-from src.publishers.wordpress import WordPressPublisher
+from src.core.database import Provider
+from src.core.container import component
+from src.monitoring.provider_quality import ProviderQualityStore
 from src.utils.romaji_converter import contains_japanese, convert_to_romaji
 try:
     from src.data.master_locations import LocationValidator
     LOCATION_VALIDATOR_AVAILABLE = True
 except ImportError:
     LOCATION_VALIDATOR_AVAILABLE = False
-from src.monitoring.campaign_dashboard import CampaignDashboard
 
 logger = logging.getLogger(__name__)
 
@@ -110,13 +110,16 @@ class SystemQualityMetrics:
 class QualityAssuranceSystem:
     """Comprehensive quality assurance for campaign management"""
     
+    # Built on first use and shared through the process-wide container
+    db_manager = component('db')
+    wordpress = component('publisher')
+    dashboard = component('dashboard')
+    
     def __init__(self):
         """Initialize quality assurance system"""
-        self.db_manager = DatabaseManager()
-        self.wordpress = WordPressPublisher()
         # Initialize validators if available
         self.location_validator = LocationValidator() if LOCATION_VALIDATOR_AVAILABLE else None
-        self.dashboard = CampaignDashboard()
+        self._quality_store = None
         
         # Quality thresholds
         self.quality_thresholds = {
@@ -145,6 +148,13 @@ class QualityAssuranceSystem:
         
         logger.info("✅ Quality Assurance System initialized")
     
+    @property
+    def quality_store(self) -> ProviderQualityStore:
+        """Persisted per-provider scores (lazy loading)"""
+        if self._quality_store is None:
+            self._quality_store = ProviderQualityStore(self.db_manager)
+        return self._quality_store
+    
     def analyze_content_quality(self, provider: Provider) -> ContentQualityScore:
         """Comprehensive content quality analysis for a provider"""
         
@@ -590,60 +600,46 @@ class QualityAssuranceSystem:
             issues.append("Specialties require validation")
             recommendations.append("Validate specialties against canonical list")
     
-    def generate_system_quality_metrics(self) -> SystemQualityMetrics:
-        """Generate comprehensive system-wide quality metrics"""
-        logger.info("📊 Generating system-wide quality metrics...")
+    def refresh_provider_scores(self) -> Dict[str, int]:
+        """Rescore providers whose scored columns changed since their last score"""
+        return self.quality_store.refresh()
+    
+    def generate_system_quality_metrics(self, refresh: bool = True) -> SystemQualityMetrics:
+        """Generate comprehensive system-wide quality metrics
         
-        # Get all providers for analysis
-        with self.db_manager.get_session() as session:
-            providers = session.query(Provider).all()
+        Args:
+            refresh: Rescore stale providers first; aggregates always come from
+                the provider_quality table
+        """
+        logger.info("📊 Generating system-wide quality metrics...")
         
-        if not providers:
-            logger.warning("No providers found for quality analysis")
-            return self._create_empty_quality_metrics()
+        if refresh:
+            self.refresh_provider_scores()
         
-        # Analyze each provider
-        provider_scores = []
-        total_issues = 0
-        critical_issues = 0
-        high_priority_issues = 0
-        medium_priority_issues = 0
-        
-        for provider in providers:
-            try:
-                score = self.analyze_content_quality(provider)
-                provider_scores.append(score)
-                
-                total_issues += len(score.issues)
-                if score.priority_level == 'critical':
-                    critical_issues += 1
-                elif score.priority_level == 'high':
-                    high_priority_issues += 1
-                elif score.priority_level == 'medium':
-                    medium_priority_issues += 1
-                    
-            except Exception as e:
-                logger.error(f"Quality analysis failed for provider {provider.id}: {e}")
-        
-        if not provider_scores:
+        aggregates = self.quality_store.aggregates()
+        if not aggregates['scored']:
             logger.warning("No provider scores generated")
             return self._create_empty_quality_metrics()
         
-        # Calculate aggregate metrics
-        avg_content_quality = sum(s.overall_quality for s in provider_scores) / len(provider_scores)
-        content_completeness_rate = sum(s.overall_completeness for s in provider_scores) / len(provider_scores)
-        romaji_success_rate = sum(s.romaji_consistency for s in provider_scores) / len(provider_scores)
-        seo_optimization_score = sum(s.seo_optimization for s in provider_scores) / len(provider_scores)
+        avg_content_quality = aggregates['avg_content_quality']
+        content_completeness_rate = aggregates['content_completeness_rate']
+        romaji_success_rate = aggregates['romaji_success_rate']
+        seo_optimization_score = aggregates['seo_optimization_score']
         
-        master_data_compliance_rate = sum(s.master_data_compliance for s in provider_scores) / len(provider_scores)
-        database_integrity_score = sum(s.field_validation for s in provider_scores) / len(provider_scores)
-        wordpress_sync_accuracy = sum(s.wordpress_consistency for s in provider_scores) / len(provider_scores)
+        master_data_compliance_rate = aggregates['master_data_compliance_rate']
+        database_integrity_score = aggregates['database_integrity_score']
+        wordpress_sync_accuracy = aggregates['wordpress_sync_accuracy']
         
         # Quality distribution
-        high_quality = len([s for s in provider_scores if s.final_quality_score >= 75])
-        medium_quality = len([s for s in provider_scores if 60 <= s.final_quality_score < 75])
-        low_quality = len([s for s in provider_scores if s.final_quality_score < 60])
-        needs_review = len([s for s in provider_scores if s.needs_manual_review])
+        high_quality = aggregates['high_quality']
+        medium_quality = aggregates['medium_quality']
+        low_quality = aggregates['low_quality']
+        needs_review = aggregates['needs_review']
+        
+        total_issues = aggregates['total_issues']
+        critical_issues = aggregates['critical_issues']
+        high_priority_issues = aggregates['high_priority_issues']
+        medium_priority_issues = aggregates['medium_priority_issues']
         
         # System reliability metrics (placeholder values - would need actual monitoring)
         api_performance_score = 85.0  # Based on API response times
@@ -664,8 +660,9 @@ class QualityAssuranceSystem:
         
         # Generate top recommendations
         recommendations = self._generate_system_recommendations(
-            provider_scores, avg_content_quality, content_completeness_rate,
-            master_data_compliance_rate, needs_review
+            aggregates['scored'], avg_content_quality, content_completeness_rate,
+            master_data_compliance_rate, needs_review,
+            aggregates['romaji_issues'], aggregates['seo_issues']
         )
         
         logger.info("✅ System quality metrics generated")
@@ -724,11 +721,13 @@ class QualityAssuranceSystem:
             top_recommendations=['No data available for quality analysis']
         )
     
-    def _generate_system_recommendations(self, provider_scores: List[ContentQualityScore],
+    def _generate_system_recommendations(self, scored_providers: int,
                                        avg_content_quality: float,
                                        content_completeness_rate: float,
                                        master_data_compliance_rate: float,
-                                       needs_review: int) -> List[str]:
+                                       needs_review: int,
+                                       romaji_issues: int,
+                                       seo_issues: int) -> List[str]:
         """Generate system-wide quality improvement recommendations"""
         recommendations = []
         
@@ -746,7 +745,6 @@ class QualityAssuranceSystem:
             )
         
         # Romaji conversion recommendations
-        romaji_issues = len([s for s in provider_scores if s.romaji_consistency < 90])
         if romaji_issues > 0:
             recommendations.append(
                 f"🔤 OPTIMIZE ROMAJI CONVERSION: {romaji_issues} providers have romaji inconsistencies. "
@@ -761,14 +759,13 @@ class QualityAssuranceSystem:
             )
         
         # Manual review recommendations
-        if needs_review > len(provider_scores) * 0.2:  # More than 20% need review
+        if needs_review > scored_providers * 0.2:  # More than 20% need review
             recommendations.append(
                 f"👁️ PRIORITIZE MANUAL REVIEWS: {needs_review} providers need manual attention. "
                 f"Allocate resources for quality validation workflow."
             )
         
         # SEO recommendations
-        seo_issues = len([s for s in provider_scores if s.seo_optimization < 70])
         if seo_issues > 0:
             recommendations.append(
                 f"🔍 ENHANCE SEO OPTIMIZATION: {seo_issues} providers have SEO issues. "
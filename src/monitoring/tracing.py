@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+"""
+Pipeline Span Tracing
+Parent/child timing spans for one pipeline run. The active span travels in a
+context variable, so nested calls attach themselves to whatever phase, grid,
+query or batch is running; spans are buffered and written to a local SQLite
+sink keyed by run id. Outside a trace every span call is a cheap no-op.
+"""
+
+import os
+import json
+import time
+import uuid
+import sqlite3
+import logging
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar, copy_context
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TRACE_DB = 'logs/traces.db'
+
+
+@dataclass
+class Span:
+    """One timed operation inside a trace"""
+    trace_id: str
+    name: str
+    span_id: str = field(default_factory=lambda: uuid.uuid4().hex[:16])
+    parent_id: Optional[str] = None
+    started_at: float = field(default_factory=time.time)
+    duration: float = 0.0
+    status: str = 'ok'
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    
+    def set(self, **attributes) -> None:
+        """Attach attributes (counts, ids, outcomes) to the span"""
+        self.attributes.update(attributes)
+
+
+class _NoopSpan:
+    """Stand-in yielded when no trace is active"""
+    
+    def set(self, **attributes) -> None:
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+_current: ContextVar[Optional[Span]] = ContextVar('current_span', default=None)
+
+
+class SpanSink:
+    """SQLite store of finished spans"""
+    
+    def __init__(self, db_path: Optional[str] = None):
+        self.db_path = db_path or os.getenv('TRACE_DB', DEFAULT_TRACE_DB)
+        directory = os.path.dirname(self.db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._init_db()
+    
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=30)
+    
+    def _init_db(self):
+        with self._connect() as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS spans (
+                    span_id TEXT PRIMARY KEY,
+                    trace_id TEXT NOT NULL,
+                    parent_id TEXT,
+                    name TEXT NOT NULL,
+                    started_at REAL NOT NULL,
+                    duration REAL NOT NULL,
+                    status TEXT NOT NULL,
+                    attributes TEXT
+                )
+            ''')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_spans_trace ON spans(trace_id, started_at)')
+            conn.commit()
+    
+    def write(self, spans: List[Span]) -> None:
+        if not spans:
+            return
+        with self._connect() as conn:
+            conn.executemany(
+                'INSERT OR REPLACE INTO spans VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                [(s.span_id, s.trace_id, s.parent_id, s.name, s.started_at, s.duration,
+                  s.status, json.dumps(s.attributes, default=str)) for s in spans]
+            )
+            conn.commit()
+    
+    def spans(self, trace_id: str) -> List[Span]:
+        """All spans of one trace in start order"""
+        with self._connect() as conn:
+            rows = conn.execute('''
+                SELECT span_id, trace_id, parent_id, name, started_at, duration, status, attributes
+                FROM spans WHERE trace_id = ? ORDER BY started_at
+            ''', (trace_id,)).fetchall()
+        return [
+            Span(span_id=r[0], trace_id=r[1], parent_id=r[2], name=r[3], started_at=r[4],
+                 duration=r[5], status=r[6], attributes=json.loads(r[7] or '{}'))
+            for r in rows
+        ]
+    
+    def recent_traces(self, limit: int = 10) -> List[Dict[str, Any]]:
+        """Root spans of the latest traces"""
+        with self._connect() as conn:
+            rows = conn.execute('''
+                SELECT trace_id, name, started_at, duration, status
+                FROM spans WHERE parent_id IS NULL
+                ORDER BY started_at DESC LIMIT ?
+            ''', (limit,)).fetchall()
+        return [
+            {'trace_id': r[0], 'name': r[1], 'started_at': r[2], 'duration': r[3], 'status': r[4]}
+            for r in rows
+        ]
+
+
+class Tracer:
+    """Creates spans under the current context and buffers them for the sink"""
+    
+    def __init__(self, sink: Optional[SpanSink] = None, flush_every: int = 500):
+        self._sink = sink
+        self.flush_every = flush_every
+        self._buffer: List[Span] = []
+        self._lock = threading.Lock()
+    
+    @property
+    def sink(self) -> SpanSink:
+        # Created on first flush so importing the tracer never touches disk
+        if self._sink is None:
+            self._sink = SpanSink()
+        return self._sink
+    
+    @staticmethod
+    def current() -> Optional[Span]:
+        return _current.get()
+    
+    def _finish(self, span: Span) -> None:
+        with self._lock:
+            self._buffer.append(span)
+            full = len(self._buffer) >= self.flush_every
+        if full:
+            self.flush()
+    
+    def flush(self) -> None:
+        with self._lock:
+            spans, self._buffer = self._buffer, []
+        try:
+            self.sink.write(spans)
+        except Exception as e:
+            logger.error(f"Could not write {len(spans)} trace spans: {e}")
+    
+    @contextmanager
+    def _enter(self, span: Span):
+        token = _current.set(span)
+        start = time.perf_counter()
+        try:
+            yield span
+        except BaseException as e:
+            span.status = 'error'
+            span.attributes.setdefault('error', str(e)[:200])
+            raise
+        finally:
+            span.duration = time.perf_counter() - start
+            _current.reset(token)
+            self._finish(span)
+    
+    @contextmanager
+    def trace(self, trace_id: str, name: str, **attributes):
+        """Root span of a trace; everything below is flushed when it ends"""
+        try:
+            with self._enter(Span(trace_id=trace_id, name=name, attributes=attributes)) as span:
+                yield span
+        finally:
+            self.flush()
+    
+    @contextmanager
+    def span(self, name: str, **attributes):
+        """Child of the current span (no-op outside a trace)"""
+        parent = _current.get()
+        if parent is None:
+            yield NOOP_SPAN
+            return
+        
+        span = Span(trace_id=parent.trace_id, name=name, parent_id=parent.span_id, attributes=attributes)
+        with self._enter(span):
+            yield span
+    
+    def record(self, name: str, duration: float, status: str = 'ok', **attributes) -> None:
+        """Add an already finished child span, e.g. from a response hook"""
+        parent = _current.get()
+        if parent is None:
+            return
+        self._finish(Span(trace_id=parent.trace_id, name=name, parent_id=parent.span_id,
+                          started_at=time.time() - duration, duration=duration,
+                          status=status, attributes=attributes))
+
+
+tracer = Tracer()
+start_trace = tracer.trace
+span = tracer.span
+record_span = tracer.record
+
+
+def propagate(fn: Callable) -> Callable:
+    """Bind fn to the caller's trace context for use on pool threads"""
+    context = copy_context()
+    
+    def run(*args, **kwargs):
+        # A context can only be entered by one thread at a time
+        return context.copy().run(fn, *args, **kwargs)
+    return run
+
+
+def record_wordpress_span(response, *args, **kwargs):
+    """requests response hook: one span per WordPress REST call"""
+    try:
+        from .metrics import wordpress_endpoint
+        record_span(
+            'wordpress.request', response.elapsed.total_seconds(),
+            status='ok' if response.status_code < 400 else 'error',
+            method=response.request.method,
+            endpoint=wordpress_endpoint(response.request.url),
+            http_status=response.status_code
+        )
+    except Exception as e:
+        logger.debug(f"Could not record WordPress span: {e}")
+    return response
+
+
+def flame_breakdown(spans: List[Span], max_depth: int = 6, min_share: float = 0.001,
+                    width: int = 30) -> str:
+    """Render a trace as a tree with same-named siblings merged
+    
+    Each line shows the merged span name, call count, total and self time, and
+    its share of the root. Self time excludes children; children that ran on
+    pool threads can overlap, so self time is floored at zero. Spans below
+    min_share of the run are hidden from the tree but still count in the
+    self-time summary.
+    """
+    if not spans:
+        return 'No spans recorded'
+    
+    children = defaultdict(list)
+    for s in spans:
+        children[s.parent_id].append(s)
+    roots = children[None] or [min(spans, key=lambda s: s.started_at)]
+    total = sum(r.duration for r in roots) or 1e-9
+    
+    lines = []
+    self_times = defaultdict(float)
+    
+    def walk(group: List[Span], depth: int):
+        merged = defaultdict(list)
+        for s in group:
+            merged[s.name].append(s)
+        
+        for name, members in sorted(merged.items(), key=lambda kv: -sum(s.duration for s in kv[1])):
+            duration = sum(s.duration for s in members)
+            kids = [c for s in members for c in children.get(s.span_id, [])]
+            self_time = max(0.0, duration - sum(c.duration for c in kids))
+            self_times[name] += self_time
+            errors = sum(1 for s in members if s.status == 'error')
+            
+            share = duration / total
+            if depth < max_depth and (depth == 0 or share >= min_share):
+                bar = '█' * max(1, int(round(share * width)))
+                label = ('  ' * depth + name + (f' ×{len(members)}' if len(members) > 1 else ''))[:48]
+                error_note = f'  ⚠️ {errors} failed' if errors else ''
+                lines.append(f"{label:<48} {duration:>9.2f}s {self_time:>9.2f}s {share:>6.1%}  {bar}{error_note}")
+            walk(kids, depth + 1)
+    
+    walk(roots, 0)
+    
+    header = f"{'SPAN':<48} {'TOTAL':>10} {'SELF':>10} {'SHARE':>6}"
+    summary = ['', 'Self time by span:']
+    for name, seconds in sorted(self_times.items(), key=lambda kv: -kv[1])[:10]:
+        summary.append(f"  {name:<40} {seconds:>9.2f}s {seconds / total:>6.1%}")
+    
+    return '\n'.join([header, '-' * len(header)] + lines + summary)
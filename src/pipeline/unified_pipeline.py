@@ -6,10 +6,7 @@ Coordinates search, process, and publish phases
 
 import logging
 from typing import List, Dict, Optional
-from ..core.database import DatabaseManager
-from ..collectors.google_places import GooglePlacesCollector
-from ..processors.ai_content import AIContentProcessor
-from ..publishers.wordpress import WordPressPublisher
+from ..core.container import component
 
 logger = logging.getLogger(__name__)
 
@@ -17,13 +14,14 @@ logger = logging.getLogger(__name__)
 class UnifiedPipeline:
     """Coordinates the complete provider collection pipeline"""
     
+    # Built on first use and shared through the process-wide container
+    db = component('db')
+    collector = component('collector')
+    ai_processor = component('processor')
+    publisher = component('publisher')
+    
     def __init__(self):
         """Initialize pipeline components"""
-        self.db = DatabaseManager()
-        self.collector = GooglePlacesCollector()
-        self.ai_processor = AIContentProcessor()
-        self.publisher = WordPressPublisher()
-        
         logger.info("✅ Unified Pipeline initialized")
     
     def run_search_phase(self, queries: List[str], limit_per_query: int = 10) -> List[Dict]:
@@ -13,6 +13,15 @@ from collections import namedtuple
 
 from anthropic import Anthropic
 from ..core.database import DatabaseManager, Provider
+from ..monitoring.metrics import CLAUDE_REQUEST_SECONDS, CLAUDE_REQUESTS, timed
+from ..monitoring.tracing import span
+from .anthropic_usage import (
+    AnthropicUsageTracker,
+    cached_system_prompt,
+    has_cache_breakpoint,
+    PROMPT_CACHING_BETA
+)
+from ..utils.review_features import get_review_features, parse_review_content
 from ..utils.romaji_converter import (
     contains_japanese, 
     convert_to_romaji, 
@@ -21,6 +30,63 @@ from ..utils.romaji_converter import (
 
 logger = logging.getLogger(__name__)
 
+# Static instructions shared by every mega-batch call. Kept byte-identical
+# between calls so Anthropic can serve it from the prompt cache.
+MEGA_BATCH_SYSTEM_PROMPT = """You generate content for a directory of English-speaking healthcare providers in Japan. Each request lists one or more providers; every provider needs exactly 6 pieces of content with precise formatting.
+
+CRITICAL: Generate one complete set of content per listed provider. For each provider, create ALL SIX content types in this EXACT format:
+
+PROVIDER [NUMBER]:
+
+DESCRIPTION:
+[150-175 word description in exactly 2 paragraphs separated by a blank line. First paragraph: medical services and English support. Second paragraph: patient experience and practical details]
+
+EXCERPT:
+[50-75 word concise summary highlighting key strengths and location]
+
+REVIEW_SUMMARY:
+[80-100 word narrative paragraph summarizing patient experiences, focusing on what patients consistently praise]
+
+ENGLISH_SUMMARY:
+[80-100 word paragraph specifically about English language support and communication experience for international patients]
+
+SEO_TITLE:
+[50-60 character SEO title including provider name, specialty, and location for search optimization]
+
+SEO_META_DESCRIPTION:
+[150-160 character meta description with call to action, focusing on location + specialty for local SEO]
+
+IMPORTANT NAME USAGE:
+- ALWAYS use the English/romaji provider name provided (NOT the original Japanese name)
+- The English name has already been converted from Japanese where necessary
+- Use this consistent English name in ALL content fields
+- Do NOT include Japanese characters in any content
+
+FORMATTING REQUIREMENTS:
+1. DESCRIPTION: Exactly 2 paragraphs, 150-175 words total
+2. EXCERPT: Single paragraph, 50-75 words
+3. REVIEW_SUMMARY: Single narrative paragraph, 80-100 words
+4. ENGLISH_SUMMARY: Single paragraph about language support, 80-100 words
+5. SEO_TITLE: 50-60 characters, includes name + specialty + location
+6. SEO_META_DESCRIPTION: 150-160 characters, compelling with call to action
+
+Content Guidelines:
+- Professional, informative tone throughout
+- Use specific patient feedback when available
+- Mention English proficiency levels accurately
+- Include location context (district, city, prefecture)
+- Focus on patient experience and medical quality
+- Avoid phone numbers or website URLs
+- Make each content type distinct but complementary
+- SEO content should target local search terms
+
+CRITICAL UNIQUENESS REQUIREMENT:
+- EVERY piece of content MUST be UNIQUE to each specific provider
+- NEVER reuse the same phrases or sentences between different providers
+- Each provider must have COMPLETELY DIFFERENT content from all others
+- Specifically mention the provider's NAME and LOCATION in the content
+- DO NOT use generic templates - create fresh, original content for EACH provider"""
+
 # Content result structure
 ContentResult = namedtuple('ContentResult', [
     'description',
@@ -49,9 +115,7 @@ class AIContentProcessor:
         self.claude = Anthropic(api_key=self.api_key)
         self.model = model
         self.db = DatabaseManager()
-        
-        # Cache for romaji conversions to avoid redundant processing
-        self._romaji_cache = {}
+        self.usage_tracker = AnthropicUsageTracker()
         
         logger.info(f"✅ AI Content Processor initialized with {model}")
     
@@ -66,23 +130,15 @@ class AIContentProcessor:
         """
         original_name = provider.provider_name
         
-        # Check cache first
-        if original_name in self._romaji_cache:
-            return self._romaji_cache[original_name]
-        
         # Check if name contains Japanese
         if contains_japanese(original_name):
-            # Convert to romaji
+            # Convert to romaji (repeats are served by the shared converter cache)
             romaji_name = convert_to_romaji(original_name)
             
-            # Cache and return the romaji version
-            self._romaji_cache[original_name] = romaji_name
-            
             logger.debug(f"🔤 Converted '{original_name}' to '{romaji_name}'")
             return romaji_name
         else:
-            # Already in English, cache and return as-is
-            self._romaji_cache[original_name] = original_name
+            # Already in English, return as-is
             return original_name
     
     def process_providers(self, providers: List[Provider], 
@@ -112,53 +168,56 @@ class AIContentProcessor:
             batch_num = i // batch_size + 1
             total_batches = (len(providers) + batch_size - 1) // batch_size
             
-            logger.info(f"📦 Processing batch {batch_num}/{total_batches} ({len(batch)} providers)")
-            
-            success = False
-            
-            for attempt in range(max_retries + 1):
-                try:
-                    # Generate content for batch
-                    content_results = self._generate_mega_batch_content(batch)
-                    summary['api_calls'] += 1
-                    
-                    if content_results:
-                        # Process image selection
-                        content_results = self._process_image_selection(batch, content_results)
-                        
-                        # Update database
-                        updated = self._update_providers_with_content(batch, content_results)
-                        summary['successful'] += updated
-                        
-                        success = True
-                        break
-                    
-                except Exception as e:
-                    if attempt < max_retries:
-                        logger.warning(f"🔄 Retry {attempt + 1}/{max_retries} for batch {batch_num}")
-                    else:
-                        logger.error(f"❌ Batch {batch_num} failed: {str(e)}")
-                        summary['failed'] += len(batch)
-                        summary['errors'].append(f"Batch {batch_num}: {str(e)}")
-            
-            if not success and len(batch) > 1:
-                # Try individual processing as fallback
-                logger.info(f"🔧 Falling back to individual processing for batch {batch_num}")
-                for provider in batch:
+            with span('ai.batch', batch=batch_num, providers=len(batch)) as batch_span:
+                logger.info(f"📦 Processing batch {batch_num}/{total_batches} ({len(batch)} providers)")
+                
+                success = False
+                
+                for attempt in range(max_retries + 1):
                     try:
-                        results = self._generate_mega_batch_content([provider])
+                        # Generate content for batch
+                        content_results = self._generate_mega_batch_content(batch)
                         summary['api_calls'] += 1
                         
-                        if results:
-                            results = self._process_image_selection([provider], results)
-                            updated = self._update_providers_with_content([provider], results)
+                        if content_results:
+                            # Process image selection
+                            content_results = self._process_image_selection(batch, content_results)
+                            
+                            # Update database
+                            updated = self._update_providers_with_content(batch, content_results)
                             summary['successful'] += updated
-                        else:
-                            summary['failed'] += 1
                             
+                            success = True
+                            break
+                        
                     except Exception as e:
-                        logger.error(f"❌ Individual processing failed for {provider.provider_name}: {e}")
-                        summary['failed'] += 1
+                        if attempt < max_retries:
+                            logger.warning(f"🔄 Retry {attempt + 1}/{max_retries} for batch {batch_num}")
+                        else:
+                            logger.error(f"❌ Batch {batch_num} failed: {str(e)}")
+                            summary['failed'] += len(batch)
+                            summary['errors'].append(f"Batch {batch_num}: {str(e)}")
+                
+                if not success and len(batch) > 1:
+                    # Try individual processing as fallback
+                    logger.info(f"🔧 Falling back to individual processing for batch {batch_num}")
+                    for provider in batch:
+                        try:
+                            results = self._generate_mega_batch_content([provider])
+                            summary['api_calls'] += 1
+                            
+                            if results:
+                                results = self._process_image_selection([provider], results)
+                                updated = self._update_providers_with_content([provider], results)
+                                summary['successful'] += updated
+                            else:
+                                summary['failed'] += 1
+                                
+                        except Exception as e:
+                            logger.error(f"❌ Individual processing failed for {provider.provider_name}: {e}")
+                            summary['failed'] += 1
+                
+                batch_span.set(succeeded=success)
         
         logger.info(f"✅ Content generation complete: {summary['successful']}/{summary['total_providers']} successful")
         return summary
@@ -197,7 +256,8 @@ class AIContentProcessor:
             location = ', '.join(filter(None, location_parts))
             
             # Process reviews
-            review_insights = self._analyze_reviews(provider.review_content)
+            review_insights = self._analyze_reviews(provider.review_content,
+                                                    getattr(provider, 'review_keywords', None))
             
             # Format provider details
             name_info = name
@@ -225,13 +285,20 @@ Patient Reviews Sample:
         prompt = self._create_mega_prompt(provider_details)
         
         try:
-            # Make API call
-            response = self.claude.messages.create(
-                model=self.model,
-                max_tokens=min(8000, 3000 * len(providers)),
-                temperature=0.6,
-                messages=[{"role": "user", "content": prompt}]
-            )
+            # Make API call - static instructions go in the cached system prefix
+            system = cached_system_prompt(MEGA_BATCH_SYSTEM_PROMPT, model=self.model)
+            with timed(CLAUDE_REQUEST_SECONDS, CLAUDE_REQUESTS, caller='mega_batch'), \
+                    span('claude.messages', caller='mega_batch', providers=len(providers)):
+                response = self.claude.messages.create(
+                    model=self.model,
+                    max_tokens=min(8000, 3000 * len(providers)),
+                    temperature=0.6,
+                    system=system,
+                    messages=[{"role": "user", "content": prompt}],
+                    extra_headers={"anthropic-beta": PROMPT_CACHING_BETA}
+                )
+            self.usage_tracker.track_response(response, model=self.model,
+                                             cached=has_cache_breakpoint(system))
             
             # Parse response
             response_text = response.content[0].text if response.content else ""
@@ -249,68 +316,24 @@ Patient Reviews Sample:
             return self._create_fallback_content(providers)
     
     def _create_mega_prompt(self, provider_details: List[str]) -> str:
-        """Create the mega-batch prompt for multiple providers"""
-        return f"""Generate ALL SIX content types for these {len(provider_details)} healthcare providers. Each provider needs exactly 6 pieces of content with precise formatting.
+        """Create the variable part of the mega-batch prompt
+        
+        The static formatting rules live in MEGA_BATCH_SYSTEM_PROMPT so they
+        are served from the prompt cache; only provider details change per call.
+        """
+        return f"""Generate ALL SIX content types for these {len(provider_details)} healthcare providers.
 
 {chr(10).join(provider_details)}
 
-CRITICAL: Generate exactly {len(provider_details)} complete sets of content. For each provider, create ALL SIX content types in this EXACT format:
-
-PROVIDER [NUMBER]:
-
-DESCRIPTION:
-[150-175 word description in exactly 2 paragraphs separated by a blank line. First paragraph: medical services and English support. Second paragraph: patient experience and practical details]
-
-EXCERPT:
-[50-75 word concise summary highlighting key strengths and location]
-
-REVIEW_SUMMARY:
-[80-100 word narrative paragraph summarizing patient experiences, focusing on what patients consistently praise]
-
-ENGLISH_SUMMARY:
-[80-100 word paragraph specifically about English language support and communication experience for international patients]
-
-SEO_TITLE:
-[50-60 character SEO title including provider name, specialty, and location for search optimization]
-
-SEO_META_DESCRIPTION:
-[150-160 character meta description with call to action, focusing on location + specialty for local SEO]
-
-IMPORTANT NAME USAGE:
-- ALWAYS use the English/romaji provider name provided (NOT the original Japanese name)
-- The English name has already been converted from Japanese where necessary
-- Use this consistent English name in ALL content fields
-- Do NOT include Japanese characters in any content
-
-FORMATTING REQUIREMENTS:
-1. DESCRIPTION: Exactly 2 paragraphs, 150-175 words total
-2. EXCERPT: Single paragraph, 50-75 words
-3. REVIEW_SUMMARY: Single narrative paragraph, 80-100 words
-4. ENGLISH_SUMMARY: Single paragraph about language support, 80-100 words
-5. SEO_TITLE: 50-60 characters, includes name + specialty + location
-6. SEO_META_DESCRIPTION: 150-160 characters, compelling with call to action
-
-Content Guidelines:
-- Professional, informative tone throughout
-- Use specific patient feedback when available
-- Mention English proficiency levels accurately
-- Include location context (district, city, prefecture)
-- Focus on patient experience and medical quality
-- Avoid phone numbers or website URLs
-- Make each content type distinct but complementary
-- SEO content should target local search terms
-
-CRITICAL UNIQUENESS REQUIREMENT:
-- EVERY piece of content MUST be UNIQUE to each specific provider
-- NEVER reuse the same phrases or sentences between different providers
-- Each provider must have COMPLETELY DIFFERENT content from all others
-- Specifically mention the provider's NAME and LOCATION in the content
-- DO NOT use generic templates - create fresh, original content for EACH provider
-
-Generate content for all {len(provider_details)} providers with ALL SIX content types."""
+Generate exactly {len(provider_details)} complete sets of content, numbered PROVIDER 1 to PROVIDER {len(provider_details)}, with ALL SIX content types for each."""
     
-    def _analyze_reviews(self, review_content: Any) -> Dict[str, Any]:
-        """Analyze review content for insights"""
+    def _analyze_reviews(self, review_content: Any, review_features: Any = None) -> Dict[str, Any]:
+        """Analyze review content for insights
+        
+        Args:
+            review_content: Stored review content
+            review_features: Precomputed Provider.review_keywords, if available
+        """
         result = {
             'reviews': [],
             'positive_themes': [],
@@ -318,50 +341,16 @@ Generate content for all {len(provider_details)} providers with ALL SIX content
             'avg_rating': 0
         }
         
-        if not review_content:
-            return result
-        
-        # Handle different review content formats
-        reviews = []
-        if isinstance(review_content, str):
-            try:
-                reviews = eval(review_content) if review_content else []
-            except:
-                return result
-        elif isinstance(review_content, list):
-            reviews = review_content
-        
+        reviews = parse_review_content(review_content)
         if not reviews:
             return result
         
-        # Process reviews
-        total_rating = 0
-        english_keywords = ['english', 'English', '英語', 'foreign', 'international']
-        positive_words = ['excellent', 'great', 'good', 'professional', 'friendly', 
-                         'helpful', 'clean', 'modern', 'efficient', 'thorough']
+        features = get_review_features(reviews, review_features)
         
-        themes = set()
-        
-        for review in reviews[:10]:  # Limit to prevent token overflow
-            if isinstance(review, dict):
-                text = review.get('text', '')
-                rating = review.get('rating', 0)
-                
-                result['reviews'].append(review)
-                total_rating += rating
-                
-                # Check for English mentions
-                if any(keyword in text for keyword in english_keywords):
-                    result['english_mentions'].append(text[:200])
-                
-                # Extract positive themes
-                text_lower = text.lower()
-                for word in positive_words:
-                    if word in text_lower:
-                        themes.add(word.capitalize())
-        
-        result['positive_themes'] = list(themes)[:5]
-        result['avg_rating'] = total_rating / len(reviews) if reviews else 0
+        result['reviews'] = [r for r in reviews[:10] if isinstance(r, dict)]  # Limit to prevent token overflow
+        result['english_mentions'] = features['english_mentions']
+        result['positive_themes'] = features['positive_themes'][:5]
+        result['avg_rating'] = features['avg_rating']
         
         return result
     
@@ -2,16 +2,73 @@
 """
 Anthropic Usage Tracking
 Gets actual usage data from Anthropic API
+Stores raw entries and a per-day aggregate in SQLite
 """
 
 import os
+import json
+import sqlite3
 import logging
 import requests
 from datetime import datetime, timedelta
-from typing import Dict, Optional
+from typing import Dict, List, Optional
+
+from ..monitoring.metrics import CLAUDE_TOKENS
 
 logger = logging.getLogger(__name__)
 
+# Beta header that enables prompt caching on the Messages API
+PROMPT_CACHING_BETA = "prompt-caching-2024-07-31"
+
+# Cache writes cost 25% more than fresh input, cache reads 90% less
+CACHE_WRITE_MULTIPLIER = 1.25
+CACHE_READ_MULTIPLIER = 0.10
+
+
+# Shortest prefix Anthropic will cache; a cache_control marker on anything
+# shorter is silently ignored and the prompt is billed as fresh input
+MIN_CACHEABLE_TOKENS = 1024
+MIN_CACHEABLE_TOKENS_HAIKU = 2048
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count of English text (about four characters per token)"""
+    return len(text) // 4
+
+
+def min_cacheable_tokens(model: Optional[str]) -> int:
+    """Minimum cacheable prompt length for a model"""
+    if model and "haiku" in model:
+        return MIN_CACHEABLE_TOKENS_HAIKU
+    return MIN_CACHEABLE_TOKENS
+
+
+def cached_system_prompt(prompt: str, model: Optional[str] = None) -> List[Dict]:
+    """Wrap a static system prompt so Anthropic caches it between calls
+    
+    Prompts shorter than the model's minimum cacheable size are sent without
+    a breakpoint, since Anthropic would not cache them anyway.
+    
+    Args:
+        prompt: Instruction block that is identical across requests
+        model: Model the prompt is sent to, for the minimum size check
+        
+    Returns:
+        One system content block, with an ephemeral cache breakpoint when
+        the prompt is long enough to be cached
+    """
+    block = {"type": "text", "text": prompt}
+    if estimate_tokens(prompt) >= min_cacheable_tokens(model):
+        block["cache_control"] = {"type": "ephemeral"}
+    else:
+        logger.debug(f"System prompt is below the minimum cacheable size for {model}; sending it uncached")
+    return [block]
+
+
+def has_cache_breakpoint(system: List[Dict]) -> bool:
+    """True if any system block asks Anthropic to cache the prefix"""
+    return any("cache_control" in block for block in system)
+
 
 class AnthropicUsageTracker:
     """Track actual Anthropic API usage and costs"""
@@ -36,68 +93,319 @@ class AnthropicUsageTracker:
         }
     }
     
-    def __init__(self):
-        """Initialize with Anthropic API key"""
+    def __init__(self, log_dir: str = "logs"):
+        """Initialize with Anthropic API key
+        
+        Args:
+            log_dir: Directory holding the usage database
+        """
+        # Note: Anthropic doesn't currently have a billing API endpoint
+        # We track usage locally and calculate costs. Each call is one row in
+        # SQLite, written in the same transaction as its per-day aggregate so
+        # logging and lookups stay constant-time as history grows.
+        self.db_path = os.path.join(log_dir, "anthropic_usage.db")
+        self.legacy_log_file = os.path.join(log_dir, "anthropic_usage.json")
+        self.legacy_log_dir = os.path.join(log_dir, "anthropic_usage")
+        
+        os.makedirs(log_dir, exist_ok=True)
+        self._init_db()
+        self._migrate_legacy_logs()
+        
         self.api_key = os.getenv('ANTHROPIC_API_KEY')
         if not self.api_key:
             logger.warning("ANTHROPIC_API_KEY not set")
+    
+    def _connect(self) -> sqlite3.Connection:
+        """Open the usage database, waiting on concurrent writers"""
+        return sqlite3.connect(self.db_path, timeout=30)
+    
+    def _init_db(self):
+        """Initialize SQLite usage schema"""
+        with self._connect() as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS usage_entries (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    timestamp TEXT NOT NULL,
+                    model TEXT NOT NULL,
+                    input_tokens INTEGER NOT NULL DEFAULT 0,
+                    output_tokens INTEGER NOT NULL DEFAULT 0,
+                    cache_creation_tokens INTEGER NOT NULL DEFAULT 0,
+                    cache_read_tokens INTEGER NOT NULL DEFAULT 0,
+                    cost REAL NOT NULL DEFAULT 0
+                )
+            ''')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS daily_usage (
+                    date TEXT NOT NULL,
+                    model TEXT NOT NULL,
+                    requests INTEGER NOT NULL DEFAULT 0,
+                    input_tokens INTEGER NOT NULL DEFAULT 0,
+                    output_tokens INTEGER NOT NULL DEFAULT 0,
+                    cache_creation_tokens INTEGER NOT NULL DEFAULT 0,
+                    cache_read_tokens INTEGER NOT NULL DEFAULT 0,
+                    cost REAL NOT NULL DEFAULT 0,
+                    PRIMARY KEY (date, model)
+                )
+            ''')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS meta (
+                    key TEXT PRIMARY KEY,
+                    value TEXT
+                )
+            ''')
+            conn.commit()
+    
+    def _read_legacy_entries(self) -> List[Dict]:
+        """Entries from the old JSON array log and the per-day JSONL logs"""
+        entries = []
+        if os.path.exists(self.legacy_log_file):
+            with open(self.legacy_log_file, 'r') as f:
+                entries.extend(json.load(f))
+        
+        if os.path.isdir(self.legacy_log_dir):
+            for name in sorted(os.listdir(self.legacy_log_dir)):
+                if not name.endswith(".jsonl"):
+                    continue
+                with open(os.path.join(self.legacy_log_dir, name), 'r') as f:
+                    entries.extend(json.loads(line) for line in f if line.strip())
+        
+        return entries
+    
+    def _migrate_legacy_logs(self):
+        """Import the file-based logs into SQLite exactly once
+        
+        The meta row is checked and written inside one BEGIN IMMEDIATE
+        transaction, so concurrent trackers cannot import the files twice.
+        The aggregate is rebuilt from the imported rows rather than added to.
+        """
+        conn = self._connect()
+        conn.isolation_level = None
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            if conn.execute("SELECT 1 FROM meta WHERE key = 'legacy_logs_migrated'").fetchone():
+                conn.execute("ROLLBACK")
+                return
+            
+            entries = self._read_legacy_entries()
+            for entry in entries:
+                self._insert_entry(conn, entry)
+            conn.execute("DELETE FROM daily_usage")
+            conn.execute('''
+                INSERT INTO daily_usage
+                    (date, model, requests, input_tokens, output_tokens,
+                     cache_creation_tokens, cache_read_tokens, cost)
+                SELECT substr(timestamp, 1, 10), model, COUNT(*), SUM(input_tokens),
+                       SUM(output_tokens), SUM(cache_creation_tokens),
+                       SUM(cache_read_tokens), SUM(cost)
+                FROM usage_entries
+                GROUP BY substr(timestamp, 1, 10), model
+            ''')
+            conn.execute(
+                "INSERT INTO meta (key, value) VALUES ('legacy_logs_migrated', ?)",
+                (datetime.now().isoformat(),)
+            )
+            conn.execute("COMMIT")
+            
+            if entries:
+                logger.info(f"✅ Migrated {len(entries)} usage entries into {self.db_path}")
+        
+        except Exception as e:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            logger.error(f"Error migrating legacy usage logs: {e}")
             return
         
-        # Note: Anthropic doesn't currently have a billing API endpoint
-        # We track usage locally and calculate costs
-        self.usage_log_file = "logs/anthropic_usage.json"
+        finally:
+            conn.close()
         
-    def track_usage(self, model: str, input_tokens: int, output_tokens: int):
+        if os.path.exists(self.legacy_log_file):
+            os.replace(self.legacy_log_file, self.legacy_log_file + ".migrated")
+    
+    @staticmethod
+    def _insert_entry(conn: sqlite3.Connection, entry: Dict):
+        """Store one raw usage entry"""
+        conn.execute('''
+            INSERT INTO usage_entries
+                (timestamp, model, input_tokens, output_tokens,
+                 cache_creation_tokens, cache_read_tokens, cost)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', (
+            entry["timestamp"],
+            entry["model"],
+            entry.get("input_tokens", 0),
+            entry.get("output_tokens", 0),
+            entry.get("cache_creation_input_tokens", 0),
+            entry.get("cache_read_input_tokens", 0),
+            entry.get("total_cost", 0)
+        ))
+    
+    @staticmethod
+    def _add_to_aggregate(conn: sqlite3.Connection, entry: Dict):
+        """Add one entry to its (date, model) aggregate row"""
+        conn.execute('''
+            INSERT INTO daily_usage
+                (date, model, requests, input_tokens, output_tokens,
+                 cache_creation_tokens, cache_read_tokens, cost)
+            VALUES (?, ?, 1, ?, ?, ?, ?, ?)
+            ON CONFLICT (date, model) DO UPDATE SET
+                requests = requests + 1,
+                input_tokens = input_tokens + excluded.input_tokens,
+                output_tokens = output_tokens + excluded.output_tokens,
+                cache_creation_tokens = cache_creation_tokens + excluded.cache_creation_tokens,
+                cache_read_tokens = cache_read_tokens + excluded.cache_read_tokens,
+                cost = cost + excluded.cost
+        ''', (
+            entry["timestamp"][:10],
+            entry["model"],
+            entry.get("input_tokens", 0),
+            entry.get("output_tokens", 0),
+            entry.get("cache_creation_input_tokens", 0),
+            entry.get("cache_read_input_tokens", 0),
+            entry.get("total_cost", 0)
+        ))
+    
+    def track_usage(self, model: str, input_tokens: int, output_tokens: int,
+                    cache_creation_input_tokens: int = 0,
+                    cache_read_input_tokens: int = 0):
         """Track usage after each API call
         
         Args:
             model: Model name used
-            input_tokens: Number of input tokens
+            input_tokens: Number of fresh (uncached) input tokens
             output_tokens: Number of output tokens
+            cache_creation_input_tokens: Input tokens written to the prompt cache
+            cache_read_input_tokens: Input tokens served from the prompt cache
         """
         
         # Calculate cost
         pricing = self.PRICING.get(model, self.PRICING["claude-3-haiku-20240307"])
         input_cost = (input_tokens / 1_000_000) * pricing["input"]
+        cache_write_cost = (cache_creation_input_tokens / 1_000_000) * pricing["input"] * CACHE_WRITE_MULTIPLIER
+        cache_read_cost = (cache_read_input_tokens / 1_000_000) * pricing["input"] * CACHE_READ_MULTIPLIER
         output_cost = (output_tokens / 1_000_000) * pricing["output"]
-        total_cost = input_cost + output_cost
+        total_cost = input_cost + cache_write_cost + cache_read_cost + output_cost
         
-        # Log to file
         usage_entry = {
             "timestamp": datetime.now().isoformat(),
             "model": model,
             "input_tokens": input_tokens,
             "output_tokens": output_tokens,
+            "cache_creation_input_tokens": cache_creation_input_tokens,
+            "cache_read_input_tokens": cache_read_input_tokens,
             "input_cost": round(input_cost, 4),
+            "cache_write_cost": round(cache_write_cost, 4),
+            "cache_read_cost": round(cache_read_cost, 4),
             "output_cost": round(output_cost, 4),
             "total_cost": round(total_cost, 4)
         }
         
-        # Append to log file
-        import json
+        # Store the entry and bump the per-day aggregate in one transaction
         try:
-            if os.path.exists(self.usage_log_file):
-                with open(self.usage_log_file, 'r') as f:
-                    logs = json.load(f)
-            else:
-                logs = []
-            
-            logs.append(usage_entry)
-            
-            with open(self.usage_log_file, 'w') as f:
-                json.dump(logs, f, indent=2)
-                
+            with self._connect() as conn:
+                self._insert_entry(conn, usage_entry)
+                self._add_to_aggregate(conn, usage_entry)
+                conn.commit()
+        
         except Exception as e:
             logger.error(f"Error logging usage: {e}")
         
         return total_cost
     
+    def track_response(self, response, model: Optional[str] = None,
+                       cached: bool = False) -> float:
+        """Track usage straight from a messages.create() response
+        
+        Args:
+            response: Response from anthropic.messages.create()
+            model: Model name override (defaults to response.model)
+            cached: The request carried a cache_control breakpoint
+        
+        Returns:
+            Cost of the call in USD
+        """
+        usage = AnthropicAPIUsage.extract_usage_from_response(response)
+        model = model or usage.get("model", "unknown")
+        for kind in ("input_tokens", "output_tokens", "cache_creation_input_tokens", "cache_read_input_tokens"):
+            if usage.get(kind):
+                CLAUDE_TOKENS.inc(usage[kind], model=model, kind=kind)
+        
+        if cached:
+            if usage.get("cache_read_input_tokens"):
+                logger.debug(f"Prompt cache hit: {usage['cache_read_input_tokens']} input tokens read from cache")
+            elif not usage.get("cache_creation_input_tokens"):
+                logger.warning(f"Prompt cache unused for {model}: no tokens written to or read from the cache")
+        
+        return self.track_usage(
+            model=model,
+            input_tokens=usage["input_tokens"],
+            output_tokens=usage["output_tokens"],
+            cache_creation_input_tokens=usage.get("cache_creation_input_tokens", 0),
+            cache_read_input_tokens=usage.get("cache_read_input_tokens", 0)
+        )
+    
+    @staticmethod
+    def _empty_stats(**extra) -> Dict:
+        """Zeroed usage statistics for a day or a model"""
+        return {
+            **extra,
+            "requests": 0,
+            "cost": 0,
+            "input_tokens": 0,
+            "output_tokens": 0,
+            "cache_creation_tokens": 0,
+            "cache_read_tokens": 0
+        }
+    
+    @staticmethod
+    def _add_row(stats: Dict, row: sqlite3.Row):
+        """Add one aggregate row's counters to a statistics dict"""
+        for key in ("requests", "cost", "input_tokens", "output_tokens",
+                    "cache_creation_tokens", "cache_read_tokens"):
+            stats[key] += row[key]
+    
+    def _query_aggregates(self, start_date: str, end_date: str) -> List[sqlite3.Row]:
+        """Fetch aggregate rows for an inclusive date range"""
+        with self._connect() as conn:
+            conn.row_factory = sqlite3.Row
+            return conn.execute('''
+                SELECT * FROM daily_usage
+                WHERE date BETWEEN ? AND ?
+                ORDER BY date, model
+            ''', (start_date, end_date)).fetchall()
+    
+    def _build_daily_stats(self, date_str: str, rows: List[sqlite3.Row]) -> Dict:
+        """Build the daily statistics structure from that day's aggregate rows"""
+        daily_stats = {
+            "date": date_str,
+            "total_cost": 0,
+            "total_input_tokens": 0,
+            "total_output_tokens": 0,
+            "total_cache_creation_tokens": 0,
+            "total_cache_read_tokens": 0,
+            "requests": 0,
+            "by_model": {}
+        }
+        
+        for row in rows:
+            daily_stats["total_cost"] += row["cost"]
+            daily_stats["total_input_tokens"] += row["input_tokens"]
+            daily_stats["total_output_tokens"] += row["output_tokens"]
+            daily_stats["total_cache_creation_tokens"] += row["cache_creation_tokens"]
+            daily_stats["total_cache_read_tokens"] += row["cache_read_tokens"]
+            daily_stats["requests"] += row["requests"]
+            
+            model_stats = self._empty_stats()
+            self._add_row(model_stats, row)
+            daily_stats["by_model"][row["model"]] = model_stats
+        
+        return daily_stats
+    
     def get_daily_usage(self, date: Optional[datetime] = None) -> Dict:
         """Get usage for a specific day
         
         Args:
             date: Date to get usage for (default: today)
-            
+        
         Returns:
             Dict with usage statistics
         """
@@ -107,46 +415,8 @@ class AnthropicUsageTracker:
         date_str = date.strftime('%Y-%m-%d')
         
         try:
-            import json
-            if not os.path.exists(self.usage_log_file):
-                return {"date": date_str, "total_cost": 0, "requests": 0}
-            
-            with open(self.usage_log_file, 'r') as f:
-                logs = json.load(f)
-            
-            daily_stats = {
-                "date": date_str,
-                "total_cost": 0,
-                "total_input_tokens": 0,
-                "total_output_tokens": 0,
-                "requests": 0,
-                "by_model": {}
-            }
-            
-            for entry in logs:
-                entry_date = datetime.fromisoformat(entry["timestamp"]).strftime('%Y-%m-%d')
-                if entry_date == date_str:
-                    daily_stats["total_cost"] += entry["total_cost"]
-                    daily_stats["total_input_tokens"] += entry["input_tokens"]
-                    daily_stats["total_output_tokens"] += entry["output_tokens"]
-                    daily_stats["requests"] += 1
-                    
-                    model = entry["model"]
-                    if model not in daily_stats["by_model"]:
-                        daily_stats["by_model"][model] = {
-                            "requests": 0,
-                            "cost": 0,
-                            "input_tokens": 0,
-                            "output_tokens": 0
-                        }
-                    
-                    daily_stats["by_model"][model]["requests"] += 1
-                    daily_stats["by_model"][model]["cost"] += entry["total_cost"]
-                    daily_stats["by_model"][model]["input_tokens"] += entry["input_tokens"]
-                    daily_stats["by_model"][model]["output_tokens"] += entry["output_tokens"]
-            
-            return daily_stats
-            
+            return self._build_daily_stats(date_str, self._query_aggregates(date_str, date_str))
+        
         except Exception as e:
             logger.error(f"Error getting daily usage: {e}")
             return {"error": str(e)}
@@ -161,17 +431,34 @@ class AnthropicUsageTracker:
             "month": today.strftime('%Y-%m'),
             "total_cost": 0,
             "total_requests": 0,
+            "total_input_tokens": 0,
+            "total_cache_read_tokens": 0,
             "by_model": {},
             "daily_breakdown": []
         }
         
+        try:
+            rows = self._query_aggregates(first_of_month.strftime('%Y-%m-%d'),
+                                          today.strftime('%Y-%m-%d'))
+        except Exception as e:
+            logger.error(f"Error getting monthly usage: {e}")
+            return monthly_stats
+        
+        rows_by_date = {}
+        for row in rows:
+            rows_by_date.setdefault(row["date"], []).append(row)
+            model_stats = monthly_stats["by_model"].setdefault(row["model"], self._empty_stats())
+            self._add_row(model_stats, row)
+        
         current = first_of_month
         while current <= today:
-            daily = self.get_daily_usage(current)
-            if "total_cost" in daily:
-                monthly_stats["total_cost"] += daily["total_cost"]
-                monthly_stats["total_requests"] += daily.get("requests", 0)
-                monthly_stats["daily_breakdown"].append(daily)
+            date_str = current.strftime('%Y-%m-%d')
+            daily = self._build_daily_stats(date_str, rows_by_date.get(date_str, []))
+            monthly_stats["total_cost"] += daily["total_cost"]
+            monthly_stats["total_requests"] += daily["requests"]
+            monthly_stats["total_input_tokens"] += daily["total_input_tokens"]
+            monthly_stats["total_cache_read_tokens"] += daily["total_cache_read_tokens"]
+            monthly_stats["daily_breakdown"].append(daily)
             current += timedelta(days=1)
         
         return monthly_stats
@@ -194,16 +481,21 @@ class AnthropicAPIUsage:
             Dict with token counts
         """
         try:
-            # Anthropic returns usage in the response
+            # Anthropic returns usage in the response; cache fields are only
+            # present when prompt caching is in play
+            usage_data = getattr(response, 'usage', None)
             usage = {
-                "input_tokens": response.usage.input_tokens if hasattr(response, 'usage') else 0,
-                "output_tokens": response.usage.output_tokens if hasattr(response, 'usage') else 0,
+                "input_tokens": getattr(usage_data, 'input_tokens', 0) or 0,
+                "output_tokens": getattr(usage_data, 'output_tokens', 0) or 0,
+                "cache_creation_input_tokens": getattr(usage_data, 'cache_creation_input_tokens', 0) or 0,
+                "cache_read_input_tokens": getattr(usage_data, 'cache_read_input_tokens', 0) or 0,
                 "model": response.model if hasattr(response, 'model') else "unknown"
             }
             return usage
         except Exception as e:
             logger.error(f"Error extracting usage: {e}")
-            return {"input_tokens": 0, "output_tokens": 0}
+            return {"input_tokens": 0, "output_tokens": 0,
+                    "cache_creation_input_tokens": 0, "cache_read_input_tokens": 0}
 
 
 def integrate_with_content_generator():
@@ -221,18 +513,22 @@ def integrate_with_content_generator():
     1. In generate_taxonomy_content.py, after each API call:
     
     ```python
-    response = self.client.messages.create(...)
+    system = cached_system_prompt(STATIC_INSTRUCTIONS, model=MODEL)
+    response = self.client.messages.create(
+        system=system,
+        messages=[{"role": "user", "content": variable_part}],
+        extra_headers={"anthropic-beta": PROMPT_CACHING_BETA},
+        ...
+    )
     
     # Track usage
-    from src.processors.anthropic_usage import AnthropicUsageTracker, AnthropicAPIUsage
+    from src.processors.anthropic_usage import (
+        AnthropicUsageTracker, cached_system_prompt, has_cache_breakpoint,
+        PROMPT_CACHING_BETA
+    )
     
-    usage = AnthropicAPIUsage.extract_usage_from_response(response)
     tracker = AnthropicUsageTracker()
-    cost = tracker.track_usage(
-        model="claude-3-7-sonnet-20250219",
-        input_tokens=usage["input_tokens"],
-        output_tokens=usage["output_tokens"]
-    )
+    cost = tracker.track_response(response, cached=has_cache_breakpoint(system))
     
     logger.info(f"API call cost: ${cost:.4f}")
     ```
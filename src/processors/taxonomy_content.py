@@ -0,0 +1,455 @@
+#!/usr/bin/env python3
+"""
+Taxonomy Content Generator
+Generates AI-powered content for location, specialty, and combination taxonomy
+pages using mega-batch prompts and the 70/30 unique/template hybrid approach
+"""
+
+import os
+import json
+import logging
+import threading
+from typing import Any, List, Dict, Tuple, Optional
+from dataclasses import dataclass
+
+from sqlalchemy import text
+import anthropic
+
+from ..core.database import DatabaseManager
+from ..core.cost_tracker import CostTracker
+from ..monitoring.metrics import CLAUDE_REQUEST_SECONDS, CLAUDE_REQUESTS, timed
+from ..monitoring.tracing import span
+from .anthropic_usage import (
+    AnthropicUsageTracker,
+    AnthropicAPIUsage,
+    cached_system_prompt,
+    has_cache_breakpoint,
+    PROMPT_CACHING_BETA
+)
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class TaxonomyContent:
+    """Represents content for a taxonomy page"""
+    taxonomy_type: str  # 'location', 'specialty', or 'combination'
+    title: str
+    meta_description: str
+    brief_intro: str
+    full_description: str
+    location: str
+    specialty: Optional[str] = None
+    ward: Optional[str] = None
+    provider_count: int = 0
+    priority_tier: int = 0
+
+
+def upsert_taxonomy_content(session, content_list: List[TaxonomyContent]) -> int:
+    """Insert or replace taxonomy pages in one statement
+    
+    Rows are keyed by (taxonomy_type, location, specialty, ward), matching the
+    uq_taxonomy_content_page index from
+    utility/migrate/add_taxonomy_content_unique_key.py. A regenerated page
+    keeps its wordpress_post_id.
+    
+    Returns:
+        Number of rows written
+    """
+    if not content_list:
+        return 0
+    
+    session.execute(text("""
+        INSERT INTO taxonomy_content
+        (taxonomy_type, location, specialty, ward, title, meta_description,
+         brief_intro, full_description, provider_count, priority_tier)
+        VALUES
+        (:type, :location, :specialty, :ward, :title, :meta,
+         :brief, :full, :count, :tier)
+        ON CONFLICT (taxonomy_type, COALESCE(location, ''), COALESCE(specialty, ''), COALESCE(ward, ''))
+        DO UPDATE SET
+            title = EXCLUDED.title,
+            meta_description = EXCLUDED.meta_description,
+            brief_intro = EXCLUDED.brief_intro,
+            full_description = EXCLUDED.full_description,
+            provider_count = EXCLUDED.provider_count,
+            priority_tier = EXCLUDED.priority_tier,
+            updated_at = CURRENT_TIMESTAMP
+    """), [{
+        'type': content.taxonomy_type,
+        'location': content.location,
+        'specialty': content.specialty,
+        'ward': content.ward,
+        'title': content.title,
+        'meta': content.meta_description,
+        'brief': content.brief_intro,
+        'full': content.full_description,
+        'count': content.provider_count,
+        'tier': content.priority_tier
+    } for content in content_list])
+    
+    return len(content_list)
+
+
+class TaxonomyContentGenerator:
+    """
+    Generates SEO-optimized content for taxonomy pages using Claude AI.
+    Implements mega-batch processing and 70/30 unique/template hybrid approach.
+    """
+    
+    # Template elements (30% of content) - Updated to be more natural
+    TEMPLATE_SECTIONS = {
+        "insurance": """
+<h2>Insurance and Payment</h2>
+<p>Healthcare providers in this area accept various insurance plans, including Japanese National Health Insurance and many international insurance policies. Having comprehensive health insurance ensures you can access quality care whenever needed, from routine checkups to specialized treatments. Multiple payment options are available for your convenience, including credit cards and digital payments. The clinic staff can help verify your insurance coverage and explain your benefits when you book your appointment.</p>
+        """,
+        
+        "appointment": """
+<h2>Booking Your Appointment</h2>
+<p>Appointments can be made by phone, online, or walk-in depending on the clinic. Many facilities offer same-day appointments for urgent care. English-speaking staff are available to assist with booking and paperwork. Online booking systems are becoming more common, making it easier for international patients to schedule visits.</p>
+        """,
+        
+        "accessibility": """
+<h2>Getting There</h2>
+<p>Most clinics are located within walking distance of major train stations. Building signage often includes English, and reception staff can provide directions by phone. Consider saving the clinic's address in Japanese on your phone for taxi drivers who may not speak English.</p>
+        """
+    }
+    
+    # Static instructions and output format shared by every batch prompt
+    # (served from the prompt cache)
+    SYSTEM_PROMPT = """You generate content for healthcare directory taxonomy pages.
+Write in a natural, informative tone - like a helpful guide for expats in Japan.
+Focus on practical information that residents actually need.
+
+IMPORTANT GUIDELINES:
+- Brief intro: Start with "Find trusted English-speaking [specialty] in [location]..."
+- Mention that all listed providers have verified English language support
+- Use HTML formatting for full descriptions with <h2> headers
+- Include practical details about train access and what to expect
+- Avoid sales language and marketing fluff
+- NEVER use exact numbers like "8+", "12+" etc. Use "multiple", "several", or "various" instead
+- Do NOT mention specific provider counts anywhere
+- NO call-to-action at the end (no "browse providers below")
+- Content should be 70% unique to each location/specialty, 30% can be template
+
+INSURANCE SECTION GUIDELINES:
+- Keep the Insurance and Payment section general and positive
+- Mention that providers accept "various insurance plans including Japanese National Health Insurance and international insurance"
+- Say "multiple payment options are available" and "staff can help verify coverage"
+- DO NOT mention: specific costs, upfront payments, reimbursement processes, additional fees, or any complications
+- Make insurance sound valuable and accessible, not complicated
+
+For EACH page, provide content in this format:
+
+PAGE [number]:
+TITLE: [Simple format: "English [Specialty] in [Location]" - keep it under 60 chars]
+META: [meta description, 155 chars max]
+BRIEF_INTRO:
+[2-3 sentences starting with "Find trusted English-speaking..."]
+
+FULL_DESCRIPTION:
+[HTML formatted content with H2 headers as specified]
+
+---
+
+Make each page unique with specific local details and practical information."""
+    
+    MODEL = "claude-3-7-sonnet-20250219"  # Claude 3.7 Sonnet for best quality
+    
+    def __init__(self):
+        """Initialize the content generator"""
+        self.db = DatabaseManager()
+        self.cost_tracker = CostTracker()
+        
+        # Initialize Claude client
+        api_key = os.getenv('ANTHROPIC_API_KEY')
+        if not api_key:
+            raise ValueError("ANTHROPIC_API_KEY not found in environment")
+        
+        # The SDK backs off and retries on 429/5xx, so callers don't sleep
+        self.client = anthropic.Anthropic(api_key=api_key, max_retries=5)
+        self.usage_tracker = AnthropicUsageTracker()
+        
+        self.generated_count = 0
+        self.total_cost = 0.0
+        self._count_lock = threading.Lock()
+        
+        logger.info("✅ Taxonomy content generator initialized")
+    
+    @staticmethod
+    def _page_prompt(index: int, item: Tuple) -> str:
+        """Prompt block describing one page of a batch"""
+        content_type, location, specialty, ward, count = item
+        full_location = f"{ward}, {location}" if ward else location
+        
+        if content_type == "combination":
+            return f"""
+
+PAGE {index}: {specialty} in {full_location}
+Create content including:
+- Brief intro (2-3 sentences)
+- Full description with these H2 sections:
+  * Finding English-Speaking {specialty} in {full_location}
+  * What to Expect at {specialty} Clinics in Japan
+  * Location and Accessibility (mention actual train lines/stations)
+  * Insurance and Payment
+"""
+        if content_type == "location":
+            return f"""
+
+PAGE {index}: Healthcare in {full_location}
+Create content for a location overview page
+"""
+        return f"""
+
+PAGE {index}: {specialty} Specialists in Japan
+Create content for a specialty overview page
+"""
+    
+    def generate_pages(self, items: List[Tuple]) -> Tuple[List[Optional[TaxonomyContent]], int]:
+        """Generate a batch of pages in one API call, without fallbacks
+        
+        Safe to call from several threads at once.
+        
+        Args:
+            items: List of tuples (type, location, specialty, ward, count)
+            
+        Returns:
+            Tuple of (content per item, None where a page could not be
+            parsed; tokens used by the call)
+        """
+        if not items:
+            return [], 0
+        
+        prompt = "PAGES TO GENERATE:" + "".join(
+            self._page_prompt(i, item) for i, item in enumerate(items, 1)
+        )
+        
+        system = cached_system_prompt(self.SYSTEM_PROMPT, model=self.MODEL)
+        with timed(CLAUDE_REQUEST_SECONDS, CLAUDE_REQUESTS, caller='taxonomy_batch'), \
+                span('claude.messages', caller='taxonomy_batch'):
+            response = self.client.messages.create(
+                model=self.MODEL,
+                max_tokens=min(8000, 1600 * len(items)),
+                temperature=0.7,
+                system=system,
+                messages=[{
+                    "role": "user",
+                    "content": prompt
+                }],
+                extra_headers={"anthropic-beta": PROMPT_CACHING_BETA}
+            )
+        cost = self.usage_tracker.track_response(response, model=self.MODEL,
+                                                  cached=has_cache_breakpoint(system))
+        usage = AnthropicAPIUsage.extract_usage_from_response(response)
+        tokens = (usage["input_tokens"] + usage["output_tokens"]
+                  + usage.get("cache_creation_input_tokens", 0))
+        
+        # Split the response into its numbered pages
+        pages = {}
+        for page in response.content[0].text.split("PAGE ")[1:]:
+            number, _, rest = page.partition(":")
+            if number.strip().isdigit():
+                pages[int(number)] = rest
+        
+        results = []
+        for i, item in enumerate(items, 1):
+            content_type, location, specialty, ward, count = item
+            page_content = pages.get(i, "")
+            
+            brief_intro = self._extract_section(page_content, "BRIEF_INTRO:", "FULL_DESCRIPTION:")
+            full_desc = self._extract_section(page_content, "FULL_DESCRIPTION:", "---")
+            if not brief_intro or not full_desc:
+                results.append(None)
+                continue
+            
+            full_location = f"{ward}, {location}" if ward else location
+            subject = f"English {specialty} in {full_location}" if specialty else f"Healthcare in {full_location}"
+            
+            results.append(TaxonomyContent(
+                taxonomy_type=content_type,
+                title=self._extract_section(page_content, "TITLE:", "META:") or subject,
+                meta_description=self._extract_section(page_content, "META:", "BRIEF_INTRO:") or f"Find {subject}",
+                brief_intro=brief_intro,
+                full_description=full_desc,
+                location=location,
+                specialty=specialty,
+                ward=ward,
+                provider_count=count,
+                priority_tier=(1 if count >= 5 else 2) if content_type == "combination" else 3
+            ))
+        
+        with self._count_lock:
+            self.generated_count += sum(1 for r in results if r)
+            self.total_cost += cost
+        
+        return results, tokens
+    
+    def generate_mega_batch(self, items: List[Tuple], batch_size: int = 5) -> List[TaxonomyContent]:
+        """
+        Generate multiple content pieces in a single API call for efficiency.
+        Pages the batch call could not produce are generated individually.
+        
+        Args:
+            items: List of tuples (type, location, specialty, ward, count)
+            batch_size: Number of items to process in one API call
+            
+        Returns:
+            List of TaxonomyContent objects
+        """
+        items = items[:batch_size]
+        if not items:
+            return []
+        
+        try:
+            logger.info(f"🚀 Generating mega-batch of {len(items)} content pieces...")
+            contents, _ = self.generate_pages(items)
+        except Exception as e:
+            logger.error(f"Error in mega-batch generation: {str(e)}")
+            contents = [None] * len(items)
+        
+        results = [
+            content or self._generate_individual(item)
+            for content, item in zip(contents, items)
+        ]
+        logger.info(f"✅ Generated {len(results)} content pieces (Total: {self.generated_count})")
+        return results
+    
+    def _extract_section(self, text: str, start_marker: str, end_marker: str) -> str:
+        """Extract a section of text between markers"""
+        if start_marker in text:
+            start = text.index(start_marker) + len(start_marker)
+            if end_marker in text[start:]:
+                end = text.index(end_marker, start)
+                return text[start:end].strip()
+            else:
+                return text[start:].strip()
+        return ""
+    
+    def _generate_individual(self, item: Tuple) -> TaxonomyContent:
+        """Generate content for a single item with refined prompt"""
+        content_type, location, specialty, ward, count = item
+        
+        full_location = f"{ward}, {location}" if ward else location
+        
+        if content_type == "combination":
+            prompt = f"""Generate content for a healthcare directory page about {specialty} in {full_location}.
+
+Write in a natural, informative tone. Focus on practical information.
+
+Create:
+1. BRIEF INTRO: Start with "Find trusted English-speaking {specialty} in {full_location}..." (2-3 sentences)
+2. FULL DESCRIPTION with HTML formatting:
+   <h2>Finding English-Speaking {specialty} in {full_location}</h2>
+   <h2>What to Expect at {specialty} Clinics in Japan</h2>
+   <h2>Location and Accessibility</h2>
+   <h2>Insurance and Payment</h2>
+
+Return sections marked as:
+TITLE:
+META:
+BRIEF_INTRO:
+FULL_DESCRIPTION:"""
+        else:
+            prompt = f"Generate content for {content_type} page: {location or specialty}"
+        
+        try:
+            with timed(CLAUDE_REQUEST_SECONDS, CLAUDE_REQUESTS, caller='taxonomy_page'), \
+                    span('claude.messages', caller='taxonomy_page'):
+                response = self.client.messages.create(
+                    model=self.MODEL,
+                    max_tokens=4000,  # Increased for richer individual content
+                    temperature=0.7,
+                    messages=[{"role": "user", "content": prompt}]
+                )
+            self.usage_tracker.track_response(response, model=self.MODEL)
+            
+            content_text = response.content[0].text
+            
+            return TaxonomyContent(
+                taxonomy_type=content_type,
+                title=self._extract_section(content_text, "TITLE:", "META:") or f"Healthcare in {full_location}",
+                meta_description=self._extract_section(content_text, "META:", "BRIEF_INTRO:") or f"Find healthcare in {full_location}",
+                brief_intro=self._extract_section(content_text, "BRIEF_INTRO:", "FULL_DESCRIPTION:"),
+                full_description=self._extract_section(content_text, "FULL_DESCRIPTION:", "END") or content_text,
+                location=location,
+                specialty=specialty,
+                ward=ward,
+                provider_count=count,
+                priority_tier=1 if count >= 5 else 2
+            )
+        except Exception as e:
+            logger.error(f"Error generating individual content: {e}")
+            return TaxonomyContent(
+                taxonomy_type=content_type,
+                title=f"Healthcare in {full_location}",
+                meta_description=f"Find healthcare in {full_location}",
+                brief_intro=f"Find healthcare providers in {full_location}.",
+                full_description="<p>Healthcare services available.</p>",
+                location=location,
+                specialty=specialty,
+                ward=ward,
+                provider_count=count,
+                priority_tier=2
+            )
+    
+    def save_content(self, content_list: List[TaxonomyContent]):
+        """Save generated content to database"""
+        session = self.db.get_session()
+        try:
+            upsert_taxonomy_content(session, content_list)
+            session.commit()
+            logger.info(f"✅ Saved {len(content_list)} content pieces to database")
+            
+        except Exception as e:
+            session.rollback()
+            logger.error(f"Error saving content: {e}")
+        finally:
+            session.close()
+    
+    def load_priority_data(self) -> Dict:
+        """Load SEO priority data"""
+        try:
+            with open('seo_priority_data.json', 'r') as f:
+                return json.load(f)
+        except:
+            logger.warning("Could not load priority data")
+            return {"tier1": [], "tier2": []}
+    
+    def priority_items(self) -> List[Tuple]:
+        """Tier 1 and Tier 2 combination pages from the SEO priority data"""
+        priority_data = self.load_priority_data()
+        items = []
+        
+        # Tier 1 combinations
+        for city, ward, specialty, count in priority_data.get("tier1", []):
+            items.append(("combination", city, specialty, ward, count))
+        
+        # Tier 2 combinations
+        for city, ward, count in priority_data.get("tier2", [])[:20]:
+            for specialty in ["General Medicine", "Dentistry"]:
+                items.append(("combination", city, specialty, ward, count))
+        
+        return items
+    
+    def generate_all_priority_content(self, batch_size: int = 5) -> Dict[str, Any]:
+        """Generate all priority content concurrently through the taxonomy pipeline
+        
+        Returns:
+            Generation statistics
+        """
+        # Imported here because the pipeline module imports this one
+        from ..core.taxonomy_pipeline import TaxonomyPipeline
+        
+        items = self.priority_items()
+        logger.info(f"📊 Generating content for {len(items)} priority pages...")
+        
+        stats = TaxonomyPipeline(db=self.db, generator=self, batch_size=batch_size).generate(items)
+        
+        logger.info("=" * 60)
+        logger.info("✅ CONTENT GENERATION COMPLETE")
+        logger.info(f"   Total pages generated: {stats['generated']}/{stats['requested']}")
+        logger.info(f"   Failed: {stats['failed']}, left for next run: {stats['over_budget']}")
+        logger.info("=" * 60)
+        
+        return stats
@@ -7,12 +7,15 @@ Detects changes in provider content for selective WordPress updates
 import hashlib
 import json
 import logging
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Optional
 
 from ..core.database import Provider
 
 logger = logging.getLogger(__name__)
 
+# Bump when the field hash layout changes so stored maps are treated as missing
+FIELD_HASHES_VERSION = 1
+
 
 class ContentHashService:
     """Service for content change detection using SHA256 hashing"""
@@ -44,6 +47,30 @@ class ContentHashService:
             'nearest_station'
         ]
         
+        # Inputs of taxonomy resolution (location and specialty detection)
+        self.taxonomy_fields = [
+            'provider_name',
+            'city',
+            'district',
+            'specialties',
+            'provider_type',
+            'ai_description',
+            'review_content',
+            'review_keywords'
+        ]
+        
+        # Everything the ACF payload is rendered from, keying the render cache
+        self.render_fields = list(dict.fromkeys(self.tracked_fields + self.taxonomy_fields + [
+            'provider_name_romaji',
+            'prefecture',
+            'postal_code',
+            'business_status',
+            'latitude',
+            'longitude',
+            'proficiency_score',
+            'google_place_id'
+        ]))
+        
         logger.info("✅ Content Hash Service initialized")
     
     def generate_hash(self, provider: Provider) -> str:
@@ -59,17 +86,7 @@ class ContentHashService:
         content_parts = []
         
         for field in self.tracked_fields:
-            value = getattr(provider, field, None)
-            
-            # Normalize value for consistent hashing
-            if value is None:
-                normalized = ""
-            elif isinstance(value, (list, dict)):
-                # Convert to sorted JSON for consistent hashing
-                normalized = json.dumps(value, sort_keys=True)
-            else:
-                normalized = str(value)
-            
+            normalized = self._normalize(getattr(provider, field, None))
             content_parts.append(f"{field}:{normalized}")
         
         # Join all parts and generate hash
@@ -79,6 +96,114 @@ class ContentHashService:
         logger.debug(f"Generated hash for {provider.provider_name}: {hash_value[:8]}...")
         return hash_value
     
+    def render_key(self, provider: Provider, fields: Optional[List[str]] = None) -> str:
+        """Hash of the provider values a publish payload is rendered from
+        
+        Args:
+            provider: Provider object
+            fields: Input fields (default: render_fields)
+            
+        Returns:
+            SHA256 hash string
+        """
+        parts = [
+            f"{field}:{self._normalize(getattr(provider, field, None))}"
+            for field in (fields or self.render_fields)
+        ]
+        return hashlib.sha256("|".join(parts).encode('utf-8')).hexdigest()
+    
+    @staticmethod
+    def _normalize(value: Any) -> str:
+        """Normalize value for consistent hashing"""
+        if value is None:
+            return ""
+        if isinstance(value, (list, dict)):
+            # Convert to sorted JSON for consistent hashing
+            return json.dumps(value, sort_keys=True, default=str)
+        return str(value)
+    
+    @classmethod
+    def hash_value(cls, value: Any) -> str:
+        """Short SHA256 digest of a single normalized value"""
+        return hashlib.sha256(cls._normalize(value).encode('utf-8')).hexdigest()[:16]
+    
+    def generate_field_hashes(self, provider: Provider,
+                              post_fields: Optional[Dict[str, Any]] = None,
+                              acf_fields: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Generate the per-field hash map stored alongside content_hash
+        
+        Args:
+            provider: Provider object
+            post_fields: Top-level post values as sent to WordPress (title, content, ...)
+            acf_fields: ACF values as sent to WordPress
+            
+        Returns:
+            Dict with provider field, post field and ACF key hashes
+        """
+        fields = dict.fromkeys(self.tracked_fields + self.taxonomy_fields)
+        return {
+            'version': FIELD_HASHES_VERSION,
+            'fields': {field: self.hash_value(getattr(provider, field, None)) for field in fields},
+            'post': {key: self.hash_value(value) for key, value in (post_fields or {}).items()},
+            'acf': {key: self.hash_value(value) for key, value in (acf_fields or {}).items()}
+        }
+    
+    def _stored_field_hashes(self, provider: Provider) -> Optional[Dict[str, Any]]:
+        """Stored hash map if present and current"""
+        stored = getattr(provider, 'content_field_hashes', None)
+        if isinstance(stored, str):
+            try:
+                stored = json.loads(stored)
+            except ValueError:
+                return None
+        if isinstance(stored, dict) and stored.get('version') == FIELD_HASHES_VERSION:
+            return stored
+        return None
+    
+    def database_hash_columns(self) -> List[str]:
+        """Provider columns hashed by the database into current_content_hash"""
+        columns = Provider.__table__.columns
+        return [
+            field for field in dict.fromkeys(self.tracked_fields + self.taxonomy_fields)
+            if field in columns
+        ]
+    
+    def content_hash_trigger_sql(self) -> List[str]:
+        """Statements installing the trigger that maintains current_content_hash
+        
+        The hash is computed by Postgres from the same columns the publisher
+        tracks, so finding providers that need a WordPress update is a single
+        indexed comparison against the content_hash recorded at sync time.
+        """
+        parts = " || '|' || ".join(
+            f"'{column}:' || coalesce(NEW.{column}::text, '')"
+            for column in self.database_hash_columns()
+        )
+        return [
+            f"""
+            CREATE OR REPLACE FUNCTION set_provider_content_hash() RETURNS trigger AS $$
+            BEGIN
+                NEW.current_content_hash := encode(sha256(convert_to({parts}, 'UTF8')), 'hex');
+                RETURN NEW;
+            END;
+            $$ LANGUAGE plpgsql
+            """,
+            "DROP TRIGGER IF EXISTS providers_content_hash ON providers",
+            """
+            CREATE TRIGGER providers_content_hash
+            BEFORE INSERT OR UPDATE ON providers
+            FOR EACH ROW EXECUTE FUNCTION set_provider_content_hash()
+            """
+        ]
+    
+    def sync_hash(self, provider: Provider) -> str:
+        """Hash to record as content_hash after a successful sync
+        
+        Uses the database-maintained current_content_hash when available so the
+        set-based needs-sync query stays consistent with what was published.
+        """
+        return getattr(provider, 'current_content_hash', None) or self.generate_hash(provider)
+    
     def needs_update(self, provider: Provider) -> bool:
         """Check if provider content has changed since last sync
         
@@ -96,9 +221,16 @@ class ContentHashService:
         if not provider.content_hash:
             return True
         
-        # Compare current hash with stored hash
-        current_hash = self.generate_hash(provider)
-        needs_update = current_hash != provider.content_hash
+        # Per-field hashes also cover taxonomy inputs the combined hash misses
+        if self._stored_field_hashes(provider):
+            needs_update = bool(self.get_changed_fields(provider))
+        elif getattr(provider, 'current_content_hash', None):
+            # Hash maintained by the database trigger
+            needs_update = provider.current_content_hash != provider.content_hash
+        else:
+            # Compare current hash with stored hash
+            current_hash = self.generate_hash(provider)
+            needs_update = current_hash != provider.content_hash
         
         if needs_update:
             logger.info(f"📝 Content changed for {provider.provider_name}")
@@ -108,32 +240,51 @@ class ContentHashService:
         return needs_update
     
     def get_changed_fields(self, provider: Provider) -> List[str]:
-        """Get list of fields that have changed
+        """Get list of fields that have changed since the last sync
         
         Args:
             provider: Provider object
             
         Returns:
-            List of changed field names
+            List of changed field names (every field if no hash map is stored)
         """
-        if not provider.content_hash:
-            return self.tracked_fields
+        fields = list(dict.fromkeys(self.tracked_fields + self.taxonomy_fields))
+        stored = self._stored_field_hashes(provider)
         
-        # This is a simplified version - in practice you might want to
-        # store individual field hashes for detailed change tracking
-        changed_fields = []
+        if not provider.content_hash or not stored:
+            return fields
         
-        # Check each field for changes
-        for field in self.tracked_fields:
-            current_value = getattr(provider, field, None)
+        stored_fields = stored.get('fields', {})
+        return [
+            field for field in fields
+            if stored_fields.get(field) != self.hash_value(getattr(provider, field, None))
+        ]
+    
+    def get_changed_keys(self, provider: Provider, section: str,
+                         values: Dict[str, Any]) -> List[str]:
+        """Get the keys of outgoing post or ACF values that differ from the last sync
+        
+        Args:
+            provider: Provider object
+            section: 'post' or 'acf'
+            values: Values about to be sent to WordPress
             
-            # For this simplified version, we'll mark critical fields
-            # In a full implementation, you'd compare with previous values
-            if field in ['ai_description', 'review_summary', 'english_experience_summary']:
-                if current_value:
-                    changed_fields.append(field)
+        Returns:
+            Changed keys (every key if no hash map is stored)
+        """
+        stored = self._stored_field_hashes(provider)
+        if not stored:
+            return list(values)
         
-        return changed_fields if changed_fields else ['content']
+        stored_section = stored.get(section, {})
+        return [
+            key for key, value in values.items()
+            if stored_section.get(key) != self.hash_value(value)
+        ]
+    
+    def taxonomy_inputs_changed(self, changed_fields: List[str]) -> bool:
+        """Whether any taxonomy resolution input is among the changed fields"""
+        return any(field in changed_fields for field in self.taxonomy_fields)
     
     def compare_providers(self, provider1: Provider, provider2: Provider) -> Dict[str, any]:
         """Compare two provider objects
@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""
+Featured Image Media Pipeline
+Downloads, deduplicates and uploads featured images on a bounded background
+pool, then attaches them to their posts. Image bytes are hashed and the
+hash → media ID mapping is kept in SQLite, so an image already in the
+WordPress media library is reused instead of uploaded again.
+"""
+
+import os
+import hashlib
+import logging
+import mimetypes
+import sqlite3
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+
+import requests
+
+from .wp_session import DEFAULT_TIMEOUT
+
+logger = logging.getLogger(__name__)
+
+
+def invalid_featured_media(response) -> bool:
+    """Whether WordPress rejected a featured_media ID that no longer exists"""
+    if response is None or response.status_code != 400:
+        return False
+    try:
+        return response.json().get('code') == 'rest_invalid_featured_media'
+    except ValueError:
+        return False
+
+
+class MediaPipeline:
+    """Background featured image uploader with content-hash dedup"""
+    
+    def __init__(self, wp_url: str, auth: Tuple[str, str],
+                 session: Optional[requests.Session] = None,
+                 download_session: Optional[requests.Session] = None,
+                 db_path: str = 'cache/wordpress_media.db',
+                 workers: int = 2, max_pending: int = 100,
+                 timeout: Tuple[int, int] = DEFAULT_TIMEOUT):
+        """Initialize the pipeline
+        
+        Args:
+            wp_url: WordPress base URL
+            auth: (username, application password)
+            session: WordPress HTTP session to reuse (defaults to plain requests)
+            download_session: Session for fetching source images from third-party
+                hosts; kept apart from the instrumented, retrying WordPress session
+            db_path: SQLite file holding the hash → media ID table
+            workers: Concurrent image transfers
+            max_pending: Jobs queued before submit() blocks the caller
+            timeout: (connect, read) timeout for downloads and uploads
+        """
+        self.wp_url = wp_url.rstrip('/')
+        self.auth = auth
+        self.http = session or requests
+        self.downloads = download_session or requests.Session()
+        self.db_path = db_path
+        self.timeout = timeout
+        
+        self._executor = ThreadPoolExecutor(max_workers=max(workers, 1), thread_name_prefix='wp-media')
+        self._slots = threading.BoundedSemaphore(max(max_pending, 1))
+        self._lock = threading.Lock()
+        self._hash_locks: Dict[str, threading.Lock] = {}
+        self._pending = set()
+        
+        self.stats = {
+            'queued': 0,
+            'attached': 0,
+            'reused': 0,
+            'uploaded': 0,
+            'failed': 0
+        }
+        
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._init_db()
+    
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=30)
+    
+    def _init_db(self):
+        """Initialize SQLite schema"""
+        with self._connect() as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS media (
+                    content_hash TEXT PRIMARY KEY,
+                    media_id INTEGER NOT NULL,
+                    source_url TEXT,
+                    uploaded_at TIMESTAMP NOT NULL
+                )
+            ''')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS media_sources (
+                    source_url TEXT PRIMARY KEY,
+                    content_hash TEXT NOT NULL
+                )
+            ''')
+            conn.commit()
+    
+    def _count(self, key: str):
+        with self._lock:
+            self.stats[key] += 1
+    
+    def known_media_id(self, image_url: str) -> Optional[int]:
+        """Media ID for an image URL seen before, without any network access"""
+        if not image_url:
+            return None
+        with self._connect() as conn:
+            row = conn.execute('''
+                SELECT m.media_id
+                FROM media_sources s
+                JOIN media m ON m.content_hash = s.content_hash
+                WHERE s.source_url = ?
+            ''', (image_url,)).fetchone()
+        return row[0] if row else None
+    
+    def forget(self, media_id: int):
+        """Drop a media ID deleted from the library, so its image is uploaded again"""
+        with self._connect() as conn:
+            conn.execute('DELETE FROM media WHERE media_id = ?', (media_id,))
+            conn.commit()
+        logger.info(f"🗑️ Forgot deleted media {media_id}")
+    
+    def _media_for_hash(self, content_hash: str) -> Optional[int]:
+        with self._connect() as conn:
+            row = conn.execute('SELECT media_id FROM media WHERE content_hash = ?', (content_hash,)).fetchone()
+        return row[0] if row else None
+    
+    def _remember(self, image_url: str, content_hash: str, media_id: Optional[int] = None):
+        with self._connect() as conn:
+            if media_id is not None:
+                conn.execute(
+                    'INSERT OR REPLACE INTO media (content_hash, media_id, source_url, uploaded_at) VALUES (?, ?, ?, ?)',
+                    (content_hash, media_id, image_url, datetime.now().isoformat())
+                )
+            conn.execute(
+                'INSERT OR REPLACE INTO media_sources (source_url, content_hash) VALUES (?, ?)',
+                (image_url, content_hash)
+            )
+            conn.commit()
+    
+    def _hash_lock(self, content_hash: str) -> threading.Lock:
+        """Lock serializing uploads of identical bytes across workers"""
+        with self._lock:
+            return self._hash_locks.setdefault(content_hash, threading.Lock())
+    
+    def _upload(self, content: bytes, content_type: str, content_hash: str) -> Optional[int]:
+        """Upload image bytes to the media library"""
+        extension = mimetypes.guess_extension(content_type) or '.jpg'
+        response = self.http.post(
+            f"{self.wp_url}/wp-json/wp/v2/media",
+            auth=self.auth,
+            files={'file': (f"featured-{content_hash[:16]}{extension}", content, content_type)},
+            timeout=self.timeout
+        )
+        if response.status_code != 201:
+            logger.warning(f"Media upload failed: {response.status_code} - {response.text[:200]}")
+            return None
+        return response.json().get('id')
+    
+    def resolve(self, image_url: str) -> Optional[int]:
+        """Media ID for an image, downloading and uploading only if it is new"""
+        media_id = self.known_media_id(image_url)
+        if media_id:
+            self._count('reused')
+            return media_id
+        
+        response = self.downloads.get(image_url, timeout=self.timeout)
+        if response.status_code != 200:
+            logger.warning(f"Image download failed ({response.status_code}): {image_url}")
+            return None
+        
+        content = response.content
+        content_hash = hashlib.sha256(content).hexdigest()
+        content_type = response.headers.get('Content-Type', 'image/jpeg').split(';')[0].strip()
+        
+        with self._hash_lock(content_hash):
+            media_id = self._media_for_hash(content_hash)
+            if media_id:
+                # Same bytes behind a different URL
+                self._remember(image_url, content_hash)
+                self._count('reused')
+                return media_id
+            
+            media_id = self._upload(content, content_type, content_hash)
+            if media_id:
+                self._remember(image_url, content_hash, media_id)
+                self._count('uploaded')
+            return media_id
+    
+    def _attach(self, post_id: int, media_id: int, post_type: str) -> requests.Response:
+        return self.http.post(
+            f"{self.wp_url}/wp-json/wp/v2/{post_type}/{post_id}",
+            auth=self.auth,
+            json={'featured_media': media_id},
+            timeout=self.timeout
+        )
+    
+    def _process(self, post_id: int, image_url: str, post_type: str) -> bool:
+        try:
+            media_id = self.resolve(image_url)
+            response = self._attach(post_id, media_id, post_type) if media_id else None
+            if invalid_featured_media(response):
+                # Deleted from the media library since it was cached
+                self.forget(media_id)
+                media_id = self.resolve(image_url)
+                response = self._attach(post_id, media_id, post_type) if media_id else None
+            if response is not None and response.status_code == 200:
+                self._count('attached')
+                return True
+        except Exception as e:
+            logger.error(f"❌ Featured image error for post {post_id}: {str(e)}")
+        
+        self._count('failed')
+        return False
+    
+    def submit(self, post_id: int, image_url: str,
+               post_type: str = 'healthcare_provider') -> Future:
+        """Queue an image to be resolved and attached to a post
+        
+        Blocks only when max_pending jobs are already queued.
+        
+        Returns:
+            Future resolving to True once the image is attached
+        """
+        self._slots.acquire()
+        try:
+            # Track before the job can finish so _done always finds it
+            with self._lock:
+                future = self._executor.submit(self._process, post_id, image_url, post_type)
+                self.stats['queued'] += 1
+                self._pending.add(future)
+        except Exception:
+            self._slots.release()
+            raise
+        
+        future.add_done_callback(self._done)
+        return future
+    
+    def _done(self, future: Future):
+        self._slots.release()
+        with self._lock:
+            self._pending.discard(future)
+    
+    def wait(self, timeout: Optional[float] = None) -> Dict[str, Any]:
+        """Wait for queued images to finish
+        
+        Returns:
+            Copy of the pipeline statistics
+        """
+        with self._lock:
+            pending = list(self._pending)
+        if pending:
+            wait(pending, timeout=timeout)
+        with self._lock:
+            return dict(self.stats)
+    
+    def shutdown(self):
+        """Finish queued work and stop the worker pool"""
+        self._executor.shutdown(wait=True)
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Render Cache
+Bounded in-memory cache for publish payloads (ACF fields, detected
+specialties) keyed by a hash of the provider values they are built from
+"""
+
+import copy
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable
+
+
+class RenderCache:
+    """Thread-safe LRU of rendered payloads"""
+    
+    def __init__(self, max_size: int = 5000):
+        """Initialize the cache
+        
+        Args:
+            max_size: Payloads kept in memory (0 disables caching)
+        """
+        self.max_size = max_size
+        self._lock = threading.RLock()
+        self._cache = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+    
+    def get_or_render(self, key: Hashable, render: Callable[[], Any]) -> Any:
+        """Return the payload for key, rendering it on a miss
+        
+        Payloads are deep-copied on the way out so callers can't mutate the
+        cached value.
+        """
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return copy.deepcopy(self._cache[key])
+            self.misses += 1
+        
+        # Render outside the lock so workers don't serialize on formatting
+        value = render()
+        
+        if self.max_size > 0:
+            with self._lock:
+                self._cache[key] = copy.deepcopy(value)
+                self._cache.move_to_end(key)
+                while len(self._cache) > self.max_size:
+                    self._cache.popitem(last=False)
+        
+        return value
+    
+    def cache_info(self) -> Dict[str, int]:
+        """Cache statistics"""
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'size': len(self._cache),
+                'max_size': self.max_size
+            }
+    
+    def clear(self):
+        """Drop all cached payloads (e.g. after changing a formatter)"""
+        with self._lock:
+            self._cache.clear()
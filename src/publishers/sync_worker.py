@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+WordPress Sync Worker
+Drains the WordPress sync outbox: claims due operations, publishes the
+current provider rows and records each outcome with its duration. Failed
+operations are retried with exponential backoff by the outbox.
+"""
+
+import os
+import time
+import socket
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional
+
+from ..core.sync_outbox import SyncOutbox
+from .wordpress import WordPressPublisher
+
+logger = logging.getLogger(__name__)
+
+
+class SyncWorker:
+    """One worker process publishing queued WordPress sync operations"""
+    
+    def __init__(self, publisher: Optional[WordPressPublisher] = None,
+                 outbox: Optional[SyncOutbox] = None,
+                 worker_id: Optional[str] = None,
+                 batch_size: int = 20,
+                 lease_seconds: int = 900):
+        """Initialize the worker
+        
+        Args:
+            publisher: WordPress publisher (created if not given)
+            outbox: Sync outbox (created over the publisher's database if not given)
+            worker_id: Name recorded in claimed_by (default host:pid)
+            batch_size: Operations claimed at a time
+            lease_seconds: Claims older than this are presumed abandoned
+        """
+        self.publisher = publisher or WordPressPublisher()
+        self.outbox = outbox or SyncOutbox(self.publisher.db)
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        self.batch_size = batch_size
+        self.lease_seconds = lease_seconds
+    
+    def _process(self, operation: Dict[str, Any], provider) -> Dict[str, Any]:
+        """Publish one claimed operation and describe its outcome"""
+        outcome = {'op_id': operation['id'], 'attempts': operation['attempts']}
+        
+        if provider is None:
+            return {**outcome, 'success': False, 'retry': False, 'duration': 0.0,
+                    'error': f"Provider {operation['provider_id']} not found"}
+        
+        started = time.time()
+        try:
+            action, result = self.publisher.sync_provider(provider)
+        except Exception as e:
+            action, result = None, {'success': False, 'error': str(e)}
+        outcome['duration'] = round(time.time() - started, 3)
+        
+        if not result.get('success'):
+            return {**outcome, 'success': False, 'error': result.get('error', 'Unknown error')}
+        
+        return {
+            **outcome,
+            'success': True,
+            'operation_type': 'create' if action == 'created' else 'update',
+            'wordpress_info': result.get('wordpress_info'),
+            'content_hash_after': provider.content_hash,
+            'fields_updated': result.get('sent_fields') or []
+        }
+    
+    def run_once(self) -> Dict[str, Any]:
+        """Claim and publish one batch
+        
+        Returns:
+            Batch summary (claimed, completed, failed)
+        """
+        self.outbox.release_stale(self.lease_seconds)
+        
+        operations = self.outbox.claim(self.worker_id, self.batch_size)
+        summary = {'claimed': len(operations), 'completed': 0, 'failed': 0}
+        if not operations:
+            return summary
+        
+        providers = self.outbox.load_providers([op['provider_id'] for op in operations])
+        
+        workers = max(min(self.publisher.sync_workers, len(operations)), 1)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            outcomes = list(executor.map(
+                lambda op: self._process(op, providers.get(op['provider_id'])),
+                operations
+            ))
+        
+        self.outbox.finish(outcomes, self.worker_id)
+        
+        for outcome in outcomes:
+            if outcome['success']:
+                summary['completed'] += 1
+            else:
+                summary['failed'] += 1
+                logger.warning(f"⚠️ Sync operation {outcome['op_id']} failed "
+                               f"(attempt {outcome['attempts']}): {outcome['error']}")
+        
+        logger.info(f"📤 Sync batch: {summary['completed']} completed, {summary['failed']} failed")
+        return summary
+    
+    def run(self, max_batches: Optional[int] = None, idle_seconds: float = 5.0,
+            drain: bool = False) -> Dict[str, Any]:
+        """Process batches until stopped
+        
+        Args:
+            max_batches: Stop after this many non-empty batches
+            idle_seconds: Sleep between polls of an empty queue
+            drain: Stop as soon as no operation is due
+        
+        Returns:
+            Totals across batches
+        """
+        totals = {'batches': 0, 'claimed': 0, 'completed': 0, 'failed': 0}
+        
+        try:
+            while max_batches is None or totals['batches'] < max_batches:
+                summary = self.run_once()
+                
+                if not summary['claimed']:
+                    if drain:
+                        break
+                    time.sleep(idle_seconds)
+                    continue
+                
+                totals['batches'] += 1
+                for key in ('claimed', 'completed', 'failed'):
+                    totals[key] += summary[key]
+        finally:
+            # Featured images are attached in the background
+            totals['media'] = self.publisher.media.wait()
+        
+        return totals
@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+WordPress Taxonomy Term Index
+Loads every term of a taxonomy with paginated bulk GETs and resolves term
+names to IDs locally, persisting the index in SQLite with a TTL
+"""
+
+import os
+import re
+import html
+import sqlite3
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, Optional, Tuple
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_term_name(name: str) -> str:
+    """Normalize a term name for lookups
+    
+    WordPress returns names HTML-escaped, so "&amp;" and "&" must match.
+    """
+    if not name:
+        return ''
+    return re.sub(r'\s+', ' ', html.unescape(name)).strip().casefold()
+
+
+class TermIndex:
+    """Name → term ID index for WordPress taxonomies"""
+    
+    def __init__(self, wp_url: str, auth: Tuple[str, str],
+                 db_path: str = 'cache/wordpress_terms.db',
+                 ttl_hours: int = 24, per_page: int = 100,
+                 session: Optional[requests.Session] = None):
+        """Initialize the term index
+        
+        Args:
+            wp_url: WordPress base URL
+            auth: (username, application password)
+            db_path: SQLite file the index is persisted to
+            ttl_hours: Hours before a persisted taxonomy is reloaded from WordPress
+            per_page: Terms fetched per REST page (WordPress caps this at 100)
+            session: HTTP session to reuse (defaults to plain requests)
+        """
+        self.wp_url = wp_url.rstrip('/')
+        self.auth = auth
+        self.db_path = db_path
+        self.ttl = timedelta(hours=ttl_hours)
+        self.per_page = per_page
+        self.http = session or requests
+        
+        self._terms: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.RLock()
+        
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._init_db()
+    
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=30)
+    
+    def _init_db(self):
+        """Initialize SQLite schema"""
+        with self._connect() as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS terms (
+                    endpoint TEXT NOT NULL,
+                    normalized_name TEXT NOT NULL,
+                    term_id INTEGER NOT NULL,
+                    name TEXT NOT NULL,
+                    PRIMARY KEY (endpoint, normalized_name)
+                )
+            ''')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS term_loads (
+                    endpoint TEXT PRIMARY KEY,
+                    loaded_at TIMESTAMP NOT NULL
+                )
+            ''')
+            conn.commit()
+    
+    def _load_persisted(self, endpoint: str) -> Optional[Dict[str, int]]:
+        """Load a taxonomy from SQLite if it was fetched within the TTL"""
+        with self._connect() as conn:
+            row = conn.execute(
+                'SELECT loaded_at FROM term_loads WHERE endpoint = ?', (endpoint,)
+            ).fetchone()
+            if not row or datetime.fromisoformat(row[0]) < datetime.now() - self.ttl:
+                return None
+            
+            rows = conn.execute(
+                'SELECT normalized_name, term_id FROM terms WHERE endpoint = ?', (endpoint,)
+            ).fetchall()
+        return dict(rows)
+    
+    def _fetch_all(self, endpoint: str) -> Optional[Dict[str, int]]:
+        """Fetch every term of a taxonomy with paginated bulk GETs"""
+        url = f"{self.wp_url}/wp-json/wp/v2/{endpoint}"
+        terms: Dict[str, Tuple[int, str]] = {}
+        page = 1
+        total_pages = 1
+        
+        while page <= total_pages:
+            response = self.http.get(
+                url,
+                auth=self.auth,
+                params={
+                    'per_page': self.per_page,
+                    'page': page,
+                    'hide_empty': False,
+                    '_fields': 'id,name'
+                },
+                timeout=30
+            )
+            
+            if response.status_code != 200:
+                logger.warning(f"Could not load {endpoint} terms (page {page}): {response.status_code}")
+                return None
+            
+            for term in response.json():
+                # Keep the first (lowest page) term if names collide after normalization
+                terms.setdefault(normalize_term_name(term['name']), (term['id'], term['name']))
+            
+            total_pages = int(response.headers.get('X-WP-TotalPages', page))
+            page += 1
+        
+        with self._connect() as conn:
+            conn.execute('DELETE FROM terms WHERE endpoint = ?', (endpoint,))
+            conn.executemany(
+                'INSERT INTO terms (endpoint, normalized_name, term_id, name) VALUES (?, ?, ?, ?)',
+                [(endpoint, key, term_id, name) for key, (term_id, name) in terms.items()]
+            )
+            conn.execute(
+                'INSERT OR REPLACE INTO term_loads (endpoint, loaded_at) VALUES (?, ?)',
+                (endpoint, datetime.now().isoformat())
+            )
+            conn.commit()
+        
+        logger.info(f"📥 Indexed {len(terms)} {endpoint} terms from WordPress")
+        return {key: term_id for key, (term_id, _) in terms.items()}
+    
+    def load(self, endpoint: str, force: bool = False) -> bool:
+        """Make sure a taxonomy is indexed
+        
+        Args:
+            endpoint: REST endpoint name (e.g. 'location', 'specialties')
+            force: Reload from WordPress even if a fresh copy exists
+        
+        Returns:
+            True if the index for the taxonomy is complete
+        """
+        with self._lock:
+            if endpoint in self._terms and not force:
+                return True
+            
+            terms = None if force else self._load_persisted(endpoint)
+            if terms is None:
+                try:
+                    terms = self._fetch_all(endpoint)
+                except Exception as e:
+                    logger.warning(f"Could not index {endpoint} terms: {e}")
+                    terms = None
+            
+            if terms is None:
+                return False
+            
+            self._terms[endpoint] = terms
+            return True
+    
+    def get(self, endpoint: str, name: str) -> Optional[int]:
+        """Resolve a term name to its ID
+        
+        Returns:
+            Term ID, or None if the term is not in the index
+        """
+        with self._lock:
+            return self._terms.get(endpoint, {}).get(normalize_term_name(name))
+    
+    def is_loaded(self, endpoint: str) -> bool:
+        """Whether the taxonomy has a complete index in memory"""
+        with self._lock:
+            return endpoint in self._terms
+    
+    def add(self, endpoint: str, term_id: int, name: str):
+        """Record a newly created (or newly discovered) term"""
+        key = normalize_term_name(name)
+        with self._lock:
+            # Only extend complete indexes; a partial one would mask misses
+            if endpoint in self._terms:
+                self._terms[endpoint][key] = term_id
+            try:
+                with self._connect() as conn:
+                    conn.execute(
+                        'INSERT OR REPLACE INTO terms (endpoint, normalized_name, term_id, name) VALUES (?, ?, ?, ?)',
+                        (endpoint, key, term_id, name)
+                    )
+                    conn.commit()
+            except sqlite3.Error as e:
+                logger.debug(f"Could not persist term '{name}': {e}")
+    
+    def invalidate(self, endpoint: Optional[str] = None):
+        """Drop a taxonomy (or all taxonomies) so the next lookup reloads it"""
+        with self._lock:
+            with self._connect() as conn:
+                if endpoint:
+                    self._terms.pop(endpoint, None)
+                    conn.execute('DELETE FROM term_loads WHERE endpoint = ?', (endpoint,))
+                else:
+                    self._terms.clear()
+                    conn.execute('DELETE FROM term_loads')
+                conn.commit()
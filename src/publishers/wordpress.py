@@ -6,29 +6,45 @@ Handles all WordPress sync operations including create and update
 
 import os
 import json
+import time
 import logging
-import requests
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import List, Dict, Optional, Any
 from datetime import datetime
 import hashlib
+import requests
 
 from ..core.database import DatabaseManager, Provider
 from .content_hash import ContentHashService
+from .media_pipeline import MediaPipeline, invalid_featured_media
+from .render_cache import RenderCache
+from .term_index import TermIndex
+from .wp_session import BULK_TIMEOUT, DEFAULT_TIMEOUT, create_wordpress_session
+from ..monitoring.tracing import propagate, span
 from ..utils.romaji_converter import (
     get_display_name, 
     generate_romaji_for_provider,
     contains_japanese,
     convert_to_romaji
 )
+from ..utils.review_features import get_review_features
+from ..utils.specialty_detector import SpecialtyDetector
 from ..data.master_specialties import SpecialtyNormalizer
 from ..data.master_locations import LocationValidator
 
 logger = logging.getLogger(__name__)
 
+# Largest batch healthcare-bulk-upsert.php accepts (its MAX_ITEMS)
+BULK_MAX_ITEMS = 100
+
 
 class WordPressPublisher:
     """Unified WordPress publisher for healthcare providers"""
     
+    # Top-level post values tracked by per-field hashes (taxonomies included)
+    DELTA_POST_FIELDS = ('title', 'content', 'categories', 'location', 'specialties')
+    
     def __init__(self):
         """Initialize WordPress publisher"""
         # Load configuration
@@ -46,12 +62,48 @@ class WordPressPublisher:
         self.db = DatabaseManager()
         self.hash_service = ContentHashService()
         
-        # Initialize master data validators
+        # Pooled keep-alive session shared by the sync workers
+        self.sync_workers = int(os.getenv('WORDPRESS_SYNC_WORKERS', '4'))
+        self.timeout = DEFAULT_TIMEOUT
+        self.http = create_wordpress_session(self.wp_url, pool_size=max(self.sync_workers, 1) * 2)
+        
+        # Batch client mode for the healthcare/v1 bulk upsert endpoint
+        # (healthcare-bulk-upsert.php must be active on the site)
+        self.bulk_upsert = os.getenv('WORDPRESS_BULK_UPSERT', 'false').lower() == 'true'
+        self.bulk_batch_size = int(os.getenv('WORDPRESS_BULK_BATCH_SIZE', '50'))
+        if self.bulk_batch_size > BULK_MAX_ITEMS:
+            logger.warning(f"WORDPRESS_BULK_BATCH_SIZE={self.bulk_batch_size} exceeds the endpoint limit; using {BULK_MAX_ITEMS}")
+            self.bulk_batch_size = BULK_MAX_ITEMS
+        self.bulk_url = f"{self.wp_url}/wp-json/healthcare/v1/providers/bulk"
+        # The endpoint upserts by place ID, so a failed batch is resent rather than split up
+        self.bulk_retries = int(os.getenv('WORDPRESS_BULK_RETRIES', '3'))
+        self.bulk_retry_backoff = float(os.getenv('WORDPRESS_BULK_RETRY_BACKOFF', '2.0'))
+        
+        # Taxonomy term names resolve locally instead of via REST searches
+        self.term_index = TermIndex(
+            self.wp_url,
+            (self.wp_username, self.wp_password),
+            session=self.http,
+            ttl_hours=int(os.getenv('WORDPRESS_TERM_CACHE_TTL_HOURS', '24'))
+        )
+        # Serializes term creation so parallel workers don't create duplicates
+        self._term_create_lock = threading.Lock()
+        
+        # Featured images upload in the background, deduplicated by content hash
+        self.media = MediaPipeline(
+            self.wp_url,
+            (self.wp_username, self.wp_password),
+            session=self.http,
+            workers=int(os.getenv('WORDPRESS_MEDIA_WORKERS', '2'))
+        )
+        
+        # Initialize master data validators (shared by every render)
         self.specialty_normalizer = SpecialtyNormalizer()
         self.location_validator = LocationValidator()
+        self.specialty_detector = SpecialtyDetector()
         
-        # Cache for romaji conversions
-        self._romaji_cache = {}
+        # Rendered ACF payloads and detected specialties, keyed by input hash
+        self.render_cache = RenderCache(int(os.getenv('WORDPRESS_RENDER_CACHE_SIZE', '5000')))
         
         # ACF field mappings
         self.acf_field_mappings = {
@@ -85,10 +137,6 @@ class WordPressPublisher:
         Returns:
             English/romaji name for WordPress use
         """
-        # Check cache first
-        if provider.provider_name in self._romaji_cache:
-            return self._romaji_cache[provider.provider_name]
-        
         # Check if provider already has romaji name
         if hasattr(provider, 'provider_name_romaji') and provider.provider_name_romaji:
             english_name = provider.provider_name_romaji
@@ -98,13 +146,13 @@ class WordPressPublisher:
             # Store in database for future use
             self.db.update_provider_field(provider.id, 'provider_name_romaji', english_name)
             provider.provider_name_romaji = english_name
+            # The trigger rehashed the row; record that hash after the sync
+            self.db.refresh_content_hashes([provider])
             logger.info(f"🔤 Generated romaji: {provider.provider_name} → {english_name}")
         else:
             # Already in English
             english_name = provider.provider_name
         
-        # Cache the result
-        self._romaji_cache[provider.provider_name] = english_name
         return english_name
     
     def _validate_no_japanese_in_content(self, content_dict: Dict[str, Any]) -> Dict[str, bool]:
@@ -125,118 +173,455 @@ class WordPressPublisher:
         
         return fields_with_japanese
     
-    def sync_providers(self, providers: List[Provider]) -> Dict[str, Any]:
+    def sync_providers(self, providers: List[Provider],
+                       max_workers: Optional[int] = None,
+                       db_batch_size: int = 50) -> Dict[str, Any]:
         """Sync multiple providers to WordPress
         
+        Providers are published concurrently over the pooled session; the
+        resulting WordPress sync info is written back in batches.
+        
         Args:
             providers: List of providers to sync
+            max_workers: Concurrent publish workers (default: WORDPRESS_SYNC_WORKERS)
+            db_batch_size: Sync info rows written per database transaction
             
         Returns:
             Sync summary
         """
-        summary = {
-            'total_providers': len(providers),
+        if self.bulk_upsert:
+            return self.sync_providers_bulk(providers, max_workers=max_workers,
+                                            db_batch_size=db_batch_size)
+        
+        summary = self._new_sync_summary(len(providers))
+        self.db.refresh_content_hashes(providers)
+        
+        max_workers = max_workers or self.sync_workers
+        pending_info = []
+        
+        with ThreadPoolExecutor(max_workers=max(max_workers, 1)) as executor:
+            # Worker spans nest under the caller's publishing span
+            sync_provider = propagate(self.sync_provider)
+            futures = {
+                executor.submit(sync_provider, provider): provider
+                for provider in providers
+            }
+            
+            for future in as_completed(futures):
+                provider = futures[future]
+                try:
+                    action, result = future.result()
+                except Exception as e:
+                    logger.error(f"❌ Sync error for {provider.provider_name}: {str(e)}")
+                    summary['failed'] += 1
+                    summary['errors'].append(f"{provider.provider_name}: {str(e)}")
+                    continue
+                
+                if result.get('success'):
+                    summary[action] += 1
+                    summary['synced'] += 1
+                    if result.get('wordpress_info'):
+                        pending_info.append(result['wordpress_info'])
+                else:
+                    summary['failed'] += 1
+                    summary['errors'].append(f"{provider.provider_name}: {result.get('error', 'Unknown error')}")
+                
+                if len(pending_info) >= db_batch_size:
+                    self._write_sync_info(pending_info, summary)
+                    pending_info = []
+        
+        self._write_sync_info(pending_info, summary)
+        
+        # Featured images were uploaded off the publish path; let them finish
+        summary['media'] = self.media.wait()
+        
+        return summary
+    
+    def _write_sync_info(self, rows: List[Dict[str, Any]], summary: Dict[str, Any]) -> None:
+        """Write one batch of sync info, falling back to one row at a time
+        
+        A lost row drops the post ID of a freshly created post, so the next
+        run would create it again; rows that still fail are reported.
+        """
+        if not rows or self.db.bulk_update_wordpress_info(rows):
+            return
+        
+        logger.warning(f"⚠️ Batched sync info write failed - writing {len(rows)} rows individually")
+        for row in rows:
+            written = self.db.update_wordpress_info(
+                row['provider_id'], row['wordpress_post_id'],
+                row.get('content_hash'), row.get('content_field_hashes')
+            )
+            if not written:
+                error = (f"Provider {row['provider_id']}: WordPress post {row['wordpress_post_id']} "
+                         f"was published but its sync info was not saved")
+                logger.error(f"❌ {error}")
+                summary['errors'].append(error)
+    
+    @staticmethod
+    def _new_sync_summary(total: int) -> Dict[str, Any]:
+        """Empty sync summary"""
+        return {
+            'total_providers': total,
             'created': 0,
             'updated': 0,
             'synced': 0,
             'failed': 0,
             'errors': []
         }
+    
+    def sync_providers_bulk(self, providers: List[Provider],
+                            batch_size: Optional[int] = None,
+                            max_workers: Optional[int] = None,
+                            db_batch_size: int = 50) -> Dict[str, Any]:
+        """Sync providers through the bulk upsert endpoint
+        
+        Payloads are built locally, then sent batch_size at a time; each
+        request upserts the whole batch on the WordPress side and returns
+        per-item results.
+        
+        Args:
+            providers: List of providers to sync
+            batch_size: Providers per bulk request (default: WORDPRESS_BULK_BATCH_SIZE)
+            max_workers: Concurrent bulk requests (default: WORDPRESS_SYNC_WORKERS)
+            db_batch_size: Sync info rows written per database transaction
+            
+        Returns:
+            Sync summary
+        """
+        summary = self._new_sync_summary(len(providers))
+        self.db.refresh_content_hashes(providers)
+        batch_size = min(batch_size or self.bulk_batch_size, BULK_MAX_ITEMS)
+        pending_info = []
+        queued = []
         
         for provider in providers:
             try:
-                # Photos are no longer collected
-                
                 if provider.wordpress_post_id:
-                    # Update existing post
-                    result = self.update_provider(provider)
-                    if result.get('success'):
-                        summary['updated'] += 1
-                        summary['synced'] += 1
+                    plan = self._build_update_plan(provider)
                 else:
-                    # Create new post
-                    result = self.create_provider(provider)
-                    if result.get('success'):
-                        summary['created'] += 1
-                        summary['synced'] += 1
-                
-                if not result.get('success'):
-                    summary['failed'] += 1
-                    summary['errors'].append(f"{provider.provider_name}: {result.get('error', 'Unknown error')}")
-                    
+                    plan = self._build_create_plan(provider)
             except Exception as e:
                 logger.error(f"❌ Sync error for {provider.provider_name}: {str(e)}")
                 summary['failed'] += 1
                 summary['errors'].append(f"{provider.provider_name}: {str(e)}")
+                continue
+            
+            if plan['action'] in ('create', 'update'):
+                queued.append((provider, plan))
+                continue
+            
+            # Nothing to send
+            summary['updated'] += 1
+            summary['synced'] += 1
+            if plan['action'] == 'record':
+                result = self._complete_sync(provider, provider.wordpress_post_id, plan, True)
+                pending_info.append(result['wordpress_info'])
+        
+        batches = [queued[i:i + batch_size] for i in range(0, len(queued), batch_size)]
+        logger.info(f"📦 Bulk syncing {len(queued)} providers in {len(batches)} requests")
+        
+        with ThreadPoolExecutor(max_workers=max(max_workers or self.sync_workers, 1)) as executor:
+            for outcomes in executor.map(propagate(self._send_bulk_batch), batches):
+                for provider, action, result in outcomes:
+                    if result.get('success'):
+                        summary[action] += 1
+                        summary['synced'] += 1
+                        if result.get('wordpress_info'):
+                            pending_info.append(result['wordpress_info'])
+                    else:
+                        summary['failed'] += 1
+                        summary['errors'].append(f"{provider.provider_name}: {result.get('error', 'Unknown error')}")
+                
+                while len(pending_info) >= db_batch_size:
+                    self._write_sync_info(pending_info[:db_batch_size], summary)
+                    pending_info = pending_info[db_batch_size:]
+        
+        self._write_sync_info(pending_info, summary)
+        
+        # Featured images were uploaded off the publish path; let them finish
+        summary['media'] = self.media.wait()
         
         return summary
     
-    def create_provider(self, provider: Provider) -> Dict[str, Any]:
+    def _send_bulk_batch(self, batch: List[tuple]) -> List[tuple]:
+        """Upsert one batch of planned providers in a single request
+        
+        Returns:
+            List of (provider, summary counter name, result dict)
+        """
+        with span('wordpress.bulk_batch', providers=len(batch)):
+            items = []
+            for provider, plan in batch:
+                post = {k: v for k, v in plan['post_data'].items() if k not in ('acf', 'type')}
+                items.append({
+                    'ref': str(provider.id),
+                    'google_place_id': provider.google_place_id,
+                    'post_id': provider.wordpress_post_id,
+                    'post': post,
+                    'acf': plan['post_data'].get('acf', {})
+                })
+            
+            response, error_msg = self._post_bulk(items)
+            
+            if response is not None and self._bulk_route_missing(response):
+                # Endpoint not installed - nothing was applied, so one request per provider is safe
+                logger.warning("⚠️ Bulk endpoint not found - falling back to per-provider sync")
+                outcomes = []
+                for provider, _ in batch:
+                    action, result = self.sync_provider(provider)
+                    outcomes.append((provider, action, result))
+                return outcomes
+            
+            if response is None or response.status_code != 200:
+                # The batch may be partly applied; leave it for the next run's upsert
+                if response is not None:
+                    error_msg = f"Bulk endpoint error {response.status_code}: {response.text[:200]}"
+                logger.error(f"❌ Bulk upsert of {len(batch)} providers failed: {error_msg}")
+                return [
+                    (provider, 'created' if plan['action'] == 'create' else 'updated',
+                     {'success': False, 'error': error_msg})
+                    for provider, plan in batch
+                ]
+            
+            results = {result.get('ref'): result for result in response.json().get('results', [])}
+            outcomes = []
+            
+            for provider, plan in batch:
+                action = 'created' if plan['action'] == 'create' else 'updated'
+                result = results.get(str(provider.id))
+                
+                if not result or result.get('status') == 'error':
+                    error = result.get('error') if result else 'Missing from bulk response'
+                    logger.error(f"❌ Bulk upsert failed for {provider.provider_name}: {error}")
+                    outcomes.append((provider, action, {'success': False, 'error': error}))
+                    continue
+                
+                if result.get('invalid_featured_media'):
+                    # Deleted from the media library; the endpoint saved the post without it
+                    self.media.forget(plan['post_data']['featured_media'])
+                    plan = {**plan, 'set_featured_image': True}
+                
+                try:
+                    outcome = self._complete_sync(provider, result['post_id'], plan, True)
+                except Exception as e:
+                    outcome = {'success': False, 'error': str(e)}
+                outcomes.append((provider, action, outcome))
+            
+            return outcomes
+    
+    def _post_bulk(self, items: List[Dict[str, Any]]) -> tuple:
+        """Send one bulk request, retrying timeouts, connection errors, 429 and 5xx
+        
+        Resending is safe because the endpoint upserts by google_place_id.
+        
+        Returns:
+            Tuple of (response, or None once retries are exhausted; last error message)
+        """
+        error_msg = None
+        for attempt in range(self.bulk_retries + 1):
+            if attempt:
+                time.sleep(self.bulk_retry_backoff * 2 ** (attempt - 1))
+            
+            try:
+                response = self.http.post(
+                    self.bulk_url,
+                    auth=(self.wp_username, self.wp_password),
+                    json={'items': items},
+                    timeout=BULK_TIMEOUT
+                )
+            except requests.exceptions.RequestException as e:
+                error_msg = str(e)
+            else:
+                if response.status_code != 429 and response.status_code < 500:
+                    return response, None
+                error_msg = f"Bulk endpoint error {response.status_code}: {response.text[:200]}"
+            
+            logger.warning(f"⚠️ {error_msg} (bulk attempt {attempt + 1}/{self.bulk_retries + 1})")
+        
+        return None, error_msg
+    
+    @staticmethod
+    def _bulk_route_missing(response) -> bool:
+        """Whether the site answered that the bulk route is not registered"""
+        if response.status_code != 404:
+            return False
+        try:
+            return response.json().get('code') == 'rest_no_route'
+        except ValueError:
+            return False
+    
+    def sync_provider(self, provider: Provider):
+        """Create or update one provider, deferring the sync info write
+        
+        Returns:
+            Tuple of (summary counter name, result dict)
+        """
+        # Photos are no longer collected
+        
+        with span('wordpress.provider', provider_id=provider.id) as provider_span:
+            if provider.wordpress_post_id:
+                # Update existing post
+                provider_span.set(action='update')
+                return 'updated', self.update_provider(provider, defer_db_update=True)
+            
+            # Create new post
+            provider_span.set(action='create')
+            return 'created', self.create_provider(provider, defer_db_update=True)
+    
+    def _check_japanese(self, title: str, acf_fields: Dict[str, Any]):
+        """Log a warning if critical fields still contain Japanese characters"""
+        critical_fields = {
+            'title': title,
+            'seo_title': acf_fields.get('seo_title', ''),
+            'description': acf_fields.get(self.acf_field_mappings['description'], ''),
+            'excerpt': acf_fields.get('ai_excerpt', '')
+        }
+        
+        japanese_check = self._validate_no_japanese_in_content(critical_fields)
+        if japanese_check:
+            logger.warning(f"⚠️ Japanese characters found in {len(japanese_check)} fields: {list(japanese_check.keys())}")
+            # Continue but log the warning
+    
+    def _build_create_plan(self, provider: Provider) -> Dict[str, Any]:
+        """Build the full post payload for a new WordPress post
+        
+        Returns:
+            Plan with the post data and the hashes to record once it is created
+        """
+        # Use English/romaji name for WordPress title
+        english_name = self._ensure_romaji_consistency(provider)
+        
+        # Prepare post data
+        post_data = {
+            'title': english_name,
+            'content': self._generate_post_content(provider),
+            'status': 'publish',
+            'type': 'healthcare_provider',  # Custom post type
+            'categories': self._get_categories(provider),
+            'acf': self._prepare_acf_fields(provider)
+        }
+        
+        # Validate no Japanese characters in critical fields
+        self._check_japanese(post_data['title'], post_data['acf'])
+        
+        # Add custom taxonomies
+        post_data.update(self._get_taxonomies(provider))
+        
+        return {
+            'action': 'create',
+            'post_data': post_data,
+            'content_hash': self.hash_service.sync_hash(provider),
+            'field_hashes': self.hash_service.generate_field_hashes(
+                provider,
+                post_fields={key: post_data[key] for key in self.DELTA_POST_FIELDS if key in post_data},
+                acf_fields=post_data['acf']
+            ),
+            'set_featured_image': self._inline_known_media(provider, post_data,
+                                                           bool(provider.selected_featured_image))
+        }
+    
+    def _build_update_plan(self, provider: Provider) -> Dict[str, Any]:
+        """Build the delta payload for an existing WordPress post
+        
+        Returns:
+            Plan whose action is 'update', 'record' (hashes only) or 'skip'
+        """
+        english_name = self._ensure_romaji_consistency(provider)
+        
+        # Check if update is needed
+        if not self.hash_service.needs_update(provider):
+            current_hash = provider.current_content_hash
+            if current_hash and current_hash != provider.content_hash:
+                # Nothing to send, but the needs-update query compares these hashes
+                return {
+                    'action': 'record',
+                    'post_data': {},
+                    'content_hash': current_hash,
+                    'field_hashes': provider.content_field_hashes,
+                    'set_featured_image': False
+                }
+            return {'action': 'skip'}
+        
+        # Get changed fields
+        changed_fields = self.hash_service.get_changed_fields(provider)
+        logger.info(f"📝 Changed fields: {', '.join(changed_fields)}")
+        
+        # Build the full post, then send only what differs from the last sync
+        post_fields = {
+            'title': english_name,  # Use English/romaji name for WordPress title
+            'content': self._generate_post_content(provider),
+            'categories': self._get_categories(provider)
+        }
+        acf_fields = self._prepare_acf_fields(provider)
+        
+        # Validate no Japanese characters in critical fields
+        self._check_japanese(post_fields['title'], acf_fields)
+        
+        # Re-resolve custom taxonomies only when their inputs changed
+        if self.hash_service.taxonomy_inputs_changed(changed_fields):
+            post_fields.update(self._get_taxonomies(provider))
+        
+        changed_post = self.hash_service.get_changed_keys(provider, 'post', post_fields)
+        changed_acf = self.hash_service.get_changed_keys(provider, 'acf', acf_fields)
+        
+        post_data = {key: post_fields[key] for key in changed_post}
+        if changed_acf:
+            post_data['acf'] = {key: acf_fields[key] for key in changed_acf}
+        
+        image_changed = 'selected_featured_image' in changed_fields and bool(provider.selected_featured_image)
+        set_featured_image = self._inline_known_media(provider, post_data, image_changed)
+        
+        return {
+            # Inputs changed but nothing WordPress shows did - just record the new hashes
+            'action': 'update' if post_data else 'record',
+            'post_data': post_data,
+            'content_hash': self.hash_service.sync_hash(provider),
+            'field_hashes': self._merge_field_hashes(provider, post_fields, acf_fields),
+            'changed_fields': changed_fields,
+            'sent_fields': changed_post + [f"acf.{key}" for key in changed_acf]
+                           + (['featured_media'] if 'featured_media' in post_data else []),
+            'set_featured_image': set_featured_image
+        }
+    
+    def _inline_known_media(self, provider: Provider, post_data: Dict[str, Any],
+                            set_featured_image: bool) -> bool:
+        """Send an already-uploaded featured image with the post itself
+        
+        Returns:
+            Whether the image still has to go through the media pipeline
+        """
+        if not set_featured_image:
+            return False
+        media_id = self.media.known_media_id(provider.selected_featured_image)
+        if media_id:
+            post_data['featured_media'] = media_id
+            return False
+        return True
+    
+    def create_provider(self, provider: Provider, defer_db_update: bool = False) -> Dict[str, Any]:
         """Create a new WordPress post for a provider with romaji consistency
         
         Args:
             provider: Provider to create
+            defer_db_update: Return the sync info instead of writing it
             
         Returns:
             Result dictionary with success status
         """
-        # Get consistent English name
-        english_name = self._ensure_romaji_consistency(provider)
-        logger.info(f"📝 Creating WordPress post for {english_name} (original: {provider.provider_name})")
+        logger.info(f"📝 Creating WordPress post for {provider.provider_name}")
         
         try:
-            # Use English/romaji name for WordPress title
-            title = english_name
-            
-            # Prepare post data
-            post_data = {
-                'title': title,
-                'content': self._generate_post_content(provider),
-                'status': 'publish',
-                'type': 'healthcare_provider',  # Custom post type
-                'categories': self._get_categories(provider),
-                'acf': self._prepare_acf_fields(provider)
-            }
-            
-            # Validate no Japanese characters in critical fields
-            critical_fields = {
-                'title': post_data['title'],
-                'seo_title': post_data['acf'].get('seo_title', ''),
-                'description': post_data['acf'].get(self.acf_field_mappings['description'], ''),
-                'excerpt': post_data['acf'].get('ai_excerpt', '')
-            }
-            
-            japanese_check = self._validate_no_japanese_in_content(critical_fields)
-            if japanese_check:
-                logger.warning(f"⚠️ Japanese characters found in {len(japanese_check)} fields: {list(japanese_check.keys())}")
-                # Continue but log the warning
-            
-            # Add custom taxonomies
-            taxonomies = self._get_taxonomies(provider)
-            post_data.update(taxonomies)
+            plan = self._build_create_plan(provider)
             
             # Make API request to healthcare_provider endpoint
-            response = requests.post(
-                f"{self.wp_url}/wp-json/wp/v2/healthcare_provider",
-                auth=(self.wp_username, self.wp_password),
-                json=post_data,
-                headers={'Content-Type': 'application/json'}
+            response = self._post_provider(
+                f"{self.wp_url}/wp-json/wp/v2/healthcare_provider", provider, plan
             )
             
             if response.status_code == 201:
-                result = response.json()
-                post_id = result.get('id')
-                
-                # Update database with WordPress info
-                content_hash = self.hash_service.generate_hash(provider)
-                self.db.update_wordpress_info(provider.id, post_id, content_hash)
-                
-                # Set featured image if available
-                if provider.selected_featured_image:
-                    self._set_featured_image(post_id, provider.selected_featured_image)
-                
-                logger.info(f"✅ Created WordPress post {post_id} for {provider.provider_name}")
-                return {'success': True, 'post_id': post_id}
+                post_id = response.json().get('id')
+                return self._complete_sync(provider, post_id, plan, defer_db_update)
             else:
                 error_msg = f"WordPress API error {response.status_code}: {response.text[:200]}"
                 logger.error(f"❌ {error_msg}")
@@ -246,76 +631,38 @@ class WordPressPublisher:
             logger.error(f"❌ Create error: {str(e)}")
             return {'success': False, 'error': str(e)}
     
-    def update_provider(self, provider: Provider) -> Dict[str, Any]:
+    def update_provider(self, provider: Provider, defer_db_update: bool = False) -> Dict[str, Any]:
         """Update an existing WordPress post with romaji consistency
         
         Args:
             provider: Provider to update
+            defer_db_update: Return the sync info instead of writing it
             
         Returns:
             Result dictionary with success status
         """
-        # Get consistent English name
-        english_name = self._ensure_romaji_consistency(provider)
-        logger.info(f"🔄 Updating WordPress post {provider.wordpress_post_id} for {english_name}")
+        logger.info(f"🔄 Updating WordPress post {provider.wordpress_post_id} for {provider.provider_name}")
         
         try:
-            # Check if update is needed
-            if not self.hash_service.needs_update(provider):
-                logger.info(f"✅ No update needed for {english_name}")
-                return {'success': True, 'updated': False}
-            
-            # Get changed fields
-            changed_fields = self.hash_service.get_changed_fields(provider)
-            logger.info(f"📝 Updating fields: {', '.join(changed_fields)}")
+            plan = self._build_update_plan(provider)
             
-            # Use English/romaji name for WordPress title
-            title = english_name
-            
-            # Prepare update data
-            post_data = {
-                'title': title,
-                'content': self._generate_post_content(provider),
-                'categories': self._get_categories(provider),
-                'acf': self._prepare_acf_fields(provider)
-            }
-            
-            # Validate no Japanese characters in critical fields
-            critical_fields = {
-                'title': post_data['title'],
-                'seo_title': post_data['acf'].get('seo_title', ''),
-                'description': post_data['acf'].get(self.acf_field_mappings['description'], ''),
-                'excerpt': post_data['acf'].get('ai_excerpt', '')
-            }
+            if plan['action'] == 'skip':
+                logger.info(f"✅ No update needed for {provider.provider_name}")
+                return {'success': True, 'updated': False}
             
-            japanese_check = self._validate_no_japanese_in_content(critical_fields)
-            if japanese_check:
-                logger.warning(f"⚠️ Japanese characters found in {len(japanese_check)} fields: {list(japanese_check.keys())}")
-                # Continue but log the warning
+            if plan['action'] == 'record':
+                logger.info(f"✅ No WordPress changes for {provider.provider_name}")
+                return self._complete_sync(provider, provider.wordpress_post_id, plan, defer_db_update)
             
-            # Add custom taxonomies
-            taxonomies = self._get_taxonomies(provider)
-            post_data.update(taxonomies)
+            logger.info(f"📝 Sending {', '.join(plan['sent_fields'])}")
             
             # Make API request to healthcare_provider endpoint
-            response = requests.post(
-                f"{self.wp_url}/wp-json/wp/v2/healthcare_provider/{provider.wordpress_post_id}",
-                auth=(self.wp_username, self.wp_password),
-                json=post_data,
-                headers={'Content-Type': 'application/json'}
+            response = self._post_provider(
+                f"{self.wp_url}/wp-json/wp/v2/healthcare_provider/{provider.wordpress_post_id}", provider, plan
             )
             
             if response.status_code == 200:
-                # Update content hash
-                new_hash = self.hash_service.generate_hash(provider)
-                self.db.update_wordpress_info(provider.id, provider.wordpress_post_id, new_hash)
-                
-                # Update featured image if changed
-                if 'selected_featured_image' in changed_fields and provider.selected_featured_image:
-                    self._set_featured_image(provider.wordpress_post_id, provider.selected_featured_image)
-                
-                logger.info(f"✅ Updated WordPress post for {provider.provider_name}")
-                return {'success': True, 'updated': True, 'changed_fields': changed_fields}
+                return self._complete_sync(provider, provider.wordpress_post_id, plan, defer_db_update)
             else:
                 error_msg = f"WordPress API error {response.status_code}: {response.text[:200]}"
                 logger.error(f"❌ {error_msg}")
@@ -325,6 +672,90 @@ class WordPressPublisher:
             logger.error(f"❌ Update error: {str(e)}")
             return {'success': False, 'error': str(e)}
     
+    def _post_provider(self, url: str, provider: Provider, plan: Dict[str, Any]):
+        """Send a planned post payload
+        
+        A cached featured image may have been deleted from the media library
+        since it was uploaded; the post is then resent without it and the
+        image goes back through the media pipeline.
+        """
+        response = self._send_post_data(url, plan['post_data'])
+        
+        if 'featured_media' in plan['post_data'] and invalid_featured_media(response):
+            media_id = plan['post_data'].pop('featured_media')
+            logger.warning(f"⚠️ Media {media_id} no longer exists - re-uploading image for {provider.provider_name}")
+            self.media.forget(media_id)
+            plan['set_featured_image'] = True
+            if 'featured_media' in plan.get('sent_fields', []):
+                plan['sent_fields'].remove('featured_media')
+            response = self._send_post_data(url, plan['post_data'])
+        
+        return response
+    
+    def _send_post_data(self, url: str, post_data: Dict[str, Any]):
+        return self.http.post(
+            url,
+            auth=(self.wp_username, self.wp_password),
+            json=post_data,
+            headers={'Content-Type': 'application/json'},
+            timeout=self.timeout
+        )
+    
+    def _complete_sync(self, provider: Provider, post_id: int, plan: Dict[str, Any],
+                       defer_db_update: bool) -> Dict[str, Any]:
+        """Record a successful create/update and run its follow-up work"""
+        wordpress_info = self._record_sync(
+            provider, post_id, plan['content_hash'], plan['field_hashes'], defer_db_update
+        )
+        
+        # Queue featured image if new or changed (attached in the background)
+        if plan['set_featured_image']:
+            self.media.submit(post_id, provider.selected_featured_image)
+        
+        if plan['action'] == 'create':
+            logger.info(f"✅ Created WordPress post {post_id} for {provider.provider_name}")
+            return {'success': True, 'post_id': post_id, 'wordpress_info': wordpress_info}
+        
+        if plan['action'] == 'record':
+            return {'success': True, 'updated': False, 'wordpress_info': wordpress_info}
+        
+        logger.info(f"✅ Updated WordPress post for {provider.provider_name}")
+        return {
+            'success': True,
+            'updated': True,
+            'changed_fields': plan['changed_fields'],
+            'sent_fields': plan['sent_fields'],
+            'wordpress_info': wordpress_info
+        }
+    
+    def _merge_field_hashes(self, provider: Provider, post_fields: Dict[str, Any],
+                            acf_fields: Dict[str, Any]) -> Dict[str, Any]:
+        """Hash map after an update, keeping stored hashes for values not recomputed"""
+        field_hashes = self.hash_service.generate_field_hashes(provider, post_fields, acf_fields)
+        stored = provider.content_field_hashes
+        if isinstance(stored, dict) and stored.get('version') == field_hashes['version']:
+            # Taxonomy IDs are only resolved when their inputs change
+            field_hashes['post'] = {**stored.get('post', {}), **field_hashes['post']}
+        return field_hashes
+    
+    def _record_sync(self, provider: Provider, post_id: int, content_hash: str,
+                     field_hashes: Dict[str, Any], defer: bool) -> Optional[Dict[str, Any]]:
+        """Write sync info now, or return it for a batched write"""
+        provider.content_hash = content_hash
+        provider.content_field_hashes = field_hashes
+        
+        wordpress_info = {
+            'provider_id': provider.id,
+            'wordpress_post_id': post_id,
+            'content_hash': content_hash,
+            'content_field_hashes': field_hashes
+        }
+        if defer:
+            return wordpress_info
+        
+        self.db.update_wordpress_info(provider.id, post_id, content_hash, field_hashes)
+        return None
+    
     def _generate_post_content(self, provider: Provider) -> str:
         """Generate minimal post content (most data goes in ACF fields)
         
@@ -340,15 +771,25 @@ class WordPressPublisher:
     def _prepare_acf_fields(self, provider: Provider) -> Dict[str, Any]:
         """Prepare ACF fields for WordPress with romaji consistency and master data validation
         
+        The payload is rendered once per distinct set of input values and
+        served from the render cache afterwards.
+        
         Args:
             provider: Provider data
             
         Returns:
             Dictionary of ACF field values with English names and validated data
         """
-        # Get consistent English name
+        # Get consistent English name (may fill provider_name_romaji, so before the key)
         english_name = self._ensure_romaji_consistency(provider)
         
+        return self.render_cache.get_or_render(
+            ('acf', self.hash_service.render_key(provider)),
+            lambda: self._render_acf_fields(provider, english_name)
+        )
+    
+    def _render_acf_fields(self, provider: Provider, english_name: str) -> Dict[str, Any]:
+        """Build the ACF payload from scratch (see _prepare_acf_fields)"""
         # Validate and normalize location
         location_validation = self._validate_location(provider)
         
@@ -384,6 +825,12 @@ class WordPressPublisher:
         # Format reviews
         reviews_text = self._format_reviews(provider.review_content)
         
+        # Parse hours and review features once for all the formatters below
+        business_hours = self._parse_business_hours(getattr(provider, 'business_hours', None))
+        review_features = None
+        if provider.review_content or provider.review_keywords:
+            review_features = get_review_features(provider.review_content, provider.review_keywords)
+        
         # Format accessibility
         accessibility_info = []
         if provider.wheelchair_accessible == 'Yes':
@@ -459,23 +906,23 @@ class WordPressPublisher:
             "has_japanese_name": contains_japanese(provider.provider_name),
             
             # Business Hours (individual days)
-            "business_hours": self._format_business_hours_for_acf(provider.business_hours) if hasattr(provider, 'business_hours') else '',
-            "hours_monday": self._get_day_hours(provider.business_hours, 'Monday') if hasattr(provider, 'business_hours') else '',
-            "hours_tuesday": self._get_day_hours(provider.business_hours, 'Tuesday') if hasattr(provider, 'business_hours') else '',
-            "hours_wednesday": self._get_day_hours(provider.business_hours, 'Wednesday') if hasattr(provider, 'business_hours') else '',
-            "hours_thursday": self._get_day_hours(provider.business_hours, 'Thursday') if hasattr(provider, 'business_hours') else '',
-            "hours_friday": self._get_day_hours(provider.business_hours, 'Friday') if hasattr(provider, 'business_hours') else '',
-            "hours_saturday": self._get_day_hours(provider.business_hours, 'Saturday') if hasattr(provider, 'business_hours') else '',
-            "hours_sunday": self._get_day_hours(provider.business_hours, 'Sunday') if hasattr(provider, 'business_hours') else '',
-            "open_now": self._get_open_now_status(provider.business_hours) if hasattr(provider, 'business_hours') else 'Status unknown',
+            "business_hours": self._format_business_hours_for_acf(business_hours),
+            "hours_monday": self._get_day_hours(business_hours, 'Monday'),
+            "hours_tuesday": self._get_day_hours(business_hours, 'Tuesday'),
+            "hours_wednesday": self._get_day_hours(business_hours, 'Wednesday'),
+            "hours_thursday": self._get_day_hours(business_hours, 'Thursday'),
+            "hours_friday": self._get_day_hours(business_hours, 'Friday'),
+            "hours_saturday": self._get_day_hours(business_hours, 'Saturday'),
+            "hours_sunday": self._get_day_hours(business_hours, 'Sunday'),
+            "open_now": self._get_open_now_status(business_hours),
             
             # Accessibility Status Fields
             "accessibility_status": self._format_accessibility_status(provider.wheelchair_accessible),
             "parking_status": self._format_parking_status(provider.parking_available),
             
             # Patient Insights
-            "review_keywords": self._extract_patient_feedback_themes(provider.review_content),
-            "patient_highlights": self._generate_patient_highlights(provider.review_content),
+            "review_keywords": self._extract_patient_feedback_themes(provider.review_content, review_features),
+            "patient_highlights": self._generate_patient_highlights(provider.review_content, review_features),
             "english_indicators": self._extract_english_indicators(provider),
             
             # Content fields
@@ -655,36 +1102,55 @@ class WordPressPublisher:
         
         # Get the correct endpoint name
         endpoint = taxonomy_endpoints.get(taxonomy, taxonomy)
+        url = f"{self.wp_url}/wp-json/wp/v2/{endpoint}"
+        
+        # Resolve from the term index (bulk-loaded once, persisted with a TTL)
+        indexed = self.term_index.load(endpoint)
+        term_id = self.term_index.get(endpoint, term_name)
+        if term_id:
+            return term_id
         
+        with self._term_create_lock:
+            # Another worker may have created it while we waited
+            term_id = self.term_index.get(endpoint, term_name)
+            if term_id:
+                return term_id
+            return self._search_or_create_term(term_name, taxonomy, endpoint, url, indexed)
+    
+    def _search_or_create_term(self, term_name: str, taxonomy: str, endpoint: str,
+                               url: str, indexed: bool) -> Optional[int]:
+        """Find (when the index is unavailable) or create a taxonomy term over REST"""
         try:
-            # First, try to get existing term
-            url = f"{self.wp_url}/wp-json/wp/v2/{endpoint}"
-            logger.debug(f"Searching for term '{term_name}' at {url}")
-            
-            response = requests.get(
-                url,
-                auth=(self.wp_username, self.wp_password),
-                params={'search': term_name, 'per_page': 1}
-            )
-            
-            logger.debug(f"Search response: {response.status_code}")
-            
-            if response.status_code == 200:
-                terms = response.json()
-                if terms:
-                    logger.debug(f"Found existing term ID: {terms[0]['id']}")
-                    return terms[0]['id']
-            elif response.status_code == 404:
-                logger.warning(f"Taxonomy endpoint not found: {url}")
-                logger.warning(f"Response: {response.text[:200]}")
-                return None
+            if not indexed:
+                # Index unavailable - fall back to searching for the term
+                logger.debug(f"Searching for term '{term_name}' at {url}")
+                
+                response = self.http.get(
+                    url,
+                    auth=(self.wp_username, self.wp_password),
+                    params={'search': term_name, 'per_page': 1},
+                    timeout=self.timeout
+                )
+                
+                logger.debug(f"Search response: {response.status_code}")
+                
+                if response.status_code == 200:
+                    terms = response.json()
+                    if terms:
+                        logger.debug(f"Found existing term ID: {terms[0]['id']}")
+                        return terms[0]['id']
+                elif response.status_code == 404:
+                    logger.warning(f"Taxonomy endpoint not found: {url}")
+                    logger.warning(f"Response: {response.text[:200]}")
+                    return None
             
             # If term doesn't exist, create it
             logger.debug(f"Creating new term '{term_name}'")
-            response = requests.post(
+            response = self.http.post(
                 url,
                 auth=(self.wp_username, self.wp_password),
-                json={'name': term_name}
+                json={'name': term_name},
+                timeout=self.timeout
             )
             
             logger.debug(f"Create response: {response.status_code}")
@@ -692,9 +1158,18 @@ class WordPressPublisher:
             if response.status_code == 201:
                 term_id = response.json()['id']
                 logger.debug(f"Created new term ID: {term_id}")
+                self.term_index.add(endpoint, term_id, term_name)
                 return term_id
-            else:
-                logger.warning(f"Failed to create term: {response.status_code} - {response.text[:200]}")
+            
+            # Term was created elsewhere since the index was loaded
+            error = response.json() if response.headers.get('Content-Type', '').startswith('application/json') else {}
+            if error.get('code') == 'term_exists':
+                term_id = error.get('data', {}).get('term_id')
+                if term_id:
+                    self.term_index.add(endpoint, term_id, term_name)
+                    return term_id
+            
+            logger.warning(f"Failed to create term: {response.status_code} - {response.text[:200]}")
                 
         except Exception as e:
             logger.warning(f"Could not get/create term '{term_name}' in {taxonomy}: {e}")
@@ -710,9 +1185,6 @@ class WordPressPublisher:
         Returns:
             Dictionary with taxonomy term IDs
         """
-        # Import specialty detector
-        from ..utils.specialty_detector import SpecialtyDetector
-        
         taxonomies = {}
         
         # Set location taxonomy
@@ -738,8 +1210,35 @@ class WordPressPublisher:
             # WordPress REST API uses 'location' as the field name
             taxonomies['location'] = locations
         
-        # Enhanced specialty detection using multiple sources
-        detector = SpecialtyDetector()
+        # Enhanced specialty detection (cached per set of detection inputs)
+        cleaned_specialties = self.render_cache.get_or_render(
+            ('specialties', self.hash_service.render_key(provider, self.hash_service.taxonomy_fields)),
+            lambda: self._detect_specialties(provider)
+        )
+        
+        # Set specialty taxonomy with enhanced detection
+        specialties = []
+        for specialty in cleaned_specialties[:3]:  # Limit to top 3 specialties
+            term_id = self._get_or_create_term(specialty, 'healthcare-specialty')
+            if term_id:
+                specialties.append(term_id)
+        
+        if specialties:
+            # WordPress REST API uses 'specialties' as the field name
+            taxonomies['specialties'] = specialties
+        
+        return taxonomies
+    
+    def _detect_specialties(self, provider: Provider) -> List[str]:
+        """Determine the provider's specialty names with the shared detector
+        
+        Args:
+            provider: Provider data
+            
+        Returns:
+            Cleaned specialty names, most specific first
+        """
+        detector = self.specialty_detector
         
         # Extract Google types if available
         google_types = []
@@ -755,7 +1254,8 @@ class WordPressPublisher:
             reviews=provider.review_content if provider.review_content else [],
             google_types=google_types,
             description=provider.ai_description,
-            existing_specialties=provider.specialties if provider.specialties else []
+            existing_specialties=provider.specialties if provider.specialties else [],
+            review_features=provider.review_keywords
         )
         
         # Clean up the specialty list
@@ -772,21 +1272,10 @@ class WordPressPublisher:
         if len(cleaned_specialties) > 1 and 'General Medicine' in cleaned_specialties:
             cleaned_specialties = [s for s in cleaned_specialties if s != 'General Medicine']
         
-        # Set specialty taxonomy with enhanced detection
-        specialties = []
-        for specialty in cleaned_specialties[:3]:  # Limit to top 3 specialties
-            term_id = self._get_or_create_term(specialty, 'healthcare-specialty')
-            if term_id:
-                specialties.append(term_id)
-        
-        if specialties:
-            # WordPress REST API uses 'specialties' as the field name
-            taxonomies['specialties'] = specialties
-        
-        return taxonomies
+        return cleaned_specialties
     
     def _set_featured_image(self, post_id: int, image_url: str) -> bool:
-        """Set featured image for a post
+        """Set featured image for a post and wait for it to be attached
         
         Args:
             post_id: WordPress post ID
@@ -795,40 +1284,7 @@ class WordPressPublisher:
         Returns:
             Success status
         """
-        try:
-            # Download image
-            response = requests.get(image_url, timeout=30)
-            if response.status_code != 200:
-                return False
-            
-            # Upload to WordPress Media Library
-            files = {
-                'file': ('featured.jpg', response.content, 'image/jpeg')
-            }
-            
-            upload_response = requests.post(
-                f"{self.wp_url}/wp-json/wp/v2/media",
-                auth=(self.wp_username, self.wp_password),
-                files=files
-            )
-            
-            if upload_response.status_code == 201:
-                media = upload_response.json()
-                media_id = media.get('id')
-                
-                # Set as featured image on healthcare_provider CPT
-                update_response = requests.post(
-                    f"{self.wp_url}/wp-json/wp/v2/healthcare_provider/{post_id}",
-                    auth=(self.wp_username, self.wp_password),
-                    json={'featured_media': media_id}
-                )
-                
-                return update_response.status_code == 200
-                
-        except Exception as e:
-            logger.error(f"❌ Featured image error: {str(e)}")
-        
-        return False
+        return self.media.submit(post_id, image_url).result()
     
     def test_connection(self) -> Dict[str, Any]:
         """Test WordPress API connection
@@ -837,10 +1293,10 @@ class WordPressPublisher:
             Connection test results
         """
         try:
-            response = requests.get(
+            response = self.http.get(
                 f"{self.wp_url}/wp-json/wp/v2/users/me",
                 auth=(self.wp_username, self.wp_password),
-                timeout=10
+                timeout=self.timeout
             )
             
             if response.status_code == 200:
@@ -919,6 +1375,16 @@ class WordPressPublisher:
         else:
             return 'Operational'
     
+    @staticmethod
+    def _parse_business_hours(business_hours: Any) -> Any:
+        """Decode JSON-encoded business hours once (None if unparseable)"""
+        if isinstance(business_hours, str):
+            try:
+                return json.loads(business_hours)
+            except ValueError:
+                return None
+        return business_hours
+    
     def _format_business_hours_for_acf(self, business_hours: Any) -> str:
         """Format business hours for ACF field"""
         if not business_hours:
@@ -1003,131 +1469,69 @@ class WordPressPublisher:
         """Format parking status for ACF field"""
         return self._format_parking_availability(parking_available)
     
-    def _extract_patient_feedback_themes(self, review_content: Any) -> str:
-        """Extract patient feedback themes from reviews"""
-        if not review_content:
-            return ""
-        
-        # Simple keyword extraction (could be enhanced with NLP)
-        themes = []
-        
-        reviews = []
-        if isinstance(review_content, str):
-            try:
-                reviews = json.loads(review_content)
-            except:
-                return ""
-        elif isinstance(review_content, list):
-            reviews = review_content
+    # ACF repeater rows for each review highlight key
+    PATIENT_HIGHLIGHTS = {
+        'english_support': ('English-speaking support available', 'language'),
+        'clean_facilities': ('Clean and modern facilities', 'sparkles'),
+        'friendly_staff': ('Friendly and caring staff', 'heart'),
+        'professional_care': ('Professional medical care', 'stethoscope'),
+        'convenient_location': ('Convenient location', 'location')
+    }
+    
+    def _extract_patient_feedback_themes(self, review_content: Any,
+                                         review_features: Any = None) -> str:
+        """Extract patient feedback themes from reviews
         
-        # Extract common themes
-        keywords = {
-            'english': 0,
-            'friendly': 0,
-            'clean': 0,
-            'professional': 0,
-            'wait': 0,
-            'appointment': 0
-        }
+        Args:
+            review_content: Stored review content
+            review_features: Precomputed Provider.review_keywords, if available
+        """
+        if not review_content and not review_features:
+            return ""
         
-        for review in reviews:
-            if isinstance(review, dict) and 'text' in review:
-                text = review['text'].lower()
-                for keyword in keywords:
-                    if keyword in text:
-                        keywords[keyword] += 1
+        features = get_review_features(review_content, review_features)
+        if not features['review_count']:
+            return ""
         
         # Return top themes
-        for keyword, count in sorted(keywords.items(), key=lambda x: x[1], reverse=True):
+        themes = []
+        for keyword, count in sorted(features['theme_counts'].items(), key=lambda x: x[1], reverse=True):
             if count > 0:
                 themes.append(f"{keyword} ({count} mentions)")
         
         return ", ".join(themes[:5]) if themes else "No themes extracted"
     
-    def _generate_patient_highlights(self, review_content: Any) -> List[Dict[str, str]]:
-        """Generate patient highlights from reviews as ACF repeater field array"""
-        if not review_content:
-            return []
-        
-        reviews = []
-        if isinstance(review_content, str):
-            try:
-                reviews = json.loads(review_content)
-            except:
-                return []
-        elif isinstance(review_content, list):
-            reviews = review_content
+    def _generate_patient_highlights(self, review_content: Any,
+                                     review_features: Any = None) -> List[Dict[str, str]]:
+        """Generate patient highlights from reviews as ACF repeater field array
         
-        if not reviews or not isinstance(reviews, list):
+        Args:
+            review_content: Stored review content
+            review_features: Precomputed Provider.review_keywords, if available
+        """
+        if not review_content and not review_features:
             return []
         
-        highlights = []
-        
-        # Analyze reviews for common positive highlights
-        has_english_support = False
-        has_clean_facilities = False
-        has_friendly_staff = False
-        has_professional_care = False
-        has_convenient_location = False
-        
-        for review in reviews:
-            if isinstance(review, dict):
-                text = review.get('text', '').lower()
-                rating = review.get('rating', 0)
-                
-                # Only consider reviews with 4+ stars for highlights
-                if rating >= 4:
-                    if any(word in text for word in ['english', 'bilingual', 'speaks english']):
-                        has_english_support = True
-                    if any(word in text for word in ['clean', 'hygienic', 'spotless']):
-                        has_clean_facilities = True
-                    if any(word in text for word in ['friendly', 'kind', 'caring', 'welcoming']):
-                        has_friendly_staff = True
-                    if any(word in text for word in ['professional', 'expert', 'skilled']):
-                        has_professional_care = True
-                    if any(word in text for word in ['convenient', 'accessible', 'easy to find']):
-                        has_convenient_location = True
+        features = get_review_features(review_content, review_features)
+        if not features['review_count']:
+            return []
         
         # Build highlights array for ACF repeater field
-        if has_english_support:
-            highlights.append({
-                'highlight_text': 'English-speaking support available',
-                'highlight_icon': 'language'
-            })
-        
-        if has_clean_facilities:
-            highlights.append({
-                'highlight_text': 'Clean and modern facilities',
-                'highlight_icon': 'sparkles'
-            })
-        
-        if has_friendly_staff:
-            highlights.append({
-                'highlight_text': 'Friendly and caring staff',
-                'highlight_icon': 'heart'
-            })
-        
-        if has_professional_care:
+        highlights = []
+        for key in features['highlights']:
+            text, icon = self.PATIENT_HIGHLIGHTS[key]
             highlights.append({
-                'highlight_text': 'Professional medical care',
-                'highlight_icon': 'stethoscope'
+                'highlight_text': text,
+                'highlight_icon': icon
             })
         
-        if has_convenient_location:
+        # If no specific highlights found but has good reviews, add generic one
+        if not highlights and features['avg_rating'] >= 4.0:
             highlights.append({
-                'highlight_text': 'Convenient location',
-                'highlight_icon': 'location'
+                'highlight_text': 'Highly rated by patients',
+                'highlight_icon': 'star'
             })
         
-        # If no specific highlights found but has good reviews, add generic one
-        if not highlights and reviews:
-            avg_rating = sum(r.get('rating', 0) for r in reviews if isinstance(r, dict)) / len(reviews)
-            if avg_rating >= 4.0:
-                highlights.append({
-                    'highlight_text': 'Highly rated by patients',
-                    'highlight_icon': 'star'
-                })
-        
         return highlights
     
     def _extract_english_indicators(self, provider: Provider) -> str:
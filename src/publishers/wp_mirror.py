@@ -0,0 +1,373 @@
+#!/usr/bin/env python3
+"""
+WordPress Post Mirror
+Keeps a local SQLite mirror (id, slug, status, modified time and content
+hashes) of a post type, refreshed incrementally with modified_after cursors
+and _fields projection so drift checks do not re-download the whole site
+"""
+
+import os
+import json
+import sqlite3
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+import requests
+
+from .content_hash import ContentHashService
+
+logger = logging.getLogger(__name__)
+
+# Fields every mirrored post is fetched with
+BASE_FIELDS = ('id', 'slug', 'status', 'title', 'modified', 'modified_gmt')
+
+
+def hash_field(value: Any) -> Optional[str]:
+    """Hash a field value for mirror comparisons
+    
+    Whitespace-only differences are ignored and empty values hash to None,
+    so the same function works for WordPress and database values.
+    """
+    if isinstance(value, str):
+        value = value.strip()
+    if value is None or value == '' or value == [] or value is False:
+        return None
+    return ContentHashService.hash_value(value)
+
+
+class WordPressMirror:
+    """Incrementally refreshed local mirror of WordPress posts"""
+    
+    def __init__(self, wp_url: str, auth: Tuple[str, str],
+                 db_path: str = 'cache/wordpress_mirror.db',
+                 per_page: int = 100, overlap_seconds: int = 60,
+                 statuses: Sequence[str] = ('publish',),
+                 session: Optional[requests.Session] = None):
+        """Initialize the mirror
+        
+        Args:
+            wp_url: WordPress base URL
+            auth: (username, application password)
+            db_path: SQLite file the mirror is persisted to
+            per_page: Posts fetched per REST page (WordPress caps this at 100)
+            overlap_seconds: How far before the cursor each incremental fetch starts,
+                so posts saved in the same second as the last run are not missed
+            statuses: Post statuses to mirror
+            session: HTTP session to reuse (defaults to plain requests)
+        """
+        self.wp_url = wp_url.rstrip('/')
+        self.auth = auth
+        self.db_path = db_path
+        self.per_page = per_page
+        self.overlap = timedelta(seconds=overlap_seconds)
+        self.statuses = ','.join(statuses)
+        self.http = session or requests
+        
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._init_db()
+    
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=30)
+    
+    def _init_db(self):
+        """Initialize SQLite schema"""
+        with self._connect() as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS mirror_posts (
+                    post_type TEXT NOT NULL,
+                    post_id INTEGER NOT NULL,
+                    slug TEXT,
+                    title TEXT,
+                    status TEXT,
+                    modified TEXT,
+                    modified_gmt TEXT,
+                    content_hash TEXT,
+                    field_hashes TEXT,
+                    PRIMARY KEY (post_type, post_id)
+                )
+            ''')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS mirror_cursors (
+                    post_type TEXT PRIMARY KEY,
+                    modified TEXT,
+                    modified_gmt TEXT,
+                    acf_fields TEXT NOT NULL,
+                    refreshed_at TIMESTAMP NOT NULL
+                )
+            ''')
+            conn.commit()
+    
+    def _get_cursor(self, post_type: str) -> Optional[Dict[str, Any]]:
+        with self._connect() as conn:
+            row = conn.execute(
+                'SELECT modified, modified_gmt, acf_fields, refreshed_at FROM mirror_cursors WHERE post_type = ?',
+                (post_type,)
+            ).fetchone()
+        if not row:
+            return None
+        return {
+            'modified': row[0],
+            'modified_gmt': row[1],
+            'acf_fields': json.loads(row[2]),
+            'refreshed_at': row[3]
+        }
+    
+    def _fetch_pages(self, post_type: str, params: Dict[str, Any],
+                     per_page: Optional[int] = None) -> Iterable[Tuple[List[Dict], Dict]]:
+        """Yield (posts, headers) for each page of a REST collection query"""
+        url = f"{self.wp_url}/wp-json/wp/v2/{post_type}"
+        page = 1
+        total_pages = 1
+        
+        while page <= total_pages:
+            response = self.http.get(
+                url,
+                auth=self.auth,
+                params={**params, 'per_page': per_page or self.per_page, 'page': page, 'status': self.statuses},
+                timeout=30
+            )
+            
+            if response.status_code != 200:
+                raise RuntimeError(f"{post_type} page {page}: HTTP {response.status_code}")
+            
+            yield response.json(), response.headers
+            total_pages = int(response.headers.get('X-WP-TotalPages', page))
+            page += 1
+    
+    @staticmethod
+    def _mirror_row(post: Dict[str, Any], acf_fields: Sequence[str]) -> Dict[str, Any]:
+        """Reduce a projected REST post to its mirror row"""
+        title = post.get('title')
+        if isinstance(title, dict):
+            title = title.get('rendered')
+        acf = post.get('acf') or {}
+        field_hashes = {field: hash_field(acf.get(field)) for field in acf_fields}
+        
+        return {
+            'post_id': post['id'],
+            'slug': post.get('slug'),
+            'title': title,
+            'status': post.get('status'),
+            'modified': post.get('modified'),
+            'modified_gmt': post.get('modified_gmt'),
+            'field_hashes': field_hashes,
+            'content_hash': ContentHashService.hash_value({
+                'slug': post.get('slug'),
+                'title': title,
+                'status': post.get('status'),
+                'acf': field_hashes
+            })
+        }
+    
+    def _fetch_rows(self, post_type: str, acf_fields: Sequence[str],
+                    extra_params: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """Fetch projected posts and convert them to mirror rows"""
+        fields = list(BASE_FIELDS) + [f'acf.{field}' for field in acf_fields]
+        params = {'_fields': ','.join(fields), 'orderby': 'modified', 'order': 'asc'}
+        params.update(extra_params or {})
+        
+        rows = []
+        for posts, _ in self._fetch_pages(post_type, params):
+            rows.extend(self._mirror_row(post, acf_fields) for post in posts)
+        return rows
+    
+    def _remote_total(self, post_type: str) -> int:
+        """Number of posts WordPress reports for the mirrored statuses"""
+        for _, headers in self._fetch_pages(post_type, {'_fields': 'id'}, per_page=1):
+            return int(headers.get('X-WP-Total', 0))
+        return 0
+    
+    def _remote_ids(self, post_type: str) -> Set[int]:
+        """IDs of every mirrored post (id-only projection)"""
+        ids = set()
+        for posts, _ in self._fetch_pages(post_type, {'_fields': 'id'}):
+            ids.update(post['id'] for post in posts)
+        return ids
+    
+    def _local_ids(self, conn: sqlite3.Connection, post_type: str) -> Set[int]:
+        rows = conn.execute('SELECT post_id FROM mirror_posts WHERE post_type = ?', (post_type,)).fetchall()
+        return {row[0] for row in rows}
+    
+    def _upsert(self, conn: sqlite3.Connection, post_type: str, rows: List[Dict[str, Any]]) -> int:
+        """Write mirror rows, returning how many were new or changed"""
+        existing = dict(conn.execute(
+            'SELECT post_id, content_hash FROM mirror_posts WHERE post_type = ?', (post_type,)
+        ).fetchall())
+        changed = sum(1 for row in rows if existing.get(row['post_id']) != row['content_hash'])
+        
+        conn.executemany('''
+            INSERT OR REPLACE INTO mirror_posts
+                (post_type, post_id, slug, title, status, modified, modified_gmt, content_hash, field_hashes)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', [
+            (post_type, row['post_id'], row['slug'], row['title'], row['status'],
+             row['modified'], row['modified_gmt'], row['content_hash'], json.dumps(row['field_hashes']))
+            for row in rows
+        ])
+        return changed
+    
+    def refresh(self, post_type: str, acf_fields: Sequence[str] = (),
+                full: bool = False) -> Dict[str, Any]:
+        """Bring the mirror of a post type up to date
+        
+        Only posts modified since the stored cursor are fetched. Deleted or
+        unpublished posts do not show up in that query, so the remote post
+        count is compared with the mirror and an id-only sweep reconciles
+        the two when they disagree.
+        
+        Args:
+            post_type: REST endpoint of the post type (e.g. 'healthcare_provider')
+            acf_fields: ACF fields to hash into the mirror
+            full: Re-fetch every post even if a cursor exists
+        
+        Returns:
+            Statistics dict
+        """
+        start_time = time.time()
+        acf_fields = sorted(acf_fields)
+        cursor = self._get_cursor(post_type)
+        
+        # A different field set means stored hashes cannot be compared
+        if cursor is None or cursor['acf_fields'] != acf_fields:
+            full = True
+        
+        params = {}
+        if not full and cursor['modified']:
+            since = datetime.fromisoformat(cursor['modified']) - self.overlap
+            params['modified_after'] = since.isoformat()
+        
+        rows = self._fetch_rows(post_type, acf_fields, params)
+        stats = {
+            'post_type': post_type,
+            'mode': 'full' if full else 'incremental',
+            'fetched': len(rows),
+            'changed': 0,
+            'removed': 0,
+            'total': 0
+        }
+        
+        with self._connect() as conn:
+            local_ids = self._local_ids(conn, post_type)
+            fetched_ids = {row['post_id'] for row in rows}
+            
+            if full:
+                stale = local_ids - fetched_ids
+            else:
+                stale = set()
+                local_ids |= fetched_ids
+                if self._remote_total(post_type) != len(local_ids):
+                    remote_ids = self._remote_ids(post_type)
+                    stale = local_ids - remote_ids
+                    missing = remote_ids - local_ids
+                    if missing:
+                        # Posts older than the cursor that the mirror never saw
+                        missing = sorted(missing)
+                        for start in range(0, len(missing), self.per_page):
+                            chunk = missing[start:start + self.per_page]
+                            rows.extend(self._fetch_rows(post_type, acf_fields,
+                                                         {'include': ','.join(map(str, chunk))}))
+                        stats['fetched'] = len(rows)
+            
+            stats['changed'] = self._upsert(conn, post_type, rows)
+            
+            if stale:
+                conn.executemany(
+                    'DELETE FROM mirror_posts WHERE post_type = ? AND post_id = ?',
+                    [(post_type, post_id) for post_id in stale]
+                )
+            stats['removed'] = len(stale)
+            
+            # Advance the high-water mark only after a complete pass
+            high = conn.execute(
+                'SELECT MAX(modified), MAX(modified_gmt), COUNT(*) FROM mirror_posts WHERE post_type = ?',
+                (post_type,)
+            ).fetchone()
+            conn.execute(
+                'INSERT OR REPLACE INTO mirror_cursors (post_type, modified, modified_gmt, acf_fields, refreshed_at) '
+                'VALUES (?, ?, ?, ?, ?)',
+                (post_type, high[0], high[1], json.dumps(acf_fields), datetime.now().isoformat())
+            )
+            conn.commit()
+            stats['total'] = high[2]
+        
+        stats['elapsed_seconds'] = round(time.time() - start_time, 2)
+        logger.info(f"🪞 {post_type} mirror ({stats['mode']}): fetched {stats['fetched']}, "
+                    f"changed {stats['changed']}, removed {stats['removed']}, total {stats['total']}")
+        return stats
+    
+    def posts(self, post_type: str) -> List[Dict[str, Any]]:
+        """All mirrored posts of a post type, ordered by post ID"""
+        with self._connect() as conn:
+            rows = conn.execute('''
+                SELECT post_id, slug, title, status, modified, modified_gmt, content_hash, field_hashes
+                FROM mirror_posts
+                WHERE post_type = ?
+                ORDER BY post_id
+            ''', (post_type,)).fetchall()
+        
+        return [
+            {
+                'post_id': row[0],
+                'slug': row[1],
+                'title': row[2],
+                'status': row[3],
+                'modified': row[4],
+                'modified_gmt': row[5],
+                'content_hash': row[6],
+                'field_hashes': json.loads(row[7] or '{}')
+            }
+            for row in rows
+        ]
+    
+    def cursor(self, post_type: str) -> Optional[str]:
+        """modified_gmt high-water mark of a post type"""
+        cursor = self._get_cursor(post_type)
+        return cursor['modified_gmt'] if cursor else None
+    
+    def find_drift(self, post_type: str,
+                   expected: Dict[int, Dict[str, Any]]) -> Dict[str, Any]:
+        """Compare the mirror with the values the database expects
+        
+        Args:
+            post_type: Mirrored post type
+            expected: post ID → {acf field: expected value}
+        
+        Returns:
+            Dict with 'missing' (expected but not on WordPress), 'extra'
+            (on WordPress but not expected) and 'changed' (post ID → fields
+            whose WordPress value differs)
+        """
+        mirrored = {post['post_id']: post for post in self.posts(post_type)}
+        changed = {}
+        
+        for post_id, fields in expected.items():
+            post = mirrored.get(post_id)
+            if post is None:
+                continue
+            differing = [
+                field for field, value in fields.items()
+                if post['field_hashes'].get(field) != hash_field(value)
+            ]
+            if differing:
+                changed[post_id] = differing
+        
+        return {
+            'missing': sorted(set(expected) - set(mirrored)),
+            'extra': sorted(set(mirrored) - set(expected)),
+            'changed': changed
+        }
+    
+    def reset(self, post_type: Optional[str] = None):
+        """Forget a post type (or everything) so the next refresh is full"""
+        with self._connect() as conn:
+            if post_type:
+                conn.execute('DELETE FROM mirror_posts WHERE post_type = ?', (post_type,))
+                conn.execute('DELETE FROM mirror_cursors WHERE post_type = ?', (post_type,))
+            else:
+                conn.execute('DELETE FROM mirror_posts')
+                conn.execute('DELETE FROM mirror_cursors')
+            conn.commit()
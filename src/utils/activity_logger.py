@@ -4,29 +4,39 @@ Activity Logger Service
 Centralized logging service for tracking all system operations
 """
 
-import json
 from datetime import datetime
 from typing import Optional, Dict, Any, List
-from sqlalchemy import create_engine, text
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import column, insert, table, text
+from sqlalchemy.dialects.postgresql import JSONB
 import logging
-from ..core.database import get_postgres_config
+from ..core.database import get_engine, get_session_factory
+from ..core.event_sink import get_event_sink
 
 logger = logging.getLogger(__name__)
 
+ACTIVITY_LOG = table(
+    'activity_log',
+    column('activity_type'), column('activity_category'), column('description'),
+    column('provider_id'), column('provider_name'), column('details', JSONB(none_as_null=True)),
+    column('status'), column('duration_ms'), column('error_message'), column('user_id'),
+    column('created_at')
+)
+
+INSERT_ACTIVITY = insert(ACTIVITY_LOG)
+
 class ActivityLogger:
     """Service for logging all system activities to the database"""
     
     def __init__(self):
-        config = get_postgres_config()
-        self.engine = create_engine(
-            f"postgresql://{config['user']}:{config['password']}@{config['host']}:5432/{config['database']}",
-            pool_size=5,
-            max_overflow=10,
-            pool_pre_ping=True,
-            pool_recycle=3600
-        )
-        self.Session = sessionmaker(bind=self.engine)
+        # Shares the process-wide pool with DatabaseManager
+        self.engine = get_engine()
+        self.Session = get_session_factory()
+        # Activity rows are buffered and written in batches off the request path
+        self.events = get_event_sink()
+    
+    def flush(self) -> None:
+        """Write buffered activities now"""
+        self.events.flush()
     
     def log_activity(
         self,
@@ -41,43 +51,25 @@ class ActivityLogger:
         error_message: Optional[str] = None,
         user_id: Optional[int] = None
     ) -> bool:
-        """Log a single activity to the database"""
-        session = None
-        try:
-            session = self.Session()
-            session.execute(text("""
-                INSERT INTO activity_log (
-                    activity_type, activity_category, description,
-                    provider_id, provider_name, details, status,
-                    duration_ms, error_message, user_id, created_at
-                ) VALUES (
-                    :activity_type, :activity_category, :description,
-                    :provider_id, :provider_name, :details::jsonb, :status,
-                    :duration_ms, :error_message, :user_id, :created_at
-                )
-            """), {
-                'activity_type': activity_type,
-                'activity_category': activity_category,
-                'description': description,
-                'provider_id': provider_id,
-                'provider_name': provider_name,
-                'details': json.dumps(details) if details else None,
-                'status': status,
-                'duration_ms': duration_ms,
-                'error_message': error_message,
-                'user_id': user_id,
-                'created_at': datetime.now()
-            })
-            session.commit()
-            return True
-        except Exception as e:
-            logger.error(f"Error logging activity: {str(e)}")
-            if session:
-                session.rollback()
-            return False
-        finally:
-            if session:
-                session.close()
+        """Queue a single activity for the activity log
+        
+        Returns:
+            True once queued; rows are written by the event sink
+        """
+        self.events.add(INSERT_ACTIVITY, {
+            'activity_type': activity_type,
+            'activity_category': activity_category,
+            'description': description,
+            'provider_id': provider_id,
+            'provider_name': provider_name,
+            'details': details or None,
+            'status': status,
+            'duration_ms': duration_ms,
+            'error_message': error_message,
+            'user_id': user_id,
+            'created_at': datetime.now()
+        })
+        return True
     
     def log_provider_creation(
         self,
@@ -192,6 +184,7 @@ class ActivityLogger:
         hours_ago: int = 24
     ) -> List[Dict[str, Any]]:
         """Retrieve recent activities from the log"""
+        self.flush()
         session = None
         try:
             session = self.Session()
@@ -256,6 +249,7 @@ class ActivityLogger:
         hours_ago: int = 24
     ) -> Dict[str, Any]:
         """Get summary statistics of recent activities"""
+        self.flush()
         session = None
         try:
             session = self.Session()
@@ -1,18 +1,39 @@
 #!/usr/bin/env python3
 """
 Pipeline Execution Tracker
-Tracks pipeline runs and individual step progress
+Tracks pipeline runs and individual step progress. Step events are buffered
+and written in batches; run status changes flush them first.
 """
 
 import logging
 from datetime import datetime
 from typing import Dict, List, Optional, Any
 
+from sqlalchemy import and_, bindparam, insert, update
+
 from ..core.database import DatabaseManager
+from ..core.event_sink import get_event_sink
 from ..core.models import PipelineRun, PipelineStep
 
 logger = logging.getLogger(__name__)
 
+STEPS = PipelineStep.__table__
+
+INSERT_STEP = insert(STEPS)
+
+# Completes a step whose 'running' row was already written
+FINISH_STEP = update(STEPS).where(and_(
+    STEPS.c.run_id == bindparam('b_run_id'),
+    STEPS.c.provider_id == bindparam('b_provider_id'),
+    STEPS.c.step_name == bindparam('b_step_name'),
+    STEPS.c.status == 'running'
+)).values(
+    status=bindparam('b_status'),
+    completed_at=bindparam('b_completed_at'),
+    details=bindparam('b_details'),
+    error_message=bindparam('b_error_message')
+)
+
 
 class PipelineTracker:
     """Track pipeline execution progress"""
@@ -20,9 +41,16 @@ class PipelineTracker:
     def __init__(self):
         """Initialize pipeline tracker"""
         self.db = DatabaseManager()
+        self.events = get_event_sink()
         self.current_run_id = None
+        # Steps of the current run whose start was logged
+        self._started = set()
         logger.info("✅ Pipeline Tracker initialized")
     
+    def flush(self) -> None:
+        """Write buffered step events now"""
+        self.events.flush()
+    
     def start_run(self, run_id: str, run_type: str, config: Dict = None) -> None:
         """Start tracking a new pipeline run
         
@@ -31,7 +59,9 @@ class PipelineTracker:
             run_type: Type of run (full, collect, process, etc.)
             config: Configuration for this run
         """
+        self.flush()
         self.current_run_id = run_id
+        self._started = set()
         
         session = self.db.get_session()
         try:
@@ -63,6 +93,7 @@ class PipelineTracker:
             successful: Successful providers
             failed: Failed providers
         """
+        self.flush()
         session = self.db.get_session()
         try:
             run = session.query(PipelineRun).filter_by(run_id=run_id).first()
@@ -89,6 +120,7 @@ class PipelineTracker:
             run_id: Run identifier
             error: Error message
         """
+        self.flush()
         session = self.db.get_session()
         try:
             run = session.query(PipelineRun).filter_by(run_id=run_id).first()
@@ -106,6 +138,43 @@ class PipelineTracker:
         finally:
             session.close()
     
+    def _finish_step(self, provider_id: int, provider_name: str, step_name: str,
+                     status: str, details: Dict = None, error_message: str = None) -> None:
+        """Queue the outcome of a step
+        
+        A start still in the buffer is completed in place; one already written
+        is updated; otherwise a completed row is inserted.
+        """
+        now = datetime.utcnow()
+        key = (self.current_run_id, provider_id, step_name)
+        changes = {
+            'status': status,
+            'completed_at': now,
+            'details': details,
+            'error_message': error_message
+        }
+        
+        if self.events.merge(INSERT_STEP, key, changes):
+            # The start never left the buffer; one row carries both
+            pass
+        elif key in self._started:
+            self.events.add(FINISH_STEP, {
+                'b_run_id': self.current_run_id,
+                'b_provider_id': provider_id,
+                'b_step_name': step_name,
+                **{f'b_{name}': value for name, value in changes.items()}
+            })
+        else:
+            self.events.add(INSERT_STEP, {
+                'run_id': self.current_run_id,
+                'provider_id': provider_id,
+                'provider_name': provider_name,
+                'step_name': step_name,
+                'started_at': now,
+                **changes
+            })
+        self._started.discard(key)
+    
     def log_step_start(self, provider_id: int, provider_name: str, 
                       step_name: str) -> None:
         """Log the start of a processing step
@@ -118,26 +187,21 @@ class PipelineTracker:
         if not self.current_run_id:
             return
         
-        session = self.db.get_session()
-        try:
-            step = PipelineStep(
-                run_id=self.current_run_id,
-                provider_id=provider_id,
-                provider_name=provider_name,
-                step_name=step_name,
-                status='running',
-                started_at=datetime.utcnow()
-            )
-            session.add(step)
-            session.commit()
-            
-            logger.debug(f"▶️ Started {step_name} for {provider_name}")
-            
-        except Exception as e:
-            session.rollback()
-            logger.error(f"Error logging step start: {str(e)}")
-        finally:
-            session.close()
+        key = (self.current_run_id, provider_id, step_name)
+        self.events.add(INSERT_STEP, {
+            'run_id': self.current_run_id,
+            'provider_id': provider_id,
+            'provider_name': provider_name,
+            'step_name': step_name,
+            'status': 'running',
+            'started_at': datetime.utcnow(),
+            'completed_at': None,
+            'details': None,
+            'error_message': None
+        }, key=key)
+        self._started.add(key)
+        
+        logger.debug(f"▶️ Started {step_name} for {provider_name}")
     
     def log_step_success(self, provider_id: int, provider_name: str,
                         step_name: str, details: Dict = None) -> None:
@@ -152,41 +216,8 @@ class PipelineTracker:
         if not self.current_run_id:
             return
         
-        session = self.db.get_session()
-        try:
-            step = session.query(PipelineStep).filter_by(
-                run_id=self.current_run_id,
-                provider_id=provider_id,
-                step_name=step_name,
-                status='running'
-            ).first()
-            
-            if step:
-                step.status = 'success'
-                step.completed_at = datetime.utcnow()
-                step.details = details or {}
-            else:
-                # Create new step record if not found
-                step = PipelineStep(
-                    run_id=self.current_run_id,
-                    provider_id=provider_id,
-                    provider_name=provider_name,
-                    step_name=step_name,
-                    status='success',
-                    started_at=datetime.utcnow(),
-                    completed_at=datetime.utcnow(),
-                    details=details or {}
-                )
-                session.add(step)
-            
-            session.commit()
-            logger.debug(f"✅ Completed {step_name} for {provider_name}")
-            
-        except Exception as e:
-            session.rollback()
-            logger.error(f"Error logging step success: {str(e)}")
-        finally:
-            session.close()
+        self._finish_step(provider_id, provider_name, step_name, 'success', details=details or {})
+        logger.debug(f"✅ Completed {step_name} for {provider_name}")
     
     def log_failure(self, provider_id: int, provider_name: str,
                    step_name: str, status: str, error_message: str) -> None:
@@ -202,40 +233,8 @@ class PipelineTracker:
         if not self.current_run_id:
             return
         
-        session = self.db.get_session()
-        try:
-            step = session.query(PipelineStep).filter_by(
-                run_id=self.current_run_id,
-                provider_id=provider_id,
-                step_name=step_name,
-                status='running'
-            ).first()
-            
-            if step:
-                step.status = status
-                step.completed_at = datetime.utcnow()
-                step.error_message = error_message
-            else:
-                step = PipelineStep(
-                    run_id=self.current_run_id,
-                    provider_id=provider_id,
-                    provider_name=provider_name,
-                    step_name=step_name,
-                    status=status,
-                    started_at=datetime.utcnow(),
-                    completed_at=datetime.utcnow(),
-                    error_message=error_message
-                )
-                session.add(step)
-            
-            session.commit()
-            logger.warning(f"❌ {provider_name}: Failed at {step_name} - {status}")
-            
-        except Exception as e:
-            session.rollback()
-            logger.error(f"Error logging failure: {str(e)}")
-        finally:
-            session.close()
+        self._finish_step(provider_id, provider_name, step_name, status, error_message=error_message)
+        logger.warning(f"❌ {provider_name}: Failed at {step_name} - {status}")
     
     def get_run_status(self, run_id: str) -> Dict[str, Any]:
         """Get status of a pipeline run
@@ -246,6 +245,7 @@ class PipelineTracker:
         Returns:
             Run status information
         """
+        self.flush()
         session = self.db.get_session()
         try:
             run = session.query(PipelineRun).filter_by(run_id=run_id).first()
@@ -341,6 +341,7 @@ class PipelineTracker:
         Returns:
             List of processing history
         """
+        self.flush()
         session = self.db.get_session()
         try:
             steps = session.query(PipelineStep).filter_by(
@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+"""
+Single-pass review feature extraction
+Scans patient review text once with an Aho-Corasick matcher over every keyword
+set used downstream (English support, positive themes, feedback themes,
+highlights, specialty hints) and produces a compact feature dict that is
+stored on the provider in review_keywords / review_highlights.
+"""
+
+import ast
+import json
+import logging
+from collections import deque
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from .specialty_detector import SpecialtyDetector
+
+logger = logging.getLogger(__name__)
+
+# Bump when keyword sets or the feature layout change so stored features are rebuilt
+REVIEW_FEATURES_VERSION = 1
+
+# Reviews that mention any of these count as English support mentions
+ENGLISH_KEYWORDS = [
+    'english', '英語', 'えいご', 'foreign', 'international',
+    'interpreter', 'translation', 'bilingual'
+]
+
+# Positive words surfaced as themes in AI content prompts
+POSITIVE_KEYWORDS = [
+    'excellent', 'great', 'good', 'professional', 'friendly',
+    'helpful', 'clean', 'modern', 'efficient', 'thorough'
+]
+
+# Patient feedback themes shown in the review_keywords ACF field
+FEEDBACK_THEME_KEYWORDS = [
+    'english', 'friendly', 'clean', 'professional', 'wait', 'appointment'
+]
+
+# Highlight groups, only counted for reviews rated 4 stars or more
+HIGHLIGHT_KEYWORDS = {
+    'english_support': ['english', 'bilingual', 'speaks english'],
+    'clean_facilities': ['clean', 'hygienic', 'spotless'],
+    'friendly_staff': ['friendly', 'kind', 'caring', 'welcoming'],
+    'professional_care': ['professional', 'expert', 'skilled'],
+    'convenient_location': ['convenient', 'accessible', 'easy to find']
+}
+
+HIGHLIGHT_MIN_RATING = 4
+
+
+class AhoCorasickMatcher:
+    """Multi-pattern substring matcher over labelled keyword groups
+    
+    All patterns are matched case-insensitively in a single pass over the text,
+    regardless of how many groups or keywords are registered.
+    """
+    
+    def __init__(self, keyword_groups: Dict[str, Iterable[str]], whole_words: bool = False):
+        """Build the automaton
+        
+        Args:
+            keyword_groups: Mapping of group label to keywords
+            whole_words: Only report ASCII keywords at word boundaries
+        """
+        self.whole_words = whole_words
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._outputs: List[List[tuple]] = [[]]
+        
+        for group, keywords in keyword_groups.items():
+            for keyword in keywords:
+                self._add_pattern(keyword.lower(), group)
+        
+        self._build_failure_links()
+    
+    def _add_pattern(self, pattern: str, group: str):
+        """Insert one pattern into the trie"""
+        if not pattern:
+            return
+        
+        state = 0
+        for char in pattern:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._outputs.append([])
+            state = next_state
+        
+        self._outputs[state].append((group, pattern))
+    
+    def _build_failure_links(self):
+        """Breadth-first construction of failure links and merged outputs"""
+        queue = deque(self._goto[0].values())
+        
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                
+                target = self._goto[fallback].get(char, 0)
+                self._fail[next_state] = target if target != next_state else 0
+                self._outputs[next_state] = self._outputs[next_state] + self._outputs[self._fail[next_state]]
+    
+    @staticmethod
+    def _is_word_char(char: str) -> bool:
+        return char.isascii() and (char.isalnum() or char == '_')
+    
+    def _at_word_boundary(self, text: str, start: int, end: int, pattern: str) -> bool:
+        """Whole-word check that only applies to ASCII patterns"""
+        if not pattern.isascii():
+            return True
+        before = text[start - 1] if start > 0 else ' '
+        after = text[end] if end < len(text) else ' '
+        return not self._is_word_char(before) and not self._is_word_char(after)
+    
+    def find(self, text: str) -> Dict[str, Set[str]]:
+        """Find all keyword groups present in text
+        
+        Args:
+            text: Text to scan (any case)
+        
+        Returns:
+            Mapping of group label to the set of keywords found
+        """
+        matches: Dict[str, Set[str]] = {}
+        if not text:
+            return matches
+        
+        text = text.lower()
+        state = 0
+        
+        for index, char in enumerate(text):
+            while state and char not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(char, 0)
+            
+            for group, pattern in self._outputs[state]:
+                if self.whole_words:
+                    start = index - len(pattern) + 1
+                    if not self._at_word_boundary(text, start, index + 1, pattern):
+                        continue
+                matches.setdefault(group, set()).add(pattern)
+        
+        return matches
+
+
+def _build_review_matcher() -> AhoCorasickMatcher:
+    """Combine every review keyword set into one automaton"""
+    groups = {
+        'english': ENGLISH_KEYWORDS,
+        'positive': POSITIVE_KEYWORDS,
+        'theme': FEEDBACK_THEME_KEYWORDS
+    }
+    for highlight, keywords in HIGHLIGHT_KEYWORDS.items():
+        groups[f'highlight:{highlight}'] = keywords
+    for specialty, keywords in SpecialtyDetector.REVIEW_SPECIALTY_PATTERNS.items():
+        groups[f'specialty:{specialty}'] = keywords
+    return AhoCorasickMatcher(groups)
+
+
+_review_matcher: Optional[AhoCorasickMatcher] = None
+
+
+def get_review_matcher() -> AhoCorasickMatcher:
+    """Shared review matcher, built on first use"""
+    global _review_matcher
+    if _review_matcher is None:
+        _review_matcher = _build_review_matcher()
+    return _review_matcher
+
+
+def parse_review_content(review_content: Any) -> List[Any]:
+    """Normalize stored review content into a list of reviews
+    
+    Args:
+        review_content: List of reviews, or a JSON / Python-literal string of one
+    
+    Returns:
+        List of review dicts (or strings); empty list if unparseable
+    """
+    if not review_content:
+        return []
+    
+    if isinstance(review_content, list):
+        return review_content
+    
+    if isinstance(review_content, str):
+        try:
+            reviews = json.loads(review_content)
+        except (ValueError, TypeError):
+            try:
+                # Older rows were stored with str() of a Python list
+                reviews = ast.literal_eval(review_content)
+            except (ValueError, SyntaxError):
+                return []
+        return reviews if isinstance(reviews, list) else []
+    
+    return []
+
+
+def extract_review_features(review_content: Any) -> Dict[str, Any]:
+    """Scan reviews once and collect every downstream keyword feature
+    
+    Args:
+        review_content: Reviews as stored on the provider or returned by Google
+    
+    Returns:
+        Feature dict suitable for Provider.review_keywords
+    """
+    reviews = parse_review_content(review_content)
+    matcher = get_review_matcher()
+    
+    english_mentions = []
+    positive_themes: Set[str] = set()
+    theme_counts = {keyword: 0 for keyword in FEEDBACK_THEME_KEYWORDS}
+    highlights: Set[str] = set()
+    specialty_keywords: Dict[str, Set[str]] = {}
+    rating_total = 0
+    rated_reviews = 0
+    
+    for review in reviews:
+        if isinstance(review, dict):
+            text = review.get('text', '') or ''
+            rating = review.get('rating', 0) or 0
+            rating_total += rating
+            rated_reviews += 1
+        elif isinstance(review, str):
+            text, rating = review, 0
+        else:
+            continue
+        
+        matches = matcher.find(text)
+        
+        if 'english' in matches:
+            english_mentions.append(text[:200])
+        
+        for word in matches.get('positive', ()):
+            positive_themes.add(word.capitalize())
+        
+        for keyword in matches.get('theme', ()):
+            theme_counts[keyword] += 1
+        
+        for group, keywords in matches.items():
+            if group.startswith('highlight:') and rating >= HIGHLIGHT_MIN_RATING:
+                highlights.add(group.split(':', 1)[1])
+            elif group.startswith('specialty:'):
+                specialty_keywords.setdefault(group.split(':', 1)[1], set()).update(keywords)
+    
+    return {
+        'version': REVIEW_FEATURES_VERSION,
+        'review_count': len(reviews),
+        'avg_rating': rating_total / rated_reviews if rated_reviews else 0,
+        'english_mentions': english_mentions,
+        'positive_themes': sorted(positive_themes),
+        'theme_counts': {k: v for k, v in theme_counts.items() if v},
+        # Keep the highlight order stable for ACF repeater output
+        'highlights': [h for h in HIGHLIGHT_KEYWORDS if h in highlights],
+        'specialty_keywords': {k: sorted(v) for k, v in specialty_keywords.items()}
+    }
+
+
+def get_review_features(review_content: Any, stored_features: Any = None) -> Dict[str, Any]:
+    """Return precomputed features when current, otherwise extract them
+    
+    Args:
+        review_content: Provider review content (used only on a cache miss)
+        stored_features: Provider.review_keywords as loaded from the database
+    
+    Returns:
+        Review feature dict
+    """
+    if isinstance(stored_features, str):
+        try:
+            stored_features = json.loads(stored_features)
+        except ValueError:
+            stored_features = None
+    
+    if isinstance(stored_features, dict) and stored_features.get('version') == REVIEW_FEATURES_VERSION:
+        return stored_features
+    
+    return extract_review_features(review_content)
+
+
+def review_feature_columns(review_content: Any) -> Dict[str, Any]:
+    """Provider column values for freshly collected reviews"""
+    features = extract_review_features(review_content)
+    return {
+        'review_keywords': features,
+        'review_highlights': features['highlights']
+    }
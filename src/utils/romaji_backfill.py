@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Parallel romaji backfill
+Romanizes provider names across a process pool: the main process walks the
+providers table in keyset pages, workers (each with its own Cutlet tagger)
+convert chunks of names, and results are written back in batched
+UPDATE ... FROM (VALUES ...) statements.
+"""
+
+import os
+import time
+import logging
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from sqlalchemy import text
+
+logger = logging.getLogger(__name__)
+
+# Same character classes as contains_japanese(), expressed as a Postgres regex
+JAPANESE_NAME_REGEX = '[\u3040-\u309f\u30a0-\u30ff\u4e00-\u9faf\u31f0-\u31ff\u3400-\u4dbf]'
+
+
+def _init_worker():
+    """Build the worker's tagger once, before it receives any work"""
+    from .romaji_converter import CUTLET_AVAILABLE, get_romaji_converter
+    if CUTLET_AVAILABLE:
+        get_romaji_converter().katsu
+
+
+def romanize_rows(rows: Sequence[Tuple[int, str]]) -> List[Tuple[int, str]]:
+    """Convert a chunk of (id, provider_name) rows
+    
+    Args:
+        rows: Provider ids and Japanese names
+    
+    Returns:
+        (id, romaji) pairs for names that produced a usable conversion
+    """
+    from .romaji_converter import convert_to_romaji
+    
+    results = []
+    for provider_id, provider_name in rows:
+        try:
+            romaji = convert_to_romaji(provider_name)
+        except Exception as e:
+            logger.error(f"Error converting provider {provider_id}: {e}")
+            continue
+        if romaji and romaji != provider_name:
+            results.append((provider_id, romaji))
+    return results
+
+
+def build_romaji_update(pairs: Sequence[Tuple[int, str]]) -> Tuple[Any, Dict[str, Any]]:
+    """Build one UPDATE ... FROM (VALUES ...) statement for a batch of results
+    
+    Args:
+        pairs: (id, romaji) pairs
+    
+    Returns:
+        Tuple of (SQL text clause, bind parameters)
+    """
+    values = []
+    params = {}
+    for i, (provider_id, romaji) in enumerate(pairs):
+        values.append(f"(CAST(:id_{i} AS INTEGER), CAST(:romaji_{i} AS VARCHAR))")
+        params[f'id_{i}'] = provider_id
+        params[f'romaji_{i}'] = romaji
+    
+    statement = text(f"""
+        UPDATE providers AS p
+        SET provider_name_romaji = v.romaji
+        FROM (VALUES {', '.join(values)}) AS v(id, romaji)
+        WHERE p.id = v.id
+          AND p.provider_name_romaji IS DISTINCT FROM v.romaji
+    """)
+    return statement, params
+
+
+class RomajiBackfill:
+    """Process-pool romaji backfill engine"""
+    
+    def __init__(self, db=None, workers: Optional[int] = None,
+                 page_size: int = 2000, chunk_size: int = 200,
+                 write_batch_size: int = 500, only_missing: bool = True,
+                 dry_run: bool = False):
+        """Initialize the backfill
+        
+        Args:
+            db: DatabaseManager (created if omitted)
+            workers: Worker processes (default: CPU count)
+            page_size: Rows fetched per keyset page
+            chunk_size: Rows sent to a worker per task
+            write_batch_size: Results written per UPDATE statement
+            only_missing: Skip providers that already have romaji
+            dry_run: Convert but do not write
+        """
+        if db is None:
+            from ..core.database import DatabaseManager
+            db = DatabaseManager()
+        
+        self.db = db
+        self.workers = workers or os.cpu_count() or 1
+        self.page_size = page_size
+        self.chunk_size = chunk_size
+        self.write_batch_size = write_batch_size
+        self.only_missing = only_missing
+        self.dry_run = dry_run
+        
+        self.stats = {
+            'scanned': 0,
+            'converted': 0,
+            'written': 0,
+            'elapsed_seconds': 0.0
+        }
+    
+    def _iter_chunks(self) -> Iterator[List[Tuple[int, str]]]:
+        """Walk Japanese-named providers in keyset pages, yielding worker chunks"""
+        missing_filter = "AND provider_name_romaji IS NULL" if self.only_missing else ""
+        last_id = 0
+        
+        while True:
+            session = self.db.get_session()
+            try:
+                rows = session.execute(text(f"""
+                    SELECT id, provider_name
+                    FROM providers
+                    WHERE id > :last_id
+                      AND provider_name ~ :pattern
+                      {missing_filter}
+                    ORDER BY id
+                    LIMIT :limit
+                """), {
+                    'last_id': last_id,
+                    'pattern': JAPANESE_NAME_REGEX,
+                    'limit': self.page_size
+                }).fetchall()
+            finally:
+                session.close()
+            
+            if not rows:
+                return
+            
+            last_id = rows[-1][0]
+            self.stats['scanned'] += len(rows)
+            
+            page = [(row[0], row[1]) for row in rows]
+            for start in range(0, len(page), self.chunk_size):
+                yield page[start:start + self.chunk_size]
+    
+    def _write(self, pairs: List[Tuple[int, str]]):
+        """Write one batch of results"""
+        if self.dry_run or not pairs:
+            return
+        
+        session = self.db.get_session()
+        try:
+            statement, params = build_romaji_update(pairs)
+            result = session.execute(statement, params)
+            session.commit()
+            self.stats['written'] += result.rowcount
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+    
+    def run(self) -> Dict[str, Any]:
+        """Run the backfill
+        
+        Returns:
+            Statistics dict
+        """
+        start_time = time.time()
+        pending_writes: List[Tuple[int, str]] = []
+        # Bound in-flight tasks so memory stays flat on large tables
+        max_in_flight = self.workers * 2
+        
+        logger.info(f"🔤 Romaji backfill with {self.workers} workers "
+                    f"({'missing only' if self.only_missing else 'all Japanese names'})")
+        
+        with ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker) as executor:
+            in_flight = set()
+            chunks = self._iter_chunks()
+            exhausted = False
+            
+            while in_flight or not exhausted:
+                while not exhausted and len(in_flight) < max_in_flight:
+                    chunk = next(chunks, None)
+                    if chunk is None:
+                        exhausted = True
+                        break
+                    in_flight.add(executor.submit(romanize_rows, chunk))
+                
+                if not in_flight:
+                    break
+                
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    results = future.result()
+                    self.stats['converted'] += len(results)
+                    pending_writes.extend(results)
+                
+                while len(pending_writes) >= self.write_batch_size:
+                    self._write(pending_writes[:self.write_batch_size])
+                    del pending_writes[:self.write_batch_size]
+                
+                logger.info(f"   Scanned {self.stats['scanned']}, converted {self.stats['converted']}")
+        
+        self._write(pending_writes)
+        
+        self.stats['elapsed_seconds'] = round(time.time() - start_time, 2)
+        logger.info(f"✅ Romaji backfill complete: {self.stats}")
+        return self.stats
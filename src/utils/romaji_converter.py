@@ -3,8 +3,13 @@ Romaji converter for Japanese provider names
 Converts Japanese text (hiragana, katakana, kanji) to readable romaji
 """
 
+import os
 import re
+import sqlite3
 import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
 
 # For compatibility - import the wrapper class
 try:
@@ -100,76 +105,271 @@ def contains_japanese(text: str) -> bool:
     return bool(re.search(japanese_pattern, text))
 
 
-def convert_to_romaji(text: str, preserve_non_japanese: bool = True) -> str:
+# Bump when conversion rules change so persisted conversions are recomputed
+ROMAJI_RULES_VERSION = 1
+
+
+def _build_term_trie(terms: Dict[str, str]) -> Dict:
+    """Build a character trie over the medical term dictionary
+    
+    Each node is a dict of child characters; a node that ends a term stores
+    its English translation under the None key.
     """
-    Convert Japanese text to romaji with proper medical term translation
+    trie = {}
+    for japanese_term, english_term in terms.items():
+        node = trie
+        for char in japanese_term:
+            node = node.setdefault(char, {})
+        node[None] = english_term
+    return trie
+
+
+# Compiled once at import instead of re-sorting the dictionary per call
+_MEDICAL_TERM_TRIE = _build_term_trie(MEDICAL_TERM_TRANSLATIONS)
+
+
+def replace_medical_terms(text: str) -> Tuple[str, List[str]]:
+    """Swap known medical terms for placeholders using longest-match lookup
     
     Args:
-        text: Text to convert
-        preserve_non_japanese: If True, preserve non-Japanese text as-is
+        text: Text to scan
         
     Returns:
-        Romaji version of the text with medical terms properly translated
+        Tuple of (text with __TERM_n__ placeholders, English terms by index)
     """
-    if not text:
-        return text
+    result = []
+    replacements = []
+    index = 0
+    length = len(text)
     
-    if not CUTLET_AVAILABLE:
-        logger.warning("Cannot convert to romaji - cutlet not installed")
-        return text
+    while index < length:
+        node = _MEDICAL_TERM_TRIE
+        match_end = None
+        match_term = None
+        
+        position = index
+        while position < length and text[position] in node:
+            node = node[text[position]]
+            position += 1
+            if None in node:
+                match_end, match_term = position, node[None]
+        
+        if match_term is not None:
+            result.append(f"__TERM_{len(replacements)}__")
+            replacements.append(match_term)
+            index = match_end
+        else:
+            result.append(text[index])
+            index += 1
+    
+    return ''.join(result), replacements
+
+
+class RomajiConverter:
+    """Process-wide romaji converter
+    
+    Holds a single lazily built Cutlet tagger (MeCab/fugashi initialization is
+    the expensive part) and a bounded LRU of name conversions shared by every
+    caller, optionally backed by a SQLite file so conversions survive restarts.
+    """
     
-    try:
-        # First, replace known medical terms with English equivalents
-        processed_text = text
-        replacements = []
+    def __init__(self, cache_size: int = 10000, persist_path: Optional[str] = None):
+        """Initialize the converter
         
-        # Sort terms by length (longest first) to avoid partial replacements
-        sorted_terms = sorted(MEDICAL_TERM_TRANSLATIONS.items(), 
-                            key=lambda x: len(x[0]), reverse=True)
+        Args:
+            cache_size: Maximum number of conversions kept in memory
+            persist_path: Optional SQLite file for persisted conversions
+        """
+        self.cache_size = cache_size
+        self.persist_path = persist_path
+        self._katsu = None
+        self._lock = threading.RLock()
+        self._cache = OrderedDict()
+        self.hits = 0
+        self.misses = 0
         
-        for japanese_term, english_term in sorted_terms:
-            if japanese_term in processed_text:
-                # Store the replacement for later
-                placeholder = f"__TERM_{len(replacements)}__"
-                processed_text = processed_text.replace(japanese_term, placeholder)
-                replacements.append(english_term)
+        if persist_path:
+            self._init_persistent_cache()
+    
+    def _init_persistent_cache(self):
+        """Create the persisted conversion table"""
+        directory = os.path.dirname(self.persist_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with sqlite3.connect(self.persist_path, timeout=30) as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS romaji_cache (
+                    source TEXT NOT NULL,
+                    preserve_non_japanese INTEGER NOT NULL,
+                    rules_version INTEGER NOT NULL,
+                    romaji TEXT NOT NULL,
+                    PRIMARY KEY (source, preserve_non_japanese, rules_version)
+                )
+            ''')
+            conn.commit()
+    
+    @property
+    def katsu(self):
+        """Shared Cutlet instance, built on first use"""
+        if self._katsu is None:
+            with self._lock:
+                if self._katsu is None:
+                    katsu = Cutlet()
+                    katsu.use_foreign_spelling = True
+                    self._katsu = katsu
+        return self._katsu
+    
+    def convert(self, text: str, preserve_non_japanese: bool = True) -> str:
+        """Convert text to romaji, serving repeats from the shared cache"""
+        if not text:
+            return text
         
-        # Now convert the remaining Japanese text to romaji
-        if contains_japanese(processed_text):
-            # Initialize Cutlet with hepburn romanization
-            katsu = Cutlet()
-            katsu.use_foreign_spelling = True
-            
-            if preserve_non_japanese and not contains_only_japanese(processed_text):
-                # Mixed text - need to handle carefully
-                romaji = convert_mixed_text(processed_text, katsu)
-            else:
-                # Pure Japanese text
-                romaji = katsu.romaji(processed_text)
-                romaji = title_case_romaji(romaji)
-        else:
-            romaji = processed_text
+        key = (text, preserve_non_japanese)
         
-        # Replace placeholders with English terms
-        for i, english_term in enumerate(replacements):
-            placeholder = f"__TERM_{i}__"
-            # Add space before the term if needed
-            if romaji.find(placeholder) > 0 and not romaji[romaji.find(placeholder)-1].isspace():
-                romaji = romaji.replace(placeholder, ' ' + english_term)
-            else:
-                romaji = romaji.replace(placeholder, english_term)
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return self._cache[key]
         
-        # Clean up spacing and capitalize properly
-        romaji = re.sub(r'\s+', ' ', romaji).strip()
+        romaji = self._load_persisted(text, preserve_non_japanese)
+        if romaji is None:
+            with self._lock:
+                self.misses += 1
+                # Cutlet is not thread-safe, so conversions share the lock
+                romaji = self._convert_uncached(text, preserve_non_japanese)
+            self._store_persisted(text, preserve_non_japanese, romaji)
         
-        # Fix common spacing issues
-        romaji = re.sub(r'([a-z])([A-Z])', r'\1 \2', romaji)  # Add space between camelCase
+        with self._lock:
+            self._cache[key] = romaji
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
         
         return romaji
+    
+    def _load_persisted(self, text: str, preserve_non_japanese: bool) -> Optional[str]:
+        """Look up a conversion in the persisted cache"""
+        if not self.persist_path:
+            return None
+        try:
+            with sqlite3.connect(self.persist_path, timeout=30) as conn:
+                row = conn.execute('''
+                    SELECT romaji FROM romaji_cache
+                    WHERE source = ? AND preserve_non_japanese = ? AND rules_version = ?
+                ''', (text, int(preserve_non_japanese), ROMAJI_RULES_VERSION)).fetchone()
+            return row[0] if row else None
+        except sqlite3.Error as e:
+            logger.debug(f"Romaji cache read failed: {e}")
+            return None
+    
+    def _store_persisted(self, text: str, preserve_non_japanese: bool, romaji: str):
+        """Save a conversion to the persisted cache"""
+        if not self.persist_path:
+            return
+        try:
+            with sqlite3.connect(self.persist_path, timeout=30) as conn:
+                conn.execute('''
+                    INSERT OR REPLACE INTO romaji_cache
+                    (source, preserve_non_japanese, rules_version, romaji)
+                    VALUES (?, ?, ?, ?)
+                ''', (text, int(preserve_non_japanese), ROMAJI_RULES_VERSION, romaji))
+                conn.commit()
+        except sqlite3.Error as e:
+            logger.debug(f"Romaji cache write failed: {e}")
+    
+    def _convert_uncached(self, text: str, preserve_non_japanese: bool) -> str:
+        """Run the actual conversion pipeline"""
+        if not CUTLET_AVAILABLE:
+            logger.warning("Cannot convert to romaji - cutlet not installed")
+            return text
+        
+        try:
+            # First, replace known medical terms with English equivalents
+            processed_text, replacements = replace_medical_terms(text)
             
-    except Exception as e:
-        logger.error(f"Error converting to romaji: {e}")
-        return text
+            # Now convert the remaining Japanese text to romaji
+            if contains_japanese(processed_text):
+                if preserve_non_japanese and not contains_only_japanese(processed_text):
+                    # Mixed text - need to handle carefully
+                    romaji = convert_mixed_text(processed_text, self.katsu)
+                else:
+                    # Pure Japanese text
+                    romaji = self.katsu.romaji(processed_text)
+                    romaji = title_case_romaji(romaji)
+            else:
+                romaji = processed_text
+            
+            # Replace placeholders with English terms
+            for i, english_term in enumerate(replacements):
+                placeholder = f"__TERM_{i}__"
+                # Add space before the term if needed
+                if romaji.find(placeholder) > 0 and not romaji[romaji.find(placeholder)-1].isspace():
+                    romaji = romaji.replace(placeholder, ' ' + english_term)
+                else:
+                    romaji = romaji.replace(placeholder, english_term)
+            
+            # Clean up spacing and capitalize properly
+            romaji = re.sub(r'\s+', ' ', romaji).strip()
+            
+            # Fix common spacing issues
+            romaji = re.sub(r'([a-z])([A-Z])', r'\1 \2', romaji)  # Add space between camelCase
+            
+            return romaji
+                
+        except Exception as e:
+            logger.error(f"Error converting to romaji: {e}")
+            return text
+    
+    def cache_info(self) -> Dict[str, int]:
+        """In-memory cache statistics"""
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'size': len(self._cache),
+                'max_size': self.cache_size
+            }
+    
+    def clear_cache(self):
+        """Drop in-memory conversions (e.g. after changing term rules)"""
+        with self._lock:
+            self._cache.clear()
+
+
+_converter: Optional[RomajiConverter] = None
+_converter_lock = threading.Lock()
+
+
+def get_romaji_converter() -> RomajiConverter:
+    """Get the process-wide romaji converter
+    
+    Set ROMAJI_CACHE_PATH to persist conversions to a SQLite file and
+    ROMAJI_CACHE_SIZE to change the in-memory LRU bound.
+    """
+    global _converter
+    if _converter is None:
+        with _converter_lock:
+            if _converter is None:
+                _converter = RomajiConverter(
+                    cache_size=int(os.getenv('ROMAJI_CACHE_SIZE', '10000')),
+                    persist_path=os.getenv('ROMAJI_CACHE_PATH') or None
+                )
+    return _converter
+
+
+def convert_to_romaji(text: str, preserve_non_japanese: bool = True) -> str:
+    """
+    Convert Japanese text to romaji with proper medical term translation
+    
+    Args:
+        text: Text to convert
+        preserve_non_japanese: If True, preserve non-Japanese text as-is
+        
+    Returns:
+        Romaji version of the text with medical terms properly translated
+    """
+    return get_romaji_converter().convert(text, preserve_non_japanese)
 
 
 def contains_only_japanese(text: str) -> bool:
@@ -209,8 +409,7 @@ def convert_mixed_text(text: str, katsu=None) -> str:
         return text
     
     if katsu is None:
-        katsu = Cutlet()
-        katsu.use_foreign_spelling = True
+        katsu = get_romaji_converter().katsu
     
     # Split text into Japanese and non-Japanese segments
     japanese_pattern = r'([\u3040-\u309f\u30a0-\u30ff\u4e00-\u9faf\u31f0-\u31ff\u3400-\u4dbf]+)'
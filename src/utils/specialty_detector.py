@@ -152,31 +152,30 @@ class SpecialtyDetector:
         """Initialize the specialty detector"""
         self.logger = logging.getLogger(__name__)
     
-    def extract_from_reviews(self, reviews: List[Dict[str, Any]]) -> List[str]:
+    def extract_from_reviews(self, reviews: List[Dict[str, Any]],
+                             review_features: Dict[str, Any] = None) -> List[str]:
         """Extract specialty hints from patient reviews
         
         Args:
             reviews: List of review dictionaries
+            review_features: Precomputed Provider.review_keywords, if available
             
         Returns:
             List of detected specialties
         """
-        if not reviews:
+        if not reviews and not review_features:
             return []
         
-        # Combine all review text
-        review_text = ''
-        for review in reviews:
-            if isinstance(review, dict):
-                review_text += ' ' + review.get('text', '').lower()
-            elif isinstance(review, str):
-                review_text += ' ' + review.lower()
+        # Imported here: review_features builds its matcher from our patterns
+        from .review_features import get_review_features
+        
+        matched = get_review_features(reviews, review_features).get('specialty_keywords', {})
         
         detected_specialties = []
         
         # Check each specialty pattern
-        for specialty, keywords in self.REVIEW_SPECIALTY_PATTERNS.items():
-            keyword_count = sum(1 for keyword in keywords if keyword.lower() in review_text)
+        for specialty in self.REVIEW_SPECIALTY_PATTERNS:
+            keyword_count = len(matched.get(specialty, []))
             if keyword_count >= 2:  # Require at least 2 keyword matches for confidence
                 detected_specialties.append(specialty)
                 self.logger.debug(f"Detected {specialty} from reviews (matched {keyword_count} keywords)")
@@ -257,7 +256,8 @@ class SpecialtyDetector:
                           reviews: List[Dict] = None,
                           google_types: List[str] = None,
                           description: str = None,
-                          existing_specialties: List[str] = None) -> str:
+                          existing_specialties: List[str] = None,
+                          review_features: Dict[str, Any] = None) -> str:
         """Determine the best specialty from all available sources
         
         Args:
@@ -266,6 +266,7 @@ class SpecialtyDetector:
             google_types: Google Places types
             description: Provider description
             existing_specialties: Already detected specialties
+            review_features: Precomputed review features for the provider
             
         Returns:
             Best specialty match or 'General Medicine' as fallback
@@ -286,7 +287,7 @@ class SpecialtyDetector:
             all_specialties.extend(name_specialties * 2)  # Weight name matches higher
         
         # Priority 3: Reviews (patient experiences)
-        review_specialties = self.extract_from_reviews(reviews)
+        review_specialties = self.extract_from_reviews(reviews, review_features)
         if review_specialties:
             all_specialties.extend(review_specialties)
         
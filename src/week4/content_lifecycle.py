@@ -17,6 +17,7 @@ from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any, Tuple
 from dataclasses import dataclass, field
 from enum import Enum
+import heapq
 import hashlib
 from pathlib import Path
 
@@ -44,6 +45,110 @@ except ImportError as e:
     class CampaignStateManager:
         pass
 
+# Provider database for lifecycle analysis (the legacy imports above fall back to stubs)
+try:
+    from sqlalchemy import text
+    from src.core.database import DatabaseManager as ProviderDatabase
+except ImportError as e:
+    logging.warning(f"Provider database unavailable for content lifecycle: {e}")
+    ProviderDatabase = None
+
+# One row per provider with everything the lifecycle analysis needs. Ages,
+# freshness, delay status and update priority are computed set-wise here,
+# mirroring ContentAgingAnalyzer and ContentPrioritizer, from the bound
+# thresholds and weights (see ContentLifecycleManager._lifecycle_params).
+LIFECYCLE_SQL = r"""
+    WITH sync AS (
+        SELECT provider_id,
+               MAX(COALESCE(completed_at, timestamp)) FILTER (
+                   WHERE status = 'completed'
+                     AND content_hash_after IS DISTINCT FROM content_hash_before
+               ) AS content_updated_at,
+               (array_agg(status ORDER BY id DESC))[1] AS last_sync_status
+        FROM wordpress_sync_operations
+        GROUP BY provider_id
+    ),
+    base AS (
+        SELECT p.id,
+               p.provider_name,
+               CASE WHEN p.created_at ~ '^\d{4}-\d{2}-\d{2}'
+                    THEN left(p.created_at, 19)::timestamp END AS created_date,
+               COALESCE(s.content_updated_at, p.last_wordpress_sync) AS content_updated_at,
+               COALESCE(q.final_quality_score, :default_quality) AS quality_score,
+               COALESCE(q.overall_completeness, :default_completeness) AS completeness_score,
+               COALESCE(q.overall_integrity, :default_accuracy) AS accuracy_score,
+               COALESCE(p.wordpress_status, '') <> 'failed'
+                   AND COALESCE(s.last_sync_status, '') <> 'failed' AS wordpress_sync_status,
+               COALESCE(q.romaji_consistency, 100) >= 100 AS romaji_consistency
+        FROM providers p
+        LEFT JOIN provider_quality q ON q.provider_id = p.id
+        LEFT JOIN sync s ON s.provider_id = p.id
+    ),
+    dated AS (
+        SELECT b.*,
+               COALESCE(b.created_date, b.content_updated_at,
+                        CAST(:now AS timestamp) - interval '365 days') AS provider_created_date
+        FROM base b
+    ),
+    aged AS (
+        SELECT d.*,
+               COALESCE(d.content_updated_at, d.provider_created_date) AS last_updated,
+               EXTRACT(DAY FROM CAST(:now AS timestamp) - d.provider_created_date)::int AS provider_age_days,
+               EXTRACT(DAY FROM CAST(:now AS timestamp)
+                       - COALESCE(d.content_updated_at, d.provider_created_date))::int AS content_age_days,
+               CASE WHEN d.quality_score < :quality_threshold
+                    THEN :quality_delay_days ELSE :campaign_delay_days END AS delay_days
+        FROM dated d
+    ),
+    scored AS (
+        SELECT a.*,
+               CASE
+                   WHEN :critical_override AND a.quality_score < :critical_threshold
+                       THEN 'critical_quality_score_' || a.quality_score
+                   WHEN :quality_override AND a.quality_score < :quality_threshold
+                       THEN 'quality_issue_score_' || a.quality_score
+                   WHEN NOT a.wordpress_sync_status THEN 'wordpress_sync_failure'
+                   WHEN NOT a.romaji_consistency THEN 'romaji_inconsistency'
+               END AS delay_override_reason,
+               CASE
+                   WHEN a.content_age_days <= :fresh_days THEN 100.0
+                   WHEN a.content_age_days <= :aging_days
+                       THEN 100 - (a.content_age_days - :fresh_days) * 30.0 / (:aging_days - :fresh_days)
+                   WHEN a.content_age_days <= :stale_days
+                       THEN 70 - (a.content_age_days - :aging_days) * 40.0 / (:stale_days - :aging_days)
+                   ELSE GREATEST(5.0, 30 * power(0.99, a.content_age_days - :stale_days))
+               END AS freshness_score,
+               LEAST(100.0,
+                     GREATEST(0, 100 - a.quality_score) * :quality_weight
+                     + LEAST(:traffic_score, 100) * :traffic_weight
+                     + LEAST(a.content_age_days / 365.0 * 100, 100) * :age_weight
+                     + LEAST(CASE WHEN a.romaji_consistency THEN 0 ELSE 30 END
+                             + CASE WHEN a.wordpress_sync_status THEN 0 ELSE 40 END, 100) * :strategic_weight
+               ) AS priority_score
+        FROM aged a
+    )
+    SELECT s.id, s.provider_name, s.provider_created_date, s.last_updated,
+           s.provider_age_days, s.content_age_days, s.quality_score, s.completeness_score,
+           s.accuracy_score, s.wordpress_sync_status, s.romaji_consistency,
+           s.freshness_score, s.priority_score, s.delay_override_reason,
+           s.provider_created_date + make_interval(days => s.delay_days) AS eligible_for_update_date,
+           CASE
+               WHEN NOT :delay_enabled THEN
+                   CASE WHEN s.content_age_days <= :fresh_days THEN 'fresh'
+                        WHEN s.content_age_days <= :aging_days THEN 'aging'
+                        WHEN s.content_age_days <= :stale_days THEN 'stale'
+                        ELSE 'outdated' END
+               WHEN s.provider_age_days <= :recent_days THEN
+                   CASE WHEN s.delay_override_reason IS NULL THEN 'recently_added' ELSE 'needs_update' END
+               WHEN s.provider_age_days < s.delay_days THEN
+                   CASE WHEN s.delay_override_reason IS NULL THEN 'delay_period_active' ELSE 'needs_update' END
+               WHEN s.content_age_days <= :fresh_days THEN 'fresh'
+               ELSE 'ready_for_review'
+           END AS delay_status
+    FROM scored s
+    ORDER BY s.id
+"""
+
 class ContentStatus(Enum):
     """Content lifecycle status"""
     FRESH = "fresh"
@@ -132,6 +237,9 @@ class ContentMetrics:
     content_hash: str = ""
     sync_attempts: int = 0
     last_sync_success: Optional[datetime] = None
+    
+    # Update priority precomputed with the metrics (None to compute on demand)
+    priority_score: Optional[float] = None
 
 @dataclass
 class ContentUpdatePlan:
@@ -501,9 +609,11 @@ class ContentPrioritizer:
 class ContentLifecycleManager:
     """Comprehensive content lifecycle management system with delay configuration"""
     
-    def __init__(self, maintenance_manager: Optional[MaintenanceModeManager] = None, delay_config: Optional[ContentUpdateDelayConfig] = None):
+    def __init__(self, maintenance_manager: Optional[MaintenanceModeManager] = None, delay_config: Optional[ContentUpdateDelayConfig] = None,
+                 db=None):
         # Initialize core systems
         self.db_manager = DatabaseManager()
+        self.provider_db = db  # Provider database, connected on first analysis if not given
         self.romaji_processor = RomajiProcessor()
         self.qa_system = QualityAssuranceSystem()
         self.dashboard = CampaignDashboard()
@@ -516,6 +626,9 @@ class ContentLifecycleManager:
         self.aging_analyzer = ContentAgingAnalyzer(self.delay_config)
         self.prioritizer = ContentPrioritizer(self.qa_system)
         
+        # No per-provider traffic source yet; every provider gets the same baseline
+        self.traffic_metrics = self._get_provider_traffic_metrics(None)
+        
         # Configuration
         self.monthly_update_limit = 50
         self.monthly_budget_limit = 500.0
@@ -581,83 +694,41 @@ class ContentLifecycleManager:
             Path(directory).mkdir(parents=True, exist_ok=True)
     
     def analyze_all_provider_content(self) -> Dict[str, ContentMetrics]:
-        """Analyze content metrics for all providers"""
+        """Analyze content metrics for all providers
+        
+        Ages, freshness, delay status and priority come from one projected
+        query over providers, provider_quality and wordpress_sync_operations.
+        """
         try:
             self.logger.info("Starting comprehensive provider content analysis...")
             
-            # Get all provider data
-            providers = self._get_all_providers()
             content_metrics = {}
-            
-            for provider in providers:
-                try:
-                    provider_id = provider.get('id', str(provider.get('provider_id', 'unknown')))
-                    
-                    # Analyze content age and status
-                    content_status = self.aging_analyzer.analyze_content_age(provider)
-                    content_age = self._calculate_content_age(provider)
-                    
-                    # Get quality metrics
-                    quality_assessment = self.qa_system.assess_provider_quality(provider)
-                    quality_score = quality_assessment.get('quality_score', 75.0)
-                    
-                    # Calculate traffic and performance metrics
-                    traffic_metrics = self._get_provider_traffic_metrics(provider_id)
-                    
-                    # Check romaji consistency
-                    romaji_consistent = self._check_romaji_consistency(provider)
-                    
-                    # Check WordPress sync status
-                    wp_sync_status = self._check_wordpress_sync_status(provider_id)
-                    
-                    # Get provider creation date and calculate delay status
-                    provider_created = provider.get('provider_created_date') or provider.get('created_date')
-                    if isinstance(provider_created, str):
-                        provider_created = datetime.fromisoformat(provider_created.replace('Z', '+00:00'))
-                    
-                    provider_age_days = (datetime.now() - provider_created).days if provider_created else 365
-                    
-                    # Analyze delay status
-                    delay_status = self.aging_analyzer.analyze_content_age_with_delay(provider)
-                    
-                    # Calculate eligible update date
-                    eligible_date = None
-                    delay_override_reason = None
-                    if provider_created:
-                        eligible_date = self.aging_analyzer.calculate_eligible_update_date(provider_created, quality_score)
-                        # Check for overrides
-                        delay_override_reason = self.aging_analyzer._check_delay_overrides(provider, quality_score, provider_age_days)
-                    
-                    # Create content metrics
-                    metrics = ContentMetrics(
-                        provider_id=provider_id,
-                        content_age_days=content_age,
-                        quality_score=quality_score,
-                        last_updated=provider.get('last_updated', datetime.now()),
-                        traffic_score=traffic_metrics.get('traffic_score', 0.0),
-                        wordpress_sync_status=wp_sync_status,
-                        romaji_consistency=romaji_consistent,
-                        # New delay-related fields
-                        provider_created_date=provider_created,
-                        provider_age_days=provider_age_days,
-                        delay_status=delay_status,
-                        eligible_for_update_date=eligible_date,
-                        delay_override_reason=delay_override_reason,
-                        # Quality indicators
-                        completeness_score=quality_assessment.get('completeness_score', 80.0),
-                        accuracy_score=quality_assessment.get('accuracy_score', 85.0),
-                        freshness_score=self.aging_analyzer.calculate_freshness_score(content_age),
-                        # Performance metrics
-                        page_views_30d=traffic_metrics.get('page_views_30d', 0),
-                        search_ranking=traffic_metrics.get('search_ranking', 0.0),
-                        user_engagement_score=traffic_metrics.get('engagement_score', 0.0)
-                    )
-                    
-                    content_metrics[provider_id] = metrics
-                    
-                except Exception as e:
-                    self.logger.error(f"Error analyzing provider {provider.get('id', 'unknown')}: {e}")
-                    continue
+            for row in self._lifecycle_rows():
+                provider_id = str(row['id'])
+                content_metrics[provider_id] = ContentMetrics(
+                    provider_id=provider_id,
+                    content_age_days=row['content_age_days'],
+                    quality_score=float(row['quality_score']),
+                    last_updated=row['last_updated'],
+                    traffic_score=self.traffic_metrics['traffic_score'],
+                    wordpress_sync_status=row['wordpress_sync_status'],
+                    romaji_consistency=row['romaji_consistency'],
+                    # Delay-related fields
+                    provider_created_date=row['provider_created_date'],
+                    provider_age_days=row['provider_age_days'],
+                    delay_status=ContentStatus(row['delay_status']),
+                    eligible_for_update_date=row['eligible_for_update_date'],
+                    delay_override_reason=row['delay_override_reason'],
+                    # Quality indicators
+                    completeness_score=float(row['completeness_score']),
+                    accuracy_score=float(row['accuracy_score']),
+                    freshness_score=float(row['freshness_score']),
+                    # Performance metrics
+                    page_views_30d=self.traffic_metrics['page_views_30d'],
+                    search_ranking=self.traffic_metrics['search_ranking'],
+                    user_engagement_score=self.traffic_metrics['engagement_score'],
+                    priority_score=float(row['priority_score'])
+                )
             
             self.logger.info(f"Completed content analysis for {len(content_metrics)} providers")
             return content_metrics
@@ -667,19 +738,21 @@ class ContentLifecycleManager:
             return {}
     
     def generate_update_plans(self, content_metrics: Dict[str, ContentMetrics], budget_limit: float = None) -> List[ContentUpdatePlan]:
-        """Generate prioritized content update plans within budget constraints and delay rules"""
+        """Generate prioritized content update plans within budget constraints and delay rules
+        
+        Only the highest-priority providers that fit the budget are turned into
+        plans; they are picked with a heap instead of sorting every provider.
+        """
         try:
             if budget_limit is None:
                 budget_limit = self.monthly_budget_limit
                 
             self.logger.info(f"Generating update plans with budget limit: ${budget_limit} and delay config")
             
-            update_plans = []
-            total_cost = 0.0
-            max_updates = int(budget_limit / self.cost_per_update)
+            max_updates = min(int(budget_limit / self.cost_per_update), len(content_metrics))
             
             # Filter providers that are eligible for updates based on delay configuration
-            eligible_providers = []
+            candidates = []
             delay_statistics = {
                 'total_providers': len(content_metrics),
                 'eligible_for_update': 0,
@@ -689,87 +762,63 @@ class ContentLifecycleManager:
             }
             
             for provider_id, metrics in content_metrics.items():
-                # Check delay status
-                if hasattr(metrics, 'delay_status'):
-                    delay_status = metrics.delay_status
-                else:
-                    # Determine delay status using provider data
-                    provider_data = {
-                        'provider_created_date': metrics.provider_created_date,
-                        'last_updated': metrics.last_updated,
-                        'quality_score': metrics.quality_score,
-                        'wordpress_sync_status': metrics.wordpress_sync_status,
-                        'romaji_consistency': metrics.romaji_consistency,
-                        'manual_update_requested': getattr(metrics, 'manual_update_requested', False)
-                    }
-                    delay_status = self.aging_analyzer.analyze_content_age_with_delay(provider_data)
+                delay_status = metrics.delay_status
                 
                 # Update statistics
                 if delay_status == ContentStatus.RECENTLY_ADDED:
                     delay_statistics['recently_added'] += 1
+                    continue
                 elif delay_status == ContentStatus.DELAY_PERIOD_ACTIVE:
                     delay_statistics['in_delay_period'] += 1
-                elif delay_status in [ContentStatus.READY_FOR_REVIEW, ContentStatus.NEEDS_UPDATE]:
+                    continue
+                elif delay_status in (ContentStatus.READY_FOR_REVIEW, ContentStatus.NEEDS_UPDATE):
                     delay_statistics['eligible_for_update'] += 1
-                    eligible_providers.append((provider_id, metrics))
-                elif delay_status in [ContentStatus.AGING, ContentStatus.STALE, ContentStatus.OUTDATED]:
+                elif delay_status in (ContentStatus.AGING, ContentStatus.STALE, ContentStatus.OUTDATED):
                     # Override case - provider qualifies despite delay
                     delay_statistics['override_qualified'] += 1
-                    eligible_providers.append((provider_id, metrics))
+                else:
+                    continue
+                
+                priority_score = metrics.priority_score
+                if priority_score is None:
+                    priority_score = self.prioritizer.calculate_update_priority_score(metrics)
+                
+                # Skip if priority is too low
+                if self.prioritizer.assign_priority_level(priority_score) == UpdatePriority.DEFERRED:
+                    continue
+                candidates.append((priority_score, provider_id, metrics))
             
             self.logger.info(f"Delay filtering results: {delay_statistics}")
             
-            # Calculate priority scores only for eligible providers
-            provider_priorities = []
-            for provider_id, metrics in eligible_providers:
-                priority_score = self.prioritizer.calculate_update_priority_score(metrics)
-                priority_level = self.prioritizer.assign_priority_level(priority_score)
-                update_reasons = self.prioritizer.identify_update_reasons(metrics, priority_score)
-                
-                provider_priorities.append({
-                    'provider_id': provider_id,
-                    'metrics': metrics,
-                    'priority_score': priority_score,
-                    'priority_level': priority_level,
-                    'update_reasons': update_reasons
-                })
-            
-            # Sort by priority score (highest first)
-            provider_priorities.sort(key=lambda x: x['priority_score'], reverse=True)
+            # Highest priority first; ties keep provider order
+            top = heapq.nlargest(max(max_updates, 0), enumerate(candidates), key=lambda c: (c[1][0], -c[0]))
             
             # Create update plans within budget
             current_date = datetime.now()
+            update_plans = []
             
-            for i, provider_data in enumerate(provider_priorities):
-                if len(update_plans) >= max_updates:
-                    break
-                
-                if total_cost + self.cost_per_update > budget_limit:
-                    break
-                
-                # Skip if priority is too low
-                if provider_data['priority_level'] == UpdatePriority.DEFERRED:
-                    continue
+            for i, (_, (priority_score, provider_id, metrics)) in enumerate(top):
+                update_reasons = self.prioritizer.identify_update_reasons(metrics, priority_score)
                 
-                # Create update plan
                 plan = ContentUpdatePlan(
-                    provider_id=provider_data['provider_id'],
-                    current_status=self._determine_content_status(provider_data['metrics']),
+                    provider_id=provider_id,
+                    current_status=self._determine_content_status(metrics),
                     target_status=ContentStatus.UPDATED,
-                    priority=provider_data['priority_level'],
-                    update_reasons=provider_data['update_reasons'],
+                    priority=self.prioritizer.assign_priority_level(priority_score),
+                    update_reasons=update_reasons,
                     scheduled_date=current_date + timedelta(days=i * 2),  # Spread updates over time
                     estimated_cost=self.cost_per_update,
-                    sections_to_update=self._identify_sections_to_update(provider_data['update_reasons']),
-                    romaji_processing_required=ContentUpdateReason.ROMAJI_INCONSISTENCY in provider_data['update_reasons'],
+                    sections_to_update=self._identify_sections_to_update(update_reasons),
+                    romaji_processing_required=ContentUpdateReason.ROMAJI_INCONSISTENCY in update_reasons,
                     wordpress_sync_required=True,
                     quality_validation_required=True
                 )
                 
                 update_plans.append(plan)
-                total_cost += self.cost_per_update
             
-            self.logger.info(f"Generated {len(update_plans)} update plans from {len(eligible_providers)} eligible providers")
+            total_cost = len(update_plans) * self.cost_per_update
+            eligible_count = delay_statistics['eligible_for_update'] + delay_statistics['override_qualified']
+            self.logger.info(f"Generated {len(update_plans)} update plans from {eligible_count} eligible providers")
             self.logger.info(f"Total cost: ${total_cost:.2f}, {delay_statistics['in_delay_period']} providers in delay period")
             return update_plans
             
@@ -894,35 +943,67 @@ class ContentLifecycleManager:
             )
     
     # Helper methods
+    def _lifecycle_params(self, now: datetime) -> Dict[str, Any]:
+        """Bind parameters for LIFECYCLE_SQL from the current configuration"""
+        config = self.delay_config
+        analyzer = self.aging_analyzer
+        prioritizer = self.prioritizer
+        return {
+            'now': now,
+            'default_quality': 75.0,
+            'default_completeness': 80.0,
+            'default_accuracy': 85.0,
+            'quality_threshold': config.quality_issue_threshold,
+            'critical_threshold': config.critical_quality_threshold,
+            'quality_override': config.quality_issue_override,
+            'critical_override': config.critical_priority_override,
+            'quality_delay_days': config.quality_issue_delay_months * 30,  # Approximate days per month
+            'campaign_delay_days': config.new_campaign_delay_months * 30,
+            'recent_days': config.recently_added_threshold_days,
+            'delay_enabled': config.delay_evaluation_enabled,
+            'fresh_days': analyzer.freshness_threshold_days,
+            'aging_days': analyzer.aging_threshold_days,
+            'stale_days': analyzer.stale_threshold_days,
+            'traffic_score': self.traffic_metrics['traffic_score'],
+            'quality_weight': prioritizer.quality_weight,
+            'traffic_weight': prioritizer.traffic_weight,
+            'age_weight': prioritizer.age_weight,
+            'strategic_weight': prioritizer.strategic_weight
+        }
+    
+    def _lifecycle_rows(self) -> List[Dict[str, Any]]:
+        """Run LIFECYCLE_SQL against the provider database"""
+        if self.provider_db is None:
+            if ProviderDatabase is None:
+                raise RuntimeError("Provider database is not available")
+            self.provider_db = ProviderDatabase()
+        
+        session = self.provider_db.get_session()
+        try:
+            result = session.execute(text(LIFECYCLE_SQL), self._lifecycle_params(datetime.now()))
+            return [dict(row) for row in result.mappings()]
+        finally:
+            session.close()
+    
     def _get_all_providers(self) -> List[Dict[str, Any]]:
         """Get all provider data from database with creation dates"""
         try:
-            # Mock implementation - would query actual database
-            current_time = datetime.now()
-            providers = []
-            
-            for i in range(1, 474):  # 473 providers as mentioned
-                # Simulate providers being added over realistic campaign timeline
-                # For a project less than 2 months old, spread providers over ~60 days maximum
-                days_ago = min(i * 0.25, 60)  # Spread creation over ~60 days (realistic for 2-month project)
-                provider_created = current_time - timedelta(days=days_ago)
-                content_updated = provider_created + timedelta(days=2)  # Content updated shortly after creation
-                
-                provider = {
-                    'id': f'provider_{i}',
-                    'name': f'Provider {i}',
-                    'provider_created_date': provider_created,
-                    'created_date': provider_created,  # Alternative field name
-                    'last_updated': content_updated,
-                    'quality_score': max(75, 90 - (i % 15)),  # Higher baseline quality, fewer issues
-                    'romaji_name': f'provider-{i}',
-                    'wordpress_sync_status': i % 50 != 0,  # 98% have successful sync (fewer failures)
-                    'romaji_consistency': i % 100 != 0,  # 99% have consistent romaji (very few issues)
-                    'manual_update_requested': i % 200 == 0  # 0.5% have manual update requests (very rare)
+            providers = [
+                {
+                    'id': str(row['id']),
+                    'name': row['provider_name'],
+                    'provider_created_date': row['provider_created_date'],
+                    'created_date': row['provider_created_date'],  # Alternative field name
+                    'last_updated': row['last_updated'],
+                    'quality_score': float(row['quality_score']),
+                    'wordpress_sync_status': row['wordpress_sync_status'],
+                    'romaji_consistency': row['romaji_consistency'],
+                    'manual_update_requested': False
                 }
-                providers.append(provider)
+                for row in self._lifecycle_rows()
+            ]
             
-            self.logger.info(f"Generated {len(providers)} mock providers with creation dates")
+            self.logger.info(f"Loaded {len(providers)} providers with creation dates")
             return providers
             
         except Exception as e:
@@ -939,7 +1020,7 @@ class ContentLifecycleManager:
         except:
             return 365  # Default to 1 year old if calculation fails
     
-    def _get_provider_traffic_metrics(self, provider_id: str) -> Dict[str, Any]:
+    def _get_provider_traffic_metrics(self, provider_id: Optional[str]) -> Dict[str, Any]:
         """Get traffic and performance metrics for provider"""
         # Mock implementation
         return {
@@ -31,6 +31,12 @@ def generate_test_id():
     """Generate unique test ID to avoid data collisions"""
     return f"test_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:6]}"
 
+def remove_state_db(path):
+    """Remove a campaign state database and its WAL files"""
+    for suffix in ('', '-wal', '-shm'):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+
 
 def test_end_to_end_campaign_flow():
     """Test complete campaign flow from search to database"""
@@ -43,7 +49,7 @@ def test_end_to_end_campaign_flow():
         
         # Use unique test file to avoid state conflicts
         test_id = generate_test_id()
-        test_file = f'test_e2e_{test_id}.json'
+        test_file = f'test_e2e_{test_id}.db'
         
         # Initialize test campaign
         pipeline = EnhancedCampaignPipeline(state_file=test_file)
@@ -110,8 +116,8 @@ def test_end_to_end_campaign_flow():
             print(f"  {check}")
         
         # Cleanup
-        if os.path.exists(test_file):
-            os.remove(test_file)
+        pipeline.state_manager.close()
+        remove_state_db(test_file)
         
         # Clean up test providers from database
         if providers_collected > 0:
@@ -360,7 +366,7 @@ def test_campaign_state_management():
         from src.campaign import CampaignStateManager
         
         test_id = generate_test_id()
-        test_file = f'test_state_{test_id}.json'
+        test_file = f'test_state_{test_id}.db'
         manager = CampaignStateManager(test_file)
         
         checks = []
@@ -423,12 +429,9 @@ def test_campaign_state_management():
             print(f"  {check}")
         
         # Cleanup
-        if os.path.exists(test_file):
-            os.remove(test_file)
-        
-        if os.path.exists('campaign_checkpoints'):
-            import shutil
-            shutil.rmtree('campaign_checkpoints', ignore_errors=True)
+        manager.close()
+        new_manager.close()
+        remove_state_db(test_file)
         
         if all("✓" in check for check in checks):
             test_results['passed'].append("Campaign State Management")
@@ -9,10 +9,12 @@ import sys
 import psycopg2
 from psycopg2.extras import RealDictCursor
 from dotenv import load_dotenv
-import requests
-from requests.auth import HTTPBasicAuth
 import argparse
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.publishers.wp_mirror import WordPressMirror, hash_field
+
 # Load environment variables
 load_dotenv('config/.env')
 
@@ -30,8 +32,14 @@ def get_db_connection():
         print(f"❌ Database connection failed: {e}")
         sys.exit(1)
 
-def get_wordpress_providers():
-    """Fetch all healthcare providers from WordPress"""
+# Values the content pipeline leaves behind when generation failed
+FAILED_DESCRIPTION_HASHES = {hash_field(v) for v in ('fail', 'error', 'Fail', 'Error', 'FAIL', 'ERROR')}
+
+def get_wordpress_providers(full_refresh=False):
+    """List healthcare providers from the local WordPress mirror
+    
+    Only posts modified since the previous run are downloaded.
+    """
     wp_url = os.getenv('WORDPRESS_URL')
     wp_user = os.getenv('WORDPRESS_USERNAME')
     wp_pass = os.getenv('WORDPRESS_APPLICATION_PASSWORD')
@@ -40,52 +48,21 @@ def get_wordpress_providers():
         print("❌ WordPress credentials missing in .env file")
         return []
     
-    print("🔍 Fetching providers from WordPress...")
+    print("🔍 Refreshing provider mirror from WordPress...")
     
-    providers = []
-    page = 1
-    per_page = 100
-    
-    while True:
-        url = f"{wp_url}/wp-json/wp/v2/healthcare_provider"
-        params = {
-            'page': page,
-            'per_page': per_page,
-            'status': 'publish'
-        }
-        
-        try:
-            response = requests.get(
-                url, 
-                params=params,
-                auth=HTTPBasicAuth(wp_user, wp_pass),
-                timeout=30
-            )
-            
-            if response.status_code == 200:
-                page_providers = response.json()
-                if not page_providers:
-                    break
-                providers.extend(page_providers)
-                print(f"   Fetched page {page}: {len(page_providers)} providers")
-                page += 1
-            else:
-                print(f"❌ WordPress API error: {response.status_code}")
-                break
-                
-        except Exception as e:
-            print(f"❌ Error fetching from WordPress: {e}")
-            break
+    mirror = WordPressMirror(wp_url, (wp_user, wp_pass))
+    try:
+        stats = mirror.refresh('healthcare_provider', acf_fields=('ai_description',), full=full_refresh)
+        print(f"   {stats['mode'].title()} refresh: {stats['fetched']} fetched, "
+              f"{stats['removed']} removed in {stats['elapsed_seconds']}s")
+    except Exception as e:
+        print(f"❌ Error refreshing from WordPress: {e}")
     
+    providers = mirror.posts('healthcare_provider')
     print(f"📊 Total WordPress providers found: {len(providers)}")
     return providers
 
-def get_acf_field_value(wp_provider, field_name):
-    """Extract ACF field value from WordPress provider data"""
-    acf_data = wp_provider.get('acf', {})
-    return acf_data.get(field_name, '')
-
-def compare_database_vs_wordpress():
+def compare_database_vs_wordpress(full_refresh=False):
     """Compare database content with WordPress content"""
     # Get database providers
     conn = get_db_connection()
@@ -103,10 +80,10 @@ def compare_database_vs_wordpress():
     print(f"📊 Database providers with WordPress IDs: {len(db_providers)}")
     
     # Get WordPress providers
-    wp_providers = get_wordpress_providers()
+    wp_providers = get_wordpress_providers(full_refresh)
     
     # Create lookup by WordPress ID
-    wp_lookup = {str(provider['id']): provider for provider in wp_providers}
+    wp_lookup = {str(provider['post_id']): provider for provider in wp_providers}
     
     print(f"\n🔍 Comparing database vs WordPress content...")
     print("-" * 80)
@@ -125,33 +102,28 @@ def compare_database_vs_wordpress():
         
         wp_provider = wp_lookup[wp_id]
         
-        # Check ACF field content
-        wp_description = get_acf_field_value(wp_provider, 'ai_description')
-        wp_excerpt = get_acf_field_value(wp_provider, 'ai_excerpt')
-        wp_review_summary = get_acf_field_value(wp_provider, 'review_summary')
-        wp_english_summary = get_acf_field_value(wp_provider, 'english_experience_summary')
+        # Check ACF field content (the mirror holds hashes, not bodies)
+        wp_description_hash = wp_provider['field_hashes'].get('ai_description')
         
         # Check for missing descriptions on WordPress
-        if not wp_description or wp_description.lower() in ['fail', 'error', '']:
+        if wp_description_hash is None or wp_description_hash in FAILED_DESCRIPTION_HASHES:
             missing_descriptions.append({
                 'id': db_provider['id'],
                 'name': provider_name,
                 'wp_id': wp_id,
                 'db_description': db_provider['ai_description'][:100] if db_provider['ai_description'] else 'NULL',
-                'wp_description': wp_description
+                'wp_description': '' if wp_description_hash is None else 'fail/error'
             })
         
         # Check for content mismatches
-        if db_provider['ai_description'] and wp_description:
-            if db_provider['ai_description'].strip() != wp_description.strip():
-                content_mismatches.append({
-                    'id': db_provider['id'],
-                    'name': provider_name,
-                    'wp_id': wp_id,
-                    'field': 'ai_description',
-                    'db_length': len(db_provider['ai_description']),
-                    'wp_length': len(wp_description)
-                })
+        elif db_provider['ai_description'] and hash_field(db_provider['ai_description']) != wp_description_hash:
+            content_mismatches.append({
+                'id': db_provider['id'],
+                'name': provider_name,
+                'wp_id': wp_id,
+                'field': 'ai_description',
+                'db_length': len(db_provider['ai_description'])
+            })
     
     # Report findings
     print(f"\n📊 Content Analysis Results:")
@@ -176,11 +148,11 @@ def compare_database_vs_wordpress():
             print()
     
     if content_mismatches:
-        print(f"\n⚠️  Content length mismatches (possible sync issues):")
+        print(f"\n⚠️  Content mismatches (possible sync issues):")
         print("-" * 80)
         for mismatch in content_mismatches[:10]:  # Show first 10
             print(f"ID: {mismatch['id']:3} | {mismatch['name']:<40} | Field: {mismatch['field']}")
-            print(f"     DB length: {mismatch['db_length']}, WP length: {mismatch['wp_length']}")
+            print(f"     DB length: {mismatch['db_length']}, WordPress value differs")
         if len(content_mismatches) > 10:
             print(f"... and {len(content_mismatches) - 10} more mismatches")
     
@@ -284,6 +256,7 @@ def main():
     parser = argparse.ArgumentParser(description='Check WordPress content quality')
     parser.add_argument('--wordpress-only', action='store_true', help='Only check WordPress comparison')
     parser.add_argument('--quality-only', action='store_true', help='Only check content quality issues')
+    parser.add_argument('--full-refresh', action='store_true', help='Re-download every WordPress post instead of only modified ones')
     args = parser.parse_args()
     
     print("🔍 WordPress Content Quality Analysis")
@@ -291,12 +264,12 @@ def main():
     
     if not any([args.wordpress_only, args.quality_only]):
         # Run all checks
-        issues, missing_descriptions, content_mismatches = compare_database_vs_wordpress()
+        issues, missing_descriptions, content_mismatches = compare_database_vs_wordpress(args.full_refresh)
         short_descriptions, generic_descriptions, duplicate_descriptions = check_specific_content_issues()
         generate_fix_commands_wordpress(missing_descriptions, content_mismatches)
     else:
         if args.wordpress_only:
-            issues, missing_descriptions, content_mismatches = compare_database_vs_wordpress()
+            issues, missing_descriptions, content_mismatches = compare_database_vs_wordpress(args.full_refresh)
             generate_fix_commands_wordpress(missing_descriptions, content_mismatches)
         if args.quality_only:
             short_descriptions, generic_descriptions, duplicate_descriptions = check_specific_content_issues()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Add content_field_hashes column to providers table
+Stores per-field content hashes so WordPress updates only send what changed
+"""
+
+import sys
+import os
+import logging
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from src.core.database import DatabaseManager
+from sqlalchemy import text
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+
+def add_content_field_hashes_column():
+    """Add content_field_hashes column to providers table"""
+    
+    db = DatabaseManager()
+    session = db.get_session()
+    
+    try:
+        # Check if column already exists
+        check_query = """
+            SELECT column_name 
+            FROM information_schema.columns 
+            WHERE table_name = 'providers' 
+            AND column_name = 'content_field_hashes'
+        """
+        
+        result = session.execute(text(check_query)).first()
+        
+        if result:
+            logger.info("✅ Column 'content_field_hashes' already exists")
+            return True
+        
+        # Add the column
+        logger.info("Adding content_field_hashes column...")
+        
+        session.execute(text("""
+            ALTER TABLE providers 
+            ADD COLUMN content_field_hashes JSON
+        """))
+        session.execute(text("""
+            COMMENT ON COLUMN providers.content_field_hashes IS 
+            'Per-field content hashes from the last WordPress sync, used for delta updates'
+        """))
+        session.commit()
+        
+        logger.info("✅ Successfully added content_field_hashes column")
+        return True
+        
+    except Exception as e:
+        logger.error(f"❌ Error adding column: {e}")
+        session.rollback()
+        return False
+        
+    finally:
+        session.close()
+
+
+def main():
+    """Main execution"""
+    logger.info("="*60)
+    logger.info("🔧 ADDING CONTENT FIELD HASHES COLUMN TO PROVIDERS TABLE")
+    logger.info("="*60)
+    
+    success = add_content_field_hashes_column()
+    
+    if success:
+        logger.info("\n✅ Migration completed successfully")
+        logger.info("   Providers get field hashes on their next WordPress sync")
+    else:
+        logger.error("\n❌ Migration failed")
+        return 1
+    
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Add database-maintained content hash to providers table
+Installs the providers_content_hash trigger that keeps current_content_hash in
+step with the content WordPress shows, plus a partial index so "providers
+needing update" is one indexed comparison against content_hash
+"""
+
+import sys
+import os
+import logging
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from src.core.database import DatabaseManager, Provider
+from src.publishers.content_hash import ContentHashService
+from sqlalchemy import text
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+
+def install_content_hash_trigger(session, hash_service: ContentHashService):
+    """Add the column, trigger function, trigger and partial index"""
+    
+    logger.info("Adding current_content_hash column...")
+    session.execute(text("""
+        ALTER TABLE providers 
+        ADD COLUMN IF NOT EXISTS current_content_hash VARCHAR(64)
+    """))
+    
+    logger.info(f"Installing trigger over {len(hash_service.database_hash_columns())} columns...")
+    for statement in hash_service.content_hash_trigger_sql():
+        session.execute(text(statement))
+    
+    logger.info("Creating needs-sync partial index...")
+    session.execute(text("""
+        CREATE INDEX IF NOT EXISTS idx_providers_needs_sync
+        ON providers (id)
+        WHERE wordpress_post_id IS NOT NULL
+          AND current_content_hash IS DISTINCT FROM content_hash
+    """))
+    session.commit()
+
+
+def backfill_current_hashes(session, batch_size: int) -> int:
+    """Touch every row in keyset batches so the trigger computes its hash"""
+    last_id = 0
+    total = 0
+    
+    while True:
+        rows = session.execute(text("""
+            UPDATE providers SET current_content_hash = NULL
+            WHERE id IN (
+                SELECT id FROM providers
+                WHERE id > :last_id
+                ORDER BY id
+                LIMIT :limit
+            )
+            RETURNING id
+        """), {'last_id': last_id, 'limit': batch_size}).fetchall()
+        session.commit()
+        
+        if not rows:
+            return total
+        
+        last_id = max(row[0] for row in rows)
+        total += len(rows)
+        logger.info(f"   Hashed {total} providers")
+
+
+def reconcile_synced_hashes(session, hash_service: ContentHashService, batch_size: int) -> int:
+    """Carry over providers that were in sync under the Python-computed hash
+    
+    Without this, every published provider would look changed once the
+    database hash replaces the old content_hash values.
+    """
+    last_id = 0
+    reconciled = 0
+    
+    while True:
+        providers = session.query(Provider).filter(
+            Provider.id > last_id,
+            Provider.wordpress_post_id.isnot(None),
+            Provider.content_hash.isnot(None)
+        ).order_by(Provider.id).limit(batch_size).all()
+        
+        if not providers:
+            return reconciled
+        
+        last_id = providers[-1].id
+        in_sync = [
+            provider.id for provider in providers
+            if hash_service.generate_hash(provider) == provider.content_hash
+        ]
+        
+        if in_sync:
+            session.execute(text("""
+                UPDATE providers SET content_hash = current_content_hash
+                WHERE id = ANY(:ids)
+            """), {'ids': in_sync})
+        session.commit()
+        session.expunge_all()
+        
+        reconciled += len(in_sync)
+        logger.info(f"   Reconciled {reconciled} in-sync providers (through id {last_id})")
+
+
+def add_current_content_hash(batch_size: int = 1000):
+    """Install the database content hash and migrate existing sync state"""
+    
+    db = DatabaseManager()
+    session = db.get_session()
+    hash_service = ContentHashService()
+    
+    try:
+        install_content_hash_trigger(session, hash_service)
+        
+        hashed = backfill_current_hashes(session, batch_size)
+        logger.info(f"✅ Computed current_content_hash for {hashed} providers")
+        
+        reconciled = reconcile_synced_hashes(session, hash_service, batch_size)
+        logger.info(f"✅ Carried over sync state for {reconciled} providers")
+        
+        return True
+        
+    except Exception as e:
+        logger.error(f"❌ Error installing content hash trigger: {e}")
+        session.rollback()
+        return False
+        
+    finally:
+        session.close()
+
+
+def main():
+    """Main execution"""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='Install the database-maintained provider content hash')
+    parser.add_argument('--batch-size', type=int, default=1000, help='Rows per batch')
+    args = parser.parse_args()
+    
+    logger.info("="*60)
+    logger.info("🔧 ADDING DATABASE CONTENT HASH TO PROVIDERS TABLE")
+    logger.info("="*60)
+    
+    success = add_current_content_hash(args.batch_size)
+    
+    if success:
+        logger.info("\n✅ Migration completed successfully")
+        logger.info("   Re-run after changing ContentHashService tracked fields")
+    else:
+        logger.error("\n❌ Migration failed")
+        return 1
+    
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Add a unique page key to taxonomy_content
+Creates the table once (the generators used to re-run CREATE TABLE on every
+save), merges duplicate pages and adds the uq_taxonomy_content_page index
+that upsert_taxonomy_content's ON CONFLICT targets
+"""
+
+import sys
+import os
+import logging
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from src.core.database import DatabaseManager
+from sqlalchemy import text
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+PAGE_KEY = "taxonomy_type, COALESCE(location, ''), COALESCE(specialty, ''), COALESCE(ward, '')"
+
+
+def create_taxonomy_content_table(session):
+    """Create taxonomy_content with every column the scripts use"""
+    logger.info("Creating taxonomy_content table...")
+    session.execute(text("""
+        CREATE TABLE IF NOT EXISTS taxonomy_content (
+            id SERIAL PRIMARY KEY,
+            taxonomy_type VARCHAR(20),
+            location VARCHAR(100),
+            specialty VARCHAR(100),
+            ward VARCHAR(100),
+            title VARCHAR(255),
+            meta_description TEXT,
+            brief_intro TEXT,
+            full_description TEXT,
+            provider_count INTEGER,
+            priority_tier INTEGER,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            wordpress_post_id INTEGER
+        )
+    """))
+    
+    for column, definition in (('updated_at', 'TIMESTAMP DEFAULT CURRENT_TIMESTAMP'),
+                               ('wordpress_post_id', 'INTEGER')):
+        session.execute(text(f"""
+            ALTER TABLE taxonomy_content
+            ADD COLUMN IF NOT EXISTS {column} {definition}
+        """))
+
+
+def merge_duplicate_pages(session) -> int:
+    """Keep the newest row per page, carrying over any WordPress post ID"""
+    session.execute(text(f"""
+        UPDATE taxonomy_content AS keep
+        SET wordpress_post_id = dup.wordpress_post_id
+        FROM (
+            SELECT {PAGE_KEY} AS page,
+                   MAX(id) AS keep_id,
+                   MAX(wordpress_post_id) AS wordpress_post_id
+            FROM taxonomy_content
+            GROUP BY {PAGE_KEY}
+            HAVING COUNT(*) > 1
+        ) AS dup
+        WHERE keep.id = dup.keep_id
+          AND keep.wordpress_post_id IS NULL
+    """))
+    
+    return session.execute(text(f"""
+        DELETE FROM taxonomy_content
+        WHERE id NOT IN (
+            SELECT MAX(id) FROM taxonomy_content GROUP BY {PAGE_KEY}
+        )
+    """)).rowcount
+
+
+def add_taxonomy_content_unique_key():
+    """Create the table if needed, merge duplicates and add the unique key"""
+    
+    db = DatabaseManager()
+    session = db.get_session()
+    
+    try:
+        create_taxonomy_content_table(session)
+        
+        removed = merge_duplicate_pages(session)
+        logger.info(f"Removed {removed} duplicate pages")
+        
+        logger.info("Creating uq_taxonomy_content_page index...")
+        session.execute(text(f"""
+            CREATE UNIQUE INDEX IF NOT EXISTS uq_taxonomy_content_page
+            ON taxonomy_content ({PAGE_KEY})
+        """))
+        session.commit()
+        
+        return True
+    
+    except Exception as e:
+        logger.error(f"❌ Error adding taxonomy_content key: {e}")
+        session.rollback()
+        return False
+    
+    finally:
+        session.close()
+
+
+def main():
+    """Main execution"""
+    logger.info("="*60)
+    logger.info("🔧 ADDING UNIQUE PAGE KEY TO TAXONOMY_CONTENT")
+    logger.info("="*60)
+    
+    success = add_taxonomy_content_unique_key()
+    
+    if success:
+        logger.info("\n✅ Migration completed successfully")
+    else:
+        logger.error("\n❌ Migration failed")
+        return 1
+    
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Turn wordpress_sync_operations into the WordPress sync outbox
+Creates the table if needed, adds the queue columns, the partial index the
+workers claim through and the unique index that coalesces pending operations
+"""
+
+import sys
+import os
+import logging
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from src.core.database import DatabaseManager
+from sqlalchemy import text
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+QUEUE_COLUMNS = [
+    ('attempts', 'INTEGER NOT NULL DEFAULT 0'),
+    ('coalesced', 'INTEGER NOT NULL DEFAULT 0'),
+    ('next_attempt_at', 'TIMESTAMP'),
+    ('claimed_by', 'VARCHAR(100)'),
+    ('claimed_at', 'TIMESTAMP'),
+    ('completed_at', 'TIMESTAMP')
+]
+
+
+def create_outbox_table(session):
+    """Create wordpress_sync_operations as modelled in src/core/models.py"""
+    logger.info("Creating wordpress_sync_operations table...")
+    session.execute(text("""
+        CREATE TABLE IF NOT EXISTS wordpress_sync_operations (
+            id SERIAL PRIMARY KEY,
+            timestamp TIMESTAMP DEFAULT (NOW() AT TIME ZONE 'utc'),
+            operation_type VARCHAR(50),
+            provider_id INTEGER,
+            wordpress_post_id INTEGER,
+            status VARCHAR(20),
+            error_message TEXT,
+            content_hash_before VARCHAR(64),
+            content_hash_after VARCHAR(64),
+            fields_updated JSON,
+            duration FLOAT
+        )
+    """))
+    session.execute(text("""
+        CREATE INDEX IF NOT EXISTS ix_wordpress_sync_operations_timestamp
+        ON wordpress_sync_operations (timestamp)
+    """))
+    session.execute(text("""
+        CREATE INDEX IF NOT EXISTS ix_wordpress_sync_operations_provider_id
+        ON wordpress_sync_operations (provider_id)
+    """))
+
+
+def add_queue_columns(session):
+    """Add the outbox state columns"""
+    for column, definition in QUEUE_COLUMNS:
+        logger.info(f"Adding {column} column...")
+        session.execute(text(f"""
+            ALTER TABLE wordpress_sync_operations
+            ADD COLUMN IF NOT EXISTS {column} {definition}
+        """))
+
+
+def add_queue_indexes(session):
+    """Indexes for claiming and coalescing"""
+    # Leftover rows from before the outbox would block the unique index
+    retired = session.execute(text("""
+        UPDATE wordpress_sync_operations
+        SET status = 'superseded'
+        WHERE status = 'pending'
+          AND id NOT IN (
+              SELECT MAX(id) FROM wordpress_sync_operations
+              WHERE status = 'pending'
+              GROUP BY provider_id
+          )
+    """)).rowcount
+    if retired:
+        logger.info(f"Superseded {retired} duplicate pending operations")
+    
+    session.execute(text("""
+        UPDATE wordpress_sync_operations
+        SET next_attempt_at = COALESCE(timestamp, NOW() AT TIME ZONE 'utc')
+        WHERE status = 'pending' AND next_attempt_at IS NULL
+    """))
+    
+    logger.info("Creating claim index...")
+    session.execute(text("""
+        CREATE INDEX IF NOT EXISTS idx_wordpress_sync_due
+        ON wordpress_sync_operations (next_attempt_at, id)
+        WHERE status = 'pending'
+    """))
+    
+    logger.info("Creating in-flight index...")
+    session.execute(text("""
+        CREATE INDEX IF NOT EXISTS idx_wordpress_sync_processing
+        ON wordpress_sync_operations (provider_id, claimed_at)
+        WHERE status = 'processing'
+    """))
+    
+    logger.info("Creating coalescing index...")
+    session.execute(text("""
+        CREATE UNIQUE INDEX IF NOT EXISTS uq_wordpress_sync_pending
+        ON wordpress_sync_operations (provider_id)
+        WHERE status = 'pending'
+    """))
+
+
+def add_wordpress_sync_outbox():
+    """Prepare wordpress_sync_operations for use as the sync outbox"""
+    
+    db = DatabaseManager()
+    session = db.get_session()
+    
+    try:
+        create_outbox_table(session)
+        add_queue_columns(session)
+        add_queue_indexes(session)
+        session.commit()
+        
+        counts = dict(session.execute(text("""
+            SELECT status, COUNT(*) FROM wordpress_sync_operations GROUP BY status
+        """)).fetchall())
+        logger.info(f"📊 Existing operations by status: {counts or 'none'}")
+        
+        return True
+    
+    except Exception as e:
+        logger.error(f"❌ Error creating sync outbox: {e}")
+        session.rollback()
+        return False
+    
+    finally:
+        session.close()
+
+
+def main():
+    """Main execution"""
+    logger.info("="*60)
+    logger.info("🔧 CREATING WORDPRESS SYNC OUTBOX")
+    logger.info("="*60)
+    
+    success = add_wordpress_sync_outbox()
+    
+    if success:
+        logger.info("\n✅ Migration completed successfully")
+        logger.info("   Set WORDPRESS_SYNC_OUTBOX=true and run scripts/run_sync_worker.py")
+    else:
+        logger.error("\n❌ Migration failed")
+        return 1
+    
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Backfill precomputed review features
+Populates providers.review_keywords / review_highlights from review_content
+for rows collected before the single-pass review feature stage existed
+"""
+
+import sys
+import os
+import json
+import logging
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from src.core.database import DatabaseManager
+from src.utils.review_features import REVIEW_FEATURES_VERSION, extract_review_features
+from sqlalchemy import text
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+
+def backfill_review_features(batch_size: int = 500, force: bool = False):
+    """Compute review features for providers missing current ones
+    
+    Args:
+        batch_size: Rows fetched and updated per round trip
+        force: Recompute even when features are already current
+    """
+    db = DatabaseManager()
+    session = db.get_session()
+    
+    updated = 0
+    last_id = 0
+    
+    try:
+        while True:
+            rows = session.execute(text("""
+                SELECT id, review_content, review_keywords
+                FROM providers
+                WHERE id > :last_id
+                  AND review_content IS NOT NULL
+                ORDER BY id
+                LIMIT :limit
+            """), {'last_id': last_id, 'limit': batch_size}).fetchall()
+            
+            if not rows:
+                break
+            
+            last_id = rows[-1].id
+            params = []
+            
+            for row in rows:
+                current = row.review_keywords
+                if (not force and isinstance(current, dict)
+                        and current.get('version') == REVIEW_FEATURES_VERSION):
+                    continue
+                
+                features = extract_review_features(row.review_content)
+                params.append({
+                    'id': row.id,
+                    'keywords': json.dumps(features),
+                    'highlights': json.dumps(features['highlights'])
+                })
+            
+            if params:
+                session.execute(text("""
+                    UPDATE providers
+                    SET review_keywords = CAST(:keywords AS JSON),
+                        review_highlights = CAST(:highlights AS JSON)
+                    WHERE id = :id
+                """), params)
+                session.commit()
+                updated += len(params)
+                logger.info(f"   Updated {updated} providers (through id {last_id})")
+        
+        logger.info(f"✅ Backfilled review features for {updated} providers")
+        return True
+    
+    except Exception as e:
+        logger.error(f"❌ Error backfilling review features: {e}")
+        session.rollback()
+        return False
+    
+    finally:
+        session.close()
+
+
+def main():
+    """Main execution"""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='Backfill precomputed review features')
+    parser.add_argument('--batch-size', type=int, default=500, help='Rows per batch')
+    parser.add_argument('--force', action='store_true', help='Recompute current features too')
+    args = parser.parse_args()
+    
+    logger.info("="*60)
+    logger.info("🔧 BACKFILLING REVIEW FEATURES")
+    logger.info("="*60)
+    
+    success = backfill_review_features(args.batch_size, args.force)
+    sys.exit(0 if success else 1)
+
+
+if __name__ == "__main__":
+    main()
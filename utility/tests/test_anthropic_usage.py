@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Unit Tests for Anthropic Usage Tracking
+Tests the cached system prompt sent with content requests, the cache
+hit/miss accounting of tracked responses, the one-time import of the old
+file-based logs and the per-day aggregates.
+"""
+
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.processors.anthropic_usage import (
+    AnthropicUsageTracker,
+    PROMPT_CACHING_BETA,
+    cached_system_prompt,
+    has_cache_breakpoint,
+    min_cacheable_tokens
+)
+from src.processors.ai_content import MEGA_BATCH_SYSTEM_PROMPT
+from src.processors.taxonomy_content import TaxonomyContentGenerator
+
+
+def make_response(text='', cache_creation=0, cache_read=0):
+    """Messages API response with the given cache usage"""
+    return SimpleNamespace(
+        model='claude-3-7-sonnet-20250219',
+        content=[SimpleNamespace(text=text)],
+        usage=SimpleNamespace(input_tokens=120, output_tokens=800,
+                              cache_creation_input_tokens=cache_creation,
+                              cache_read_input_tokens=cache_read)
+    )
+
+
+class TestCachedSystemPrompt(unittest.TestCase):
+    """Test prompt caching of the static instructions"""
+    
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.tracker = AnthropicUsageTracker(log_dir=self.tmpdir.name)
+    
+    def test_prompts_below_the_minimum_are_sent_uncached(self):
+        for model, prompt in (('claude-3-5-sonnet-20241022', MEGA_BATCH_SYSTEM_PROMPT),
+                              (TaxonomyContentGenerator.MODEL, TaxonomyContentGenerator.SYSTEM_PROMPT)):
+            blocks = cached_system_prompt(prompt, model=model)
+            
+            self.assertEqual(blocks, [{'type': 'text', 'text': prompt}])
+            self.assertFalse(has_cache_breakpoint(blocks))
+    
+    def test_long_prompt_gets_a_breakpoint(self):
+        prompt = 'Static instructions. ' * 250
+        
+        blocks = cached_system_prompt(prompt, model='claude-3-7-sonnet-20250219')
+        
+        self.assertEqual(blocks[0]['text'], prompt)
+        self.assertEqual(blocks[0]['cache_control'], {'type': 'ephemeral'})
+        # Haiku needs twice as long a prefix
+        self.assertEqual(min_cacheable_tokens('claude-3-haiku-20240307'), 2048)
+        self.assertFalse(has_cache_breakpoint(cached_system_prompt(prompt, model='claude-3-haiku-20240307')))
+    
+    def test_taxonomy_request_payload(self):
+        generator = TaxonomyContentGenerator.__new__(TaxonomyContentGenerator)
+        generator.client = MagicMock()
+        generator.client.messages.create.return_value = make_response(
+            'PAGE 1:\nTITLE: T\nMETA: M\nBRIEF_INTRO:\nIntro\nFULL_DESCRIPTION:\n<p>Body</p>\n---',
+            cache_read=1900
+        )
+        generator.usage_tracker = self.tracker
+        generator.generated_count = 0
+        generator.total_cost = 0.0
+        generator._count_lock = threading.Lock()
+        
+        pages, _ = generator.generate_pages([('combination', 'Tokyo', 'Dentist', 'Shibuya', 6)])
+        
+        self.assertEqual(pages[0].brief_intro, 'Intro')
+        kwargs = generator.client.messages.create.call_args.kwargs
+        self.assertEqual(kwargs['system'], [{'type': 'text', 'text': TaxonomyContentGenerator.SYSTEM_PROMPT}])
+        self.assertEqual(kwargs['extra_headers'], {'anthropic-beta': PROMPT_CACHING_BETA})
+        # Only the per-call details go in the user message
+        self.assertNotIn('IMPORTANT GUIDELINES', kwargs['messages'][0]['content'])
+        self.assertIn('Dentist in Shibuya, Tokyo', kwargs['messages'][0]['content'])
+        self.assertEqual(self.tracker.get_daily_usage()['total_cache_read_tokens'], 1900)
+    
+    def test_cache_miss_is_logged(self):
+        with self.assertLogs('src.processors.anthropic_usage', level='WARNING') as logs:
+            self.tracker.track_response(make_response(), cached=True)
+        self.assertIn('Prompt cache unused', logs.output[0])
+        
+        with self.assertNoLogs('src.processors.anthropic_usage', level='WARNING'):
+            self.tracker.track_response(make_response(cache_creation=1900), cached=True)
+            self.tracker.track_response(make_response(cache_read=1900), cached=True)
+            self.tracker.track_response(make_response())
+
+
+class TestUsageStore(unittest.TestCase):
+    """Test the SQLite usage store"""
+    
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.log_dir = self.tmpdir.name
+        self.today = datetime.now().strftime('%Y-%m-%d')
+    
+    def query(self, sql):
+        conn = sqlite3.connect(os.path.join(self.log_dir, 'anthropic_usage.db'))
+        try:
+            return conn.execute(sql).fetchall()
+        finally:
+            conn.close()
+    
+    def write_legacy_logs(self):
+        entry = {'timestamp': f'{self.today}T09:00:00', 'model': 'claude-3-haiku-20240307',
+                 'input_tokens': 100, 'output_tokens': 50, 'total_cost': 0.5}
+        with open(os.path.join(self.log_dir, 'anthropic_usage.json'), 'w') as f:
+            json.dump([entry, entry], f)
+        
+        os.makedirs(os.path.join(self.log_dir, 'anthropic_usage'))
+        with open(os.path.join(self.log_dir, 'anthropic_usage', f'{self.today}.jsonl'), 'w') as f:
+            f.write(json.dumps({**entry, 'timestamp': f'{self.today}T10:00:00',
+                                'cache_read_input_tokens': 40}) + '\n')
+    
+    def test_legacy_logs_migrated_once(self):
+        self.write_legacy_logs()
+        
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            list(pool.map(lambda _: AnthropicUsageTracker(log_dir=self.log_dir), range(4)))
+        AnthropicUsageTracker(log_dir=self.log_dir)
+        
+        self.assertEqual(self.query('SELECT COUNT(*) FROM usage_entries'), [(3,)])
+        self.assertEqual(self.query('SELECT key FROM meta'), [('legacy_logs_migrated',)])
+        self.assertTrue(os.path.exists(os.path.join(self.log_dir, 'anthropic_usage.json.migrated')))
+        
+        daily = AnthropicUsageTracker(log_dir=self.log_dir).get_daily_usage()
+        self.assertEqual(daily['requests'], 3)
+        self.assertEqual(daily['total_input_tokens'], 300)
+        self.assertEqual(daily['total_cache_read_tokens'], 40)
+        self.assertAlmostEqual(daily['total_cost'], 1.5)
+    
+    def test_aggregates_match_entries(self):
+        tracker = AnthropicUsageTracker(log_dir=self.log_dir)
+        tracker.track_usage('claude-3-7-sonnet-20250219', 1_000_000, 0)
+        tracker.track_usage('claude-3-7-sonnet-20250219', 0, 1_000_000, cache_read_input_tokens=1_000_000)
+        tracker.track_usage('claude-3-haiku-20240307', 1_000_000, 1_000_000, cache_creation_input_tokens=1_000_000)
+        
+        daily = tracker.get_daily_usage()
+        sonnet = daily['by_model']['claude-3-7-sonnet-20250219']
+        self.assertEqual(sonnet['requests'], 2)
+        self.assertAlmostEqual(sonnet['cost'], 3.00 + 15.00 + 0.30)
+        self.assertAlmostEqual(daily['by_model']['claude-3-haiku-20240307']['cost'], 0.25 + 1.25 + 0.3125)
+        self.assertEqual(daily['requests'], 3)
+        self.assertEqual(daily['total_cache_creation_tokens'], 1_000_000)
+        
+        entries = self.query('SELECT COUNT(*), SUM(cost) FROM usage_entries')[0]
+        self.assertEqual(entries[0], daily['requests'])
+        self.assertAlmostEqual(entries[1], daily['total_cost'])
+        
+        monthly = tracker.get_monthly_usage()
+        self.assertEqual(monthly['total_requests'], 3)
+        self.assertAlmostEqual(monthly['total_cost'], daily['total_cost'])
+        self.assertEqual(monthly['daily_breakdown'][-1]['date'], self.today)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+"""
+Unit Tests for the Campaign State Store
+Tests per-query completion rows, persistence across managers, checkpoint
+rollback, import of legacy whole-file JSON state, query leasing for the
+parallel campaign executor, and the collector's shared rate limit.
+"""
+
+import os
+import sys
+import json
+import tempfile
+import threading
+import time
+import unittest
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+from sqlalchemy.exc import IntegrityError
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.campaign.campaign_state import CampaignStateManager
+from src.campaign.enhanced_pipeline import EnhancedCampaignPipeline
+from src.collectors.google_places import GooglePlacesCollector
+from src.core.cost_tracker import CostTracker
+
+
+def make_queries(count):
+    return [
+        {'query': f'English clinic {i}', 'location': 'Tokyo', 'specialty': 'general', 'pattern_type': 'english'}
+        for i in range(count)
+    ]
+
+
+class TestCampaignStateStore(unittest.TestCase):
+    """Test the SQLite-backed campaign state"""
+    
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.state_file = os.path.join(self.tmpdir.name, 'campaign_state.db')
+    
+    def make_manager(self):
+        manager = CampaignStateManager(self.state_file)
+        self.addCleanup(manager.close)
+        return manager
+    
+    def complete_next(self, manager, found=2):
+        query = manager.get_next_query()
+        manager.mark_query_completed(query, found, 1, 4.0)
+        return query
+    
+    def test_completions_persist_per_query(self):
+        manager = self.make_manager()
+        manager.initialize_query_queue(make_queries(5))
+        first = self.complete_next(manager)
+        self.complete_next(manager)
+        
+        reopened = self.make_manager()
+        self.assertEqual(reopened.state.completed_queries, 2)
+        self.assertEqual(reopened.get_next_query()['queue_index'], 2)
+        self.assertEqual(first['queue_index'], 0)
+        
+        performance = reopened.get_query_performance()
+        self.assertEqual([p.query for p in performance], ['English clinic 0', 'English clinic 1'])
+        self.assertTrue(all(p.executed and p.providers_found == 2 for p in performance))
+    
+    def test_restore_checkpoint_reopens_later_queries(self):
+        manager = self.make_manager()
+        manager.initialize_query_queue(make_queries(5))
+        self.complete_next(manager)
+        manager.create_checkpoint()
+        self.complete_next(manager)
+        self.complete_next(manager)
+        
+        self.assertTrue(manager.restore_checkpoint())
+        
+        self.assertEqual(manager.state.completed_queries, 1)
+        self.assertEqual(manager.get_next_query()['queue_index'], 1)
+        self.assertEqual(len(manager.get_query_performance()), 1)
+    
+    def test_checkpoint_taken_after_interval(self):
+        manager = self.make_manager()
+        manager.initialize_query_queue(make_queries(2))
+        manager.state.checkpoint_interval = 3
+        manager.update_provider_metrics(providers_found=2)
+        self.assertEqual(manager.list_checkpoints(), [])
+        
+        manager.update_provider_metrics(providers_found=2)
+        
+        self.assertEqual(len(manager.list_checkpoints()), 1)
+        self.assertEqual(manager.state.providers_since_checkpoint, 0)
+    
+    def test_legacy_json_state_is_imported(self):
+        legacy = {
+            'campaign_id': 'campaign_legacy',
+            'status': 'running',
+            'total_queries': 3,
+            'completed_queries': 1,
+            'current_query_index': 1,
+            'query_queue': make_queries(3),
+            'query_performance': [{'query': 'English clinic 0', 'location': 'Tokyo', 'specialty': 'general',
+                                   'pattern_type': 'english', 'providers_found': 7, 'executed': True}],
+            'metrics': {'total_providers_found': 7}
+        }
+        with open(os.path.join(self.tmpdir.name, 'campaign_state.json'), 'w') as f:
+            json.dump(legacy, f)
+        
+        manager = self.make_manager()
+        
+        self.assertEqual(manager.state.campaign_id, 'campaign_legacy')
+        self.assertEqual(manager.state.metrics.total_providers_found, 7)
+        self.assertEqual(manager.get_next_query()['query'], 'English clinic 1')
+        self.assertEqual(manager.get_query_performance()[0].providers_found, 7)
+    
+    def test_leased_queries_are_not_handed_out_twice(self):
+        manager = self.make_manager()
+        manager.initialize_query_queue(make_queries(5))
+        
+        first = manager.lease_queries('worker-a', 2)
+        second = manager.lease_queries('worker-b', 5)
+        
+        self.assertEqual([q['queue_index'] for q in first], [0, 1])
+        self.assertEqual([q['queue_index'] for q in second], [2, 3, 4])
+        self.assertEqual(manager.lease_queries('worker-c', 5), [])
+        
+        self.assertTrue(manager.mark_query_completed(first[0], 1, 1, 4.0))
+        self.assertFalse(manager.mark_query_completed(first[0], 1, 1, 4.0))
+        self.assertEqual(manager.state.completed_queries, 1)
+        
+        self.assertEqual(manager.release_leases('worker-a'), 1)
+        self.assertEqual([q['queue_index'] for q in manager.lease_queries('worker-c', 5)], [1])
+    
+    def test_expired_leases_are_reclaimed(self):
+        manager = self.make_manager()
+        manager.initialize_query_queue(make_queries(2))
+        manager.lease_queries('crashed', 2, lease_seconds=-1)
+        
+        reopened = self.make_manager()
+        
+        self.assertEqual(len(reopened.lease_queries('worker', 5)), 2)
+    
+    def test_own_leases_are_renewed_not_reclaimed(self):
+        manager = self.make_manager()
+        manager.initialize_query_queue(make_queries(4))
+        slow = manager.lease_queries('worker', 2, lease_seconds=-1)
+        
+        # The owner's next lease call keeps its slow queries instead of re-running them
+        more = manager.lease_queries('worker', 4)
+        
+        self.assertEqual([q['queue_index'] for q in slow], [0, 1])
+        self.assertEqual([q['queue_index'] for q in more], [2, 3])
+        self.assertEqual(manager.lease_queries('other', 4), [])
+        
+        self.assertEqual(manager.renew_leases('worker', lease_seconds=-1), 4)
+        self.assertEqual(len(manager.lease_queries('other', 4)), 4)
+
+
+class TestParallelCampaignExecutor(unittest.TestCase):
+    """Test the leased, concurrent query executor"""
+    
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.manager = CampaignStateManager(os.path.join(self.tmpdir.name, 'campaign_state.db'))
+        self.addCleanup(self.manager.close)
+        self.manager.initialize_query_queue(make_queries(12))
+        self.manager.state.status = 'running'
+        
+        self.searched = []
+        self.shared_results = []
+        self.lock = threading.Lock()
+        self.remaining_budget = 100.0
+        
+        collector = MagicMock()
+        collector.search_providers.side_effect = self.search
+        collector.get_place_details.side_effect = lambda place_id: {'place_id': place_id}
+        collector.create_provider_record.side_effect = lambda details: {
+            'provider_name': details['place_id'], 'proficiency_score': 4, 'specialties': ['general']
+        }
+        collector.cost_tracker = SimpleNamespace(
+            COSTS=CostTracker.COSTS, get_remaining_budget=lambda: self.remaining_budget
+        )
+        
+        self.pipeline = EnhancedCampaignPipeline.__new__(EnhancedCampaignPipeline)
+        self.pipeline.state_manager = self.manager
+        self.pipeline.state = self.manager.state
+        self.pipeline.collector = collector
+        self.pipeline.pipeline = SimpleNamespace(db=MagicMock())
+        self.pipeline.results_per_query = 10
+    
+    def search(self, query, limit):
+        with self.lock:
+            self.searched.append(query)
+        return [{'place_id': f'{query}-{i}'} for i in range(2)] + self.shared_results
+    
+    def run_campaign(self, **kwargs):
+        with patch.object(self.pipeline, '_process_content_generation'), \
+                patch.object(self.pipeline, 'show_progress_dashboard'):
+            return self.pipeline.run_with_state_management(workers=4, **kwargs)
+    
+    def test_runs_every_query_once(self):
+        collected = self.run_campaign(daily_limit=1000)
+        
+        self.assertEqual(collected, 24)
+        self.assertEqual(sorted(self.searched), sorted(q['query'] for q in make_queries(12)))
+        self.assertEqual(self.manager.state.completed_queries, 12)
+        self.assertEqual(self.manager.state.metrics.total_providers_found, 24)
+        self.assertEqual(self.manager.state.status, 'completed')
+    
+    def test_provider_limit_stops_leasing(self):
+        collected = self.run_campaign(daily_limit=6)
+        
+        self.assertGreaterEqual(collected, 6)
+        self.assertEqual(self.manager.state.completed_queries, len(self.searched))
+        self.assertEqual(self.manager.state.status, 'running')
+        
+        # The next run picks up exactly where this one stopped
+        self.assertEqual(len(self.manager.lease_queries('next', 100)), 12 - len(self.searched))
+    
+    def test_budget_limits_queries_in_flight(self):
+        self.remaining_budget = 0.0
+        
+        self.assertEqual(self.run_campaign(daily_limit=1000), 0)
+        self.assertEqual(self.searched, [])
+        self.assertEqual(self.manager.state.status, 'running')
+    
+    def test_budget_covers_every_search_page(self):
+        costs = CostTracker.COSTS
+        one_page_query = costs['place_search'] + 10 * (costs['place_details'] + costs['contact_data'])
+        self.remaining_budget = one_page_query * 2
+        
+        self.assertEqual(self.pipeline._affordable_slots(4, 0), 1)
+    
+    def test_places_shared_by_queries_are_fetched_once(self):
+        self.shared_results = [{'place_id': 'shared'}]
+        
+        collected = self.run_campaign(daily_limit=1000)
+        
+        self.assertEqual(collected, 25)
+        details = [c.args[0] for c in self.pipeline.collector.get_place_details.call_args_list]
+        self.assertEqual(details.count('shared'), 1)
+        self.assertEqual(self.manager.state.metrics.total_providers_found, 25)
+    
+    def test_duplicate_insert_skips_only_that_provider(self):
+        db = self.pipeline.pipeline.db
+        
+        def save(record):
+            if record['provider_name'] == 'English clinic 3-0':
+                raise IntegrityError('INSERT', {}, Exception('duplicate key value'))
+            return record
+        db.create_or_update_provider.side_effect = save
+        
+        collected = self.run_campaign(daily_limit=1000)
+        
+        self.assertEqual(collected, 23)
+        self.assertEqual(self.manager.state.completed_queries, 12)
+        self.assertTrue(all(not p.error for p in self.manager.get_query_performance()))
+
+
+
+class TestCollectorRateLimit(unittest.TestCase):
+    """Test the rate limit shared by concurrent queries"""
+    
+    def test_concurrent_calls_stay_spaced(self):
+        collector = GooglePlacesCollector.__new__(GooglePlacesCollector)
+        collector.rate_limit_delay = 0.05
+        collector.last_api_call = 0
+        collector._rate_limit_lock = threading.Lock()
+        
+        calls = []
+        lock = threading.Lock()
+        
+        def call():
+            collector._apply_rate_limit()
+            with lock:
+                calls.append(time.time())
+        
+        threads = [threading.Thread(target=call) for _ in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        calls.sort()
+        gaps = [later - earlier for earlier, later in zip(calls, calls[1:])]
+        self.assertEqual(len(gaps), 5)
+        # Allow for scheduling jitter, but not two calls in the same slot
+        self.assertGreater(min(gaps), 0.03)
+
+
+if __name__ == '__main__':
+    unittest.main()
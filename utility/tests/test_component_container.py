@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Unit Tests for the Shared Engine Registry and Component Container
+Tests that engines are shared per URL and that components are built lazily, once.
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+from unittest.mock import MagicMock
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from sqlalchemy import Column, Integer, MetaData, Table, inspect
+
+from src.core import database
+from src.core.container import Container, component
+from src.core.pipeline import UnifiedPipeline
+
+
+class TestEngineRegistry(unittest.TestCase):
+    """Test the process-wide engine registry"""
+    
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.url = f"sqlite:///{os.path.join(self.tmp.name, 'registry.db')}"
+    
+    def tearDown(self):
+        database.dispose_engines()
+        self.tmp.cleanup()
+    
+    def test_one_engine_and_session_factory_per_url(self):
+        self.assertIs(database.get_engine(self.url), database.get_engine(self.url))
+        self.assertIs(database.get_session_factory(self.url), database.get_session_factory(self.url))
+    
+    def test_tables_created_once_per_engine(self):
+        metadata = MetaData()
+        Table('things', metadata, Column('id', Integer, primary_key=True))
+        engine = database.get_engine(self.url)
+        
+        metadata.create_all = MagicMock(wraps=metadata.create_all)
+        database.ensure_tables(engine, metadata)
+        database.ensure_tables(engine, metadata)
+        
+        metadata.create_all.assert_called_once()
+        self.assertIn('things', inspect(engine).get_table_names())
+    
+    def test_dispose_forgets_engines(self):
+        engine = database.get_engine(self.url)
+        database.dispose_engines()
+        self.assertIsNot(database.get_engine(self.url), engine)
+
+
+class TestContainer(unittest.TestCase):
+    """Test lazy component construction"""
+    
+    def test_builds_once_on_first_use(self):
+        container = Container()
+        factory = MagicMock(side_effect=lambda c: object())
+        container.register('thing', factory)
+        
+        self.assertFalse(container.is_built('thing'))
+        first = container.get('thing')
+        self.assertIs(container.get('thing'), first)
+        factory.assert_called_once_with(container)
+        
+        container.reset('thing')
+        self.assertIsNot(container.get('thing'), first)
+    
+    def test_unknown_component(self):
+        with self.assertRaises(KeyError):
+            Container().get('missing')
+    
+    def test_component_attribute_is_lazy_and_overridable(self):
+        container = Container()
+        container.register('db', lambda c: 'shared-db')
+        
+        class Service:
+            db = component('db')
+            
+            def __init__(self):
+                self.container = container
+        
+        service = Service()
+        self.assertFalse(container.is_built('db'))
+        self.assertEqual(service.db, 'shared-db')
+        
+        service.db = 'override'
+        self.assertEqual(service.db, 'override')
+    
+    def test_pipeline_builds_nothing_until_used(self):
+        container = Container()
+        for name in ('db', 'collector', 'processor', 'publisher', 'tracker'):
+            container.register(name, MagicMock(side_effect=AssertionError(f"{name} built")))
+        db = MagicMock()
+        container.provide('db', db)
+        
+        pipeline = UnifiedPipeline(container=container)
+        
+        self.assertIs(pipeline.db, db)
+        self.assertFalse(container.is_built('collector'))
+        self.assertFalse(container.is_built('publisher'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Unit Tests for Content Hash Service
+Tests per-field change detection and the database-maintained content hash.
+"""
+
+import os
+import sys
+import unittest
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.core.database import DatabaseManager, Provider
+from src.publishers.content_hash import ContentHashService
+
+
+class TestContentHashService(unittest.TestCase):
+    """Test change detection"""
+    
+    def setUp(self):
+        self.service = ContentHashService()
+        self.provider = Provider(
+            id=1,
+            provider_name='Tokyo Clinic',
+            city='Tokyo',
+            rating=4.2,
+            specialties=['Internal Medicine'],
+            wordpress_post_id=10
+        )
+    
+    def _mark_synced(self):
+        self.provider.content_hash = self.service.generate_hash(self.provider)
+        self.provider.content_field_hashes = self.service.generate_field_hashes(self.provider)
+    
+    def test_changed_fields_are_diffed(self):
+        self._mark_synced()
+        self.assertEqual(self.service.get_changed_fields(self.provider), [])
+        self.assertFalse(self.service.needs_update(self.provider))
+        
+        self.provider.rating = 4.7
+        self.assertEqual(self.service.get_changed_fields(self.provider), ['rating'])
+        self.assertTrue(self.service.needs_update(self.provider))
+        self.assertFalse(self.service.taxonomy_inputs_changed(['rating']))
+    
+    def test_missing_hash_map_means_everything_changed(self):
+        self.provider.content_hash = 'legacy'
+        changed = self.service.get_changed_fields(self.provider)
+        self.assertIn('ai_description', changed)
+        self.assertIn('review_content', changed)
+    
+    def test_changed_acf_keys(self):
+        acf = {'provider_rating': '4.2', 'ai_description': 'Text'}
+        self.provider.content_field_hashes = self.service.generate_field_hashes(self.provider, acf_fields=acf)
+        
+        acf['provider_rating'] = '4.7'
+        self.assertEqual(self.service.get_changed_keys(self.provider, 'acf', acf), ['provider_rating'])
+    
+    def test_database_hash_is_used_when_present(self):
+        self.provider.content_hash = 'abc'
+        self.provider.current_content_hash = 'abc'
+        self.assertFalse(self.service.needs_update(self.provider))
+        self.assertEqual(self.service.sync_hash(self.provider), 'abc')
+        
+        self.provider.current_content_hash = 'def'
+        self.assertTrue(self.service.needs_update(self.provider))
+    
+    def test_trigger_sql_covers_table_columns_only(self):
+        columns = self.service.database_hash_columns()
+        self.assertIn('review_content', columns)
+        self.assertNotIn('provider_type', columns)
+        
+        function_sql = self.service.content_hash_trigger_sql()[0]
+        self.assertIn("coalesce(NEW.rating::text, '')", function_sql)
+        self.assertIn('NEW.current_content_hash', function_sql)
+
+
+class TestDatabaseMaintainedHash(unittest.TestCase):
+    """Test that ORM instances see the trigger-maintained hash"""
+    
+    def setUp(self):
+        engine = create_engine('sqlite://', poolclass=StaticPool,
+                               connect_args={'check_same_thread': False})
+        Provider.__table__.create(engine)
+        with engine.begin() as conn:
+            # Stand-in for the Postgres providers_content_hash trigger
+            conn.execute(text('''
+                CREATE TRIGGER providers_content_hash AFTER UPDATE OF rating ON providers
+                BEGIN
+                    UPDATE providers SET current_content_hash = 'hash:' || coalesce(NEW.rating, '')
+                    WHERE id = NEW.id;
+                END
+            '''))
+        self.db = DatabaseManager.__new__(DatabaseManager)
+        self.db.Session = sessionmaker(bind=engine)
+        
+        session = self.db.Session()
+        session.add(Provider(id=1, provider_name='Tokyo Clinic', rating=4.2))
+        session.commit()
+        session.close()
+    
+    def test_update_reloads_hash(self):
+        session = self.db.Session()
+        provider = session.get(Provider, 1)
+        
+        provider.rating = 4.7
+        session.flush()
+        
+        self.assertEqual(provider.current_content_hash, 'hash:4.7')
+        session.close()
+    
+    def test_detached_providers_are_refreshed(self):
+        session = self.db.Session(expire_on_commit=False)
+        provider = session.get(Provider, 1)
+        session.close()
+        
+        self.db.update_provider_field(1, 'rating', 3.9)
+        self.assertIsNone(provider.current_content_hash)
+        
+        self.db.refresh_content_hashes([provider])
+        
+        self.assertEqual(provider.current_content_hash, 'hash:3.9')
+        self.assertEqual(ContentHashService().sync_hash(provider), 'hash:3.9')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+"""
+Unit Tests for Database-Backed Content Lifecycle Planning
+Tests mapping of the projected lifecycle rows into content metrics,
+LIFECYCLE_SQL against Postgres (when DATABASE_URL is set) and heap-based
+top-k update planning under the budget.
+"""
+
+import os
+import sys
+import random
+import unittest
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock, patch
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session
+
+from src.week4.content_lifecycle import (
+    ContentLifecycleManager,
+    ContentMetrics,
+    ContentStatus,
+    ContentUpdateDelayConfig,
+    UpdatePriority
+)
+
+
+def make_manager(db=None):
+    with patch.object(ContentLifecycleManager, '_setup_content_directories'):
+        return ContentLifecycleManager(delay_config=ContentUpdateDelayConfig(), db=db)
+
+
+def lifecycle_row(provider_id, **overrides):
+    now = datetime.now()
+    row = {
+        'id': provider_id,
+        'provider_name': f'Clinic {provider_id}',
+        'provider_created_date': now - timedelta(days=400),
+        'last_updated': now - timedelta(days=200),
+        'provider_age_days': 400,
+        'content_age_days': 200,
+        'quality_score': 65.0,
+        'completeness_score': 80.0,
+        'accuracy_score': 85.0,
+        'wordpress_sync_status': True,
+        'romaji_consistency': True,
+        'freshness_score': 25.0,
+        'priority_score': 42.5,
+        'delay_override_reason': 'quality_issue_score_65.0',
+        'eligible_for_update_date': now - timedelta(days=370),
+        'delay_status': 'ready_for_review'
+    }
+    row.update(overrides)
+    return row
+
+
+class TestLifecycleAnalysis(unittest.TestCase):
+    """Test the projected-query analysis path"""
+    
+    def test_rows_become_content_metrics(self):
+        db = MagicMock()
+        session = db.get_session.return_value
+        session.execute.return_value.mappings.return_value = [
+            lifecycle_row(1),
+            lifecycle_row(2, delay_status='delay_period_active', delay_override_reason=None)
+        ]
+        manager = make_manager(db)
+        
+        metrics = manager.analyze_all_provider_content()
+        
+        self.assertEqual(set(metrics), {'1', '2'})
+        self.assertEqual(metrics['1'].delay_status, ContentStatus.READY_FOR_REVIEW)
+        self.assertEqual(metrics['1'].priority_score, 42.5)
+        self.assertEqual(metrics['2'].delay_status, ContentStatus.DELAY_PERIOD_ACTIVE)
+        
+        params = session.execute.call_args[0][1]
+        self.assertEqual(params['campaign_delay_days'], 180)
+        self.assertEqual(params['quality_delay_days'], 30)
+        self.assertEqual(params['quality_weight'], manager.prioritizer.quality_weight)
+        session.close.assert_called_once()
+    
+    def test_database_errors_yield_no_metrics(self):
+        db = MagicMock()
+        db.get_session.return_value.execute.side_effect = RuntimeError('connection refused')
+        
+        self.assertEqual(make_manager(db).analyze_all_provider_content(), {})
+
+
+# (id, days since created or None, days since content update or None,
+#  update recorded as 'sync' operation or on the 'provider', quality score or
+#  None for no quality row, wordpress failure recorded on the 'provider' or as
+#  the last 'sync' operation, romaji consistency)
+LIFECYCLE_FIXTURES = [
+    (1, 10, None, None, 80.0, None, 100.0),        # recently added
+    (2, 100, None, None, 80.0, None, 100.0),       # inside the campaign delay
+    (3, 100, None, None, 65.0, None, 100.0),       # quality issue, shorter delay
+    (4, 20, None, None, 50.0, None, 100.0),        # critical quality overrides
+    (5, 100, None, None, 80.0, 'provider', 100.0),
+    (6, 100, None, None, 80.0, None, 80.0),
+    (7, 400, 10, 'sync', 90.0, None, 100.0),       # fresh content
+    (8, 400, 200, 'provider', None, None, 100.0),  # no quality row
+    (9, None, None, None, 80.0, None, 100.0),      # no dates at all
+    (10, None, 50, 'provider', 80.0, None, 100.0),
+    (11, 100, None, None, 80.0, 'sync', 100.0),
+]
+
+
+@unittest.skipUnless(os.getenv('DATABASE_URL', '').startswith('postgres'),
+                     'LIFECYCLE_SQL needs Postgres; set DATABASE_URL')
+class TestLifecycleSql(unittest.TestCase):
+    """Run LIFECYCLE_SQL on fixture rows and compare with the Python analysis"""
+    
+    def setUp(self):
+        self.engine = create_engine(os.environ['DATABASE_URL'])
+        self.addCleanup(self.engine.dispose)
+        self.conn = self.engine.connect()
+        self.addCleanup(self.conn.close)
+        self.trans = self.conn.begin()
+        self.addCleanup(self.trans.rollback)
+        
+        # Temporary tables shadow the real ones for this connection only
+        self.conn.execute(text("""
+            CREATE TEMP TABLE providers (
+                id INTEGER PRIMARY KEY, provider_name TEXT, created_at TEXT,
+                last_wordpress_sync TIMESTAMP, wordpress_status TEXT
+            )
+        """))
+        self.conn.execute(text("""
+            CREATE TEMP TABLE provider_quality (
+                provider_id INTEGER PRIMARY KEY, final_quality_score FLOAT,
+                overall_completeness FLOAT, overall_integrity FLOAT, romaji_consistency FLOAT
+            )
+        """))
+        self.conn.execute(text("""
+            CREATE TEMP TABLE wordpress_sync_operations (
+                id SERIAL PRIMARY KEY, provider_id INTEGER, timestamp TIMESTAMP,
+                completed_at TIMESTAMP, status TEXT,
+                content_hash_before TEXT, content_hash_after TEXT
+            )
+        """))
+        
+        # Half a day past each age keeps the day counts off the boundaries
+        now = datetime.now()
+        self.inputs = {}
+        for provider_id, created, updated, updated_via, quality, failed_via, romaji in LIFECYCLE_FIXTURES:
+            created_date = now - timedelta(days=created, hours=12) if created is not None else None
+            updated_date = now - timedelta(days=updated, hours=12) if updated is not None else None
+            
+            self.conn.execute(text("""
+                INSERT INTO providers VALUES (:id, :name, :created, :synced, :status)
+            """), {'id': provider_id, 'name': f'Clinic {provider_id}',
+                   'created': created_date.isoformat() if created_date else None,
+                   'synced': updated_date if updated_via == 'provider' else None,
+                   'status': 'failed' if failed_via == 'provider' else 'synced'})
+            if quality is not None:
+                self.conn.execute(text("""
+                    INSERT INTO provider_quality VALUES (:id, :quality, 80.0, 85.0, :romaji)
+                """), {'id': provider_id, 'quality': quality, 'romaji': romaji})
+            if updated_via == 'sync':
+                self.conn.execute(text("""
+                    INSERT INTO wordpress_sync_operations
+                    (provider_id, timestamp, completed_at, status, content_hash_before, content_hash_after)
+                    VALUES (:id, :at, :at, 'completed', 'old', 'new')
+                """), {'id': provider_id, 'at': updated_date})
+            # A later sync that changed nothing does not refresh the content age
+            self.conn.execute(text("""
+                INSERT INTO wordpress_sync_operations
+                (provider_id, timestamp, completed_at, status, content_hash_before, content_hash_after)
+                VALUES (:id, :at, :at, :status, 'same', 'same')
+            """), {'id': provider_id, 'at': now - timedelta(days=2),
+                   'status': 'failed' if failed_via == 'sync' else 'completed'})
+            
+            self.inputs[str(provider_id)] = {
+                'provider_created_date': created_date,
+                'last_updated': updated_date,
+                'quality_score': quality if quality is not None else 75.0,
+                'wordpress_sync_status': failed_via is None,
+                'romaji_consistency': romaji >= 100,
+                'manual_update_requested': False
+            }
+    
+    def test_sql_matches_python_analysis(self):
+        db = MagicMock()
+        db.get_session.return_value = Session(bind=self.conn)
+        manager = make_manager(db)
+        
+        metrics = manager.analyze_all_provider_content()
+        
+        self.assertEqual(set(metrics), set(self.inputs))
+        statuses = set()
+        for provider_id, data in self.inputs.items():
+            with self.subTest(provider_id=provider_id):
+                row = metrics[provider_id]
+                expected_status = manager.aging_analyzer.analyze_content_age_with_delay(data)
+                self.assertEqual(row.delay_status, expected_status)
+                statuses.add(expected_status)
+                
+                last_updated = data['last_updated'] or data['provider_created_date'] \
+                    or datetime.now() - timedelta(days=365)
+                content_age_days = (datetime.now() - last_updated).days
+                self.assertEqual(row.content_age_days, content_age_days)
+                self.assertAlmostEqual(row.freshness_score,
+                                       manager.aging_analyzer.calculate_freshness_score(content_age_days))
+                self.assertEqual(row.delay_override_reason is not None,
+                                 manager.aging_analyzer._check_delay_overrides(
+                                     data, data['quality_score'], row.provider_age_days) is not None)
+                
+                expected_priority = manager.prioritizer.calculate_update_priority_score(ContentMetrics(
+                    provider_id=provider_id,
+                    content_age_days=content_age_days,
+                    quality_score=data['quality_score'],
+                    last_updated=last_updated,
+                    traffic_score=manager.traffic_metrics['traffic_score'],
+                    wordpress_sync_status=data['wordpress_sync_status'],
+                    romaji_consistency=data['romaji_consistency']
+                ))
+                self.assertAlmostEqual(row.priority_score, expected_priority)
+        
+        # The fixtures exercise every delay-aware status
+        self.assertEqual(statuses, {ContentStatus.RECENTLY_ADDED, ContentStatus.DELAY_PERIOD_ACTIVE,
+                                    ContentStatus.READY_FOR_REVIEW, ContentStatus.NEEDS_UPDATE,
+                                    ContentStatus.FRESH})
+
+
+class TestUpdatePlanning(unittest.TestCase):
+    """Test heap-based plan selection"""
+    
+    def setUp(self):
+        self.manager = make_manager(MagicMock())
+        self.manager.cost_per_update = 2.0
+    
+    def make_metrics(self, count, seed=7):
+        rng = random.Random(seed)
+        statuses = [ContentStatus.READY_FOR_REVIEW, ContentStatus.NEEDS_UPDATE,
+                    ContentStatus.DELAY_PERIOD_ACTIVE, ContentStatus.RECENTLY_ADDED, ContentStatus.FRESH]
+        metrics = {}
+        for i in range(count):
+            metrics[str(i)] = ContentMetrics(
+                provider_id=str(i),
+                content_age_days=rng.randint(0, 400),
+                quality_score=rng.uniform(40, 100),
+                last_updated=datetime.now(),
+                delay_status=rng.choice(statuses),
+                # Coarse scores so ties are common
+                priority_score=float(rng.randint(0, 20) * 5)
+            )
+        return metrics
+    
+    def reference_plan_ids(self, metrics, budget):
+        eligible = [
+            (m.priority_score, pid) for pid, m in metrics.items()
+            if m.delay_status in (ContentStatus.READY_FOR_REVIEW, ContentStatus.NEEDS_UPDATE)
+            and self.manager.prioritizer.assign_priority_level(m.priority_score) != UpdatePriority.DEFERRED
+        ]
+        eligible.sort(key=lambda e: e[0], reverse=True)
+        return [pid for _, pid in eligible[:int(budget / self.manager.cost_per_update)]]
+    
+    def test_top_k_matches_full_sort(self):
+        metrics = self.make_metrics(2000)
+        
+        plans = self.manager.generate_update_plans(metrics, budget_limit=100.0)
+        
+        self.assertEqual(len(plans), 50)
+        self.assertEqual([p.provider_id for p in plans], self.reference_plan_ids(metrics, 100.0))
+        self.assertTrue(all(p.priority != UpdatePriority.DEFERRED for p in plans))
+    
+    def test_budget_larger_than_candidates(self):
+        metrics = self.make_metrics(40)
+        
+        plans = self.manager.generate_update_plans(metrics, budget_limit=10000.0)
+        
+        self.assertEqual([p.provider_id for p in plans], self.reference_plan_ids(metrics, 10000.0))
+    
+    def test_priority_computed_when_not_precomputed(self):
+        metrics = {
+            'a': ContentMetrics(provider_id='a', content_age_days=300, quality_score=50.0,
+                                last_updated=datetime.now(), delay_status=ContentStatus.NEEDS_UPDATE,
+                                wordpress_sync_status=False)
+        }
+        
+        plans = self.manager.generate_update_plans(metrics, budget_limit=10.0)
+        
+        self.assertEqual(len(plans), 1)
+        self.assertNotEqual(plans[0].priority, UpdatePriority.DEFERRED)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Unit Tests for the Buffered Event Sink
+Tests batched multi-row writes, size-triggered background flushes, retry
+after a failed flush, dropping rows the database rejects, and step/activity
+events routed through the sink.
+"""
+
+import os
+import sys
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+
+from sqlalchemy import create_engine, event, insert, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.core.event_sink import BufferedEventSink
+from src.core.models import PipelineStep
+from src.utils import activity_logger, pipeline_tracker
+
+
+class TestEventSink(unittest.TestCase):
+    """Test buffered telemetry writes"""
+    
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.engine = create_engine(f"sqlite:///{os.path.join(self.tmpdir.name, 'events.db')}")
+        self.addCleanup(self.engine.dispose)
+        PipelineStep.__table__.create(self.engine)
+        with self.engine.begin() as conn:
+            conn.execute(text("""
+                CREATE TABLE activity_log (
+                    id INTEGER PRIMARY KEY, activity_type TEXT, activity_category TEXT,
+                    description TEXT, provider_id INTEGER, provider_name TEXT, details TEXT,
+                    status TEXT, duration_ms INTEGER, error_message TEXT, user_id INTEGER,
+                    created_at TIMESTAMP
+                )
+            """))
+        
+        self.inserts = []
+        event.listen(self.engine, 'before_cursor_execute', self.record_statement)
+        self.sink = BufferedEventSink(sessionmaker(bind=self.engine), flush_interval=60, batch_size=1000)
+        self.addCleanup(self.sink.close)
+    
+    def record_statement(self, conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith('INSERT'):
+            self.inserts.append(statement)
+    
+    def make_tracker(self):
+        with patch.object(pipeline_tracker, 'DatabaseManager'), \
+                patch.object(pipeline_tracker, 'get_event_sink', return_value=self.sink):
+            tracker = pipeline_tracker.PipelineTracker()
+        tracker.current_run_id = 'run-1'
+        return tracker
+    
+    def steps(self):
+        with self.engine.connect() as conn:
+            return conn.execute(text(
+                "SELECT provider_id, status, completed_at IS NOT NULL FROM pipeline_steps ORDER BY provider_id"
+            )).fetchall()
+    
+    def test_rows_written_in_one_multi_row_insert(self):
+        tracker = self.make_tracker()
+        for provider_id in range(1, 51):
+            tracker.log_step_success(provider_id, f'Clinic {provider_id}', 'ai_content')
+        
+        self.assertEqual(self.steps(), [])
+        self.assertEqual(self.sink.flush(), 50)
+        
+        self.assertEqual(len(self.steps()), 50)
+        self.assertEqual(len(self.inserts), 1)
+    
+    def test_start_and_success_coalesce(self):
+        tracker = self.make_tracker()
+        tracker.log_step_start(1, 'Clinic 1', 'wordpress_sync')
+        tracker.log_step_success(1, 'Clinic 1', 'wordpress_sync')
+        tracker.log_step_start(2, 'Clinic 2', 'wordpress_sync')
+        self.sink.flush()
+        tracker.log_failure(2, 'Clinic 2', 'wordpress_sync', 'failed', 'timeout')
+        self.sink.flush()
+        
+        self.assertEqual(self.steps(), [(1, 'success', 1), (2, 'failed', 1)])
+    
+    def test_batch_size_triggers_background_flush(self):
+        self.sink.batch_size = 10
+        tracker = self.make_tracker()
+        for provider_id in range(10):
+            tracker.log_step_success(provider_id, 'Clinic', 'ai_content')
+        
+        for _ in range(200):
+            if len(self.steps()) == 10:
+                break
+            time.sleep(0.01)
+        self.assertEqual(len(self.steps()), 10)
+    
+    def test_failed_flush_is_retried(self):
+        tracker = self.make_tracker()
+        tracker.log_step_success(1, 'Clinic 1', 'ai_content')
+        
+        with patch.object(self.sink, 'Session',
+                          side_effect=OperationalError('connect', {}, Exception('database down'))):
+            self.assertEqual(self.sink.flush(), 0)
+        
+        self.assertEqual(self.sink.pending(), 1)
+        self.sink.flush()
+        self.assertEqual(self.steps(), [(1, 'success', 1)])
+    
+    def test_rejected_row_is_dropped_not_requeued(self):
+        statement = insert(PipelineStep.__table__)
+        # The second row reuses the first row's primary key
+        for row_id, provider_id in ((1, 1), (1, 2), (3, 3)):
+            self.sink.add(statement, {'id': row_id, 'provider_id': provider_id,
+                                      'step_name': 'ai_content', 'status': 'success'})
+        
+        with self.assertLogs('src.core.event_sink', level='WARNING') as logs:
+            self.assertEqual(self.sink.flush(), 2)
+        
+        self.assertEqual(self.sink.pending(), 0)
+        self.assertEqual([row[0] for row in self.steps()], [1, 3])
+        self.assertTrue(any('Dropped' in line for line in logs.output))
+    
+    def test_activity_log_rows_are_buffered(self):
+        with patch.object(activity_logger, 'get_engine'), \
+                patch.object(activity_logger, 'get_session_factory'), \
+                patch.object(activity_logger, 'get_event_sink', return_value=self.sink):
+            logger = activity_logger.ActivityLogger()
+        
+        self.assertTrue(logger.log_content_generation('Clinic 1', 1, batch_size=2))
+        self.assertTrue(logger.log_wordpress_sync('Clinic 1', 1, wordpress_id=10))
+        self.sink.flush()
+        
+        with self.engine.connect() as conn:
+            rows = conn.execute(text("SELECT activity_type, details FROM activity_log ORDER BY id")).fetchall()
+        self.assertEqual([r[0] for r in rows], ['content_generation', 'wordpress_sync'])
+        self.assertIn('"batch_size": 2', rows[0][1])
+
+
+if __name__ == '__main__':
+    unittest.main()
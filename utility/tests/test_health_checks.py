@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Unit Tests for Concurrent Health Checks
+Tests that checks run in parallel, slow probes fall back after their timeout,
+results are reused within their TTL and Google usage comes from the cost tracker.
+"""
+
+import os
+import sys
+import time
+import threading
+import unittest
+from unittest.mock import MagicMock, patch
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.monitoring import health_monitor
+from src.monitoring.health_monitor import HEALTH_CHECKS, HealthMonitor
+
+
+def make_check(name, delay=0.0, calls=None):
+    def check():
+        if calls is not None:
+            calls.append(name)
+        time.sleep(delay)
+        return {'name': name}
+    return check
+
+
+class TestHealthChecks(unittest.TestCase):
+    """Test concurrent, cached health checks"""
+    
+    def setUp(self):
+        self.monitor = HealthMonitor()
+        self.calls = []
+        for name, (method, _, _) in HEALTH_CHECKS.items():
+            setattr(self.monitor, method, make_check(name, 0.2, self.calls))
+    
+    def test_checks_run_concurrently(self):
+        started = time.monotonic()
+        results = self.monitor.run_health_checks()
+        elapsed = time.monotonic() - started
+        
+        self.assertEqual(list(results), list(HEALTH_CHECKS))
+        self.assertLess(elapsed, 0.2 * len(HEALTH_CHECKS) / 2)
+    
+    def test_slow_check_times_out(self):
+        release = threading.Event()
+        self.monitor.check_wordpress_health = lambda: release.wait(5) and {'name': 'wordpress'}
+        
+        with patch.dict(HEALTH_CHECKS, {'wordpress': ('check_wordpress_health', 0.3, 30.0)}):
+            started = time.monotonic()
+            results = self.monitor.run_health_checks()
+            elapsed = time.monotonic() - started
+        release.set()
+        
+        self.assertLess(elapsed, 1.0)
+        self.assertEqual(results['wordpress']['status'], 'error')
+        self.assertIn('timed out', results['wordpress']['error_message'])
+        self.assertEqual(results['database'], {'name': 'database'})
+    
+    def test_results_cached_within_ttl(self):
+        self.monitor.run_health_checks()
+        self.monitor.run_health_checks()
+        self.assertEqual(len(self.calls), len(HEALTH_CHECKS))
+        
+        self.monitor.run_health_checks(fresh=True)
+        self.assertEqual(len(self.calls), 2 * len(HEALTH_CHECKS))
+    
+    def test_google_usage_from_cost_tracker(self):
+        monitor = HealthMonitor()
+        monitor.cost_tracker = MagicMock(DAILY_LIMIT=20.0)
+        monitor.cost_tracker.get_daily_usage.return_value = 17.0
+        
+        health = monitor.check_google_api_health()
+        
+        self.assertEqual(health['daily_usage'], 17.0)
+        self.assertAlmostEqual(health['quota_remaining'], 15.0)
+        self.assertEqual(health['status'], 'warning')
+    
+    def test_system_resources_do_not_block_on_cpu(self):
+        with patch.object(health_monitor.cpu_sampler, 'latest', return_value=42.0):
+            started = time.monotonic()
+            resources = HealthMonitor().check_system_resources()
+        
+        self.assertLess(time.monotonic() - started, 0.5)
+        self.assertEqual(resources['cpu_usage'], 42.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Unit Tests for the Featured Image Media Pipeline
+Tests content-hash dedup, persistence and background attachment.
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import unittest
+from unittest.mock import MagicMock
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.publishers.media_pipeline import MediaPipeline
+from src.publishers.wp_session import WordPressRetry, create_wordpress_session
+
+
+class FakeSession:
+    """Serves image bytes and records media uploads and attachments"""
+    
+    def __init__(self, images):
+        self.images = images
+        self.lock = threading.Lock()
+        self.downloads = []
+        self.uploads = []
+        self.attached = {}
+        self.deleted = set()
+    
+    def get(self, url, timeout=None):
+        with self.lock:
+            self.downloads.append(url)
+        response = MagicMock(status_code=200, content=self.images[url])
+        response.headers = {'Content-Type': 'image/jpeg'}
+        return response
+    
+    def post(self, url, auth=None, files=None, json=None, timeout=None):
+        with self.lock:
+            if url.endswith('/media'):
+                self.uploads.append(files['file'][0])
+                media_id = 1000 + len(self.uploads)
+                return MagicMock(status_code=201, json=MagicMock(return_value={'id': media_id}))
+            if json['featured_media'] in self.deleted:
+                return MagicMock(status_code=400, json=MagicMock(return_value={'code': 'rest_invalid_featured_media'}))
+            self.attached[int(url.rsplit('/', 1)[1])] = json['featured_media']
+            return MagicMock(status_code=200)
+
+
+class TestMediaPipeline(unittest.TestCase):
+    """Test the media pipeline"""
+    
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.session = FakeSession({
+            'https://img/a.jpg': b'photo-a',
+            'https://cdn/a-copy.jpg': b'photo-a',
+            'https://img/b.jpg': b'photo-b'
+        })
+    
+    def tearDown(self):
+        self.tmpdir.cleanup()
+    
+    def _pipeline(self):
+        return MediaPipeline('https://example.com', ('user', 'pass'), session=self.session,
+                             download_session=self.session,
+                             db_path=os.path.join(self.tmpdir.name, 'media.db'), workers=3)
+    
+    def test_downloads_bypass_the_wordpress_session(self):
+        wp_session = create_wordpress_session('https://example.com')
+        pipeline = MediaPipeline('https://example.com', ('user', 'pass'), session=wp_session,
+                                 db_path=os.path.join(self.tmpdir.name, 'media.db'))
+        
+        self.assertIsNot(pipeline.downloads, wp_session)
+        self.assertEqual(pipeline.downloads.hooks['response'], [])
+        self.assertNotIsInstance(pipeline.downloads.get_adapter('https://img/a.jpg').max_retries,
+                                 WordPressRetry)
+    
+    def test_identical_images_are_uploaded_once(self):
+        pipeline = self._pipeline()
+        for post_id, url in enumerate(['https://img/a.jpg', 'https://cdn/a-copy.jpg',
+                                       'https://img/a.jpg', 'https://img/b.jpg'], start=1):
+            pipeline.submit(post_id, url)
+        stats = pipeline.wait()
+        
+        self.assertEqual(stats['attached'], 4)
+        self.assertEqual(stats['uploaded'], 2)
+        self.assertEqual(len(self.session.uploads), 2)
+        self.assertEqual(self.session.attached[1], self.session.attached[2])
+        self.assertNotEqual(self.session.attached[1], self.session.attached[4])
+    
+    def test_known_images_skip_download(self):
+        self._pipeline().submit(1, 'https://img/a.jpg').result()
+        
+        restarted = self._pipeline()
+        media_id = restarted.known_media_id('https://img/a.jpg')
+        self.assertEqual(media_id, self.session.attached[1])
+        
+        self.assertTrue(restarted.submit(2, 'https://img/a.jpg').result())
+        self.assertEqual(self.session.downloads, ['https://img/a.jpg'])
+        self.assertEqual(restarted.wait()['reused'], 1)
+    
+    def test_deleted_media_is_uploaded_again(self):
+        pipeline = self._pipeline()
+        pipeline.submit(1, 'https://img/a.jpg').result()
+        stale = pipeline.known_media_id('https://img/a.jpg')
+        self.session.deleted.add(stale)
+        
+        self.assertTrue(pipeline.submit(2, 'https://img/a.jpg').result())
+        
+        self.assertEqual(len(self.session.uploads), 2)
+        self.assertNotEqual(self.session.attached[2], stale)
+        self.assertEqual(pipeline.known_media_id('https://img/a.jpg'), self.session.attached[2])
+    
+    def test_failed_download_is_reported(self):
+        self.session.get = MagicMock(return_value=MagicMock(status_code=404))
+        pipeline = self._pipeline()
+        
+        self.assertFalse(pipeline.submit(1, 'https://img/missing.jpg').result())
+        self.assertEqual(pipeline.wait()['failed'], 1)
+        self.assertEqual(self.session.attached, {})
+
+
+if __name__ == '__main__':
+    unittest.main()
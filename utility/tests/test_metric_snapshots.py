@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Unit Tests for Metric Snapshots
+Tests TTL expiry, stale-while-refreshing reads, single-flight refresh and
+nested reads from inside a refresh.
+"""
+
+import os
+import sys
+import threading
+import time
+import unittest
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.monitoring.metric_snapshots import MetricSnapshots
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+    
+    def __call__(self):
+        return self.now
+
+
+class TestMetricSnapshots(unittest.TestCase):
+    """Test snapshot caching"""
+    
+    def setUp(self):
+        self.clock = FakeClock()
+        self.snapshots = MetricSnapshots(clock=self.clock)
+        self.calls = 0
+    
+    def counter(self):
+        self.calls += 1
+        return {'calls': self.calls}
+    
+    def test_cached_until_ttl(self):
+        self.snapshots.register('db', self.counter, ttl=60)
+        
+        self.assertEqual(self.snapshots.get('db'), {'calls': 1})
+        self.clock.now = 59
+        self.assertEqual(self.snapshots.get('db'), {'calls': 1})
+        self.assertEqual(self.calls, 1)
+    
+    def test_stale_value_served_while_refreshing(self):
+        self.snapshots.register('db', self.counter, ttl=60)
+        self.snapshots.get('db')
+        self.clock.now = 61
+        
+        self.assertEqual(self.snapshots.get('db'), {'calls': 1})
+        for _ in range(200):
+            if not self.snapshots.is_stale('db'):
+                break
+            time.sleep(0.01)
+        self.assertEqual(self.snapshots.get('db'), {'calls': 2})
+    
+    def test_fresh_forces_refresh(self):
+        self.snapshots.register('db', self.counter, ttl=60)
+        self.snapshots.get('db')
+        self.assertEqual(self.snapshots.get('db', fresh=True), {'calls': 2})
+    
+    def test_concurrent_callers_share_one_refresh(self):
+        release = threading.Event()
+        
+        def slow():
+            release.wait(2)
+            return self.counter()
+        
+        self.snapshots.register('qa', slow, ttl=60)
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(self.snapshots.get('qa')))
+                   for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        release.set()
+        for thread in threads:
+            thread.join(2)
+        
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(results, [{'calls': 1}] * 5)
+    
+    def test_failed_refresh_keeps_last_value(self):
+        values = iter([{'ok': True}])
+        self.snapshots.register('wp', lambda: next(values), ttl=1)
+        self.snapshots.get('wp')
+        self.clock.now = 5
+        
+        self.assertEqual(self.snapshots.get('wp', fresh=True), {'ok': True})
+        self.assertTrue(self.snapshots.is_stale('wp'))
+    
+    def test_nested_read_does_not_wait(self):
+        self.snapshots.register('db', self.counter, ttl=60)
+        self.snapshots.register('search', lambda: self.snapshots.get_many(['db', 'search']), ttl=60)
+        
+        self.assertEqual(self.snapshots.get('search'), {'db': None, 'search': None})
+        self.assertEqual(self.calls, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Unit Tests for Process Metrics
+Tests counters, histograms, the text exposition format, the /metrics
+exporter and the WordPress response hook, which skips non-WordPress URLs.
+"""
+
+import os
+import sys
+import unittest
+import urllib.request
+from datetime import timedelta
+from types import SimpleNamespace
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.monitoring import metrics
+from src.monitoring.metrics import MetricsRegistry, timed, wordpress_endpoint
+from src.publishers.wp_session import create_wordpress_session
+
+
+class TestMetrics(unittest.TestCase):
+    """Test metric collection and rendering"""
+    
+    def setUp(self):
+        self.registry = MetricsRegistry()
+    
+    def test_counter_renders_per_label_set(self):
+        counter = self.registry.counter('jobs_total', 'Jobs run', ['status'])
+        counter.inc(status='ok')
+        counter.inc(2, status='ok')
+        counter.inc(status='error')
+        
+        text = self.registry.render()
+        self.assertIn('# TYPE jobs_total counter', text)
+        self.assertIn('jobs_total{status="ok"} 3', text)
+        self.assertIn('jobs_total{status="error"} 1', text)
+        with self.assertRaises(ValueError):
+            counter.inc(status='ok', extra='x')
+    
+    def test_histogram_buckets_are_cumulative(self):
+        histogram = self.registry.histogram('latency_seconds', 'Latency', ['op'], buckets=(0.1, 1.0))
+        for value in (0.05, 0.5, 5.0):
+            histogram.observe(value, op='get')
+        
+        text = self.registry.render()
+        self.assertIn('latency_seconds_bucket{op="get",le="0.1"} 1', text)
+        self.assertIn('latency_seconds_bucket{op="get",le="1.0"} 2', text)
+        self.assertIn('latency_seconds_bucket{op="get",le="+Inf"} 3', text)
+        self.assertIn('latency_seconds_count{op="get"} 3', text)
+        self.assertIn('latency_seconds_sum{op="get"} 5.55', text)
+    
+    def test_timed_counts_errors(self):
+        histogram = self.registry.histogram('op_seconds', 'Op latency', ['operation'])
+        counter = self.registry.counter('ops_total', 'Ops', ['operation', 'status'])
+        
+        @timed(histogram, counter, operation='save')
+        def save(fail):
+            if fail:
+                raise RuntimeError('boom')
+        
+        save(False)
+        with self.assertRaises(RuntimeError):
+            save(True)
+        
+        self.assertEqual(histogram.count(operation='save'), 2)
+        self.assertEqual(counter.value(operation='save', status='ok'), 1)
+        self.assertEqual(counter.value(operation='save', status='error'), 1)
+    
+    def test_wordpress_hook_templates_ids(self):
+        self.assertEqual(
+            wordpress_endpoint('https://example.com/wp-json/wp/v2/healthcare_provider/123?context=edit'),
+            '/wp/v2/healthcare_provider/{id}'
+        )
+        
+        response = SimpleNamespace(
+            status_code=201,
+            elapsed=timedelta(milliseconds=250),
+            request=SimpleNamespace(method='POST', url='https://example.com/wp-json/wp/v2/media')
+        )
+        before = metrics.WORDPRESS_REQUESTS.value(method='POST', endpoint='/wp/v2/media', status='201')
+        metrics.record_wordpress_response(response)
+        
+        self.assertEqual(
+            metrics.WORDPRESS_REQUESTS.value(method='POST', endpoint='/wp/v2/media', status='201'),
+            before + 1
+        )
+    
+    def test_session_hook_skips_other_hosts(self):
+        session = create_wordpress_session('https://example.com')
+        hook = session.hooks['response'][0]
+        
+        def response(url):
+            return SimpleNamespace(status_code=200, elapsed=timedelta(milliseconds=40),
+                                   request=SimpleNamespace(method='GET', url=url))
+        
+        image_url = 'https://images.example.org/photo.jpg'
+        hook(response(image_url))
+        self.assertEqual(metrics.WORDPRESS_REQUESTS.value(method='GET', endpoint=wordpress_endpoint(image_url),
+                                                          status='200'), 0)
+        
+        before = metrics.WORDPRESS_REQUESTS.value(method='GET', endpoint='/wp/v2/tags', status='200')
+        hook(response('https://example.com/wp-json/wp/v2/tags'))
+        self.assertEqual(metrics.WORDPRESS_REQUESTS.value(method='GET', endpoint='/wp/v2/tags', status='200'),
+                         before + 1)
+    
+    def test_exporter_serves_metrics(self):
+        metrics.CACHE_LOOKUPS.inc(cache_type='details', result='hit')
+        server = metrics.start_metrics_server(port=0, addr='127.0.0.1')
+        self.addCleanup(metrics.stop_metrics_server)
+        
+        url = f'http://127.0.0.1:{server.server_address[1]}/metrics'
+        with urllib.request.urlopen(url, timeout=5) as response:
+            body = response.read().decode('utf-8')
+        
+        self.assertIn('cache_lookups_total{cache_type="details",result="hit"}', body)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Unit Tests for Persisted Provider Quality Scores
+Tests scoring of projected rows, incremental paged refresh and metrics built
+from stored aggregates.
+"""
+
+import os
+import sys
+import unittest
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.monitoring.provider_quality import (
+    ProviderQualityStore, SCORED_COLUMNS, SCORER_VERSION, score_rows
+)
+from src.monitoring.quality_assurance import QualityAssuranceSystem
+
+
+def make_row(provider_id, **values):
+    row = {column: None for column in SCORED_COLUMNS}
+    row.update({
+        'id': provider_id,
+        'input_hash': f'hash-{provider_id}',
+        'provider_name': f'Clinic {provider_id}',
+        'city': 'Tokyo',
+        'ai_description': 'Clinic %d is located in Tokyo and provides general medicine.' % provider_id,
+        'wordpress_status': 'published'
+    })
+    row.update(values)
+    return row
+
+
+class FakeStore(ProviderQualityStore):
+    """Serves stale rows from memory and records saves"""
+    
+    def __init__(self, rows, **options):
+        super().__init__(db=MagicMock(), **options)
+        self.rows = rows
+        self.saved = []
+        self.requested = []
+    
+    def stale_page(self, after_id=0, limit=None):
+        self.requested.append(after_id)
+        saved_ids = {s['provider_id'] for s in self.saved}
+        page = [r for r in self.rows if r['id'] > after_id and r['id'] not in saved_ids]
+        return page[:limit or self.page_size]
+    
+    def save(self, scored):
+        self.saved.extend(scored)
+        return len(scored)
+
+
+class TestProviderQuality(unittest.TestCase):
+    """Test incremental quality scoring"""
+    
+    def test_score_rows_matches_orm_analysis(self):
+        row = make_row(7, seo_title='Clinic 7 | English Doctor in Tokyo')
+        scored = score_rows([row])[0]
+        
+        direct = QualityAssuranceSystem().analyze_content_quality(
+            SimpleNamespace(id=7, **{c: row[c] for c in SCORED_COLUMNS})
+        )
+        
+        self.assertEqual(scored['provider_id'], 7)
+        self.assertEqual(scored['input_hash'], 'hash-7')
+        self.assertEqual(scored['scorer_version'], SCORER_VERSION)
+        self.assertAlmostEqual(scored['final_quality_score'], direct.final_quality_score)
+        self.assertEqual(scored['issue_count'], len(direct.issues))
+    
+    def test_refresh_pages_by_keyset(self):
+        store = FakeStore([make_row(i) for i in range(1, 8)], page_size=3, workers=0)
+        
+        stats = store.refresh()
+        
+        self.assertEqual(stats, {'pages': 3, 'fetched': 7, 'scored': 7})
+        self.assertEqual(store.requested, [0, 3, 6])
+    
+    def test_refresh_in_process_pool(self):
+        store = FakeStore([make_row(i) for i in range(1, 11)], page_size=2, workers=2)
+        
+        stats = store.refresh()
+        
+        self.assertEqual(stats['scored'], 10)
+        self.assertEqual(sorted(s['provider_id'] for s in store.saved), list(range(1, 11)))
+    
+    def test_nothing_stale_scores_nothing(self):
+        store = FakeStore([], workers=2)
+        self.assertEqual(store.refresh(), {'pages': 0, 'fetched': 0, 'scored': 0})
+    
+    def test_metrics_come_from_aggregates(self):
+        qa = QualityAssuranceSystem()
+        qa._quality_store = MagicMock()
+        qa._quality_store.aggregates.return_value = {
+            'scored': 10, 'avg_content_quality': 80.0, 'content_completeness_rate': 90.0,
+            'romaji_success_rate': 95.0, 'seo_optimization_score': 60.0,
+            'master_data_compliance_rate': 100.0, 'database_integrity_score': 85.0,
+            'wordpress_sync_accuracy': 100.0, 'high_quality': 6, 'medium_quality': 3,
+            'low_quality': 1, 'needs_review': 1, 'total_issues': 12, 'critical_issues': 0,
+            'high_priority_issues': 1, 'medium_priority_issues': 3,
+            'romaji_issues': 0, 'seo_issues': 4
+        }
+        
+        metrics = qa.generate_system_quality_metrics()
+        
+        qa._quality_store.refresh.assert_called_once()
+        self.assertEqual(metrics.high_quality_providers, 6)
+        self.assertEqual(metrics.total_issues, 12)
+        self.assertTrue(any('4 providers have SEO issues' in r for r in metrics.top_recommendations))
+        
+        qa._quality_store.aggregates.return_value = {'scored': 0}
+        self.assertEqual(qa.generate_system_quality_metrics(refresh=False).quality_trend, 'unknown')
+
+
+if __name__ == '__main__':
+    unittest.main()
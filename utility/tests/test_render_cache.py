@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Unit Tests for Rendered Publish Payload Caching
+Tests the render cache and its use for ACF payloads and specialty detection.
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.core.database import Provider
+from src.publishers.render_cache import RenderCache
+from src.publishers.wordpress import WordPressPublisher
+
+
+class TestRenderCache(unittest.TestCase):
+    """Test the LRU itself"""
+    
+    def test_renders_once_per_key(self):
+        cache = RenderCache(max_size=2)
+        calls = []
+        render = lambda: calls.append(1) or {'value': [1]}
+        
+        cache.get_or_render('a', render)
+        cache.get_or_render('a', render)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(cache.cache_info()['hits'], 1)
+    
+    def test_cached_value_is_not_shared(self):
+        cache = RenderCache()
+        cache.get_or_render('a', lambda: {'value': [1]})['value'].append(2)
+        self.assertEqual(cache.get_or_render('a', lambda: None), {'value': [1]})
+    
+    def test_evicts_least_recently_used(self):
+        cache = RenderCache(max_size=2)
+        for key in ('a', 'b', 'a', 'c'):
+            cache.get_or_render(key, lambda: key)
+        
+        self.assertEqual(cache.cache_info()['size'], 2)
+        self.assertEqual(cache.get_or_render('b', lambda: 'rendered again'), 'rendered again')
+
+
+class TestPublisherRendering(unittest.TestCase):
+    """Test ACF payload and specialty caching in the publisher"""
+    
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.cwd = os.getcwd()
+        os.chdir(self.tmpdir.name)
+        
+        env = {
+            'WORDPRESS_URL': 'https://example.com',
+            'WORDPRESS_USERNAME': 'user',
+            'WORDPRESS_APPLICATION_PASSWORD': 'pass'
+        }
+        with patch.dict(os.environ, env), patch('src.publishers.wordpress.DatabaseManager'):
+            self.publisher = WordPressPublisher()
+        
+        self.provider = Provider(
+            id=1,
+            provider_name='Tokyo Clinic',
+            city='Tokyo',
+            district='Shibuya',
+            specialties=['Internal Medicine'],
+            rating=4.2,
+            business_hours={'formatted_hours': {'Monday': {'open': '09:00', 'close': '18:00'}}, 'open_now': True}
+        )
+    
+    def tearDown(self):
+        os.chdir(self.cwd)
+        self.tmpdir.cleanup()
+    
+    def test_acf_payload_is_rendered_once_per_input_hash(self):
+        with patch.object(self.publisher, '_render_acf_fields',
+                          wraps=self.publisher._render_acf_fields) as render:
+            first = self.publisher._prepare_acf_fields(self.provider)
+            second = self.publisher._prepare_acf_fields(self.provider)
+            self.assertEqual(render.call_count, 1)
+            self.assertEqual(first, second)
+            
+            self.provider.rating = 4.8
+            third = self.publisher._prepare_acf_fields(self.provider)
+            self.assertEqual(render.call_count, 2)
+            self.assertEqual(third['provider_rating'], '4.8')
+    
+    def test_rendered_hours(self):
+        acf = self.publisher._prepare_acf_fields(self.provider)
+        
+        self.assertEqual(acf['hours_monday'], '09:00 - 18:00')
+        self.assertEqual(acf['hours_tuesday'], 'Hours not available')
+        self.assertEqual(acf['open_now'], 'Open Now')
+        self.assertEqual(acf['business_hours'], 'Monday: 09:00 - 18:00')
+    
+    def test_specialty_detection_is_cached(self):
+        with patch.object(self.publisher.specialty_detector, 'determine_specialty',
+                          wraps=self.publisher.specialty_detector.determine_specialty) as detect, \
+             patch.object(self.publisher, '_get_or_create_term', side_effect=lambda name, tax: hash(name) % 1000):
+            first = self.publisher._get_taxonomies(self.provider)
+            second = self.publisher._get_taxonomies(self.provider)
+        
+        self.assertEqual(detect.call_count, 1)
+        self.assertEqual(first, second)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Unit Tests for Review Feature Extraction
+Tests the Aho-Corasick matcher and the shared review feature stage.
+"""
+
+import os
+import sys
+import unittest
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.utils.review_features import (
+    AhoCorasickMatcher,
+    REVIEW_FEATURES_VERSION,
+    extract_review_features,
+    get_review_features,
+    parse_review_content
+)
+
+
+class TestAhoCorasickMatcher(unittest.TestCase):
+    """Test multi-pattern matching"""
+    
+    def test_overlapping_patterns(self):
+        matcher = AhoCorasickMatcher({'a': ['he', 'she', 'hers'], 'b': ['his']})
+        matches = matcher.find('USHERS')
+        self.assertEqual(matches, {'a': {'he', 'she', 'hers'}})
+    
+    def test_japanese_patterns(self):
+        matcher = AhoCorasickMatcher({'dental': ['歯科']})
+        self.assertEqual(matcher.find('駅前歯科クリニック'), {'dental': {'歯科'}})
+    
+    def test_whole_words(self):
+        matcher = AhoCorasickMatcher({'x': ['test', 'root canal']}, whole_words=True)
+        self.assertEqual(matcher.find('latest news'), {})
+        self.assertEqual(matcher.find('A test and a root canal.'), {'x': {'test', 'root canal'}})
+
+
+class TestReviewFeatures(unittest.TestCase):
+    """Test review feature extraction"""
+    
+    def setUp(self):
+        self.reviews = [
+            {'text': 'Great English speaking dentist, fixed my cavity. Very clean.', 'rating': 5},
+            {'text': 'The wait was long', 'rating': 2},
+            {'text': 'Friendly staff but the clinic was not clean', 'rating': 3}
+        ]
+    
+    def test_extract_features(self):
+        features = extract_review_features(self.reviews)
+        
+        self.assertEqual(features['version'], REVIEW_FEATURES_VERSION)
+        self.assertEqual(features['review_count'], 3)
+        self.assertEqual(len(features['english_mentions']), 1)
+        self.assertEqual(features['theme_counts']['clean'], 2)
+        self.assertEqual(features['theme_counts']['wait'], 1)
+        self.assertIn('Great', features['positive_themes'])
+        # Highlights only come from 4+ star reviews
+        self.assertEqual(features['highlights'], ['english_support', 'clean_facilities'])
+        self.assertIn('dentist', features['specialty_keywords']['Dentistry'])
+    
+    def test_stored_features_are_reused(self):
+        stored = {'version': REVIEW_FEATURES_VERSION, 'review_count': 99}
+        self.assertIs(get_review_features(self.reviews, stored), stored)
+    
+    def test_stale_features_are_rebuilt(self):
+        stored = {'version': REVIEW_FEATURES_VERSION - 1, 'review_count': 99}
+        self.assertEqual(get_review_features(self.reviews, stored)['review_count'], 3)
+    
+    def test_parse_review_content(self):
+        self.assertEqual(parse_review_content('[{"text": "a"}]'), [{'text': 'a'}])
+        self.assertEqual(parse_review_content("[{'text': 'a'}]"), [{'text': 'a'}])
+        self.assertEqual(parse_review_content('__import__("os")'), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Unit Tests for Parallel Romaji Backfill
+Tests batch statement building and the worker pipeline without a database.
+"""
+
+import os
+import sys
+import unittest
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.utils import romaji_converter
+from src.utils.romaji_backfill import RomajiBackfill, build_romaji_update
+
+
+class FakeCutlet:
+    """Stand-in tagger so the test does not need MeCab"""
+    
+    def romaji(self, text):
+        return text.upper()
+
+
+class FakeBackfill(RomajiBackfill):
+    """Backfill fed from an in-memory list that records writes"""
+    
+    def __init__(self, rows, **kwargs):
+        super().__init__(db=object(), **kwargs)
+        self.rows = rows
+        self.writes = []
+    
+    def _iter_chunks(self):
+        self.stats['scanned'] = len(self.rows)
+        for start in range(0, len(self.rows), self.chunk_size):
+            yield self.rows[start:start + self.chunk_size]
+    
+    def _write(self, pairs):
+        if pairs:
+            self.writes.append(list(pairs))
+            self.stats['written'] += len(pairs)
+
+
+class TestRomajiBackfill(unittest.TestCase):
+    """Test the backfill engine"""
+    
+    def setUp(self):
+        # Worker processes are forked, so they inherit this converter
+        self._available = romaji_converter.CUTLET_AVAILABLE
+        self._converter = romaji_converter._converter
+        romaji_converter.CUTLET_AVAILABLE = True
+        romaji_converter._converter = romaji_converter.RomajiConverter()
+        romaji_converter._converter._katsu = FakeCutlet()
+    
+    def tearDown(self):
+        romaji_converter.CUTLET_AVAILABLE = self._available
+        romaji_converter._converter = self._converter
+    
+    def test_build_romaji_update(self):
+        statement, params = build_romaji_update([(1, 'Chiba Clinic'), (2, 'Tokyo Dental')])
+        sql = str(statement)
+        
+        self.assertIn('FROM (VALUES', sql)
+        self.assertIn('CAST(:id_1 AS INTEGER)', sql)
+        self.assertEqual(params['id_0'], 1)
+        self.assertEqual(params['romaji_1'], 'Tokyo Dental')
+    
+    def test_results_are_batched(self):
+        # English names convert to themselves and are not written
+        rows = [(i, f'千葉{i}歯科') for i in range(1, 11)] + [(11, 'Tokyo Clinic')]
+        backfill = FakeBackfill(rows, workers=2, chunk_size=3, write_batch_size=4)
+        stats = backfill.run()
+        
+        written = sorted(pair[0] for batch in backfill.writes for pair in batch)
+        self.assertEqual(written, list(range(1, 11)))
+        self.assertTrue(all(len(batch) <= 4 for batch in backfill.writes))
+        self.assertEqual(stats['converted'], 10)
+        self.assertEqual(stats['scanned'], 11)
+
+
+if __name__ == '__main__':
+    unittest.main()
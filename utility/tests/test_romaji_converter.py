@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Unit Tests for Romaji Converter
+Tests longest-match medical term replacement and the shared conversion cache.
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.utils import romaji_converter
+from src.utils.romaji_converter import RomajiConverter, replace_medical_terms
+
+
+class FakeCutlet:
+    """Stand-in tagger that counts calls"""
+    
+    def __init__(self):
+        self.calls = 0
+    
+    def romaji(self, text):
+        self.calls += 1
+        return 'Chiba' if text == '千葉' else text
+
+
+class TestMedicalTermReplacement(unittest.TestCase):
+    """Test precompiled term matching"""
+    
+    def test_longest_match_wins(self):
+        text, terms = replace_medical_terms('千葉歯科医院')
+        self.assertEqual(text, '千葉__TERM_0__')
+        self.assertEqual(terms, ['Dental Clinic'])
+    
+    def test_multiple_terms(self):
+        text, terms = replace_medical_terms('新宿駅東口クリニック')
+        self.assertEqual(text, '新宿__TERM_0____TERM_1__')
+        self.assertEqual(terms, ['Station East Exit', 'Clinic'])
+
+
+class TestRomajiConverterCache(unittest.TestCase):
+    """Test the shared LRU and persisted cache"""
+    
+    def setUp(self):
+        self._available = romaji_converter.CUTLET_AVAILABLE
+        romaji_converter.CUTLET_AVAILABLE = True
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmpdir.name, 'romaji_cache.db')
+    
+    def tearDown(self):
+        romaji_converter.CUTLET_AVAILABLE = self._available
+        self.tmpdir.cleanup()
+    
+    def _converter(self, **kwargs):
+        converter = RomajiConverter(**kwargs)
+        converter._katsu = FakeCutlet()
+        return converter
+    
+    def test_repeat_conversions_hit_cache(self):
+        converter = self._converter()
+        self.assertEqual(converter.convert('千葉歯科医院'), 'Chiba Dental Clinic')
+        self.assertEqual(converter.convert('千葉歯科医院'), 'Chiba Dental Clinic')
+        self.assertEqual(converter.katsu.calls, 1)
+        self.assertEqual(converter.cache_info()['hits'], 1)
+    
+    def test_cache_is_bounded(self):
+        converter = self._converter(cache_size=2)
+        for name in ('千葉', '千葉医院', '千葉病院'):
+            converter.convert(name)
+        self.assertEqual(converter.cache_info()['size'], 2)
+    
+    def test_persisted_conversions_survive_restart(self):
+        self._converter(persist_path=self.db_path).convert('千葉医院')
+        restarted = self._converter(persist_path=self.db_path)
+        self.assertEqual(restarted.convert('千葉医院'), 'Chiba Clinic')
+        self.assertEqual(restarted.katsu.calls, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
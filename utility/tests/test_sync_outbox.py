@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Unit Tests for the WordPress Sync Outbox
+Tests retry scheduling and the worker's claim → publish → record cycle.
+"""
+
+import os
+import sys
+import unittest
+from datetime import datetime
+from unittest.mock import MagicMock
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from sqlalchemy.exc import IntegrityError
+
+from src.core.database import Provider
+from src.core.sync_outbox import SyncOutbox, backoff_delay
+from src.publishers.sync_worker import SyncWorker
+
+
+class TestRetryScheduling(unittest.TestCase):
+    """Test backoff and the failed / pending / superseded decision"""
+    
+    def setUp(self):
+        self.outbox = SyncOutbox(db=MagicMock(), max_attempts=3, backoff_base=10, backoff_cap=60)
+        self.session = MagicMock()
+    
+    def _statuses(self):
+        return [str(c.args[0]).split("status = '")[1].split("'")[0]
+                for c in self.session.execute.call_args_list]
+    
+    def test_backoff_is_exponential_and_capped(self):
+        self.assertEqual(backoff_delay(1, base=10, jitter=0), 10)
+        self.assertEqual(backoff_delay(3, base=10, jitter=0), 40)
+        self.assertEqual(backoff_delay(20, base=10, cap=60, jitter=0), 60)
+        self.assertTrue(9 <= backoff_delay(1, base=10, jitter=0.1) <= 11)
+    
+    def test_failure_is_rescheduled(self):
+        now = datetime(2024, 5, 1, 12, 0, 0)
+        self.outbox._mark_retry(self.session, {'op_id': 1, 'attempts': 2, 'error': 'timeout'}, now)
+        
+        self.assertEqual(self._statuses(), ['pending'])
+        params = self.session.execute.call_args.args[1]
+        self.assertGreater(params['next_attempt_at'], now)
+    
+    def test_last_attempt_fails_permanently(self):
+        self.outbox._mark_retry(self.session, {'op_id': 1, 'attempts': 3, 'error': 'timeout'}, datetime.utcnow())
+        self.assertEqual(self._statuses(), ['failed'])
+    
+    def test_newer_pending_operation_supersedes_retry(self):
+        self.session.execute.side_effect = [IntegrityError('', {}, Exception()), None]
+        self.outbox._mark_retry(self.session, {'op_id': 1, 'attempts': 1, 'error': 'timeout'}, datetime.utcnow())
+        self.assertEqual(self._statuses(), ['pending', 'superseded'])
+    
+    def test_completion_requires_the_claiming_worker(self):
+        self.session.execute.return_value.rowcount = 0
+        outcome = {'op_id': 1, 'success': True, 'attempts': 1,
+                   'wordpress_info': {'wordpress_post_id': 100, 'content_hash': 'abc'}}
+        
+        with self.assertLogs('src.core.sync_outbox', level='WARNING'):
+            self.outbox._mark_completed(self.session, outcome, 'worker-a', datetime.utcnow())
+        
+        sql, params = self.session.execute.call_args.args
+        self.assertIn("status = 'processing' AND claimed_by = :worker", str(sql))
+        self.assertEqual(params['worker'], 'worker-a')
+    
+    def test_retry_requires_the_claiming_worker(self):
+        self.outbox._mark_retry(self.session, {'op_id': 1, 'attempts': 1, 'error': 'timeout'},
+                                datetime.utcnow(), 'worker-a')
+        self.outbox._mark_retry(self.session, {'op_id': 2, 'attempts': 3, 'error': 'timeout'},
+                                datetime.utcnow(), 'worker-a')
+        
+        for call in self.session.execute.call_args_list:
+            self.assertIn("status = 'processing' AND claimed_by = :worker", str(call.args[0]))
+            self.assertEqual(call.args[1]['worker'], 'worker-a')
+    
+    def test_stale_release_requires_processing_status(self):
+        self.outbox._mark_retry(self.session, {'op_id': 1, 'attempts': 1, 'error': 'lease expired'},
+                                datetime.utcnow())
+        
+        sql = str(self.session.execute.call_args.args[0])
+        self.assertIn("status = 'processing'", sql)
+        self.assertNotIn('claimed_by = :worker', sql)
+    
+    def test_provider_info_written_only_for_held_operations(self):
+        session = self.outbox.db.get_session.return_value
+        # Operation 1 is still held; operation 2 was reclaimed by another worker
+        session.execute.side_effect = lambda sql, params: MagicMock(rowcount=1 if params['op_id'] == 1 else 0)
+        outcomes = [
+            {'op_id': op_id, 'success': True, 'attempts': 1,
+             'wordpress_info': {'provider_id': op_id, 'wordpress_post_id': 100 + op_id, 'content_hash': 'abc'}}
+            for op_id in (1, 2)
+        ]
+        
+        with self.assertLogs('src.core.sync_outbox', level='WARNING'):
+            self.outbox.finish(outcomes, 'worker-a')
+        
+        mappings = session.bulk_update_mappings.call_args.args[1]
+        self.assertEqual([m['id'] for m in mappings], [1])
+        session.commit.assert_called_once()
+
+
+class TestSyncWorker(unittest.TestCase):
+    """Test one worker batch against a stubbed outbox and publisher"""
+    
+    def setUp(self):
+        self.outbox = MagicMock()
+        self.outbox.claim.return_value = [
+            {'id': 10, 'provider_id': 1, 'operation_type': 'create', 'attempts': 1},
+            {'id': 11, 'provider_id': 2, 'operation_type': 'update', 'attempts': 2},
+            {'id': 12, 'provider_id': 3, 'operation_type': 'update', 'attempts': 1}
+        ]
+        self.outbox.load_providers.return_value = {
+            1: Provider(id=1, provider_name='New Clinic'),
+            2: Provider(id=2, provider_name='Broken Clinic', wordpress_post_id=200)
+        }
+        
+        self.publisher = MagicMock()
+        self.publisher.sync_workers = 2
+        self.publisher.sync_provider.side_effect = self._sync
+        self.worker = SyncWorker(publisher=self.publisher, outbox=self.outbox, worker_id='test')
+    
+    def _sync(self, provider):
+        if provider.id == 1:
+            provider.content_hash = 'abc'
+            info = {'provider_id': 1, 'wordpress_post_id': 100, 'content_hash': 'abc'}
+            return 'created', {'success': True, 'post_id': 100, 'wordpress_info': info}
+        return 'updated', {'success': False, 'error': 'WordPress API error 502'}
+    
+    def test_batch_outcomes_are_recorded(self):
+        summary = self.worker.run_once()
+        
+        self.assertEqual(summary, {'claimed': 3, 'completed': 1, 'failed': 2})
+        self.outbox.claim.assert_called_once_with('test', 20)
+        
+        outcomes = {o['op_id']: o for o in self.outbox.finish.call_args.args[0]}
+        self.assertEqual(self.outbox.finish.call_args.args[1], 'test')
+        self.assertTrue(outcomes[10]['success'])
+        self.assertEqual(outcomes[10]['operation_type'], 'create')
+        self.assertEqual(outcomes[10]['wordpress_info']['wordpress_post_id'], 100)
+        self.assertIn('duration', outcomes[10])
+        
+        self.assertEqual(outcomes[11]['error'], 'WordPress API error 502')
+        self.assertEqual(outcomes[11]['attempts'], 2)
+        self.assertNotIn('retry', outcomes[11])
+        
+        # A deleted provider is not worth retrying
+        self.assertFalse(outcomes[12]['retry'])
+    
+    def test_drain_stops_on_empty_queue(self):
+        self.outbox.claim.side_effect = [self.outbox.claim.return_value, []]
+        totals = self.worker.run(drain=True)
+        
+        self.assertEqual(totals['batches'], 1)
+        self.assertEqual(totals['completed'], 1)
+        self.publisher.media.wait.assert_called_once()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Unit Tests for the Taxonomy Page Pipeline
+Tests slug parsing, the missing-page diff, budgeted concurrent generation and
+publishing of changed pages.
+"""
+
+import os
+import sys
+import threading
+import unittest
+from unittest.mock import MagicMock, patch
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.core.taxonomy_pipeline import TaxonomyPipeline, TokenBudget, page_key, parse_combination_slug
+from src.processors.taxonomy_content import TaxonomyContent
+from src.publishers.wp_mirror import hash_field
+
+
+class FakeGenerator:
+    """Returns one page per item and records how many calls overlap"""
+    
+    def __init__(self, tokens_per_call=1000, unparsed=()):
+        self.tokens_per_call = tokens_per_call
+        self.unparsed = set(unparsed)
+        self.calls = 0
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+        self._release = threading.Barrier(2, timeout=2)
+    
+    def generate_pages(self, items):
+        with self._lock:
+            self.calls += 1
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        try:
+            if self.calls <= 2:
+                # The first two calls wait for each other, proving they overlap
+                self._release.wait()
+        except threading.BrokenBarrierError:
+            pass
+        finally:
+            with self._lock:
+                self.active -= 1
+        
+        pages = [
+            None if item[2] in self.unparsed else TaxonomyContent(
+                taxonomy_type='combination', title=f'{item[2]} in {item[1]}',
+                meta_description='meta', brief_intro='Intro', full_description='<p>Body</p>',
+                location=item[1], specialty=item[2], ward=item[3], provider_count=item[4]
+            )
+            for item in items
+        ]
+        return pages, self.tokens_per_call
+
+
+class TestTaxonomyPipeline(unittest.TestCase):
+    """Test the pipeline stages without a database or WordPress"""
+    
+    def _pipeline(self, generator=None, **options):
+        with patch.dict(os.environ, {'WORDPRESS_URL': 'https://example.com'}):
+            pipeline = TaxonomyPipeline(db=MagicMock(), generator=generator,
+                                        mirror=MagicMock(), **options)
+        pipeline.saved = []
+        pipeline._save = lambda pages: pipeline.saved.extend(pages) or len(pages)
+        return pipeline
+    
+    def _items(self, count):
+        return [('combination', 'Tokyo', f'Specialty {i}', 'Minato', count - i) for i in range(count)]
+    
+    def test_parse_combination_slug(self):
+        self.assertEqual(parse_combination_slug('english-dentistry-in-shibuya'),
+                         {'location': 'Tokyo', 'specialty': 'Dentist', 'ward': 'Shibuya'})
+        self.assertEqual(parse_combination_slug('english-cardiology-in-osaka')['location'], 'Osaka')
+        self.assertIsNone(parse_combination_slug('about-us')['location'])
+    
+    def test_token_budget(self):
+        budget = TokenBudget(1000)
+        self.assertTrue(budget.reserve(600))
+        self.assertFalse(budget.reserve(600))
+        budget.settle(600, 300)
+        self.assertTrue(budget.reserve(600))
+        self.assertTrue(TokenBudget().reserve(10 ** 9))
+    
+    def test_find_missing_merges_providers_and_wordpress(self):
+        combinations = [
+            ('combination', 'Tokyo', 'Dentist', 'Shibuya', 3),
+            ('combination', 'Osaka', 'Pediatrics', None, 8)
+        ]
+        wp_pages = [
+            {'wp_id': 1, 'slug': 'english-dentistry-in-shibuya', 'location': 'Tokyo',
+             'specialty': 'Dentist', 'ward': 'Shibuya'},
+            {'wp_id': 2, 'slug': 'english-cardiology-in-kobe', 'location': 'Kobe',
+             'specialty': 'Cardiology', 'ward': None}
+        ]
+        content = {page_key('Osaka', 'Pediatrics', None): {'brief_intro': 'Done'}}
+        
+        missing = TaxonomyPipeline.find_missing(combinations, wp_pages, content)
+        self.assertEqual([(m[1], m[2]) for m in missing], [('Tokyo', 'Dentist'), ('Kobe', 'Cardiology')])
+    
+    def test_generate_runs_batches_concurrently(self):
+        generator = FakeGenerator(unparsed={'Specialty 3'})
+        pipeline = self._pipeline(generator, workers=2, batch_size=2)
+        
+        stats = pipeline.generate(self._items(6))
+        
+        self.assertEqual(generator.calls, 3)
+        self.assertEqual(generator.max_active, 2)
+        self.assertEqual(stats['generated'], 5)
+        self.assertEqual(stats['failed'], 1)
+        self.assertEqual(stats['tokens'], 3000)
+        self.assertEqual(len(pipeline.saved), 5)
+    
+    def test_generate_stops_at_token_budget(self):
+        generator = FakeGenerator(tokens_per_call=2000)
+        pipeline = self._pipeline(generator, workers=1, batch_size=2,
+                                  token_budget=5000, tokens_per_page=1000)
+        
+        stats = pipeline.generate(self._items(8))
+        
+        # Two calls fit; the third would overspend
+        self.assertEqual(generator.calls, 2)
+        self.assertEqual(stats['generated'], 4)
+        self.assertEqual(stats['over_budget'], 4)
+    
+    def test_push_sends_only_changed_pages(self):
+        pipeline = self._pipeline()
+        pipeline.http = MagicMock()
+        pipeline.http.post.return_value.status_code = 200
+        
+        stored = {'title': 'T', 'meta_description': 'M', 'full_description': 'Full',
+                  'wordpress_post_id': None}
+        content = {
+            page_key('Tokyo', 'Dentist', 'Shibuya'): {**stored, 'brief_intro': 'New intro'},
+            page_key('Osaka', 'Pediatrics', None): {**stored, 'brief_intro': 'Same intro'}
+        }
+        wp_pages = [
+            {'wp_id': 1, 'location': 'Tokyo', 'specialty': 'Dentist', 'ward': 'Shibuya',
+             'current_brief_hash': hash_field('Old intro'), 'current_full_hash': hash_field('Full')},
+            {'wp_id': 2, 'location': 'Osaka', 'specialty': 'Pediatrics', 'ward': None,
+             'current_brief_hash': hash_field('Same intro'), 'current_full_hash': hash_field('Full')}
+        ]
+        
+        stats = pipeline.push(wp_pages, content)
+        
+        self.assertEqual(stats, {'candidates': 1, 'updated': 1, 'failed': 0})
+        url = pipeline.http.post.call_args.args[0]
+        self.assertTrue(url.endswith('/wp-json/wp/v2/tc_combination/1'))
+        self.assertEqual(pipeline.http.post.call_args.kwargs['json']['acf']['brief_intro'], 'New intro')
+
+
+if __name__ == '__main__':
+    unittest.main()
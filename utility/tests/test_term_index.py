@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Unit Tests for WordPress Term Index
+Tests bulk loading, normalized lookups, persistence and TTL handling.
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.publishers.term_index import TermIndex, normalize_term_name
+
+
+def _page(terms, total_pages):
+    response = MagicMock()
+    response.status_code = 200
+    response.json.return_value = terms
+    response.headers = {'X-WP-TotalPages': str(total_pages)}
+    return response
+
+
+class TestTermIndex(unittest.TestCase):
+    """Test the term index"""
+    
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmpdir.name, 'terms.db')
+        self.pages = [
+            _page([{'id': 1, 'name': 'Tokyo'}, {'id': 2, 'name': 'Ear, Nose &amp; Throat'}], 2),
+            _page([{'id': 3, 'name': 'Shibuya'}], 2)
+        ]
+    
+    def tearDown(self):
+        self.tmpdir.cleanup()
+    
+    def _index(self, **kwargs):
+        return TermIndex('https://example.com/', ('user', 'pass'), db_path=self.db_path, **kwargs)
+    
+    def test_normalize_term_name(self):
+        self.assertEqual(normalize_term_name('  Ear, Nose &amp;  Throat '), 'ear, nose & throat')
+    
+    @patch('src.publishers.term_index.requests.get')
+    def test_bulk_load_and_lookup(self, mock_get):
+        mock_get.side_effect = self.pages
+        index = self._index()
+        
+        self.assertTrue(index.load('location'))
+        self.assertEqual(mock_get.call_count, 2)
+        self.assertEqual(index.get('location', 'tokyo'), 1)
+        self.assertEqual(index.get('location', 'Ear, Nose & Throat'), 2)
+        self.assertEqual(index.get('location', 'Shibuya'), 3)
+        self.assertIsNone(index.get('location', 'Osaka'))
+    
+    @patch('src.publishers.term_index.requests.get')
+    def test_persisted_index_is_reused(self, mock_get):
+        mock_get.side_effect = self.pages
+        self._index().load('location')
+        self._index().add('location', 4, 'Osaka')
+        
+        restarted = self._index()
+        self.assertTrue(restarted.load('location'))
+        self.assertEqual(mock_get.call_count, 2)
+        self.assertEqual(restarted.get('location', 'Osaka'), 4)
+    
+    @patch('src.publishers.term_index.requests.get')
+    def test_expired_index_is_reloaded(self, mock_get):
+        mock_get.side_effect = self.pages + self.pages
+        self._index().load('location')
+        
+        self.assertTrue(self._index(ttl_hours=0).load('location'))
+        self.assertEqual(mock_get.call_count, 4)
+    
+    @patch('src.publishers.term_index.requests.get')
+    def test_failed_load_is_not_complete(self, mock_get):
+        mock_get.return_value = MagicMock(status_code=500)
+        index = self._index()
+        
+        self.assertFalse(index.load('location'))
+        index.add('location', 9, 'Nagoya')
+        self.assertFalse(index.is_loaded('location'))
+
+
+if __name__ == '__main__':
+    unittest.main()
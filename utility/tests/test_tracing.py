@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Unit Tests for Pipeline Span Tracing
+Tests parent/child nesting, propagation to pool threads, the SQLite sink and
+the flame breakdown.
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.monitoring.tracing import NOOP_SPAN, Span, SpanSink, Tracer, flame_breakdown, propagate
+
+
+class TestTracing(unittest.TestCase):
+    """Test span recording"""
+    
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.sink = SpanSink(os.path.join(self.tmpdir.name, 'traces.db'))
+        self.tracer = Tracer(sink=self.sink)
+    
+    def by_name(self, run_id):
+        return {s.name: s for s in self.sink.spans(run_id)}
+    
+    def test_spans_nest_under_trace(self):
+        with self.tracer.trace('run-1', 'pipeline.run'):
+            with self.tracer.span('phase.collection'):
+                with self.tracer.span('query', query='dentist') as query:
+                    query.set(results=3)
+                self.tracer.record('wordpress.request', 0.25, endpoint='/wp/v2/media')
+        
+        spans = self.by_name('run-1')
+        self.assertIsNone(spans['pipeline.run'].parent_id)
+        self.assertEqual(spans['phase.collection'].parent_id, spans['pipeline.run'].span_id)
+        self.assertEqual(spans['query'].parent_id, spans['phase.collection'].span_id)
+        self.assertEqual(spans['query'].attributes, {'query': 'dentist', 'results': 3})
+        self.assertEqual(spans['wordpress.request'].parent_id, spans['phase.collection'].span_id)
+        self.assertAlmostEqual(spans['wordpress.request'].duration, 0.25)
+    
+    def test_span_outside_trace_is_noop(self):
+        with self.tracer.span('query') as span:
+            self.assertIs(span, NOOP_SPAN)
+        self.tracer.flush()
+        self.assertEqual(self.sink.recent_traces(), [])
+    
+    def test_errors_mark_span(self):
+        with self.assertRaises(ValueError):
+            with self.tracer.trace('run-2', 'pipeline.run'):
+                with self.tracer.span('claude.messages'):
+                    raise ValueError('overloaded')
+        
+        spans = self.by_name('run-2')
+        self.assertEqual(spans['claude.messages'].status, 'error')
+        self.assertEqual(spans['claude.messages'].attributes['error'], 'overloaded')
+        self.assertEqual(spans['pipeline.run'].status, 'error')
+    
+    def test_propagate_to_pool_threads(self):
+        def publish(provider_id):
+            with self.tracer.span('wordpress.provider', provider_id=provider_id):
+                pass
+        
+        with self.tracer.trace('run-3', 'pipeline.run'):
+            with self.tracer.span('phase.publishing'):
+                with ThreadPoolExecutor(max_workers=4) as executor:
+                    list(executor.map(propagate(publish), range(8)))
+        
+        spans = self.sink.spans('run-3')
+        phase = next(s for s in spans if s.name == 'phase.publishing')
+        workers = [s for s in spans if s.name == 'wordpress.provider']
+        self.assertEqual(len(workers), 8)
+        self.assertTrue(all(s.parent_id == phase.span_id for s in workers))
+    
+    def test_flame_breakdown_merges_siblings(self):
+        spans = [
+            Span(trace_id='r', name='pipeline.run', span_id='root', duration=10.0),
+            Span(trace_id='r', name='query', span_id='q1', parent_id='root', duration=4.0),
+            Span(trace_id='r', name='query', span_id='q2', parent_id='root', duration=4.0),
+            Span(trace_id='r', name='google.pagination_wait', span_id='w1', parent_id='q1', duration=2.5),
+            Span(trace_id='r', name='google.pagination_wait', span_id='w2', parent_id='q2', duration=2.5),
+        ]
+        
+        text = flame_breakdown(spans)
+        
+        self.assertIn('query ×2', text)
+        self.assertIn('google.pagination_wait ×2', text)
+        summary = text.split('Self time by span:')[1]
+        self.assertIn('google.pagination_wait', summary.splitlines()[1])
+        self.assertIn('5.00s', summary.splitlines()[1])
+
+
+if __name__ == '__main__':
+    unittest.main()
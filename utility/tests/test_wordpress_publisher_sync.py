@@ -0,0 +1,469 @@
+#!/usr/bin/env python3
+"""
+Unit Tests for the Parallel WordPress Sync Engine
+Runs WordPressPublisher.sync_providers against a local stub WordPress REST server.
+"""
+
+import os
+import re
+import sys
+import json
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.core.database import Provider
+from src.publishers.wordpress import WordPressPublisher
+
+
+class StubWordPress:
+    """Minimal in-memory WordPress REST API"""
+    
+    def __init__(self, throttle_first: int = 0, fail_names=(), bulk=True, bulk_errors: int = 0,
+                 create_errors: int = 0):
+        self.lock = threading.Lock()
+        self.bulk = bulk
+        self.bulk_errors_remaining = bulk_errors
+        self.create_errors_remaining = create_errors
+        self.next_id = 100
+        self.posts = {}
+        self.terms = {'location': {}, 'specialties': {}}
+        self.throttle_remaining = throttle_first
+        self.fail_names = set(fail_names)
+        self.requests = []
+        self.updates = []
+        self.uploads = []
+        self.media = set()
+        self.connections = set()
+    
+    def allocate_id(self):
+        with self.lock:
+            self.next_id += 1
+            return self.next_id
+    
+    def invalid_media(self, body):
+        return 'featured_media' in body and body['featured_media'] not in self.media
+
+
+def make_handler(stub):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        
+        def log_message(self, *args):
+            pass
+        
+        def _send(self, status, body, headers=None):
+            payload = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(payload)))
+            for key, value in (headers or {}).items():
+                self.send_header(key, value)
+            self.end_headers()
+            self.wfile.write(payload)
+        
+        def _record(self):
+            with stub.lock:
+                stub.requests.append((self.command, self.path))
+                stub.connections.add(self.client_address)
+        
+        def do_GET(self):
+            self._record()
+            match = re.match(r'/wp-json/wp/v2/(location|specialties)', self.path)
+            if match:
+                terms = [{'id': i, 'name': n} for n, i in stub.terms[match.group(1)].items()]
+                return self._send(200, terms, {'X-WP-TotalPages': '1'})
+            if self.path.startswith('/images/'):
+                payload = b'image:' + self.path.encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'image/png')
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                return self.wfile.write(payload)
+            self._send(404, {'code': 'rest_no_route'})
+        
+        def do_POST(self):
+            self._record()
+            raw = self.rfile.read(int(self.headers['Content-Length']))
+            if self.path == '/wp-json/wp/v2/media':
+                media_id = stub.allocate_id()
+                with stub.lock:
+                    stub.uploads.append(raw)
+                    stub.media.add(media_id)
+                return self._send(201, {'id': media_id})
+            body = json.loads(raw or b'{}')
+            
+            match = re.match(r'/wp-json/wp/v2/(location|specialties)$', self.path)
+            if match:
+                term_id = stub.allocate_id()
+                with stub.lock:
+                    stub.terms[match.group(1)][body['name']] = term_id
+                return self._send(201, {'id': term_id, 'name': body['name']})
+            
+            if self.path == '/wp-json/wp/v2/healthcare_provider':
+                with stub.lock:
+                    throttled = stub.throttle_remaining > 0
+                    stub.throttle_remaining -= 1
+                if throttled:
+                    return self._send(429, {'code': 'too_many_requests'}, {'Retry-After': '0'})
+                with stub.lock:
+                    failing = stub.create_errors_remaining > 0
+                    stub.create_errors_remaining -= 1
+                if failing:
+                    # The post is saved before the error, as when a later hook fails
+                    stub.posts[stub.allocate_id()] = body
+                    return self._send(500, {'code': 'internal_server_error'})
+                if body['title'] in stub.fail_names:
+                    return self._send(400, {'code': 'rest_invalid_param'})
+                if stub.invalid_media(body):
+                    return self._send(400, {'code': 'rest_invalid_featured_media'})
+                post_id = stub.allocate_id()
+                with stub.lock:
+                    stub.posts[post_id] = body
+                return self._send(201, {'id': post_id})
+            
+            match = re.match(r'/wp-json/wp/v2/healthcare_provider/(\d+)$', self.path)
+            if match:
+                if stub.invalid_media(body):
+                    return self._send(400, {'code': 'rest_invalid_featured_media'})
+                with stub.lock:
+                    stub.updates.append(body)
+                    stub.posts.setdefault(int(match.group(1)), {}).update(body)
+                return self._send(200, {'id': int(match.group(1))})
+            
+            if self.path == '/wp-json/healthcare/v1/providers/bulk' and stub.bulk:
+                with stub.lock:
+                    failing = stub.bulk_errors_remaining > 0
+                    stub.bulk_errors_remaining -= 1
+                if failing:
+                    return self._send(503, {'code': 'service_unavailable'})
+                results = []
+                for item in body['items']:
+                    if item['post'].get('title') in stub.fail_names:
+                        results.append({'ref': item['ref'], 'post_id': None,
+                                        'status': 'error', 'error': 'Invalid title'})
+                        continue
+                    post_id = item.get('post_id') or stub.allocate_id()
+                    post = dict(item['post'])
+                    invalid_media = stub.invalid_media(post)
+                    if invalid_media:
+                        del post['featured_media']
+                    with stub.lock:
+                        stub.posts.setdefault(post_id, {}).update(post, acf=item['acf'])
+                    results.append({'ref': item['ref'], 'google_place_id': item['google_place_id'],
+                                    'post_id': post_id, 'status': 'updated' if item.get('post_id') else 'created',
+                                    'error': None})
+                    if invalid_media:
+                        results[-1]['invalid_featured_media'] = True
+                post_ids = {r['google_place_id']: r['post_id'] for r in results if r['post_id']}
+                return self._send(200, {'results': results, 'post_ids': post_ids})
+            
+            self._send(404, {'code': 'rest_no_route'})
+    
+    return Handler
+
+
+class TestParallelWordPressSync(unittest.TestCase):
+    """Test sync_providers against a stub server"""
+    
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.cwd = os.getcwd()
+        os.chdir(self.tmpdir.name)
+    
+    def tearDown(self):
+        os.chdir(self.cwd)
+        self.tmpdir.cleanup()
+    
+    def _start(self, stub):
+        server = ThreadingHTTPServer(('127.0.0.1', 0), make_handler(stub))
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        return f"http://127.0.0.1:{server.server_address[1]}"
+    
+    def _publisher(self, url, **extra_env):
+        env = {
+            'WORDPRESS_URL': url,
+            'WORDPRESS_USERNAME': 'user',
+            'WORDPRESS_APPLICATION_PASSWORD': 'pass',
+            'WORDPRESS_SYNC_WORKERS': '4',
+            **extra_env
+        }
+        with patch.dict(os.environ, env), patch('src.publishers.wordpress.DatabaseManager') as db_class:
+            publisher = WordPressPublisher()
+        self.db = db_class.return_value
+        return publisher
+    
+    @staticmethod
+    def _providers(count, start_id=1, post_id=None, image=None):
+        return [
+            Provider(
+                id=start_id + i,
+                provider_name=f'Tokyo Clinic {start_id + i}',
+                city='Tokyo',
+                district='Shibuya' if i % 2 else 'Minato',
+                specialties=['Internal Medicine'],
+                google_place_id=f'place-{start_id + i}',
+                selected_featured_image=image,
+                wordpress_post_id=post_id
+            )
+            for i in range(count)
+        ]
+    
+    def test_creates_in_parallel_with_batched_db_updates(self):
+        stub = StubWordPress()
+        publisher = self._publisher(self._start(stub))
+        
+        summary = publisher.sync_providers(self._providers(12), db_batch_size=5)
+        
+        self.assertEqual(summary['created'], 12)
+        self.assertEqual(summary['failed'], 0)
+        self.assertEqual(len(stub.posts), 12)
+        # Sync info is written in batches, never per provider
+        self.db.update_wordpress_info.assert_not_called()
+        batches = [c.args[0] for c in self.db.bulk_update_wordpress_info.call_args_list]
+        self.assertEqual(sum(len(b) for b in batches), 12)
+        self.assertTrue(all(len(b) <= 5 for b in batches))
+        # Terms are created once each and then served from the index
+        term_posts = [r for r in stub.requests if r[0] == 'POST' and 'healthcare_provider' not in r[1]]
+        self.assertEqual(len(term_posts), 4)
+        # Keep-alive pool: far fewer connections than requests
+        self.assertLess(len(stub.connections), len(stub.requests))
+    
+    def test_failed_batch_write_falls_back_to_rows(self):
+        stub = StubWordPress()
+        publisher = self._publisher(self._start(stub))
+        self.db.bulk_update_wordpress_info.return_value = False
+        self.db.update_wordpress_info.side_effect = lambda provider_id, *args: provider_id != 2
+        
+        summary = publisher.sync_providers(self._providers(3))
+        
+        self.assertEqual(summary['created'], 3)
+        written = {c.args[0]: c.args[1] for c in self.db.update_wordpress_info.call_args_list}
+        self.assertEqual(set(written), {1, 2, 3})
+        self.assertTrue(all(post_id in stub.posts for post_id in written.values()))
+        self.assertEqual(len(summary['errors']), 1)
+        self.assertIn(f"WordPress post {written[2]}", summary['errors'][0])
+    
+    def test_retries_throttled_requests(self):
+        stub = StubWordPress(throttle_first=3)
+        publisher = self._publisher(self._start(stub))
+        
+        summary = publisher.sync_providers(self._providers(3))
+        
+        self.assertEqual(summary['created'], 3)
+        self.assertEqual(len(stub.posts), 3)
+    
+    def test_server_errors_on_create_are_not_retried(self):
+        stub = StubWordPress(create_errors=1)
+        publisher = self._publisher(self._start(stub))
+        
+        summary = publisher.sync_providers(self._providers(1))
+        
+        self.assertEqual(summary['failed'], 1)
+        # Retrying the POST would have created the post a second time
+        self.assertEqual(len(stub.posts), 1)
+        creates = [r for r in stub.requests if r == ('POST', '/wp-json/wp/v2/healthcare_provider')]
+        self.assertEqual(len(creates), 1)
+    
+    def test_updates_and_failures(self):
+        stub = StubWordPress(fail_names={'Tokyo Clinic 2'})
+        publisher = self._publisher(self._start(stub))
+        providers = self._providers(2) + self._providers(2, start_id=10, post_id=555)
+        
+        summary = publisher.sync_providers(providers)
+        
+        self.assertEqual(summary['created'], 1)
+        self.assertEqual(summary['updated'], 2)
+        self.assertEqual(summary['failed'], 1)
+        self.assertIn('Tokyo Clinic 2', summary['errors'][0])
+        self.assertIn(555, stub.posts)
+    
+    
+    def test_rating_refresh_sends_only_changed_fields(self):
+        stub = StubWordPress()
+        publisher = self._publisher(self._start(stub))
+        provider = self._providers(1)[0]
+        
+        publisher.sync_providers([provider])
+        post_id = self.db.bulk_update_wordpress_info.call_args.args[0][0]['wordpress_post_id']
+        provider.wordpress_post_id = post_id
+        requests_before = len(stub.requests)
+        
+        provider.rating = 4.7
+        summary = publisher.sync_providers([provider])
+        
+        self.assertEqual(summary['updated'], 1)
+        update = stub.updates[-1]
+        self.assertEqual(set(update), {'acf'})
+        self.assertIn('provider_rating', update['acf'])
+        self.assertNotIn('ai_description', update['acf'])
+        # No taxonomy re-resolution: the only new request is the update itself
+        self.assertEqual(len(stub.requests), requests_before + 1)
+    
+    def test_unchanged_provider_is_skipped(self):
+        stub = StubWordPress()
+        publisher = self._publisher(self._start(stub))
+        provider = self._providers(1)[0]
+        
+        publisher.sync_providers([provider])
+        provider.wordpress_post_id = stub.next_id
+        requests_before = len(stub.requests)
+        
+        publisher.sync_providers([provider])
+        self.assertEqual(len(stub.requests), requests_before)
+    
+    def test_unchanged_fields_still_record_database_hash(self):
+        stub = StubWordPress()
+        publisher = self._publisher(self._start(stub))
+        provider = self._providers(1)[0]
+        publisher.sync_providers([provider])
+        provider.wordpress_post_id = stub.next_id
+        requests_before = len(stub.requests)
+        
+        # A column outside the per-field hashes changed, so only the trigger hash moved
+        provider.current_content_hash = 'rehashed-by-trigger'
+        for bulk in (False, True):
+            publisher.bulk_upsert = bulk
+            summary = publisher.sync_providers([provider])
+            
+            self.assertEqual(summary['failed'], 0)
+            info = self.db.bulk_update_wordpress_info.call_args.args[0]
+            self.assertEqual([row['content_hash'] for row in info], ['rehashed-by-trigger'])
+            provider.content_hash = 'previous'
+        
+        self.assertEqual(len(stub.requests), requests_before)
+    
+    def test_featured_images_upload_once_in_background(self):
+        stub = StubWordPress()
+        url = self._start(stub)
+        publisher = self._publisher(url)
+        
+        summary = publisher.sync_providers(self._providers(4, image=f'{url}/images/a.png'))
+        
+        self.assertEqual(summary['created'], 4)
+        self.assertEqual(summary['media']['attached'], 4)
+        self.assertEqual(len(stub.uploads), 1)
+        self.assertTrue(all('featured_media' in body for body in stub.updates))
+        
+        # A known image is sent with the post itself
+        publisher.sync_providers(self._providers(1, start_id=50, image=f'{url}/images/a.png'))
+        self.assertEqual(len(stub.uploads), 1)
+        self.assertIn('featured_media', list(stub.posts.values())[-1])
+    
+    def test_deleted_media_is_uploaded_again(self):
+        stub = StubWordPress()
+        url = self._start(stub)
+        publisher = self._publisher(url)
+        image = f'{url}/images/a.png'
+        publisher.sync_providers(self._providers(1, image=image))
+        self.assertEqual(len(stub.uploads), 1)
+        
+        # Media library cleanup force-deletes the attachment
+        stub.media.clear()
+        summary = publisher.sync_providers(self._providers(1, start_id=50, image=image))
+        
+        self.assertEqual(summary['created'], 1)
+        self.assertEqual(summary['media']['attached'], 2)
+        self.assertEqual(len(stub.uploads), 2)
+        new_media_id = publisher.media.known_media_id(image)
+        self.assertIn(new_media_id, stub.media)
+        self.assertEqual(stub.updates[-1], {'featured_media': new_media_id})
+    
+    def test_bulk_upsert_replaces_deleted_media(self):
+        stub = StubWordPress()
+        url = self._start(stub)
+        publisher = self._publisher(url)
+        image = f'{url}/images/a.png'
+        publisher.sync_providers(self._providers(1, image=image))
+        stub.media.clear()
+        publisher.bulk_upsert = True
+        
+        summary = publisher.sync_providers(self._providers(1, start_id=50, image=image))
+        
+        self.assertEqual(summary['created'], 1)
+        self.assertEqual(len(stub.uploads), 2)
+        self.assertIn(publisher.media.known_media_id(image), stub.media)
+    
+    def test_bulk_upsert_batches_requests(self):
+        stub = StubWordPress(fail_names={'Tokyo Clinic 3'})
+        publisher = self._publisher(self._start(stub))
+        publisher.bulk_upsert = True
+        providers = self._providers(10) + self._providers(2, start_id=20, post_id=777)
+        
+        summary = publisher.sync_providers(providers, db_batch_size=100)
+        
+        self.assertEqual(summary['created'], 9)
+        self.assertEqual(summary['updated'], 2)
+        self.assertEqual(summary['failed'], 1)
+        self.assertIn('Tokyo Clinic 3', summary['errors'][0])
+        bulk_posts = [r for r in stub.requests if r[1].endswith('/providers/bulk')]
+        self.assertEqual(len(bulk_posts), 1)
+        provider_posts = [r for r in stub.requests if 'healthcare_provider' in r[1]]
+        self.assertEqual(provider_posts, [])
+        info = self.db.bulk_update_wordpress_info.call_args.args[0]
+        self.assertEqual(len(info), 11)
+        self.assertIn(777, {row['wordpress_post_id'] for row in info})
+    
+    def test_bulk_batches_respect_endpoint_limit(self):
+        stub = StubWordPress()
+        publisher = self._publisher(self._start(stub), WORDPRESS_BULK_BATCH_SIZE='500')
+        self.assertEqual(publisher.bulk_batch_size, 100)
+        publisher.bulk_upsert = True
+        
+        summary = publisher.sync_providers(self._providers(105), db_batch_size=500)
+        
+        self.assertEqual(summary['created'], 105)
+        bulk_posts = [r for r in stub.requests if r[1].endswith('/providers/bulk')]
+        self.assertEqual(len(bulk_posts), 2)
+    
+    def test_bulk_upsert_falls_back_without_endpoint(self):
+        stub = StubWordPress(bulk=False)
+        publisher = self._publisher(self._start(stub))
+        publisher.bulk_upsert = True
+        
+        summary = publisher.sync_providers(self._providers(3))
+        
+        self.assertEqual(summary['created'], 3)
+        self.assertEqual(len(stub.posts), 3)
+    
+    def test_bulk_upsert_retries_server_errors_without_fallback(self):
+        stub = StubWordPress(bulk_errors=2)
+        publisher = self._publisher(self._start(stub))
+        publisher.bulk_upsert = True
+        publisher.bulk_retry_backoff = 0
+        
+        summary = publisher.sync_providers(self._providers(3))
+        
+        self.assertEqual(summary['created'], 3)
+        self.assertEqual(len(stub.posts), 3)
+        bulk_posts = [r for r in stub.requests if r[1].endswith('/providers/bulk')]
+        self.assertEqual(len(bulk_posts), 3)
+        # A partly applied batch must never be replayed as per-provider creates
+        provider_posts = [r for r in stub.requests if 'healthcare_provider' in r[1]]
+        self.assertEqual(provider_posts, [])
+    
+    def test_bulk_upsert_reports_failure_after_retries(self):
+        stub = StubWordPress(bulk_errors=10)
+        publisher = self._publisher(self._start(stub))
+        publisher.bulk_upsert = True
+        publisher.bulk_retries = 1
+        publisher.bulk_retry_backoff = 0
+        
+        summary = publisher.sync_providers(self._providers(2))
+        
+        self.assertEqual(summary['failed'], 2)
+        self.assertEqual(summary['created'], 0)
+        self.assertEqual(stub.posts, {})
+        self.db.bulk_update_wordpress_info.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
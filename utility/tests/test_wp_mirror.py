@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Unit Tests for the WordPress Post Mirror
+Tests full and incremental refreshes, projection, deletions and drift detection.
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+from unittest.mock import MagicMock
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.publishers.wp_mirror import WordPressMirror, hash_field
+
+
+class FakeCollection:
+    """In-memory WordPress post collection answering paginated REST GETs"""
+    
+    def __init__(self):
+        self.posts = {}
+        self.calls = []
+    
+    def save(self, post_id, modified, brief='', slug=None):
+        self.posts[post_id] = {
+            'id': post_id,
+            'slug': slug or f'post-{post_id}',
+            'status': 'publish',
+            'title': {'rendered': f'Post {post_id}'},
+            'modified': modified,
+            'modified_gmt': modified,
+            'acf': {'brief_intro': brief, 'full_description': 'Full text'}
+        }
+    
+    def get(self, url, auth=None, params=None, timeout=None):
+        self.calls.append(params)
+        posts = sorted(self.posts.values(), key=lambda p: (p['modified'], p['id']))
+        if 'modified_after' in params:
+            posts = [p for p in posts if p['modified'] > params['modified_after']]
+        if 'include' in params:
+            include = {int(i) for i in params['include'].split(',')}
+            posts = [p for p in posts if p['id'] in include]
+        
+        per_page, page = params['per_page'], params['page']
+        total_pages = max(1, -(-len(posts) // per_page))
+        page_posts = posts[(page - 1) * per_page:page * per_page]
+        
+        fields = params['_fields'].split(',')
+        projected = []
+        for post in page_posts:
+            item = {f: post[f] for f in fields if f in post}
+            acf = {f.split('.', 1)[1]: post['acf'][f.split('.', 1)[1]] for f in fields if f.startswith('acf.')}
+            if acf:
+                item['acf'] = acf
+            projected.append(item)
+        
+        response = MagicMock()
+        response.status_code = 200
+        response.json.return_value = projected
+        response.headers = {'X-WP-TotalPages': str(total_pages), 'X-WP-Total': str(len(posts))}
+        return response
+
+
+class TestWordPressMirror(unittest.TestCase):
+    """Test the post mirror"""
+    
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.site = FakeCollection()
+        for i in range(1, 8):
+            self.site.save(i, f'2024-05-01T10:0{i}:00', brief=f'Intro {i}')
+    
+    def tearDown(self):
+        self.tmpdir.cleanup()
+    
+    def _mirror(self):
+        return WordPressMirror('https://example.com/', ('user', 'pass'), per_page=3,
+                               db_path=os.path.join(self.tmpdir.name, 'mirror.db'),
+                               session=self.site)
+    
+    def test_hash_field(self):
+        self.assertIsNone(hash_field('  '))
+        self.assertIsNone(hash_field(None))
+        self.assertEqual(hash_field(' Intro '), hash_field('Intro'))
+    
+    def test_first_refresh_is_full_and_projected(self):
+        stats = self._mirror().refresh('tc_combination', acf_fields=('brief_intro',))
+        
+        self.assertEqual(stats['mode'], 'full')
+        self.assertEqual(stats['total'], 7)
+        self.assertEqual(len(self.site.calls), 3)
+        self.assertIn('acf.brief_intro', self.site.calls[0]['_fields'])
+        self.assertNotIn('content', self.site.calls[0]['_fields'])
+        
+        posts = self._mirror().posts('tc_combination')
+        self.assertEqual(posts[0]['slug'], 'post-1')
+        self.assertEqual(posts[0]['title'], 'Post 1')
+        self.assertEqual(posts[0]['field_hashes']['brief_intro'], hash_field('Intro 1'))
+    
+    def test_incremental_refresh_fetches_only_modified_posts(self):
+        mirror = self._mirror()
+        mirror.refresh('tc_combination', acf_fields=('brief_intro',))
+        self.assertEqual(mirror.cursor('tc_combination'), '2024-05-01T10:07:00')
+        
+        self.site.save(3, '2024-05-01T11:00:00', brief='Rewritten')
+        self.site.calls.clear()
+        stats = mirror.refresh('tc_combination', acf_fields=('brief_intro',))
+        
+        self.assertEqual(stats['mode'], 'incremental')
+        self.assertEqual(stats['changed'], 1)
+        # Modified posts (plus the overlap window) and one count request
+        self.assertEqual(len(self.site.calls), 2)
+        self.assertIn('modified_after', self.site.calls[0])
+        self.assertEqual(mirror.cursor('tc_combination'), '2024-05-01T11:00:00')
+        post = [p for p in mirror.posts('tc_combination') if p['post_id'] == 3][0]
+        self.assertEqual(post['field_hashes']['brief_intro'], hash_field('Rewritten'))
+    
+    def test_deleted_posts_are_removed(self):
+        mirror = self._mirror()
+        mirror.refresh('tc_combination')
+        
+        del self.site.posts[2]
+        stats = mirror.refresh('tc_combination')
+        
+        self.assertEqual(stats['removed'], 1)
+        self.assertEqual(stats['total'], 6)
+        self.assertNotIn(2, [p['post_id'] for p in mirror.posts('tc_combination')])
+    
+    def test_changed_field_set_forces_full_refresh(self):
+        mirror = self._mirror()
+        mirror.refresh('tc_combination', acf_fields=('brief_intro',))
+        
+        stats = mirror.refresh('tc_combination', acf_fields=('brief_intro', 'full_description'))
+        self.assertEqual(stats['mode'], 'full')
+    
+    def test_find_drift(self):
+        mirror = self._mirror()
+        mirror.refresh('tc_combination', acf_fields=('brief_intro',))
+        
+        expected = {i: {'brief_intro': f'Intro {i}'} for i in range(1, 7)}
+        expected[4] = {'brief_intro': 'Newer intro'}
+        expected[99] = {'brief_intro': 'Never published'}
+        drift = mirror.find_drift('tc_combination', expected)
+        
+        self.assertEqual(drift['missing'], [99])
+        self.assertEqual(drift['extra'], [7])
+        self.assertEqual(drift['changed'], {4: ['brief_intro']})
+
+
+if __name__ == '__main__':
+    unittest.main()